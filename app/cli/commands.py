@@ -6,6 +6,7 @@ import time
 from pathlib import Path as _Path
 
 from app.core.brush_engine import BrushEngine
+from app.core.clean_analysis import preview_clean
 from app.core.engine import ColmapEngine
 from app.core.i18n import tr
 from app.core.params import FEATURE_TO_DEFAULT_MATCHING, ColmapParams
@@ -99,6 +100,19 @@ def run_colmap(args):
         undistort_images=args.undistort,
         filter_blurry=args.filter_blur,
         blur_factor=_blur_factor_from_strength(args.blur_strength),
+        blur_downscale=args.blur_downscale,
+        blur_stream_window=args.blur_stream_window,
+        keyframe_budget=args.keyframe_budget,
+        keyframe_fps=args.keyframe_fps,
+        dedupe_images=args.dedupe,
+        dedupe_distance=args.dedupe_distance,
+        ingest_mode=args.ingest_mode,
+        stage_cache=args.stage_cache,
+        merge_submodels=args.merge_submodels,
+        partition_mode=args.partition_mode,
+        partition_size=args.partition_size,
+        partition_overlap=args.partition_overlap,
+        partition_workers=args.partition_workers,
         use_view_graph_calibration=getattr(args, 'view_graph_calibration', True),
         ignore_watermarks=getattr(args, 'ignore_watermarks', True),
         thermal_throttling=args.thermal_throttling,
@@ -116,6 +130,7 @@ def run_colmap(args):
         logger_callback=print,
         progress_callback=lambda x: print(tr("cli_progression", x)),
     )
+    engine.resume_from = getattr(args, "resume_from", None)
 
     success, msg = engine.run()
     if success:
@@ -380,6 +395,9 @@ def run_clean(args):
         overrides["scale_pct"] = args.scale_pct
     if args.outlier_pct is not None:
         overrides["outlier_pct"] = args.outlier_pct
+    for key in ("outlier_mode", "knn_k", "knn_sigma", "low_memory", "streaming"):
+        if getattr(args, key, None) is not None:
+            overrides[key] = getattr(args, key)
 
     input_path = _Path(args.input)
     output_path = _Path(args.output)
@@ -389,6 +407,9 @@ def run_clean(args):
         print(f"Nettoyage par lots : {input_path} → {output_path}")
         print(f"  Sévérité : {args.strength}")
         print(f"  Récursif : {'oui' if args.recursive else 'non'}")
+        jobs = getattr(args, "jobs", 1)
+        if jobs != 1:
+            print(f"  Processus : {jobs if jobs > 0 else 'auto'}")
         if overrides:
             print(f"  Surcharges : {overrides}")
 
@@ -396,7 +417,7 @@ def run_clean(args):
             all_stats = clean_ply_batch(
                 input_path, output_path,
                 strength=args.strength, overrides=overrides or None,
-                log=print, recursive=args.recursive,
+                log=print, recursive=args.recursive, workers=jobs,
             )
             success = sum(1 for s in all_stats if "error" not in s)
             failed = len(all_stats) - success
@@ -404,7 +425,7 @@ def run_clean(args):
                 if "error" in s:
                     print(f"  ✗ {s['file']}: {s['error']}")
                 else:
-                    print(f"  ✓ {s['file']}: {s['kept']}/{s['total']} splats conservés")
+                    print(f"  ✓ {s['file']}: {s['kept']}/{s['total']} splats conservés ({s['seconds']:.2f}s)")
             print(f"Terminé : {success} réussis, {failed} échoués.")
             if failed > 0:
                 sys.exit(1)
@@ -419,6 +440,14 @@ def run_clean(args):
             print(f"  Surcharges : {overrides}")
 
         try:
+            if getattr(args, "preview", False):
+                stats = preview_clean(args.input, strength=args.strength, overrides=overrides or None, log=print)
+                print(
+                    f"Aperçu : {stats['kept']}/{stats['total']} splats conservés "
+                    f"(opacité -{stats['removed_opacity']}, échelle -{stats['removed_scale']}, "
+                    f"distance -{stats['removed_outlier']}) — aucun fichier écrit"
+                )
+                return
             stats = clean_ply(args.input, args.output, strength=args.strength, overrides=overrides or None, log=print)
             print(f"Terminé : {stats['kept']}/{stats['total']} splats conservés ({stats['removed']} retirés)")
         except ValueError as e:
@@ -590,6 +619,19 @@ def run_pipeline(args):
         undistort_images=args.undistort,
         filter_blurry=getattr(args, "filter_blur", False),
         blur_factor=_blur_factor_from_strength(getattr(args, "blur_strength", "medium")),
+        blur_downscale=getattr(args, "blur_downscale", 1),
+        blur_stream_window=getattr(args, "blur_stream_window", 0),
+        keyframe_budget=getattr(args, "keyframe_budget", 0),
+        keyframe_fps=getattr(args, "keyframe_fps", 10.0),
+        dedupe_images=getattr(args, "dedupe", False),
+        dedupe_distance=getattr(args, "dedupe_distance", 6),
+        ingest_mode=getattr(args, "ingest_mode", "auto"),
+        stage_cache=getattr(args, "stage_cache", False),
+        merge_submodels=getattr(args, "merge_submodels", False),
+        partition_mode=getattr(args, "partition_mode", "off"),
+        partition_size=getattr(args, "partition_size", 500),
+        partition_overlap=getattr(args, "partition_overlap", 50),
+        partition_workers=getattr(args, "partition_workers", 0),
         use_view_graph_calibration=getattr(args, 'view_graph_calibration', True),
         ignore_watermarks=getattr(args, 'ignore_watermarks', True),
         thermal_throttling=getattr(args, 'thermal_throttling', False),
@@ -603,6 +645,7 @@ def run_pipeline(args):
         logger_callback=print,
         progress_callback=lambda x: print(f"  Progression : {x}%"),
     )
+    colmap_engine.resume_from = getattr(args, "resume_from", None)
 
     try:
         success, msg = colmap_engine.run()
@@ -662,6 +705,18 @@ def run_pipeline(args):
         sys.exit(1)
 
 
+def run_jobs(args):
+    """Affiche la file des jobs publiée par les instances en cours."""
+    from app.core.scheduler import format_state, read_published_states
+
+    states = read_published_states()
+    if not states:
+        print("Aucune instance CorbeauSplat en cours.")
+        return
+    for state in states:
+        print(format_state(state))
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # Command dispatch
 # ─────────────────────────────────────────────────────────────────────────────
@@ -677,4 +732,5 @@ DISPATCH = {
     "extract360":       run_extract360,
     "clean":            run_clean,
     "splattransform":   run_splat_transform,
+    "jobs":             run_jobs,
 }
@@ -55,8 +55,8 @@ def get_parser():
                    help="Extracteur de features (défaut: ALIKED_N32). ALIKED requiert ONNX (intégré dans brew colmap)")
     p.add_argument("--matching_type", choices=["SIFT_BRUTEFORCE","ALIKED_BRUTEFORCE","SIFT_LIGHTGLUE","ALIKED_LIGHTGLUE"], default=None,
                    help="Algorithme de matching (défaut: auto selon --feature-type). LightGlue = matching neuronal")
-    p.add_argument("--matcher_type", choices=["exhaustive","sequential","vocab_tree"], default="exhaustive",
-                   help="Stratégie de matching (défaut: exhaustive)")
+    p.add_argument("--matcher_type", choices=["exhaustive","sequential","vocab_tree","auto"], default="exhaustive",
+                   help="Stratégie de matching ; auto = selon le nombre d'images, la séquence des noms et des vignettes (défaut: exhaustive)")
     p.add_argument("--max_image_size", type=int, default=3200,
                    help="Résolution max des images pour COLMAP (défaut: 3200)")
     # Brush
@@ -75,6 +75,35 @@ def get_parser():
     p.add_argument("--filter_blur",  action="store_true", help="Filtrer les images floues avant COLMAP")
     p.add_argument("--blur_strength", choices=["light","medium","strong"], default="medium",
                    help="Force du filtre flou (défaut: medium)")
+    p.add_argument("--blur_downscale", type=int, choices=[1, 2, 4, 8], default=1,
+                   help="Réduction du décodage pour le score de netteté (1 = pleine résolution, défaut: 1)")
+    p.add_argument("--blur_stream_window", type=int, default=0, metavar="N",
+                   help="Vidéo : filtrage flou en flux contre la médiane des N dernières frames, ex. 31 (0 = passe globale après extraction, défaut: 0)")
+    p.add_argument("--keyframe_budget", type=int, default=0, metavar="N",
+                   help="Vidéo : sélectionner N keyframes selon le mouvement de caméra au lieu d'un fps fixe (0 = désactivé)")
+    p.add_argument("--keyframe_fps", type=float, default=10.0,
+                   help="Fréquence des frames candidates pour la sélection de keyframes (défaut: 10)")
+    p.add_argument("--dedupe",       action="store_true", help="Écarter les quasi-doublons (rafales) d'un dossier d'images")
+    p.add_argument("--dedupe_distance", type=int, default=6, metavar="BITS",
+                   help="Distance de Hamming max entre hashes perceptuels (sur 64 bits, défaut: 6)")
+    p.add_argument("--ingest_mode", choices=["auto", "link", "copy"], default="auto",
+                   help="Import des images : auto = reflink sinon copie, link = liens physiques (défaut: auto)")
+    p.add_argument("--stage_cache", action="store_true",
+                   help="Réutiliser les bases COLMAP après extraction et matching (colmap_cache/) ; sans reflink, chaque entrée copie database.db")
+    p.add_argument("--merge_submodels", action="store_true",
+                   help="Fusionner les sous-modèles sparse partageant des images (colmap model_merger) avant de retenir le meilleur")
+    p.add_argument("--partition", dest="partition_mode", default="off",
+                   choices=["off", "auto", "sequential", "graph"],
+                   help="Reconstruction partitionnée des grands jeux : clusters reconstruits en parallèle puis fusionnés (défaut: off)")
+    p.add_argument("--partition_size", type=int, default=500, metavar="N",
+                   help="Images max par cluster (défaut: 500)")
+    p.add_argument("--partition_overlap", type=int, default=50, metavar="N",
+                   help="Images communes ajoutées à chaque cluster pour la fusion (défaut: 50)")
+    p.add_argument("--partition_workers", type=int, default=0, metavar="N",
+                   help="Mappers de clusters simultanés (0 = selon le nombre de threads)")
+    p.add_argument("--resume-from", dest="resume_from", default=None,
+                   choices=["auto", "extraction", "matching", "calibration", "mapper", "undistortion"],
+                   help="Reprendre un projet existant (images conservées) : auto = première étape COLMAP incomplète")
     p.add_argument("--robust",       action="store_true", help="Mode robuste pour grandes scènes (anti-crash COLMAP)")
     p.add_argument("--thermal-throttling", action="store_true", help="Activer le throttling thermique")
     p.add_argument("--view-graph-calibration", action="store_true", default=True, help="Calibrer le graphe de vues (recommandé pour vidéo IA)")
@@ -105,8 +134,8 @@ def get_parser():
     p.add_argument("--estimate_affine_shape", action="store_true", help="Estimer la forme affine des features")
     p.add_argument("--no_domain_size_pooling", action="store_true", help="Désactiver le domain size pooling")
     # Feature matching
-    p.add_argument("--matcher_type", choices=["exhaustive","sequential","vocab_tree"], default="exhaustive",
-                   help="Stratégie de matching (défaut: exhaustive)")
+    p.add_argument("--matcher_type", choices=["exhaustive","sequential","vocab_tree","auto"], default="exhaustive",
+                   help="Stratégie de matching ; auto = selon le nombre d'images, la séquence des noms et des vignettes (défaut: exhaustive)")
     p.add_argument("--max_ratio",    type=float, default=0.8,  help="Ratio max Lowe (défaut: 0.8)")
     p.add_argument("--max_distance", type=float, default=0.7,  help="Distance max (défaut: 0.7)")
     p.add_argument("--no_cross_check", action="store_true", help="Désactiver le cross-check")
@@ -118,6 +147,35 @@ def get_parser():
     p.add_argument("--filter_blur",  action="store_true", help="Filtrer les images floues avant COLMAP")
     p.add_argument("--blur_strength", choices=["light","medium","strong"], default="medium",
                    help="Force du filtre flou (défaut: medium)")
+    p.add_argument("--blur_downscale", type=int, choices=[1, 2, 4, 8], default=1,
+                   help="Réduction du décodage pour le score de netteté (1 = pleine résolution, défaut: 1)")
+    p.add_argument("--blur_stream_window", type=int, default=0, metavar="N",
+                   help="Vidéo : filtrage flou en flux contre la médiane des N dernières frames, ex. 31 (0 = passe globale après extraction, défaut: 0)")
+    p.add_argument("--keyframe_budget", type=int, default=0, metavar="N",
+                   help="Vidéo : sélectionner N keyframes selon le mouvement de caméra au lieu d'un fps fixe (0 = désactivé)")
+    p.add_argument("--keyframe_fps", type=float, default=10.0,
+                   help="Fréquence des frames candidates pour la sélection de keyframes (défaut: 10)")
+    p.add_argument("--dedupe",       action="store_true", help="Écarter les quasi-doublons (rafales) d'un dossier d'images")
+    p.add_argument("--dedupe_distance", type=int, default=6, metavar="BITS",
+                   help="Distance de Hamming max entre hashes perceptuels (sur 64 bits, défaut: 6)")
+    p.add_argument("--ingest_mode", choices=["auto", "link", "copy"], default="auto",
+                   help="Import des images : auto = reflink sinon copie, link = liens physiques (défaut: auto)")
+    p.add_argument("--stage_cache", action="store_true",
+                   help="Réutiliser les bases COLMAP après extraction et matching (colmap_cache/) ; sans reflink, chaque entrée copie database.db")
+    p.add_argument("--merge_submodels", action="store_true",
+                   help="Fusionner les sous-modèles sparse partageant des images (colmap model_merger) avant de retenir le meilleur")
+    p.add_argument("--partition", dest="partition_mode", default="off",
+                   choices=["off", "auto", "sequential", "graph"],
+                   help="Reconstruction partitionnée des grands jeux : clusters reconstruits en parallèle puis fusionnés (défaut: off)")
+    p.add_argument("--partition_size", type=int, default=500, metavar="N",
+                   help="Images max par cluster (défaut: 500)")
+    p.add_argument("--partition_overlap", type=int, default=50, metavar="N",
+                   help="Images communes ajoutées à chaque cluster pour la fusion (défaut: 50)")
+    p.add_argument("--partition_workers", type=int, default=0, metavar="N",
+                   help="Mappers de clusters simultanés (0 = selon le nombre de threads)")
+    p.add_argument("--resume-from", dest="resume_from", default=None,
+                   choices=["auto", "extraction", "matching", "calibration", "mapper", "undistortion"],
+                   help="Reprendre un projet existant (images conservées) : auto = première étape COLMAP incomplète")
     p.add_argument("--robust",       action="store_true", help="Mode robuste pour grandes scènes (anti-crash COLMAP)")
     p.add_argument("--thermal-throttling", action="store_true", help="Activer le throttling thermique")
     p.add_argument("--view-graph-calibration", action="store_true", default=True, help="Calibrer le graphe de vues (recommandé pour vidéo IA)")
@@ -210,12 +268,26 @@ def get_parser():
                    help="Sévérité du nettoyage (défaut: medium)")
     p.add_argument("--recursive", "-r", action="store_true",
                    help="Parcourir récursivement les sous-dossiers (mode dossier uniquement)")
+    p.add_argument("--jobs", "-j", type=int, default=1,
+                   help="Processus parallèles en mode dossier (0 = auto, plafonné selon la RAM ; défaut: 1)")
     p.add_argument("--opacity_min", type=float, default=None,
                    help="Opacité minimale (0-1, surcharge le preset)")
     p.add_argument("--scale_pct", type=float, default=None,
                    help="Percentile d'échelle max (90-100, surcharge le preset)")
     p.add_argument("--outlier_pct", type=float, default=None,
                    help="Percentile de distance max (90-100, surcharge le preset)")
+    p.add_argument("--outlier_mode", choices=["median", "knn"], default=None,
+                   help="Filtre spatial : distance au centre (median) ou densité k plus proches voisins (knn)")
+    p.add_argument("--knn_k", type=int, default=None,
+                   help="Nombre de voisins du mode knn (surcharge le preset)")
+    p.add_argument("--knn_sigma", type=float, default=None,
+                   help="Seuil du mode knn en écarts robustes (MAD) (surcharge le preset)")
+    p.add_argument("--low-memory", action="store_true", default=None,
+                   help="Calcul du masque en float32 par blocs (auto si la RAM est insuffisante)")
+    p.add_argument("--streaming", action="store_true", default=None,
+                   help="Seuils estimés en flux (quantiles approchés à 0,1 %%), mémoire indépendante de la taille")
+    p.add_argument("--preview", action="store_true",
+                   help="Fichier unique : afficher les splats conservés sans écrire (analyse mise en cache)")
     p.add_argument("--then-export", metavar="FORMAT",
                    choices=["spz", "glb", "obj", "ply", "xyz"],
                    help="Enchaîner un export après le nettoyage (format cible)")
@@ -283,4 +355,7 @@ def get_parser():
     p.add_argument("--motion_threshold", type=float, default=0.3,
                    help="Seuil de mouvement pour l'extraction adaptative (défaut: 0.3)")
 
+    # ── jobs ──────────────────────────────────────────────────────────────────
+    subs.add_parser("jobs", help="File des jobs des instances CorbeauSplat en cours (GUI)")
+
     return parser
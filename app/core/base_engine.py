@@ -1,15 +1,20 @@
+import asyncio
 import contextlib
+import inspect
 import logging
 import os
 import select as _select
 import signal
 import subprocess
 import sys
-from collections.abc import Iterator
+import threading
+import time
+from collections.abc import Awaitable, Iterator
 from pathlib import Path
 from typing import Any
 
 from .system import get_device, resolve_project_root
+from .telemetry import TelemetryBackend, TelemetrySampler, default_backend, format_summary, run_path
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 
@@ -41,6 +46,16 @@ class IProcessRunner:
     def get_returncode(self) -> int:
         raise NotImplementedError()
 
+def _preexec_with_nice():
+    """Setup child process: new session group + background priority."""
+    try:
+        os.setsid()
+        # nice=10 → background priority (E-core preference on AS)
+        os.nice(10)
+    except OSError:
+        pass  # non-critical, continue
+
+
 class SubprocessRunner(IProcessRunner):
     """Implémentation concrète de l'OS via subprocess"""
     def __init__(self):
@@ -60,15 +75,6 @@ class SubprocessRunner(IProcessRunner):
         #   - Le throttling thermique est plus agressif
         #   - L'UI reste réactive même pendant COLMAP/Brush/Sharp
         if sys.platform != "win32":
-            def _preexec_with_nice():
-                """Setup child process: new session group + background priority."""
-                try:
-                    os.setsid()
-                    # nice=10 → background priority (E-core preference on AS)
-                    os.nice(10)
-                except OSError:
-                    pass  # non-critical, continue
-
             base_kwargs['preexec_fn'] = _preexec_with_nice
 
         self._process = subprocess.Popen(cmd, env=env, **base_kwargs)
@@ -120,11 +126,179 @@ class SubprocessRunner(IProcessRunner):
         return -1
 
 
+_supervisor_lock = threading.Lock()
+_supervisor_loop: asyncio.AbstractEventLoop | None = None
+
+
+def supervisor_loop() -> asyncio.AbstractEventLoop:
+    """Boucle asyncio partagée, tournant dans un thread démon : elle supervise
+    les processus de tous les ``AsyncProcessRunner`` utilisés en synchrone."""
+    global _supervisor_loop
+    with _supervisor_lock:
+        if _supervisor_loop is None or _supervisor_loop.is_closed():
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="process-supervisor", daemon=True).start()
+            _supervisor_loop = loop
+        return _supervisor_loop
+
+
+class AsyncProcessRunner(IProcessRunner):
+    """Implémentation asyncio (``create_subprocess_exec``) : une seule boucle
+    d'événements lit la sortie de tous les processus, sans thread de lecture
+    (``select`` + ``readline``) bloqué par enfant.
+
+    API native (coroutines, depuis la boucle du runner) : ``start_async``,
+    ``readline_async``, ``wait_async``, ``terminate_async``. Les méthodes
+    synchrones d'``IProcessRunner`` y sont relayées depuis un autre thread
+    (boucle ``supervisor_loop()`` par défaut). ``cancel()`` est thread-safe et
+    réveille immédiatement une lecture en attente.
+    """
+    # Taille maximale d'une ligne (asyncio plafonne à 64 Ko par défaut).
+    STREAM_LIMIT = 1 << 20
+
+    def __init__(self, loop: asyncio.AbstractEventLoop | None = None):
+        self._loop = loop
+        self._process: asyncio.subprocess.Process | None = None
+        self._cancel_event: asyncio.Event | None = None
+        self._pending_read: asyncio.Future | None = None
+        self.cancelled = False
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        if self._loop is None:
+            self._loop = supervisor_loop()
+        return self._loop
+
+    def _in_loop(self) -> bool:
+        try:
+            return asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            return False
+
+    def call(self, coro: Awaitable):
+        """Exécute ``coro`` sur la boucle du runner et attend son résultat
+        (depuis un autre thread que celui de la boucle)."""
+        if self._in_loop():
+            coro.close()
+            raise RuntimeError("appel synchrone depuis la boucle du runner : utiliser la variante async")
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+    # ── API asyncio ────────────────────────────────────────────────────────
+    async def start_async(self, cmd: list, env: dict | None = None, **kwargs):
+        self._loop = asyncio.get_running_loop()
+        self._cancel_event = asyncio.Event()
+        self._pending_read = None
+        self.cancelled = False
+        # Options de Popen sans équivalent : la sortie est décodée ligne à ligne.
+        for key in ("text", "universal_newlines", "encoding", "errors", "bufsize"):
+            kwargs.pop(key, None)
+        if sys.platform != "win32":
+            kwargs.setdefault('preexec_fn', _preexec_with_nice)
+        kwargs.setdefault('stdout', asyncio.subprocess.PIPE)
+        kwargs.setdefault('stderr', asyncio.subprocess.STDOUT)
+        self._process = await asyncio.create_subprocess_exec(
+            *map(str, cmd), env=env, limit=self.STREAM_LIMIT, **kwargs
+        )
+        return self._process
+
+    async def readline_async(self, timeout: float | None = None) -> str | None:
+        """Ligne suivante ; None si ``timeout`` expire ou si ``cancel()`` est
+        appelé, chaîne vide en fin de flux. Une lecture interrompue par le
+        timeout reste en cours et sert à l'appel suivant."""
+        if not self._process or not self._process.stdout:
+            return ""
+        if self._cancel_event.is_set():
+            return None
+        if self._pending_read is None:
+            self._pending_read = asyncio.ensure_future(self._process.stdout.readline())
+        cancel_wait = asyncio.ensure_future(self._cancel_event.wait())
+        try:
+            done, _ = await asyncio.wait({self._pending_read, cancel_wait}, timeout=timeout,
+                                         return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            cancel_wait.cancel()
+        if self._pending_read not in done:
+            return None
+        read, self._pending_read = self._pending_read, None
+        try:
+            data = read.result()
+        except ValueError:
+            return "\n"  # ligne au-delà de STREAM_LIMIT : abandonnée par asyncio
+        return data.decode(errors="replace")
+
+    async def wait_async(self, timeout: float | None = None) -> int | None:
+        if not self._process:
+            return None
+        try:
+            return await asyncio.wait_for(self._process.wait(), timeout)
+        except asyncio.TimeoutError:
+            raise subprocess.TimeoutExpired(str(self._process.pid), timeout) from None
+
+    async def terminate_async(self) -> None:
+        process = self._process
+        if process is None or process.returncode is not None:
+            return
+        try:
+            if sys.platform != "win32":
+                os.killpg(os.getpgid(process.pid), signal.SIGTERM)
+            else:
+                process.terminate()
+            await asyncio.wait_for(process.wait(), 5)
+        except (ProcessLookupError, PermissionError, OSError, asyncio.TimeoutError):
+            with contextlib.suppress(ProcessLookupError):
+                process.kill()
+            with contextlib.suppress(asyncio.TimeoutError):
+                # unrecoverable zombie — process will be reaped by OS
+                await asyncio.wait_for(process.wait(), 2)
+
+    def cancel(self) -> None:
+        """Signale l'annulation (thread-safe) sans attendre la fin du processus."""
+        self.cancelled = True
+        if self._cancel_event is not None and self._loop is not None:
+            with contextlib.suppress(RuntimeError):  # boucle déjà fermée
+                self._loop.call_soon_threadsafe(self._cancel_event.set)
+
+    # ── IProcessRunner (synchrone) ─────────────────────────────────────────
+    def start(self, cmd: list, env: dict | None = None, **kwargs):
+        return self.call(self.start_async(cmd, env, **kwargs))
+
+    def poll(self):
+        return self._process.returncode if self._process else None
+
+    def wait(self, timeout=None):
+        return self.call(self.wait_async(timeout))
+
+    def terminate(self):
+        self.cancel()
+        if self._process is None or self._process.returncode is not None:
+            return
+        if self._in_loop():
+            self._loop.create_task(self.terminate_async())
+        else:
+            # Sans attendre : SIGTERM puis, jusqu'à 7 s plus tard, SIGKILL
+            # bloqueraient l'appelant (thread GUI via ``BaseEngine.stop``).
+            with contextlib.suppress(RuntimeError):  # boucle déjà fermée
+                asyncio.run_coroutine_threadsafe(self.terminate_async(), self.loop)
+
+    def stdout_iter(self) -> Iterator[str]:
+        while line := self.readline():
+            yield line
+
+    def readline(self, timeout: float | None = None) -> str | None:
+        return self.call(self.readline_async(timeout))
+
+    def get_returncode(self) -> int:
+        if self._process and self._process.returncode is not None:
+            return self._process.returncode
+        return -1
+
+
 class BaseEngine:
     """
     Base class for all engines to consolidate common logic.
     """
     _THERMAL_CHECK_INTERVAL = 30  # seconds between thermal state checks
+    _TELEMETRY_INTERVAL = 1.0  # seconds between resource samples of the child group
 
     def __init__(self, name, logger_callback=None, process_runner: IProcessRunner | None = None, thermal_throttling: bool = False):
         self.name = name
@@ -144,6 +318,11 @@ class BaseEngine:
         self.runner = process_runner or SubprocessRunner()
         self.process = None # Retro-compatibilité temporaire
 
+        # Télémétrie des commandes (app.core.telemetry) : JSONL par exécution
+        # dans ce dossier (``<projet>/telemetry``) ; None = désactivée.
+        self.telemetry_dir: Path | None = None
+        self.telemetry_backend: TelemetryBackend | None = None  # None = backend de la plateforme
+
     def _check_initial_thermal(self):
         """Log a warning if thermal state is already degraded at startup."""
         if not self.thermal_throttling:
@@ -201,6 +380,32 @@ class BaseEngine:
         if self.logger_callback:
             self.logger_callback(message)
 
+    def _start_telemetry(self, cmd: list, pid) -> TelemetrySampler | None:
+        """Échantillonne le groupe de processus de l'enfant ``pid`` (leader
+        de session via ``setsid``) si ``telemetry_dir`` est défini."""
+        if self.telemetry_dir is None or not isinstance(pid, int):
+            return None
+        backend = self.telemetry_backend or default_backend()
+        if backend is None:
+            return None
+        try:
+            path = run_path(self.telemetry_dir, f"{self.name}-{Path(str(cmd[0])).name}")
+            return TelemetrySampler(pid, path, backend, self._TELEMETRY_INTERVAL,
+                                    header={"engine": self.name, "cmd": list(map(str, cmd))}).start()
+        except OSError as e:
+            self.log(f"Télémétrie désactivée : {e}", level=logging.WARNING)
+            return None
+
+    def _stop_telemetry(self, sampler: TelemetrySampler | None) -> None:
+        """Arrête l'échantillonnage et résume pics / moyennes dans le log."""
+        if sampler is None:
+            return
+        summary = sampler.stop()
+        if summary:
+            self.log(f"Télémétrie : {format_summary(summary)} → {sampler.path}")
+        else:
+            sampler.path.unlink(missing_ok=True)  # exécution plus courte qu'un intervalle
+
     def stop(self):
         self.stop_requested = True
         self.runner.terminate()
@@ -230,11 +435,19 @@ class BaseEngine:
 
         if self.stop_requested:
             return -1
+        if isinstance(self.runner, AsyncProcessRunner):
+            # Supervision par la boucle du runner ; ce thread attend seulement le résultat.
+            return self.runner.call(self._execute_command_async(
+                cmd, env=env, line_callback=line_callback, timeout=timeout,
+                inactivity_timeout=inactivity_timeout, **kwargs,
+            ))
 
         self.log(f"Exec: {' '.join(map(str, cmd))}")
+        telemetry = None
         try:
             self.runner.start(cmd, env=env, **kwargs)
             self.process = getattr(self.runner, '_process', None) # Legacy mapping
+            telemetry = self._start_telemetry(cmd, getattr(self.process, 'pid', None))
 
             read_timeout = min(self._THERMAL_CHECK_INTERVAL, 10.0)  # check every N seconds
             start_time = _time.monotonic()
@@ -295,6 +508,100 @@ class BaseEngine:
             self.logger.error("Exception in _execute_command", exc_info=True)
             self.log(f"Exception: {e}", level=logging.ERROR)
             return -1
+        finally:
+            self._stop_telemetry(telemetry)
+
+    async def _execute_command_async(self, cmd: list, env: dict | None = None, line_callback=None,
+                                     timeout: float = 3600, inactivity_timeout: float = 0, **kwargs) -> int:
+        """Variante awaitable de ``_execute_command`` (mêmes paramètres, même
+        returncode, -1 si annulé, en timeout ou en erreur).
+
+        Si ``self.runner`` n'est pas un ``AsyncProcessRunner``, un runner lié à
+        la boucle courante le remplace le temps de l'exécution (``stop()`` le
+        trouve ainsi), puis le runner d'origine est rétabli. Aucun thread n'est bloqué pendant
+        l'exécution : ``stop()`` réveille aussitôt la lecture en cours, et le
+        watchdog thermique tourne dans l'executor par défaut. ``line_callback``
+        peut être une fonction ou une coroutine ; elle s'exécute dans la boucle,
+        partagée avec les autres moteurs : elle doit rester brève.
+        """
+        if self.stop_requested:
+            return -1
+        previous = self.runner
+        if isinstance(previous, AsyncProcessRunner):
+            runner = previous
+        else:
+            runner = self.runner = AsyncProcessRunner(asyncio.get_running_loop())
+
+        self.log(f"Exec: {' '.join(map(str, cmd))}")
+        telemetry = None
+        try:
+            # self.process (Popen hérité, cf. _kill_process) reste inutilisé ici :
+            # l'arrêt passe par runner.terminate().
+            process = await runner.start_async(cmd, env=env, **kwargs)
+            # Lectures /proc et join du thread d'échantillonnage hors de la boucle.
+            telemetry = await asyncio.to_thread(self._start_telemetry, cmd, getattr(process, 'pid', None))
+            start_time = last_output_time = time.monotonic()
+            while True:
+                now = time.monotonic()
+                remaining = timeout - (now - start_time)
+                if remaining <= 0:
+                    self.log(f"Timeout after {timeout}s (wall-clock) — forcing termination", level=logging.WARNING)
+                    await runner.terminate_async()
+                    return -1
+                read_timeout = remaining
+                if inactivity_timeout > 0:
+                    idle = now - last_output_time
+                    if idle >= inactivity_timeout:
+                        self.log(
+                            f"Inactivity timeout after {idle:.0f}s "
+                            f"(no stdout for {inactivity_timeout}s) — forcing termination",
+                            level=logging.WARNING
+                        )
+                        await runner.terminate_async()
+                        return -1
+                    read_timeout = min(read_timeout, inactivity_timeout - idle)
+                if self.thermal_throttling:
+                    due = now - self._last_thermal_check >= self._THERMAL_CHECK_INTERVAL
+                    if due and await asyncio.to_thread(self._check_thermal_abort):
+                        await runner.terminate_async()
+                        return -1
+                    read_timeout = min(read_timeout, self._THERMAL_CHECK_INTERVAL)
+
+                line = await runner.readline_async(timeout=read_timeout)
+                if self.stop_requested or runner.cancelled:
+                    await runner.terminate_async()
+                    return -1
+                if line is None:
+                    continue  # timeout de lecture : re-vérifie délais et thermique
+                if line == "":
+                    break  # EOF
+                last_output_time = time.monotonic()
+                stripped = line.strip()
+                if stripped:
+                    if line_callback:
+                        result = line_callback(stripped)
+                        if inspect.isawaitable(result):
+                            await result
+                    else:
+                        self.log(stripped)
+
+            return await runner.wait_async(timeout=max(0.0, timeout - (time.monotonic() - start_time)))
+        except subprocess.TimeoutExpired:
+            self.log(f"Timeout after {timeout}s — forcing termination", level=logging.WARNING)
+            await runner.terminate_async()
+            return -1
+        except asyncio.CancelledError:
+            # Tâche annulée par l'appelant : le processus ne doit pas lui survivre.
+            await runner.terminate_async()
+            raise
+        except Exception as e:
+            self.logger.error("Exception in _execute_command_async", exc_info=True)
+            self.log(f"Exception: {e}", level=logging.ERROR)
+            return -1
+        finally:
+            self.runner = previous
+            if telemetry is not None:
+                await asyncio.to_thread(self._stop_telemetry, telemetry)
 
     def _kill_process(self, process):
         """Terminate a subprocess gracefully, using process group kill on Unix."""
@@ -1,5 +1,6 @@
 import os
 from collections.abc import Callable
+from pathlib import Path
 from typing import Any
 
 from .base_engine import BaseEngine
@@ -151,6 +152,7 @@ class BrushEngine(BaseEngine):
                 params = dict(eps, max_splats=adapted)
 
         cmd, env = self.build_command(str(safe_input), str(safe_output), params)
+        self.telemetry_dir = Path(safe_output) / "telemetry"
         self.log(f"Lancement Brush: {' '.join(cmd)}")
         # Brush training can exceed 1h on large scenes — use extended wall-clock timeout.
         # Inactivity detection disabled: Brush has legitimately long silent phases
@@ -0,0 +1,297 @@
+"""
+clean_analysis.py — Cache d'analyse par fichier pour les aperçus de nettoyage.
+
+Régler opacity_min / scale_pct / outlier_pct ne change que des seuils : les
+grandeurs par splat (alpha activé, échelle max, distance au centre) restent
+les mêmes. Elles sont calculées une fois par fichier puis conservées sous
+forme de tables triées :
+
+  - ``sorted``  valeurs triées (float64) → percentiles exacts, identiques à
+    ``np.percentile`` sur les valeurs brutes ;
+  - ``rank``    rang (uint32) de chaque splat dans cette table → un seuil se
+    traduit en comparaison d'entiers, sans relire le PLY.
+
+Ces tables (~36 octets par splat) ne vivent qu'en mémoire, pour quelques
+fichiers récents. Sur disque, seules les grandeurs brutes sont gardées, en
+float32 (12 octets par splat), dans ``CACHE_DIR`` et non à côté du PLY. Le
+cache est invalidé par la clé (chemin, mtime, taille) et plafonné à
+``CACHE_MAX_BYTES`` (les fichiers les moins récemment utilisés partent en
+premier). Une analyse relue du disque est approchée à la précision float32
+près : elle sert aux aperçus, jamais au masque d'écriture de ``clean_ply``.
+"""
+import contextlib
+import hashlib
+import os
+import tempfile
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+
+from .base_engine import validate_path_standalone as _validate_path
+from .ply_cleaner import (
+    _check_outlier_mode,
+    _mask_stats,
+    centre_distance,
+    compute_clean_mask,
+    knn_distance,
+    knn_keep_mask,
+    resolve_params,
+    splat_alpha,
+    splat_sizes,
+)
+from .ply_utils import read_ply_vertices
+
+CACHE_VERSION = 2
+CACHE_DIR = Path(tempfile.gettempdir()) / "corbeausplat-clean-cache"
+CACHE_MAX_BYTES = 1 << 30
+_MASK_FIELDS = ("x", "y", "z", "opacity", "scale_0", "scale_1", "scale_2")
+_REQUIRED_FIELDS = set(_MASK_FIELDS)
+
+# Analyses gardées en mémoire (fichiers récemment prévisualisés).
+_MEMORY_CACHE_SIZE = 4
+_memory_cache = OrderedDict()
+
+
+def _check_splat_fields(data):
+    missing = _REQUIRED_FIELDS - set(data.dtype.names or ())
+    if missing:
+        raise ValueError(
+            "Ce PLY n'est pas un Gaussian Splat (champs manquants : "
+            + ", ".join(sorted(missing)) + ")."
+        )
+
+
+def cache_key(path):
+    """Clé d'invalidation : (chemin absolu, mtime en ns, taille)."""
+    st = os.stat(path)
+    return (str(Path(path).resolve()), st.st_mtime_ns, st.st_size)
+
+
+def cache_path(path):
+    """Fichier du cache disque de ``path`` : ``CACHE_DIR/<sha1 du chemin>.npz``."""
+    digest = hashlib.sha1(str(Path(path).resolve()).encode("utf-8")).hexdigest()
+    return CACHE_DIR / f"{digest}.npz"
+
+
+class RankedColumn:
+    """Valeurs triées + rang de chaque splat, pour des seuillages en O(n) entier."""
+
+    def __init__(self, sorted_values, rank):
+        self.sorted = sorted_values
+        self.rank = rank
+
+    @classmethod
+    def from_values(cls, values):
+        order = np.argsort(values, kind="stable")
+        rank = np.empty(len(values), dtype=np.uint32)
+        rank[order] = np.arange(len(values), dtype=np.uint32)
+        return cls(values[order], rank)
+
+    @property
+    def values(self):
+        """Valeurs dans l'ordre des splats."""
+        return self.sorted[self.rank]
+
+    def percentile(self, pct):
+        return np.percentile(self.sorted, pct)
+
+    def mask_le(self, threshold):
+        """Équivalent à ``values <= threshold``."""
+        return self.rank < np.searchsorted(self.sorted, threshold, side="right")
+
+    def mask_ge(self, threshold):
+        """Équivalent à ``values >= threshold``."""
+        return self.rank >= np.searchsorted(self.sorted, threshold, side="left")
+
+
+class CleanAnalysis:
+    """Grandeurs par splat d'un PLY, prêtes pour des seuillages répétés.
+
+    ``keep_mask`` produit exactement le masque et les statistiques de
+    ``compute_clean_mask`` ; ``exact`` est faux pour une analyse relue du
+    cache disque (grandeurs arrondies en float32). En mode knn, les distances
+    k-NN sont calculées (depuis ``source``) au premier usage de chaque k puis
+    conservées.
+    """
+
+    _COLUMNS = ("alpha", "size", "dist")
+
+    def __init__(self, alpha, size, dist, key=None, knn=None, source=None, exact=True):
+        self.alpha = alpha
+        self.size = size
+        self.dist = dist
+        self.key = key
+        self.knn = dict(knn or {})
+        self.source = source
+        self.exact = exact
+
+    def __len__(self):
+        return len(self.alpha.rank)
+
+    @classmethod
+    def from_vertices(cls, data, key=None, source=None):
+        _check_splat_fields(data)
+        return cls(
+            RankedColumn.from_values(splat_alpha(data["opacity"])),
+            RankedColumn.from_values(splat_sizes(data["scale_0"], data["scale_1"], data["scale_2"])),
+            RankedColumn.from_values(centre_distance(data["x"], data["y"], data["z"])),
+            key=key,
+            source=source,
+        )
+
+    def knn_distance(self, k):
+        k = max(1, int(k))
+        if k not in self.knn:
+            if self.source is None:
+                raise ValueError("Distances k-NN absentes du cache et PLY source inconnu.")
+            data = read_ply_vertices(self.source)
+            self.knn[k] = knn_distance(data["x"], data["y"], data["z"], k=k)
+        return self.knn[k]
+
+    def keep_mask(self, opacity_min=0.10, scale_pct=99.5, outlier_pct=99.5,
+                  outlier_mode="median", knn_k=8, knn_sigma=3.0, low_memory=False,
+                  streaming=False):
+        """Même contrat que ``compute_clean_mask`` : retourne (keep, stats).
+        ``low_memory`` et ``streaming`` sont ignorés : les tables en cache sont
+        déjà calculées et donnent les seuils exacts (voir ``exact``)."""
+        _check_outlier_mode(outlier_mode)
+        n = len(self)
+        m_op = self.alpha.mask_ge(opacity_min)
+        m_sc = (np.ones(n, dtype=bool) if scale_pct >= 100.0 or n == 0
+                else self.size.mask_le(self.size.percentile(scale_pct)))
+        if outlier_pct >= 100.0 or n == 0:
+            m_out = np.ones(n, dtype=bool)
+        elif outlier_mode == "knn":
+            m_out = knn_keep_mask(self.knn_distance(knn_k), knn_sigma)
+        else:
+            m_out = self.dist.mask_le(self.dist.percentile(outlier_pct))
+        return _mask_stats(m_op, m_sc, m_out)
+
+    def save(self, path):
+        key_path, key_mtime, key_size = self.key or ("", 0, 0)
+        arrays = {
+            "version": np.int64(CACHE_VERSION),
+            "key_path": np.str_(key_path),
+            "key_mtime": np.int64(key_mtime),
+            "key_size": np.int64(key_size),
+        }
+        for name in self._COLUMNS:
+            arrays[name] = getattr(self, name).values.astype(np.float32)
+        for k, dist in self.knn.items():
+            arrays[f"knn_{k}"] = np.asarray(dist, dtype=np.float32)
+        # Écriture atomique ; via un handle, np.savez n'ajoute pas d'extension.
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path, key, source=None):
+        """Relit le cache disque ; None s'il est absent, illisible ou périmé.
+
+        Les tables triées sont reconstruites à partir des grandeurs float32."""
+        try:
+            with np.load(path, allow_pickle=False) as npz:
+                if int(npz["version"]) != CACHE_VERSION:
+                    return None
+                stored = (str(npz["key_path"]), int(npz["key_mtime"]), int(npz["key_size"]))
+                if stored != tuple(key):
+                    return None
+                cols = [RankedColumn.from_values(npz[name]) for name in cls._COLUMNS]
+                knn = {int(name[4:]): npz[name] for name in npz.files if name.startswith("knn_")}
+        except (OSError, ValueError, KeyError):
+            return None
+        return cls(*cols, key=key, knn=knn, source=source, exact=False)
+
+
+def _remember(analysis):
+    _memory_cache[analysis.key] = analysis
+    _memory_cache.move_to_end(analysis.key)
+    while len(_memory_cache) > _MEMORY_CACHE_SIZE:
+        _memory_cache.popitem(last=False)
+
+
+def _trim_cache(keep):
+    """Supprime les fichiers les moins récemment utilisés au-delà de
+    ``CACHE_MAX_BYTES`` (``keep``, le fichier qui vient d'être écrit, reste)."""
+    entries = []
+    for entry in CACHE_DIR.glob("*.npz"):
+        with contextlib.suppress(OSError):
+            st = entry.stat()
+            entries.append((st.st_mtime_ns, st.st_size, entry))
+    total = 0
+    for _, size, entry in sorted(entries, key=lambda e: e[0], reverse=True):
+        total += size
+        if total > CACHE_MAX_BYTES and entry != keep:
+            with contextlib.suppress(OSError):
+                entry.unlink()
+
+
+def _save_to_disk(analysis, path):
+    # Dossier de cache non inscriptible : le cache mémoire suffit.
+    target = cache_path(path)
+    with contextlib.suppress(OSError):
+        analysis.save(target)
+        _trim_cache(target)
+
+
+def get_cached_analysis(path, exact=False):
+    """Analyse déjà disponible (mémoire, ou cache disque à jour si ``exact``
+    est faux), sinon None."""
+    key = cache_key(path)
+    analysis = _memory_cache.get(key)
+    if analysis is None and not exact:
+        target = cache_path(path)
+        analysis = CleanAnalysis.load(target, key, source=path)
+        if analysis is not None:
+            _remember(analysis)
+            with contextlib.suppress(OSError):
+                os.utime(target)  # récemment utilisé : évincé en dernier
+    if analysis is not None and exact and not analysis.exact:
+        return None
+    return analysis
+
+
+def analyze_ply(path, use_disk_cache=True, log=None):
+    """Retourne l'analyse de ``path``, en la calculant (et l'enregistrant) si besoin."""
+    analysis = get_cached_analysis(path) if use_disk_cache else _memory_cache.get(cache_key(path))
+    if analysis is not None:
+        return analysis
+    if log:
+        log(f"Analyse de {path} (mise en cache) ...")
+    key = cache_key(path)
+    analysis = CleanAnalysis.from_vertices(read_ply_vertices(path), key=key, source=path)
+    _remember(analysis)
+    if use_disk_cache:
+        _save_to_disk(analysis, path)
+    return analysis
+
+
+def preview_clean(path, strength="medium", overrides=None, use_disk_cache=True, log=None):
+    """Statistiques de ``clean_ply`` pour ces paramètres, sans écrire de PLY.
+
+    Le premier appel analyse le fichier ; les suivants ne font que seuiller
+    les tables en cache. Les distances k-NN calculées en mode knn sont
+    ajoutées au cache disque. Avec ``low_memory`` ou ``streaming``, les
+    tables (~36 octets par splat) ne sont pas construites : le masque est
+    calculé dans ce mode, sans cache.
+    """
+    safe = _validate_path(path)
+    if safe is None:
+        raise ValueError(f"Chemin d'entrée non autorisé: {path}")
+    path = safe
+    params = resolve_params(strength, overrides)
+    if params.get("low_memory") or params.get("streaming"):
+        data = read_ply_vertices(path)
+        _check_splat_fields(data)
+        _, stats = compute_clean_mask(*(data[f] for f in _MASK_FIELDS), **params)
+        return stats
+    analysis = analyze_ply(path, use_disk_cache=use_disk_cache, log=log)
+    known_knn = set(analysis.knn)
+    _, stats = analysis.keep_mask(**params)
+    if use_disk_cache and set(analysis.knn) != known_knn:
+        _save_to_disk(analysis, path)
+    return stats
@@ -50,20 +50,42 @@ def build_feature_matching_command(
     database_path: str,
     params: Any,
     num_threads: int,
+    matcher_type: str | None = None,
+    sequential_overlap: int | None = None,
+    match_list_path: Path | None = None,
 ) -> tuple[list, str]:
     """Commande de matching des features (sequential/vocab_tree/exhaustive,
-    bruteforce ou LightGlue selon le type de features)."""
+    bruteforce ou LightGlue selon le type de features).
+
+    ``matcher_type`` / ``sequential_overlap`` remplacent ceux de ``params``
+    (plan du mode auto) ; ``pairs`` importe la liste ``match_list_path``.
+    """
     match_type = getattr(params, 'matching_type', 'SIFT_BRUTEFORCE')
     feat_type = getattr(params, 'feature_type', 'SIFT')
+    matcher_type = matcher_type or params.matcher_type
+    if sequential_overlap is None:
+        sequential_overlap = params.sequential_overlap
 
-    if params.matcher_type == 'sequential':
+    if matcher_type == 'pairs':
+        # Paires choisies à l'avance (plan auto) : seules celles-ci sont comparées.
+        cmd = [
+            colmap_bin, 'matches_importer',
+            '--database_path', database_path,
+            '--match_list_path', str(match_list_path),
+            '--match_type', 'pairs',
+            '--FeatureMatching.num_threads', str(num_threads),
+            '--FeatureMatching.type', match_type,
+            '--FeatureMatching.guided_matching', '1' if params.guided_matching else '0',
+        ]
+        description = f"Matching par liste de paires ({match_type})"
+    elif matcher_type == 'sequential':
         cmd = [
             colmap_bin, 'sequential_matcher',
             '--database_path', database_path,
             '--FeatureMatching.num_threads', str(num_threads),
             '--FeatureMatching.type', match_type,
             '--FeatureMatching.guided_matching', '1' if params.guided_matching else '0',
-            '--SequentialMatching.overlap', str(params.sequential_overlap),
+            '--SequentialMatching.overlap', str(sequential_overlap),
             '--SequentialMatching.quadratic_overlap', '1',
         ]
         # Loop detection ferme les boucles quand la caméra repasse sur une zone déjà
@@ -73,7 +95,7 @@ def build_feature_matching_command(
         if feat_type == 'SIFT':
             cmd.extend(['--SequentialMatching.loop_detection', '1'])
         description = f"Matching Sequentiel ({match_type})"
-    elif params.matcher_type == 'vocab_tree':
+    elif matcher_type == 'vocab_tree':
         # Vocab tree : matching par similarité visuelle, adapté aux grandes collections
         # de photos non ordonnées (bien plus rapide qu'exhaustif au-delà de ~500 images).
         # COLMAP télécharge/met en cache l'arbre de vocabulaire (SIFT) au 1er usage.
@@ -141,10 +163,12 @@ def build_incremental_mapper_command(
     sparse_dir: Path,
     params: Any,
     num_threads: int,
+    image_list_path: Path | None = None,
 ) -> list:
     """Commande de reconstruction 3D via le mapper incrémental (repli si le
-    mapper global ne produit pas de modèle exploitable)."""
-    return [
+    mapper global ne produit pas de modèle exploitable, ou mapper d'un
+    cluster en mode partitionné via ``image_list_path``)."""
+    cmd = [
         colmap_bin, 'mapper',
         '--database_path', database_path,
         '--image_path', images_dir,
@@ -156,6 +180,41 @@ def build_incremental_mapper_command(
         '--Mapper.ba_refine_principal_point', '1' if params.ba_refine_principal_point else '0',
         '--Mapper.ba_refine_extra_params', '1' if params.ba_refine_extra_params else '0',
     ]
+    if image_list_path:
+        cmd.extend(['--image_list_path', str(image_list_path)])
+    return cmd
+
+
+def build_model_merger_command(
+    colmap_bin: str,
+    input_path1: Path,
+    input_path2: Path,
+    output_path: Path,
+) -> list:
+    """Commande de fusion de deux sous-modèles partageant des images."""
+    return [
+        colmap_bin, 'model_merger',
+        '--input_path1', str(input_path1),
+        '--input_path2', str(input_path2),
+        '--output_path', str(output_path),
+    ]
+
+
+def build_bundle_adjuster_command(
+    colmap_bin: str,
+    input_path: Path,
+    output_path: Path,
+    params: Any,
+) -> list:
+    """Commande de bundle adjustment global (après fusion des clusters)."""
+    return [
+        colmap_bin, 'bundle_adjuster',
+        '--input_path', str(input_path),
+        '--output_path', str(output_path),
+        '--BundleAdjustment.refine_focal_length', '1' if params.ba_refine_focal_length else '0',
+        '--BundleAdjustment.refine_principal_point', '1' if params.ba_refine_principal_point else '0',
+        '--BundleAdjustment.refine_extra_params', '1' if params.ba_refine_extra_params else '0',
+    ]
 
 
 def build_image_undistorter_command(
@@ -0,0 +1,582 @@
+"""
+colmap_io.py — Lecture des modèles sparse COLMAP et de ``database.db``.
+
+Lecteur NumPy des fichiers ``cameras`` / ``images`` / ``points3D`` (format
+``.bin`` ou ``.txt``) d'un sous-modèle ``sparse/<n>/``, sans lancer
+``colmap model_analyzer`` :
+
+  - ``points3D.bin`` est lu en une passe : seule la chaîne des longueurs de
+    track (enregistrements de taille variable) est parcourue en Python, les
+    champs (xyz, rgb, erreur, tracks) sont ensuite extraits par indexation
+    NumPy sur le buffer entier ;
+  - ``images.bin`` expose les observations 2D de chaque image comme des vues
+    ``np.frombuffer`` (aucune copie) ;
+  - ``ColmapDatabase`` ouvre ``database.db`` en lecture seule et décode les
+    blobs keypoints / descriptors / matches ; les nombres de matches par paire
+    viennent de la colonne ``rows`` sans lire les blobs.
+
+``SparseModel.summary()`` donne les statistiques usuelles de
+``model_analyzer`` (images enregistrées, points, observations, longueur
+moyenne des tracks, erreur de reprojection moyenne).
+"""
+import sqlite3
+import struct
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+
+MODEL_FILES = ("cameras", "images", "points3D")
+
+# model_id COLMAP → (nom, nombre de paramètres) ; voir colmap/sensor/models.h.
+CAMERA_MODELS = {
+    0: ("SIMPLE_PINHOLE", 3),
+    1: ("PINHOLE", 4),
+    2: ("SIMPLE_RADIAL", 4),
+    3: ("RADIAL", 5),
+    4: ("OPENCV", 8),
+    5: ("OPENCV_FISHEYE", 8),
+    6: ("FULL_OPENCV", 12),
+    7: ("FOV", 5),
+    8: ("SIMPLE_RADIAL_FISHEYE", 4),
+    9: ("RADIAL_FISHEYE", 5),
+    10: ("THIN_PRISM_FISHEYE", 12),
+    11: ("RAD_TAN_THIN_PRISM_FISHEYE", 16),
+}
+CAMERA_MODEL_IDS = {name: model_id for model_id, (name, _) in CAMERA_MODELS.items()}
+
+# Identifiant de paire de database.db : image_id1 * MAX_IMAGE_ID + image_id2.
+MAX_IMAGE_ID = 2**31 - 1
+
+# model_merger aligne deux modèles par similitude : il lui faut au moins
+# trois images communes.
+MIN_MERGE_SHARED_IMAGES = 3
+
+POINT2D_DTYPE = np.dtype([("xy", "<f8", (2,)), ("point3D_id", "<i8")])
+TRACK_DTYPE = np.dtype([("image_id", "<i4"), ("point2D_idx", "<i4")])
+# En-tête fixe d'un point de points3D.bin (sans le track).
+_POINT_HEADER_DTYPE = np.dtype([
+    ("id", "<u8"), ("xyz", "<f8", (3,)), ("rgb", "u1", (3,)),
+    ("error", "<f8"), ("track_length", "<u8"),
+])
+_TRACK_LENGTH_OFFSET = _POINT_HEADER_DTYPE.fields["track_length"][1]
+
+
+@dataclass
+class Camera:
+    id: int
+    model: str
+    width: int
+    height: int
+    params: np.ndarray
+
+
+@dataclass
+class SparseImages:
+    """Images enregistrées, une ligne par image (triées par identifiant)."""
+    ids: np.ndarray            # (N,) int64
+    qvecs: np.ndarray          # (N, 4) float64, quaternion monde → caméra (w, x, y, z)
+    tvecs: np.ndarray          # (N, 3) float64
+    camera_ids: np.ndarray     # (N,) int64
+    names: list[str]
+    num_points2D: np.ndarray   # (N,) int64
+    num_observations: np.ndarray  # (N,) int64, observations liées à un point 3D
+    points2D: list[np.ndarray] = field(default_factory=list)  # POINT2D_DTYPE, si demandé
+
+    def __len__(self):
+        return len(self.ids)
+
+    def centers(self) -> np.ndarray:
+        """Centres optiques dans le repère monde : ``-Rᵀ t``."""
+        return -np.einsum("nji,nj->ni", quaternions_to_rotations(self.qvecs), self.tvecs)
+
+
+@dataclass
+class SparsePoints:
+    """Points 3D, une ligne par point (triés par identifiant)."""
+    ids: np.ndarray            # (K,) int64
+    xyz: np.ndarray            # (K, 3) float64
+    rgb: np.ndarray            # (K, 3) uint8
+    errors: np.ndarray         # (K,) float64, erreur de reprojection moyenne (px)
+    track_lengths: np.ndarray  # (K,) int64
+    tracks: np.ndarray | None = None  # (sum(track_lengths),) TRACK_DTYPE, si demandé
+
+    def __len__(self):
+        return len(self.ids)
+
+    def track_offsets(self) -> np.ndarray:
+        """Début du track de chaque point dans ``tracks`` (K + 1 valeurs)."""
+        return np.concatenate(([0], np.cumsum(self.track_lengths)))
+
+
+@dataclass
+class SparseModel:
+    path: Path
+    cameras: dict[int, Camera]
+    images: SparseImages
+    points: SparsePoints
+
+    def summary(self) -> dict:
+        """Statistiques du modèle (équivalent de ``colmap model_analyzer``)."""
+        observations = int(self.points.track_lengths.sum())
+        n_points = len(self.points)
+        n_images = len(self.images)
+        return {
+            "cameras": len(self.cameras),
+            "registered_images": n_images,
+            "points3D": n_points,
+            "observations": observations,
+            "mean_track_length": observations / n_points if n_points else 0.0,
+            "mean_observations_per_image": observations / n_images if n_images else 0.0,
+            "mean_reprojection_error": float(self.points.errors.mean()) if n_points else 0.0,
+        }
+
+
+def model_files(model_dir) -> dict[str, Path] | None:
+    """Fichiers du modèle de ``model_dir`` (``.bin`` prioritaire sur ``.txt``) ;
+    None s'il en manque un."""
+    model_dir = Path(model_dir)
+    found = {}
+    for stem in MODEL_FILES:
+        for ext in (".bin", ".txt"):
+            candidate = model_dir / f"{stem}{ext}"
+            if candidate.is_file():
+                found[stem] = candidate
+                break
+        else:
+            return None
+    return found
+
+
+def list_submodels(sparse_dir) -> list[Path]:
+    """Sous-modèles complets de ``sparse_dir`` (``0/``, ``1/``…), par numéro."""
+    sparse_dir = Path(sparse_dir)
+    if not sparse_dir.is_dir():
+        return []
+    dirs = [d for d in sparse_dir.iterdir() if d.is_dir() and d.name.isdigit()]
+    return [d for d in sorted(dirs, key=lambda d: int(d.name)) if model_files(d)]
+
+
+@dataclass
+class SubmodelReport:
+    """Résumé d'un sous-modèle ``sparse/<name>`` pour le classement."""
+    name: str
+    summary: dict
+    image_names: frozenset = frozenset()
+
+    @property
+    def rank_key(self) -> tuple:
+        # Images enregistrées d'abord, puis longueur moyenne des tracks.
+        return (self.summary["registered_images"], self.summary["mean_track_length"])
+
+    def to_dict(self):
+        return {"name": self.name, **self.summary}
+
+
+def read_submodel_report(model_dir) -> SubmodelReport | None:
+    """Résumé du modèle de ``model_dir`` ; None s'il est absent ou illisible."""
+    model_dir = Path(model_dir)
+    if model_files(model_dir) is None:
+        return None
+    try:
+        model = read_sparse_model(model_dir)
+    except (OSError, ValueError):
+        return None
+    return SubmodelReport(model_dir.name, model.summary(), frozenset(model.images.names))
+
+
+def analyze_submodels(sparse_dir) -> list[SubmodelReport]:
+    """Lit chaque sous-modèle de ``sparse_dir`` et les classe du meilleur au moins bon.
+
+    Les sous-modèles illisibles (fichiers vides ou tronqués) sont ignorés.
+    """
+    reports = [r for r in map(read_submodel_report, list_submodels(sparse_dir)) if r is not None]
+    # Tri stable : à égalité, le plus petit numéro reste devant.
+    reports.sort(key=lambda r: r.rank_key, reverse=True)
+    return reports
+
+
+def promote_submodel(sparse_dir, name: str) -> None:
+    """Échange ``sparse/<name>`` et ``sparse/0`` : les étapes suivantes lisent ``0/``."""
+    sparse_dir = Path(sparse_dir)
+    if name == "0":
+        return
+    target = sparse_dir / "0"
+    source = sparse_dir / name
+    if not target.exists():
+        source.rename(target)
+        return
+    parking = sparse_dir / f".swap-{name}"
+    target.rename(parking)
+    source.rename(target)
+    parking.rename(source)
+
+
+def read_sparse_model(model_dir, with_points2D: bool = False, with_tracks: bool = False) -> SparseModel:
+    """Lit le sous-modèle ``model_dir`` ; ValueError si incomplet ou corrompu.
+
+    ``with_points2D`` conserve les observations 2D de chaque image,
+    ``with_tracks`` le détail (image, point 2D) de chaque track.
+    """
+    files = model_files(model_dir)
+    if files is None:
+        raise ValueError(f"Modèle COLMAP incomplet (cameras/images/points3D) : {model_dir}")
+    return SparseModel(
+        path=Path(model_dir),
+        cameras=read_cameras(files["cameras"]),
+        images=read_images(files["images"], with_points2D),
+        points=read_points3D(files["points3D"], with_tracks),
+    )
+
+
+def read_cameras(path) -> dict[int, Camera]:
+    path = Path(path)
+    return _read_cameras_bin(path) if path.suffix == ".bin" else _read_cameras_txt(path)
+
+
+def read_images(path, with_points2D: bool = False) -> SparseImages:
+    path = Path(path)
+    if path.suffix == ".bin":
+        return _read_images_bin(path, with_points2D)
+    return _read_images_txt(path, with_points2D)
+
+
+def read_points3D(path, with_tracks: bool = False) -> SparsePoints:
+    path = Path(path)
+    if path.suffix == ".bin":
+        return _read_points3D_bin(path, with_tracks)
+    return _read_points3D_txt(path, with_tracks)
+
+
+def quaternions_to_rotations(qvecs) -> np.ndarray:
+    """Quaternions (N, 4) ``(w, x, y, z)`` → matrices de rotation (N, 3, 3)."""
+    q = np.asarray(qvecs, dtype=np.float64)
+    q = q / np.linalg.norm(q, axis=1, keepdims=True)
+    w, x, y, z = q.T
+    return np.stack([
+        1 - 2 * (y * y + z * z), 2 * (x * y - w * z), 2 * (x * z + w * y),
+        2 * (x * y + w * z), 1 - 2 * (x * x + z * z), 2 * (y * z - w * x),
+        2 * (x * z - w * y), 2 * (y * z + w * x), 1 - 2 * (x * x + y * y),
+    ], axis=1).reshape(-1, 3, 3)
+
+
+# ---------------------------------------------------------------------------
+# Format binaire
+# ---------------------------------------------------------------------------
+
+def _read_buffer(path: Path) -> bytes:
+    data = path.read_bytes()
+    if len(data) < 8:
+        raise ValueError(f"Fichier COLMAP tronqué : {path}")
+    return data
+
+
+def _read_cameras_bin(path: Path) -> dict[int, Camera]:
+    buf = _read_buffer(path)
+    (count,) = struct.unpack_from("<Q", buf, 0)
+    offset = 8
+    cameras = {}
+    try:
+        for _ in range(count):
+            camera_id, model_id, width, height = struct.unpack_from("<iiQQ", buf, offset)
+            offset += 24
+            if model_id not in CAMERA_MODELS:
+                raise ValueError(f"Modèle de caméra COLMAP inconnu ({model_id}) : {path}")
+            name, n_params = CAMERA_MODELS[model_id]
+            params = np.frombuffer(buf, dtype="<f8", count=n_params, offset=offset).astype(np.float64)
+            offset += 8 * n_params
+            cameras[camera_id] = Camera(camera_id, name, width, height, params)
+    except struct.error as e:
+        raise ValueError(f"Fichier COLMAP tronqué : {path}") from e
+    return cameras
+
+
+def _read_images_bin(path: Path, with_points2D: bool) -> SparseImages:
+    buf = _read_buffer(path)
+    (count,) = struct.unpack_from("<Q", buf, 0)
+    header = struct.Struct("<i7di")
+    offset = 8
+    ids = np.empty(count, dtype=np.int64)
+    poses = np.empty((count, 7), dtype=np.float64)
+    camera_ids = np.empty(count, dtype=np.int64)
+    num_points2D = np.empty(count, dtype=np.int64)
+    num_observations = np.empty(count, dtype=np.int64)
+    names = []
+    points2D = []
+    try:
+        for i in range(count):
+            values = header.unpack_from(buf, offset)
+            ids[i], poses[i], camera_ids[i] = values[0], values[1:8], values[8]
+            offset += header.size
+            end = buf.index(b"\0", offset)
+            names.append(buf[offset:end].decode("utf-8"))
+            (n,) = struct.unpack_from("<Q", buf, end + 1)
+            offset = end + 9
+            observations = np.frombuffer(buf, dtype=POINT2D_DTYPE, count=n, offset=offset)
+            offset += n * POINT2D_DTYPE.itemsize
+            num_points2D[i] = n
+            num_observations[i] = np.count_nonzero(observations["point3D_id"] != -1)
+            if with_points2D:
+                points2D.append(observations)
+    except (struct.error, ValueError) as e:
+        raise ValueError(f"Fichier COLMAP tronqué : {path}") from e
+    return _sorted_images(ids, poses, camera_ids, names, num_points2D, num_observations, points2D)
+
+
+def _read_points3D_bin(path: Path, with_tracks: bool) -> SparsePoints:
+    raw = _read_buffer(path)
+    (count,) = struct.unpack_from("<Q", raw, 0)
+    # Seule la chaîne des offsets est séquentielle (track de longueur variable).
+    header_size = _POINT_HEADER_DTYPE.itemsize
+    unpack_length = struct.Struct("<Q").unpack_from
+    offsets = np.empty(count, dtype=np.int64)
+    offset = 8
+    try:
+        for i in range(count):
+            offsets[i] = offset
+            offset += header_size + 8 * unpack_length(raw, offset + _TRACK_LENGTH_OFFSET)[0]
+    except struct.error as e:
+        raise ValueError(f"Fichier COLMAP tronqué : {path}") from e
+    if offset > len(raw):
+        raise ValueError(f"Fichier COLMAP tronqué : {path}")
+
+    buf = np.frombuffer(raw, dtype=np.uint8)
+    headers = buf[offsets[:, None] + np.arange(header_size)].view(_POINT_HEADER_DTYPE).ravel()
+    lengths = headers["track_length"].astype(np.int64)
+    tracks = None
+    if with_tracks:
+        positions = _segment_index(offsets + header_size, lengths, TRACK_DTYPE.itemsize)
+        tracks = buf[positions[:, None] + np.arange(TRACK_DTYPE.itemsize)].view(TRACK_DTYPE).ravel()
+    return _sorted_points(
+        headers["id"].astype(np.int64), headers["xyz"], headers["rgb"], headers["error"], lengths, tracks,
+    )
+
+
+# ---------------------------------------------------------------------------
+# Format texte
+# ---------------------------------------------------------------------------
+
+def _data_lines(path: Path):
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                yield line
+
+
+def _read_cameras_txt(path: Path) -> dict[int, Camera]:
+    cameras = {}
+    for line in _data_lines(path):
+        parts = line.split()
+        if parts[1] not in CAMERA_MODEL_IDS:
+            raise ValueError(f"Modèle de caméra COLMAP inconnu ({parts[1]}) : {path}")
+        camera_id = int(parts[0])
+        cameras[camera_id] = Camera(
+            camera_id, parts[1], int(parts[2]), int(parts[3]),
+            np.array(parts[4:], dtype=np.float64),
+        )
+    return cameras
+
+
+def _read_images_txt(path: Path, with_points2D: bool) -> SparseImages:
+    # Deux lignes par image ; la seconde (observations) peut être vide.
+    with open(path, encoding="utf-8") as f:
+        lines = [line.rstrip("\n") for line in f if not line.startswith("#")]
+    ids, poses, camera_ids, names = [], [], [], []
+    num_points2D, num_observations, points2D = [], [], []
+    i = 0
+    while i < len(lines):
+        if not lines[i].strip():
+            i += 1
+            continue
+        parts = lines[i].split(maxsplit=9)
+        ids.append(int(parts[0]))
+        poses.append([float(v) for v in parts[1:8]])
+        camera_ids.append(int(parts[8]))
+        names.append(parts[9])
+        values = lines[i + 1].split() if i + 1 < len(lines) else []
+        observations = np.empty(len(values) // 3, dtype=POINT2D_DTYPE)
+        if len(observations):
+            table = np.array(values, dtype=np.float64).reshape(-1, 3)
+            observations["xy"] = table[:, :2]
+            observations["point3D_id"] = table[:, 2].astype(np.int64)
+        num_points2D.append(len(observations))
+        num_observations.append(np.count_nonzero(observations["point3D_id"] != -1))
+        if with_points2D:
+            points2D.append(observations)
+        i += 2
+    return _sorted_images(
+        np.array(ids, dtype=np.int64), np.array(poses, dtype=np.float64).reshape(-1, 7),
+        np.array(camera_ids, dtype=np.int64), names,
+        np.array(num_points2D, dtype=np.int64), np.array(num_observations, dtype=np.int64), points2D,
+    )
+
+
+def _read_points3D_txt(path: Path, with_tracks: bool) -> SparsePoints:
+    ids, xyz, rgb, errors, lengths, tracks = [], [], [], [], [], []
+    for line in _data_lines(path):
+        parts = line.split()
+        ids.append(int(parts[0]))
+        xyz.append([float(v) for v in parts[1:4]])
+        rgb.append([int(v) for v in parts[4:7]])
+        errors.append(float(parts[7]))
+        track = parts[8:]
+        lengths.append(len(track) // 2)
+        if with_tracks:
+            tracks.extend(int(v) for v in track)
+    track_array = None
+    if with_tracks:
+        track_array = np.empty(len(tracks) // 2, dtype=TRACK_DTYPE)
+        pairs = np.array(tracks, dtype=np.int64).reshape(-1, 2)
+        track_array["image_id"], track_array["point2D_idx"] = pairs[:, 0], pairs[:, 1]
+    return _sorted_points(
+        np.array(ids, dtype=np.int64), np.array(xyz, dtype=np.float64).reshape(-1, 3),
+        np.array(rgb, dtype=np.uint8).reshape(-1, 3), np.array(errors, dtype=np.float64),
+        np.array(lengths, dtype=np.int64), track_array,
+    )
+
+
+def _segment_index(starts, lengths, step: int = 1) -> np.ndarray:
+    """Positions ``start + k * step`` (k < length) de chaque segment, concaténées."""
+    lengths = np.asarray(lengths, dtype=np.int64)
+    within = np.arange(int(lengths.sum())) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    return np.repeat(np.asarray(starts, dtype=np.int64), lengths) + within * step
+
+
+def _sorted_images(ids, poses, camera_ids, names, num_points2D, num_observations, points2D) -> SparseImages:
+    order = np.argsort(ids, kind="stable")
+    return SparseImages(
+        ids=ids[order],
+        qvecs=np.ascontiguousarray(poses[order, :4]),
+        tvecs=np.ascontiguousarray(poses[order, 4:]),
+        camera_ids=camera_ids[order],
+        names=[names[i] for i in order],
+        num_points2D=num_points2D[order],
+        num_observations=num_observations[order],
+        points2D=[points2D[i] for i in order] if points2D else [],
+    )
+
+
+def _sorted_points(ids, xyz, rgb, errors, lengths, tracks) -> SparsePoints:
+    order = np.argsort(ids, kind="stable")
+    if tracks is not None and np.any(order[1:] < order[:-1]):
+        # COLMAP écrit les points dans l'ordre de sa table de hachage.
+        tracks = tracks[_segment_index((np.cumsum(lengths) - lengths)[order], lengths[order])]
+    return SparsePoints(
+        ids=ids[order],
+        xyz=np.ascontiguousarray(xyz[order], dtype=np.float64),
+        rgb=np.ascontiguousarray(rgb[order], dtype=np.uint8),
+        errors=np.ascontiguousarray(errors[order], dtype=np.float64),
+        track_lengths=lengths[order],
+        tracks=np.ascontiguousarray(tracks) if tracks is not None else None,
+    )
+
+
+# ---------------------------------------------------------------------------
+# database.db
+# ---------------------------------------------------------------------------
+
+def pair_id_to_image_ids(pair_ids):
+    """Identifiants de paire → (image_id1, image_id2), vectorisé."""
+    pair_ids = np.asarray(pair_ids, dtype=np.int64)
+    return pair_ids // MAX_IMAGE_ID, pair_ids % MAX_IMAGE_ID
+
+
+def image_ids_to_pair_id(image_id1: int, image_id2: int) -> int:
+    if image_id1 > image_id2:
+        image_id1, image_id2 = image_id2, image_id1
+    return image_id1 * MAX_IMAGE_ID + image_id2
+
+
+def _blob_array(blob, rows: int, cols: int, dtype) -> np.ndarray:
+    if not rows or blob is None:
+        return np.empty((0, cols), dtype=dtype)
+    return np.frombuffer(blob, dtype=dtype).reshape(rows, cols)
+
+
+class ColmapDatabase:
+    """Accès en lecture seule à ``database.db``.
+
+    >>> with ColmapDatabase(project_dir / "database.db") as db:
+    ...     counts = db.keypoint_counts()
+    ...     id1, id2, n = db.match_counts(verified=True)
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        if not self.path.is_file():
+            raise FileNotFoundError(f"Base COLMAP introuvable : {self.path}")
+        self._con = sqlite3.connect(f"{self.path.resolve().as_uri()}?mode=ro", uri=True)
+
+    def close(self) -> None:
+        self._con.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def cameras(self) -> dict[int, Camera]:
+        cameras = {}
+        for camera_id, model_id, width, height, blob in self._con.execute(
+            "SELECT camera_id, model, width, height, params FROM cameras"
+        ):
+            name, _ = CAMERA_MODELS.get(model_id, (str(model_id), 0))
+            cameras[camera_id] = Camera(camera_id, name, width, height, np.frombuffer(blob, dtype="<f8").copy())
+        return cameras
+
+    def images(self) -> dict[int, str]:
+        """``{image_id: nom}``."""
+        return dict(self._con.execute("SELECT image_id, name FROM images"))
+
+    def keypoint_counts(self) -> dict[int, int]:
+        return dict(self._con.execute("SELECT image_id, rows FROM keypoints"))
+
+    def keypoints(self, image_id: int) -> np.ndarray:
+        """Keypoints (N, 2|4|6) float32 : x, y puis forme affine éventuelle."""
+        row = self._con.execute(
+            "SELECT rows, cols, data FROM keypoints WHERE image_id = ?", (image_id,)
+        ).fetchone()
+        return _blob_array(row[2], row[0], row[1], np.float32) if row else np.empty((0, 2), np.float32)
+
+    def descriptors(self, image_id: int) -> np.ndarray:
+        """Descripteurs (N, D) : uint8 pour SIFT, float32 pour ALIKED (selon la taille du blob)."""
+        row = self._con.execute(
+            "SELECT rows, cols, data FROM descriptors WHERE image_id = ?", (image_id,)
+        ).fetchone()
+        if not row or not row[0]:
+            return np.empty((0, row[1] if row else 128), dtype=np.uint8)
+        rows, cols, blob = row
+        dtype = np.float32 if len(blob) == rows * cols * 4 else np.uint8
+        return _blob_array(blob, rows, cols, dtype)
+
+    def _table(self, verified: bool) -> str:
+        return "two_view_geometries" if verified else "matches"
+
+    def matches(self, image_id1: int, image_id2: int, verified: bool = False) -> np.ndarray:
+        """Correspondances (M, 2) uint32 entre deux images, indices de keypoints
+        dans l'ordre (image_id1, image_id2) demandé."""
+        row = self._con.execute(
+            f"SELECT rows, cols, data FROM {self._table(verified)} WHERE pair_id = ?",
+            (image_ids_to_pair_id(image_id1, image_id2),),
+        ).fetchone()
+        pairs = _blob_array(row[2], row[0], row[1], np.uint32) if row else np.empty((0, 2), np.uint32)
+        return pairs[:, ::-1] if image_id1 > image_id2 else pairs
+
+    def iter_matches(self, verified: bool = False):
+        """Itère ``(image_id1, image_id2, correspondances (M, 2))`` sur les paires non vides."""
+        for pair_id, rows, cols, blob in self._con.execute(
+            f"SELECT pair_id, rows, cols, data FROM {self._table(verified)} WHERE rows > 0"
+        ):
+            id1, id2 = divmod(pair_id, MAX_IMAGE_ID)
+            yield id1, id2, _blob_array(blob, rows, cols, np.uint32)
+
+    def match_counts(self, verified: bool = False):
+        """(image_id1, image_id2, nombre de correspondances) en tableaux, sans lire les blobs."""
+        rows = np.array(
+            self._con.execute(f"SELECT pair_id, rows FROM {self._table(verified)}").fetchall(),
+            dtype=np.int64,
+        ).reshape(-1, 2)
+        id1, id2 = pair_id_to_image_ids(rows[:, 0])
+        return id1, id2, rows[:, 1]
@@ -0,0 +1,152 @@
+"""
+colmap_partition.py — Découpage des grands jeux d'images pour le mapper.
+
+Au-delà de quelques milliers d'images, un mapper unique (global ou
+incrémental) sature la mémoire et le temps de calcul. Le mode partitionné
+découpe le jeu en clusters d'au plus ``size`` images, reconstruits
+séparément, puis alignés et fusionnés sur leurs images communes :
+
+  - ``partition_sequential`` : tranches consécutives dans l'ordre des noms
+    (vidéo, captures séquentielles) ;
+  - ``partition_match_graph`` : croissance gloutonne de régions sur le graphe
+    des correspondances de ``database.db`` — l'image suivante d'un cluster est
+    celle qui cumule le plus d'inliers avec ses membres.
+
+Chaque cluster est ensuite étendu de ``overlap`` images voisines (celles qui
+lui sont le plus liées) : ce recouvrement sert d'ancrage à ``model_merger``.
+``merge_plan`` ordonne les fusions, paire la plus recouvrante d'abord.
+"""
+import heapq
+import math
+from collections.abc import Sequence
+
+import numpy as np
+
+PARTITION_MODES = ("off", "auto", "sequential", "graph")
+
+# Threads minimum par mapper de cluster (le bundle adjustment en profite).
+MIN_THREADS_PER_CLUSTER = 4
+
+
+def cluster_count(n_images: int, size: int) -> int:
+    return max(1, math.ceil(n_images / max(1, size)))
+
+
+def _balanced_size(n_images: int, size: int) -> int:
+    """Taille des clusters pour des clusters de tailles égales (≤ ``size``)."""
+    return math.ceil(n_images / cluster_count(n_images, size)) if n_images else 0
+
+
+def partition_sequential(names: Sequence[str], size: int, overlap: int = 0) -> list[list[str]]:
+    """Tranches consécutives de ``names`` triés ; chaque tranche reprend les
+    ``overlap`` premières images de la suivante."""
+    names = sorted(names)
+    step = _balanced_size(len(names), size)
+    if not step:
+        return []
+    return [names[start:start + step + overlap] for start in range(0, len(names), step)]
+
+
+def _adjacency(id1, id2, weights) -> dict[int, dict[int, float]]:
+    adjacency: dict[int, dict[int, float]] = {}
+    for a, b, w in zip(np.asarray(id1).tolist(), np.asarray(id2).tolist(),
+                       np.asarray(weights).tolist(), strict=True):
+        if a == b or w <= 0:
+            continue
+        total = adjacency.setdefault(a, {}).get(b, 0) + w
+        adjacency[a][b] = total
+        adjacency.setdefault(b, {})[a] = total
+    return adjacency
+
+
+def partition_match_graph(image_ids: Sequence[int], id1, id2, weights, size: int,
+                          overlap: int = 0) -> list[list[int]]:
+    """Clusters d'images connexes dans le graphe des correspondances.
+
+    ``id1``, ``id2``, ``weights`` décrivent les arêtes (paires d'images et
+    nombre d'inliers). Un cluster croît depuis une graine en ajoutant l'image
+    non affectée la plus liée au cluster (poids cumulés) ; la graine suivante
+    est l'image non affectée la plus liée au cluster précédent, sinon celle
+    de plus fort degré. Les images isolées forment la fin de l'ordre.
+    """
+    image_ids = sorted(set(int(i) for i in image_ids))
+    target = _balanced_size(len(image_ids), size)
+    if not target:
+        return []
+    adjacency = _adjacency(id1, id2, weights)
+    degree = {i: sum(adjacency.get(i, {}).values()) for i in image_ids}
+    by_degree = sorted(image_ids, key=lambda i: (-degree[i], i))
+    unassigned = set(image_ids)
+    clusters: list[list[int]] = []
+    frontier: dict[int, float] = {}
+
+    while unassigned:
+        seed = max(frontier, key=lambda i: (frontier[i], -i)) if frontier else None
+        if seed is None:
+            seed = next(i for i in by_degree if i in unassigned)
+        cluster = []
+        scores: dict[int, float] = {}
+        heap = [(0.0, seed)]
+        while heap and len(cluster) < target:
+            neg_score, node = heapq.heappop(heap)
+            if node not in unassigned or -neg_score < scores.get(node, 0.0):
+                continue  # entrée périmée
+            unassigned.discard(node)
+            scores.pop(node, None)
+            cluster.append(node)
+            for nbr, w in adjacency.get(node, {}).items():
+                if nbr in unassigned:
+                    scores[nbr] = scores.get(nbr, 0.0) + w
+                    heapq.heappush(heap, (-scores[nbr], nbr))
+            if not heap and len(cluster) < target and unassigned:
+                # Composante épuisée : on complète avec l'image la plus connectée restante.
+                nxt = next(i for i in by_degree if i in unassigned)
+                heapq.heappush(heap, (0.0, nxt))
+        frontier = {i: s for i, s in scores.items() if i in unassigned}
+        clusters.append(sorted(cluster))
+
+    if overlap > 0:
+        clusters = [_expand(cluster, adjacency, overlap) for cluster in clusters]
+    return clusters
+
+
+def _expand(cluster: list[int], adjacency: dict[int, dict[int, float]], overlap: int) -> list[int]:
+    """Ajoute à ``cluster`` ses ``overlap`` voisins extérieurs les plus liés."""
+    members = set(cluster)
+    outside: dict[int, float] = {}
+    for node in cluster:
+        for nbr, w in adjacency.get(node, {}).items():
+            if nbr not in members:
+                outside[nbr] = outside.get(nbr, 0.0) + w
+    extra = sorted(outside, key=lambda i: (-outside[i], i))[:overlap]
+    return sorted(members.union(extra))
+
+
+def plan_workers(n_clusters: int, threads: int, workers: int = 0) -> tuple[int, int]:
+    """(mappers simultanés, threads par mapper) dans un budget de ``threads``.
+
+    ``workers`` = 0 : autant de mappers que le budget en permet à
+    ``MIN_THREADS_PER_CLUSTER`` threads chacun.
+    """
+    threads = max(1, threads)
+    if workers <= 0:
+        workers = max(1, threads // MIN_THREADS_PER_CLUSTER)
+    workers = max(1, min(workers, n_clusters, threads))
+    return workers, max(1, threads // workers)
+
+
+def merge_plan(image_sets: dict[str, frozenset], min_shared: int,
+               exclude: set[frozenset] | None = None) -> tuple[str, str, int] | None:
+    """Paire de modèles partageant le plus d'images (au moins ``min_shared``) ;
+    None si aucune. Les paires de ``exclude`` (fusions déjà tentées) sont
+    ignorées ; à égalité, l'ordre des noms départage."""
+    best = None
+    names = sorted(image_sets)
+    for i, a in enumerate(names):
+        for b in names[i + 1:]:
+            if exclude and frozenset((a, b)) in exclude:
+                continue
+            shared = len(image_sets[a] & image_sets[b])
+            if shared >= min_shared and (best is None or shared > best[2]):
+                best = (a, b, shared)
+    return best
@@ -0,0 +1,291 @@
+"""
+colmap_stages.py — Empreintes des étapes COLMAP et cache des bases de données.
+
+Chaque étape du pipeline (extraction → matching → calibration → mapper →
+undistortion) reçoit une clé : hash de la clé de l'étape précédente et des
+champs de ``ColmapParams`` qui influencent sa sortie. La première clé part
+de l'empreinte du jeu d'images (chemins relatifs, tailles, mtimes). Changer
+un réglage du mapper ne change donc ni la clé d'extraction ni celle du
+matching.
+
+``StageCache`` conserve, sous ``<projet>/colmap_cache``, la base
+``database.db`` telle qu'elle était après l'extraction (``features``) et
+après le matching (``matches``), nommée par clé. Une nouvelle exécution
+repart de la base en cache la plus avancée au lieu de tout recalculer.
+Les copies passent par ``clone_or_copy`` : instantanées et sans espace
+supplémentaire avec un reflink (APFS, Btrfs, XFS), mais copies complètes
+ailleurs — jusqu'à ``2 × CACHE_KEEP`` fois la taille de ``database.db``
+(plusieurs Go sur les grands jeux). Le cache est donc opt-in
+(``ColmapParams.stage_cache``). Une entrée peut porter des métadonnées JSON
+(``<étape>-<clé>.json``), par exemple le plan du matcher ``auto``.
+
+``StageManifest`` (``<projet>/colmap_stages.json``) enregistre les étapes
+terminées : clé d'entrée, date et signature des artefacts produits. Une
+reprise (``--resume-from auto``) repart de la première étape dont l'entrée
+manque, dont la clé a changé ou dont un artefact a été modifié.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any
+
+from .ingest import clone_or_copy, is_image_name
+
+STAGES = ("extraction", "matching", "calibration", "mapper", "undistortion")
+
+# Champs de ColmapParams lus par chaque étape (voir colmap_commands).
+STAGE_FIELDS = {
+    "extraction": (
+        "camera_model", "single_camera", "max_image_size", "max_num_features",
+        "feature_type", "estimate_affine_shape", "domain_size_pooling",
+    ),
+    "matching": (
+        "matcher_type", "matching_type", "guided_matching", "max_ratio",
+        "max_distance", "cross_check", "sequential_overlap",
+    ),
+    "calibration": ("use_view_graph_calibration",),
+    "mapper": (
+        "min_num_matches", "ignore_watermarks", "ba_refine_focal_length",
+        "ba_refine_principal_point", "ba_refine_extra_params", "merge_submodels",
+        "partition_mode", "partition_size", "partition_overlap",
+    ),
+    "undistortion": ("undistort_images", "max_image_size"),
+}
+
+# Bases conservées par étape (les plus récentes).
+CACHE_KEEP = 2
+
+MANIFEST_NAME = "colmap_stages.json"
+MANIFEST_VERSION = 1
+# Au-delà, un artefact est signé par taille + mtime plutôt que par son contenu.
+_CONTENT_HASH_LIMIT = 64 << 20
+
+
+def _digest(payload) -> str:
+    data = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(data.encode(), digest_size=16).hexdigest()
+
+
+def image_set_fingerprint(images_dir) -> str:
+    """Empreinte du jeu d'images : chemins relatifs, tailles et mtimes (ns).
+
+    Parcours ``os.scandir`` récursif, mêmes fichiers que la liste d'images
+    COLMAP (ni fichiers cachés, ni masques). Le contenu n'est pas relu.
+    """
+    root = os.fspath(images_dir)
+    entries = []
+    stack = [root]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif is_image_name(entry.name) and entry.is_file():
+                        st = entry.stat()
+                        rel = os.path.relpath(entry.path, root).replace(os.sep, "/")
+                        entries.append((rel, st.st_size, st.st_mtime_ns))
+        except OSError:
+            continue
+    entries.sort()
+    return _digest(entries)
+
+
+def stage_keys(images_fingerprint: str, params: Any) -> dict[str, str]:
+    """Clé de chaque étape, chaînée depuis l'empreinte des images."""
+    keys = {}
+    previous = images_fingerprint
+    for stage in STAGES:
+        values = {name: getattr(params, name, None) for name in STAGE_FIELDS[stage]}
+        previous = keys[stage] = _digest([stage, previous, values])
+    return keys
+
+
+def _checkpoint_wal(database_path: Path) -> None:
+    """Réintègre un éventuel journal WAL pour que le fichier .db soit complet."""
+    if not database_path.with_name(database_path.name + "-wal").exists():
+        return
+    con = sqlite3.connect(str(database_path))
+    try:
+        con.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    finally:
+        con.close()
+
+
+class StageCache:
+    """Bases COLMAP mises en cache par étape et par clé.
+
+    >>> cache = StageCache(project_dir / "colmap_cache")
+    >>> if not cache.restore("features", key, database_path):
+    ...     run_extraction()
+    ...     cache.store("features", key, database_path)
+    """
+
+    def __init__(self, cache_dir, keep: int = CACHE_KEEP):
+        self.cache_dir = Path(cache_dir)
+        self.keep = keep
+
+    def path(self, stage: str, key: str) -> Path:
+        return self.cache_dir / f"{stage}-{key}.db"
+
+    def has(self, stage: str, key: str) -> bool:
+        return self.path(stage, key).is_file()
+
+    def meta_path(self, stage: str, key: str) -> Path:
+        return self.cache_dir / f"{stage}-{key}.json"
+
+    def restore(self, stage: str, key: str, database_path) -> bool:
+        """Copie la base en cache vers ``database_path`` ; False si absente."""
+        cached = self.path(stage, key)
+        if not cached.is_file():
+            return False
+        database_path = Path(database_path)
+        database_path.unlink(missing_ok=True)
+        clone_or_copy(cached, database_path)
+        os.utime(cached)  # ordre LRU de la purge
+        return True
+
+    def meta(self, stage: str, key: str) -> dict | None:
+        """Métadonnées enregistrées avec la base ; None si absentes ou illisibles."""
+        try:
+            data = json.loads(self.meta_path(stage, key).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        return data if isinstance(data, dict) else None
+
+    def store(self, stage: str, key: str, database_path, meta: dict | None = None) -> Path:
+        """Enregistre une copie de ``database_path`` (et ``meta``) puis purge les plus anciennes."""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        database_path = Path(database_path)
+        _checkpoint_wal(database_path)
+        target = self.path(stage, key)
+        tmp = target.with_name(target.name + ".tmp")
+        tmp.unlink(missing_ok=True)
+        clone_or_copy(database_path, tmp)
+        os.replace(tmp, target)
+        meta_path = self.meta_path(stage, key)
+        if meta is None:
+            meta_path.unlink(missing_ok=True)
+        else:
+            tmp = meta_path.with_name(meta_path.name + ".tmp")
+            tmp.write_text(json.dumps(meta), encoding="utf-8")
+            os.replace(tmp, meta_path)
+        self._prune(stage)
+        return target
+
+    def size(self) -> int:
+        """Taille apparente des bases en cache, en octets (un reflink n'en occupe pas)."""
+        try:
+            return sum(p.stat().st_size for p in self.cache_dir.glob("*.db"))
+        except OSError:
+            return 0
+
+    def _prune(self, stage: str) -> None:
+        entries = sorted(
+            self.cache_dir.glob(f"{stage}-*.db"),
+            key=lambda p: p.stat().st_mtime_ns,
+            reverse=True,
+        )
+        for stale in entries[self.keep:]:
+            stale.unlink(missing_ok=True)
+            stale.with_suffix(".json").unlink(missing_ok=True)
+
+
+def _file_signature(path: Path) -> str:
+    st = path.stat()
+    if st.st_size > _CONTENT_HASH_LIMIT:
+        return f"stat:{st.st_size}:{st.st_mtime_ns}"
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        while chunk := f.read(1 << 20):
+            h.update(chunk)
+    return f"blake2b:{h.hexdigest()}"
+
+
+def artifact_signature(path) -> str | None:
+    """Signature d'un fichier ou d'un dossier (récursif) ; None s'il n'existe pas.
+
+    Contenu (BLAKE2b) pour les fichiers jusqu'à 64 Mio, taille + mtime
+    au-delà (bases de plusieurs Go).
+    """
+    path = Path(path)
+    if path.is_file():
+        return _file_signature(path)
+    if not path.is_dir():
+        return None
+    parts = sorted(
+        (f.relative_to(path).as_posix(), _file_signature(f))
+        for f in path.rglob("*") if f.is_file()
+    )
+    return f"dir:{_digest(parts)}"
+
+
+class StageManifest:
+    """Étapes COLMAP terminées d'un projet, persistées dans ``colmap_stages.json``.
+
+    Les artefacts sont enregistrés relativement au dossier projet. Chaque
+    écriture est atomique (fichier temporaire puis ``os.replace``).
+    """
+
+    def __init__(self, project_dir):
+        self.project_dir = Path(project_dir)
+        self.path = self.project_dir / MANIFEST_NAME
+        self.stages: dict[str, dict] = {}
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if isinstance(data, dict) and data.get("version") == MANIFEST_VERSION:
+            self.stages = {k: v for k, v in data.get("stages", {}).items() if k in STAGES}
+
+    def save(self) -> None:
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(json.dumps(
+            {"version": MANIFEST_VERSION, "stages": self.stages}, indent=2, sort_keys=True,
+        ), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+    def mark_complete(self, stage: str, key: str, artifacts=()) -> None:
+        """Enregistre ``stage`` terminée avec la signature de ses ``artifacts``."""
+        self.stages[stage] = {
+            "key": key,
+            "completed_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "artifacts": {
+                Path(a).relative_to(self.project_dir).as_posix(): artifact_signature(a)
+                for a in artifacts
+            },
+        }
+        self.save()
+
+    def invalidate_from(self, stage: str) -> None:
+        """Oublie ``stage`` et toutes les étapes suivantes."""
+        later = STAGES[STAGES.index(stage):]
+        if any(s in self.stages for s in later):
+            for s in later:
+                self.stages.pop(s, None)
+            self.save()
+
+    def is_complete(self, stage: str, key: str) -> bool:
+        entry = self.stages.get(stage)
+        if not entry or entry.get("key") != key:
+            return False
+        return all(
+            artifact_signature(self.project_dir / rel) == sig
+            for rel, sig in entry.get("artifacts", {}).items()
+        )
+
+    def completed_count(self, keys: dict[str, str]) -> int:
+        """Nombre d'étapes terminées et intactes depuis le début du pipeline."""
+        count = 0
+        for stage in STAGES:
+            if not self.is_complete(stage, keys[stage]):
+                break
+            count += 1
+        return count
@@ -4,8 +4,12 @@ import os
 import platform
 import shutil
 import sqlite3
-import sys
+import threading
+import time
 from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
+from contextlib import closing
+from dataclasses import asdict
 from pathlib import Path
 from typing import Any
 
@@ -13,16 +17,53 @@ import send2trash
 
 from .base_engine import BaseEngine
 from .colmap_commands import (
+    build_bundle_adjuster_command,
     build_feature_extraction_command,
     build_feature_matching_command,
     build_global_mapper_command,
     build_image_undistorter_command,
     build_incremental_mapper_command,
+    build_model_merger_command,
 )
+from .colmap_io import (
+    MIN_MERGE_SHARED_IMAGES,
+    ColmapDatabase,
+    SubmodelReport,
+    analyze_submodels,
+    list_submodels,
+    promote_submodel,
+    read_submodel_report,
+)
+from .colmap_partition import PARTITION_MODES, merge_plan, partition_match_graph, partition_sequential, plan_workers
+from .colmap_stages import STAGES, StageCache, StageManifest, image_set_fingerprint, stage_keys
 from .i18n import tr
+from .image_dedupe import DEFAULT_MAX_DISTANCE, find_near_duplicates
+from .ingest import IMAGE_EXTS, ingest_files, plan_ingest, scan_image_files
+from .match_planner import MatchPlan, plan_matching, write_pairs
 from .system import get_optimal_threads, is_apple_silicon, resolve_binary
+from .video_frames import (
+    allocate_budget,
+    extract_frame_indices,
+    extract_sharp_frames,
+    scan_motion,
+    select_keyframes,
+)
 
-_IMAGE_EXTS = {'.jpg', '.jpeg', '.png'}
+
+def _plan_from_meta(meta: dict | None) -> MatchPlan | None:
+    """Plan du matcher ``auto`` enregistré avec la base de matches en cache."""
+    if not meta:
+        return None
+    try:
+        return MatchPlan(meta["matcher"], meta["reason"], meta.get("overlap"),
+                         [tuple(pair) for pair in meta.get("pairs", [])])
+    except (KeyError, TypeError):
+        return None
+
+
+def _video_prefix(video_path: Path) -> str:
+    """Préfixe des frames extraites d'une vidéo (nom de fichier assaini)."""
+    return "".join([c for c in video_path.stem if c.isalnum() or c in ('_', '-')])
 
 
 def _is_valid_image_path(p: Path) -> bool:
@@ -31,52 +72,9 @@ def _is_valid_image_path(p: Path) -> bool:
         p.is_file()
         and not p.name.startswith("._")
         and not p.name.startswith(".")
-        and p.suffix.lower() in _IMAGE_EXTS
+        and p.suffix.lower() in IMAGE_EXTS
     )
 
-# macOS 10.13+ APFS supports instant file clones via clonefile(2).
-# On APFS volumes, clonefile creates a copy-on-write reflink — near-instant
-# regardless of file size, with no additional disk space until the copy is
-# modified.  Fall back to shutil.copy2 on non-APFS or non-macOS systems.
-_CLONEFILE_SUPPORTED = False
-_CLONEFILE_FUNC = None
-
-if sys.platform == "darwin":
-    try:
-        import ctypes
-        _libc = ctypes.CDLL("libSystem.B.dylib")
-        _clonefile: Any = _libc.clonefile
-        _clonefile.argtypes = [ctypes.c_char_p, ctypes.c_char_p, ctypes.c_int]
-        _clonefile.restype = ctypes.c_int
-        # Quick check: call clonefile with a non-existent src to verify
-        # the symbol exists (expected to fail with ENOENT, not ENOSYS)
-        _clonefile(b"/nonexistent/path", b"/tmp/test_clone", 0)
-    except (AttributeError, OSError):
-        _clonefile = None
-    else:
-        _CLONEFILE_SUPPORTED = True
-        _CLONEFILE_FUNC = _clonefile
-
-
-def _apfs_copy(src: Path, dst: Path) -> None:
-    """Copy *src* to *dst*, using APFS clonefile when available.
-
-    On macOS APFS volumes, this is near-instant (copy-on-write reflink).
-    Falls back to :func:`shutil.copy2` on other filesystems or platforms.
-    Preserves metadata (timestamps, permissions) in both paths.
-    """
-    if _CLONEFILE_FUNC is not None:
-        try:
-            _CLONEFILE_FUNC(str(src).encode(), str(dst).encode(), 0)
-            # clonefile does not preserve metadata by itself
-            shutil.copystat(str(src), str(dst))
-            return
-        except OSError:
-            # clonefile may fail cross-device, on non-APFS volumes, or for
-            # other kernel-level reasons — fall through to copy2 silently.
-            pass
-    shutil.copy2(str(src), str(dst))
-
 
 def select_blurry_files(scores: dict, factor: float, max_remove_frac: float = 0.5):
     """Sélectionne les fichiers à rejeter comme trop flous.
@@ -100,6 +98,117 @@ def select_blurry_files(scores: dict, factor: float, max_remove_frac: float = 0.
     return rejected, threshold
 
 
+# Facteur de réduction → drapeau de décodage réduit OpenCV (JPEG : réduction
+# DCT pendant le décodage, bien moins de pixels à décompresser).
+_REDUCED_GRAYSCALE_FLAGS = {
+    2: "IMREAD_REDUCED_GRAYSCALE_2",
+    4: "IMREAD_REDUCED_GRAYSCALE_4",
+    8: "IMREAD_REDUCED_GRAYSCALE_8",
+}
+
+
+def _reduced_grayscale_flag(downscale: int) -> str:
+    if downscale == 1:
+        return "IMREAD_GRAYSCALE"
+    if downscale not in _REDUCED_GRAYSCALE_FLAGS:
+        raise ValueError(f"Réduction de décodage non supportée : {downscale} (attendu : 1, 2, 4 ou 8)")
+    return _REDUCED_GRAYSCALE_FLAGS[downscale]
+
+
+def blur_score(path, downscale: int = 1) -> float | None:
+    """Score de netteté d'une image : variance du Laplacien en niveaux de gris.
+
+    ``downscale`` > 1 décode directement à 1/2, 1/4 ou 1/8 de la résolution
+    (ValueError pour tout autre facteur). Le Laplacien est calculé en float32
+    et sa variance accumulée en double (cv2.meanStdDev). Retourne None si
+    l'image est illisible.
+    """
+    import cv2
+    flag = getattr(cv2, _reduced_grayscale_flag(downscale))
+    img = cv2.imread(str(path), flag)
+    if img is None:
+        return None
+    _, std = cv2.meanStdDev(cv2.Laplacian(img, cv2.CV_32F))
+    return float(std[0, 0]) ** 2
+
+
+def compute_blur_scores(files, downscale: int = 1, workers: int | None = None,
+                        is_cancelled: Callable | None = None) -> dict:
+    """Scores de netteté de ``files`` calculés dans un pool de threads.
+
+    OpenCV libère le GIL pendant le décodage et le filtrage : les threads
+    travaillent donc en parallèle. Les images illisibles sont omises.
+    ``is_cancelled`` est consulté entre deux images ; le dictionnaire
+    retourné est alors partiel.
+    """
+    _reduced_grayscale_flag(downscale)  # facteur invalide : erreur avant le pool
+
+    def score(f):
+        if is_cancelled and is_cancelled():
+            return f, None
+        return f, blur_score(f, downscale)
+
+    scores: dict[str, float] = {}
+    with ThreadPoolExecutor(max_workers=workers or get_optimal_threads()) as pool:
+        for f, value in pool.map(score, files):
+            if value is not None:
+                scores[str(f)] = value
+    return scores
+
+
+def probe_image_size(path) -> tuple[int, int] | None:
+    """Dimensions (largeur, hauteur) d'une image lues dans son en-tête.
+
+    Pillow n'analyse que l'en-tête à l'ouverture (décodage paresseux) : quelques
+    centaines d'octets au lieu de l'image complète. Repli sur un décodage
+    OpenCV si Pillow est absent ou ne reconnaît pas le fichier. Comme
+    cv2.IMREAD_UNCHANGED, l'orientation EXIF est ignorée. None si illisible.
+    """
+    try:
+        from PIL import Image
+        with Image.open(path) as im:
+            return im.size
+    except ImportError:
+        pass
+    except (OSError, ValueError, SyntaxError):
+        pass  # format inconnu de Pillow ou en-tête corrompu : essayer OpenCV
+    import cv2
+    img = cv2.imread(str(path), cv2.IMREAD_UNCHANGED)
+    if img is None:
+        return None
+    h, w = img.shape[:2]
+    return (w, h)
+
+
+# Budget mémoire du redimensionnement parallèle (images source + cible en vol).
+_RESIZE_MEMORY_BUDGET = 1 << 30
+
+
+def _resize_workers(largest: tuple[int, int], threads: int) -> int:
+    """Threads de redimensionnement tenant dans ``_RESIZE_MEMORY_BUDGET``
+    (estimation : 4 octets/pixel pour la source + la cible)."""
+    per_image = max(1, largest[0] * largest[1] * 4 * 2)
+    return max(1, min(threads, _RESIZE_MEMORY_BUDGET // per_image))
+
+
+def _resize_image_file(path: Path, size: tuple[int, int]) -> bool:
+    """Redimensionne ``path`` (INTER_AREA). False si illisible.
+
+    L'image est écrite à côté puis substituée (``os.replace``) : une image
+    importée par lien physique ne modifie jamais la source.
+    """
+    import cv2
+    img = cv2.imread(str(path), cv2.IMREAD_UNCHANGED)
+    if img is None:
+        return False
+    tmp = path.with_name(f".{path.stem}.resize{path.suffix}")
+    if not cv2.imwrite(str(tmp), cv2.resize(img, size, interpolation=cv2.INTER_AREA)):
+        tmp.unlink(missing_ok=True)
+        return False
+    os.replace(tmp, path)
+    return True
+
+
 def _first_available_model() -> str:
     try:
         from app.upscayl_manager import get_models_dir
@@ -131,8 +240,15 @@ class ColmapEngine(BaseEngine):
         self.is_silicon = is_apple_silicon()
         self.num_threads = get_optimal_threads()
         self._current_process = None
+        # Plan du matcher "auto", calculé après l'extraction des features.
+        self._matching_plan: MatchPlan | None = None
+        # Processus lancés en parallèle (mappers de clusters), arrêtés par stop().
+        self._jobs: list[BaseEngine] = []
+        self._jobs_lock = threading.Lock()
         # Reprise COLMAP : réutilise les images déjà extraites (saute extraction/upscale)
         self.resume_colmap = False
+        # Reprise par étape : "auto" (première étape incomplète) ou nom d'étape.
+        self.resume_from: str | None = None
         self.progress = progress_callback if progress_callback else lambda x: None
         self.status = status_callback if status_callback else lambda x: None
         self.check_cancel = check_cancel_callback if check_cancel_callback else lambda: False
@@ -170,7 +286,7 @@ class ColmapEngine(BaseEngine):
                 return False, "Erreur de validation des chemins"
             project_dir, images_dir, checkpoints_dir = setup_result
 
-            if self.resume_colmap:
+            if self.resume_colmap or self.resume_from:
                 # Reprise : réutilise les images déjà extraites, saute extraction + upscale
                 if not images_dir.exists() or not any(
                     _is_valid_image_path(p) for p in images_dir.iterdir()
@@ -214,6 +330,7 @@ class ColmapEngine(BaseEngine):
         project_dir.mkdir(parents=True, exist_ok=True)
         images_dir.mkdir(parents=True, exist_ok=True)
         checkpoints_dir.mkdir(parents=True, exist_ok=True)
+        self.telemetry_dir = project_dir / "telemetry"
 
         self.log(f"Préparation du projet dans : {project_dir}")
 
@@ -246,9 +363,10 @@ class ColmapEngine(BaseEngine):
             return False
 
         # FIX(AUDIT): branch blurry image filtering (was defined but never called)
-        if (getattr(self.params, 'filter_blurry', False)
-                and getattr(self.params, 'blur_factor', 0.0) > 0
-                and getattr(self, '_cv2_loaded', False)):
+        # Les vidéos extraites en flux sont déjà filtrées (voir video_frames) ;
+        # la sélection de keyframes choisit déjà la frame la plus nette.
+        if (self._blur_filter_active() and not self._stream_blur_active()
+                and not self._keyframe_mode_active()):
             self._filter_blurry_images(images_dir)
 
         upscale_conf = getattr(self, 'upscale_config', None)
@@ -259,9 +377,61 @@ class ColmapEngine(BaseEngine):
 
         return self._check_and_normalize_resolution(images_dir)
 
+    def _blur_filter_active(self) -> bool:
+        return (getattr(self.params, 'filter_blurry', False)
+                and getattr(self.params, 'blur_factor', 0.0) > 0
+                and getattr(self, '_cv2_loaded', False))
+
+    def _stream_blur_active(self) -> bool:
+        """True si l'extraction vidéo filtre le flou en flux (pas de passe globale)."""
+        return (self.input_type == "video"
+                and self._blur_filter_active()
+                and getattr(self.params, 'blur_stream_window', 0) > 0)
+
+    def _keyframe_mode_active(self) -> bool:
+        return (self.input_type == "video"
+                and getattr(self.params, 'keyframe_budget', 0) > 0
+                and getattr(self, '_cv2_loaded', False))
+
+    def _drop_near_duplicates(self, src_files: list[Path], project_dir: Path) -> list[Path]:
+        """Retire les quasi-doublons de ``src_files`` (la plus nette de chaque groupe reste).
+
+        Les fichiers écartés ne sont pas copiés ; ils sont listés dans
+        ``dedupe_report.json`` du projet.
+        """
+        max_distance = getattr(self.params, 'dedupe_distance', DEFAULT_MAX_DISTANCE)
+        self.log(f"Recherche de quasi-doublons (dHash, distance ≤ {max_distance})...")
+        t0 = time.perf_counter()
+        groups = find_near_duplicates(
+            src_files, max_distance=max_distance,
+            workers=self.num_threads, is_cancelled=self.is_cancelled,
+        )
+        if self.is_cancelled():
+            return src_files
+        removed = {p for g in groups for p in g.removed}
+        if not removed:
+            self.log(f"✅ Aucun quasi-doublon ({time.perf_counter() - t0:.2f}s)")
+            return src_files
+
+        report_path = project_dir / "dedupe_report.json"
+        try:
+            report_path.write_text(json.dumps({
+                "max_distance": max_distance,
+                "removed_count": len(removed),
+                "groups": [g.to_dict() for g in groups],
+            }, indent=2, ensure_ascii=False), encoding="utf-8")
+        except OSError as e:
+            self.log(f"⚠️ Rapport de doublons non écrit: {e}")
+        for group in groups:
+            self.log(f"  {Path(group.kept).name} ← {', '.join(Path(p).name for p in group.removed)}")
+        self.log(
+            f"🚫 {len(removed)}/{len(src_files)} quasi-doublons écartés en {len(groups)} groupes "
+            f"({time.perf_counter() - t0:.2f}s) → {report_path}"
+        )
+        return [f for f in src_files if str(f) not in removed]
+
     def _filter_blurry_images(self, images_dir: Path) -> None:
         """Compute Laplacian variance per image and discard blurry ones."""
-        import cv2
         files = sorted([
             f for f in images_dir.iterdir()
             if _is_valid_image_path(f)
@@ -270,16 +440,13 @@ class ColmapEngine(BaseEngine):
             return
 
         self.log("Analyse de netteté des images (filtrage flou)...")
-        scores: dict[str, float] = {}
-        for f in files:
-            if self.is_cancelled():
-                return
-            img = cv2.imread(str(f), cv2.IMREAD_GRAYSCALE)
-            if img is None:
-                continue
-            scores[str(f)] = cv2.Laplacian(img, cv2.CV_64F).var()
-
-        if not scores:
+        scores = compute_blur_scores(
+            files,
+            downscale=getattr(self.params, 'blur_downscale', 1),
+            workers=self.num_threads,
+            is_cancelled=self.is_cancelled,
+        )
+        if self.is_cancelled() or not scores:
             return
 
         rejected, threshold = select_blurry_files(
@@ -302,76 +469,144 @@ class ColmapEngine(BaseEngine):
             f"→ {blur_dir}"
         )
 
+    def _resume_stage_index(self, manifest: StageManifest, keys: dict, database_path: Path) -> int | None:
+        """Index (dans STAGES) de l'étape de reprise ; None si la reprise demandée est impossible."""
+        resume_from = self.resume_from or ("auto" if self.resume_colmap else None)
+        if not resume_from:
+            return 0
+        # Le matching complète database.db sur place : sans elle, rien à reprendre.
+        completed = manifest.completed_count(keys) if database_path.exists() else 0
+        if resume_from == "auto":
+            return completed
+        index = STAGES.index(resume_from)
+        return index if index <= completed else None
+
     def _run_reconstruction_pipeline(self, project_dir: Path, images_dir: Path) -> tuple[bool, str]:
-        """Exécute les étapes de reconstruction COLMAP."""
+        """Exécute les étapes de reconstruction COLMAP.
+
+        Chaque étape terminée est inscrite dans le manifeste du projet
+        (colmap_stages.json) ; une reprise saute les étapes intactes.
+        """
         database_path = project_dir / "database.db"
         sparse_dir = project_dir / "sparse"
-        if sparse_dir.exists():
-            shutil.rmtree(sparse_dir)
-            self.log(f"Reconstruction sparse precedente supprimee : {sparse_dir.name}")
-        sparse_dir.mkdir(exist_ok=True)
-
-        # Always start from a fresh database to avoid SQLite schema incompatibilities
-        # (especially between COLMAP and GLOMAP's bundled SQLite versions).
-        for db_file in [database_path,
-                        database_path.with_suffix(".db-wal"),
-                        database_path.with_suffix(".db-shm")]:
-            if db_file.exists():
-                db_file.unlink(missing_ok=True)
-                self.log(f"Base de données précédente supprimée : {db_file.name}")
+        self._matching_plan = None
+
+        # Bases en cache (colmap_cache/) : seules les étapes dont les entrées
+        # ont changé sont recalculées.
+        cache = StageCache(project_dir / "colmap_cache") if getattr(self.params, 'stage_cache', False) else None
+        manifest = StageManifest(project_dir)
+        keys = stage_keys(image_set_fingerprint(images_dir), self.params)
+
+        resume_at = self._resume_stage_index(manifest, keys, database_path)
+        if resume_at is None:
+            return False, tr("err_resume_stage", self.resume_from)
+        done = set(STAGES[:resume_at])
+        if resume_at == len(STAGES):
+            self.log("Reprise : toutes les étapes COLMAP sont déjà terminées.")
+        elif done:
+            self.log(f"Reprise à l'étape « {STAGES[resume_at]} » (terminées : {', '.join(STAGES[:resume_at])})")
+        if resume_at < len(STAGES):
+            manifest.invalidate_from(STAGES[resume_at])
+
+        if "extraction" not in done:
+            # Always start from a fresh database to avoid SQLite schema incompatibilities
+            # (especially between COLMAP and GLOMAP's bundled SQLite versions).
+            for db_file in [database_path,
+                            database_path.with_suffix(".db-wal"),
+                            database_path.with_suffix(".db-shm")]:
+                if db_file.exists():
+                    db_file.unlink(missing_ok=True)
+                    self.log(f"Base de données précédente supprimée : {db_file.name}")
 
         self.progress(25)
 
-        if self.is_cancelled():
-            return False, tr("USER_CANCELLED")
-        self.status(tr("status_feature_extraction", "Analyse des images en cours..."))
-        if not self.feature_extraction(str(database_path), str(images_dir)):
-            return False, "Échec extraction features"
-        if self.params.matcher_type == 'sequential':
-            self._sort_colmap_database_images(database_path)
-
-        self.progress(50)
+        if "matching" not in done:
+            if cache and cache.restore("matches", keys["matching"], database_path):
+                self.log("♻️ Cache COLMAP : features et matches réutilisés (paramètres inchangés)")
+                self._matching_plan = _plan_from_meta(cache.meta("matches", keys["matching"]))
+                manifest.mark_complete("extraction", keys["extraction"])
+            else:
+                if "extraction" in done:
+                    # Les paires déjà comparées avant l'interruption sont conservées.
+                    self.log("Reprise du matching sur la base existante")
+                else:
+                    if cache and cache.restore("features", keys["extraction"], database_path):
+                        self.log("♻️ Cache COLMAP : features réutilisées, reprise au matching")
+                    else:
+                        if self.is_cancelled():
+                            return False, tr("USER_CANCELLED")
+                        self.status(tr("status_feature_extraction", "Analyse des images en cours..."))
+                        if not self.feature_extraction(str(database_path), str(images_dir)):
+                            return False, "Échec extraction features"
+                        if cache:
+                            cache.store("features", keys["extraction"], database_path)
+                            self._log_stage_cache(cache)
+                    manifest.mark_complete("extraction", keys["extraction"])
+                    if self._effective_matcher_type(database_path, images_dir) == 'sequential':
+                        self._sort_colmap_database_images(database_path)
+
+                self.progress(50)
 
-        if self.is_cancelled():
-            return False, tr("USER_CANCELLED")
-        self.status(tr("status_feature_matching", "Recherche des points communs..."))
-        if not self.feature_matching(str(database_path)):
-            return False, "Échec matching"
+                if self.is_cancelled():
+                    return False, tr("USER_CANCELLED")
+                self.status(tr("status_feature_matching", "Recherche des points communs..."))
+                if not self.feature_matching(str(database_path), images_dir):
+                    return False, "Échec matching"
+                if cache:
+                    plan = asdict(self._matching_plan) if self._matching_plan else None
+                    cache.store("matches", keys["matching"], database_path, meta=plan)
+                    self._log_stage_cache(cache)
+            manifest.mark_complete("matching", keys["matching"], [database_path])
 
         self.progress(75)
 
         # View graph calibration (recommended before global_mapper, especially for AI-generated content)
         if self.params.use_view_graph_calibration:
-            if self.is_cancelled():
-                return False, tr("USER_CANCELLED")
-            self.status("Calibration du graphe de vues...")
             calib_db = database_path.with_stem(database_path.stem + "_calib")
-            shutil.copy2(database_path, calib_db)
-            if not self.run_command([
-                self.colmap_bin, 'view_graph_calibrator',
-                '--database_path', str(calib_db),
-            ], "Calibration du graphe de vues", status_prefix="Calibration"):
-                return False, "Échec calibration"
+            if "calibration" not in done:
+                if self.is_cancelled():
+                    return False, tr("USER_CANCELLED")
+                self.status("Calibration du graphe de vues...")
+                shutil.copy2(database_path, calib_db)
+                if not self.run_command([
+                    self.colmap_bin, 'view_graph_calibrator',
+                    '--database_path', str(calib_db),
+                ], "Calibration du graphe de vues", status_prefix="Calibration"):
+                    return False, "Échec calibration"
+                manifest.mark_complete("calibration", keys["calibration"], [calib_db])
             # Use the calibrated database for mapping
             database_path = calib_db
+        elif "calibration" not in done:
+            manifest.mark_complete("calibration", keys["calibration"])
 
         if self.is_cancelled():
             return False, tr("USER_CANCELLED")
 
-        self.status(tr("status_reconstruction", "Création de la scène 3D..."))
-        if not self.mapper(str(database_path), str(images_dir), sparse_dir):
-            return False, "Échec reconstruction"
+        if "mapper" not in done:
+            if sparse_dir.exists():
+                shutil.rmtree(sparse_dir)
+                self.log(f"Reconstruction sparse precedente supprimee : {sparse_dir.name}")
+            sparse_dir.mkdir(exist_ok=True)
+            self.status(tr("status_reconstruction", "Création de la scène 3D..."))
+            if not self.mapper(str(database_path), str(images_dir), sparse_dir):
+                return False, "Échec reconstruction"
+            self._select_best_submodel(database_path, images_dir, sparse_dir)
+            manifest.mark_complete("mapper", keys["mapper"], [sparse_dir])
 
         self.progress(90)
 
-        if self.params.undistort_images:
-            if self.is_cancelled():
-                return False, tr("USER_CANCELLED")
+        if "undistortion" not in done:
             dense_dir = project_dir / "dense"
-            dense_dir.mkdir(exist_ok=True)
-            self.status(tr("status_undistorting", "Correction optique des images..."))
-            if not self.image_undistorter(str(images_dir), str(sparse_dir), str(dense_dir)):
-                return False, "Echec undistortion"
+            if self.params.undistort_images:
+                if self.is_cancelled():
+                    return False, tr("USER_CANCELLED")
+                dense_dir.mkdir(exist_ok=True)
+                self.status(tr("status_undistorting", "Correction optique des images..."))
+                if not self.image_undistorter(str(images_dir), str(sparse_dir), str(dense_dir)):
+                    return False, "Echec undistortion"
+                manifest.mark_complete("undistortion", keys["undistortion"], [dense_dir])
+            else:
+                manifest.mark_complete("undistortion", keys["undistortion"])
 
         self.progress(95)
 
@@ -383,6 +618,10 @@ class ColmapEngine(BaseEngine):
 
         return False, "Arrete par l'utilisateur"
 
+    def _log_stage_cache(self, cache: StageCache) -> None:
+        self.log(f"Cache COLMAP : {cache.size() / 1024 ** 2:.1f} Mo dans {cache.cache_dir.name}/ "
+                 "(copies complètes de database.db sans reflink)")
+
     def _prepare_images(self, images_dir: Path) -> bool:
         """Gère l'extraction vidéo ou la copie d'images."""
         if self.input_type == "video":
@@ -406,6 +645,9 @@ class ColmapEngine(BaseEngine):
                 self.log(f"Aucune vidéo trouvée dans: {self.input_path}")
                 return False
 
+            if self._keyframe_mode_active():
+                return self._extract_keyframes(video_paths, images_dir)
+
             for i, video_path in enumerate(video_paths):
                 if self.is_cancelled():
                     return False
@@ -415,7 +657,7 @@ class ColmapEngine(BaseEngine):
                     continue
 
                 base_name = video_path.stem
-                prefix = "".join([c for c in base_name if c.isalnum() or c in ('_', '-')])
+                prefix = _video_prefix(video_path)
 
                 self.log(f"Extraction video ({i+1}/{total_videos}): {base_name}")
 
@@ -427,52 +669,65 @@ class ColmapEngine(BaseEngine):
             self.log("Copie des images sources vers le dossier de travail...")
             try:
                 raw_input = str(self.input_path)
-                src_files = []
+                src_files: list[tuple[Path, int]] = []
 
                 if "|" in raw_input:
                     paths = [Path(p.strip()) for p in raw_input.split("|") if p.strip()]
                     for p in paths:
                         if _is_valid_image_path(p) and not p.name.lower().endswith('.mask.png'):
-                            src_files.append(p)
+                            src_files.append((p, p.stat().st_size))
                 elif self.input_path.is_file():
                     if _is_valid_image_path(self.input_path) and not self.input_path.name.lower().endswith('.mask.png'):
-                        src_files.append(self.input_path)
+                        src_files.append((self.input_path, self.input_path.stat().st_size))
                 elif self.input_path.is_dir():
                     if self.input_path.resolve() == images_dir.resolve():
                         self.log("Les images sont déjà dans le dossier de destination. Copie ignorée.")
                         return True
-                    src_files = [
-                        f for f in self.input_path.rglob('*')
-                        if _is_valid_image_path(f)
-                        and not f.name.lower().endswith('.mask.png')
-                    ]
+                    src_files = scan_image_files(self.input_path)
 
-                total_files = len(src_files)
-                self.log(f"{total_files} images trouvées.")
+                self.log(f"{len(src_files)} images trouvées.")
 
-                if total_files == 0:
+                if not src_files:
                     return True
 
-                for i, file_path in enumerate(src_files):
+                if (getattr(self.params, 'dedupe_images', False)
+                        and getattr(self, '_cv2_loaded', False) and len(src_files) > 1):
+                    kept = set(self._drop_near_duplicates([p for p, _ in src_files], images_dir.parent))
                     if self.is_cancelled():
                         return False
-                    target_path = images_dir / file_path.name
-                    if target_path.exists():
-                        counter = 1
-                        while True:
-                            target_path = images_dir / f"{file_path.parent.name}_{counter}_{file_path.name}"
-                            if not target_path.exists():
-                                break
-                            counter += 1
-
-                    _apfs_copy(file_path, target_path)
-
-                    if i % 10 == 0 or i == total_files - 1:
-                        pct = 5 + int((i / total_files) * 15)
-                        self.progress(pct)
-                        self.status(f"Copie des images : {i+1} / {total_files}")
-
-                self.log(f"✅ {total_files} images copiées vers {images_dir}")
+                    src_files = [(p, size) for p, size in src_files if p in kept]
+
+                images_dir.mkdir(parents=True, exist_ok=True)
+                plan = plan_ingest(src_files, images_dir, workers=self.num_threads,
+                                   is_cancelled=self.is_cancelled)
+                if self.is_cancelled():
+                    return False
+                if plan.duplicates:
+                    self.log(f"{len(plan.duplicates)} fichiers identiques ignorés (contenu déjà importé)")
+
+                total_files = len(plan.targets)
+                t0 = time.perf_counter()
+
+                def _on_progress(done, total):
+                    if done % 10 == 0 or done == total:
+                        self.progress(5 + int((done / total) * 15))
+                        self.status(f"Copie des images : {done} / {total}")
+
+                counts = ingest_files(
+                    plan.targets,
+                    mode=getattr(self.params, 'ingest_mode', 'auto'),
+                    workers=max(4, self.num_threads),
+                    is_cancelled=self.is_cancelled,
+                    on_progress=_on_progress,
+                )
+                if self.is_cancelled():
+                    return False
+
+                methods = ", ".join(f"{n} {k}" for k, n in counts.items() if n)
+                self.log(
+                    f"✅ {total_files} images copiées vers {images_dir} "
+                    f"({methods}, {time.perf_counter() - t0:.2f}s)"
+                )
                 return True
             except Exception as e:
                 self.log(f"Erreur copie images: {e}")
@@ -540,8 +795,6 @@ class ColmapEngine(BaseEngine):
             self.log("⚠️ OpenCV non disponible — vérification résolution ignorée.")
             return True
 
-        import cv2
-
         files = sorted([
             f for f in images_dir.iterdir()
             if _is_valid_image_path(f)
@@ -552,16 +805,17 @@ class ColmapEngine(BaseEngine):
 
         self.log(f"Analyse de {len(files)} images...")
 
+        t0 = time.perf_counter()
         sizes = {}
         for f in files:
             if self.is_cancelled():
                 return False
-            img = cv2.imread(str(f), cv2.IMREAD_UNCHANGED)
-            if img is None:
+            size = probe_image_size(f)
+            if size is None:
                 self.log(f"⚠️ Lecture impossible: {f.name}")
                 continue
-            h, w = img.shape[:2]
-            sizes[f] = (w, h)
+            sizes[f] = size
+        self.log(f"Dimensions lues en {time.perf_counter() - t0:.2f}s (en-têtes seuls)")
 
         if not sizes:
             return True
@@ -579,21 +833,32 @@ class ColmapEngine(BaseEngine):
         self.log(f"⚠️ {len(unique_sizes)} résolutions différentes détectées.")
         self.log(f"Redimensionnement de {len(to_resize)} images → {min_w}×{min_h} px")
 
-        for i, f in enumerate(to_resize):
+        largest = max((sizes[f] for f in to_resize), key=lambda s: s[0] * s[1])
+        workers = _resize_workers(largest, self.num_threads)
+        t0 = time.perf_counter()
+
+        def resize(f):
             if self.is_cancelled():
-                return False
-            img = cv2.imread(str(f), cv2.IMREAD_UNCHANGED)
-            if img is None:
-                self.log(f"⚠️ Re-lecture impossible: {f.name}")
-                continue
-            resized = cv2.resize(img, (min_w, min_h), interpolation=cv2.INTER_AREA)
-            cv2.imwrite(str(f), resized)
-            del img, resized
-            if (i + 1) % 10 == 0 or (i + 1) == len(to_resize):
-                self.log(f"Redimensionnement: {i+1}/{len(to_resize)}")
-                self.status(f"Ajustement taille : {i+1} / {len(to_resize)}")
-
-        self.log(f"✅ {len(to_resize)} images redimensionnées vers {min_w}×{min_h} px")
+                return f, None
+            return f, _resize_image_file(f, (min_w, min_h))
+
+        done = 0
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for future in as_completed([pool.submit(resize, f) for f in to_resize]):
+                f, ok = future.result()
+                if ok is False:
+                    self.log(f"⚠️ Re-lecture impossible: {f.name}")
+                done += 1
+                if done % 10 == 0 or done == len(to_resize):
+                    self.log(f"Redimensionnement: {done}/{len(to_resize)}")
+                    self.status(f"Ajustement taille : {done} / {len(to_resize)}")
+        if self.is_cancelled():
+            return False
+
+        self.log(
+            f"✅ {len(to_resize)} images redimensionnées vers {min_w}×{min_h} px "
+            f"en {time.perf_counter() - t0:.2f}s ({workers} threads)"
+        )
         return True
 
     def extract_frames_from_video(self, video_path: str, images_dir: Path, prefix: str | None = None) -> bool | None:
@@ -602,6 +867,9 @@ class ColmapEngine(BaseEngine):
         self.log(f"\n{'='*60}\nExtraction frames: {Path(video_path).name}\n{'='*60}")
         images_dir.mkdir(parents=True, exist_ok=True)
 
+        if self._stream_blur_active():
+            return self._extract_sharp_frames(video_path, images_dir, prefix)
+
         output_pattern = images_dir / (f'{prefix}_%04d.jpg' if prefix else 'frame_%04d.jpg')
 
         cmd = [self.ffmpeg_bin]
@@ -642,15 +910,141 @@ class ColmapEngine(BaseEngine):
             self.log(f"Erreur: {str(e)}")
             return False
 
+    def _extract_keyframes(self, video_paths: list[Path], images_dir: Path) -> bool:
+        """Sélection de keyframes : analyse du mouvement puis extraction du budget.
+
+        Passe 1 (basse résolution) sur toutes les vidéos pour répartir le budget
+        au prorata du mouvement de chacune, puis passe 2 qui n'écrit que les
+        frames retenues.
+        """
+        budget = self.params.keyframe_budget
+        candidate_fps = self.params.keyframe_fps
+        hwaccel = 'videotoolbox' if self.is_silicon else None
+        self.log(f"Sélection de keyframes par mouvement (budget {budget}, candidates à {candidate_fps} fps)")
+
+        def _on_process(proc):
+            self.process = proc
+
+        videos, scans = [], []
+        t0 = time.perf_counter()
+        try:
+            for i, video_path in enumerate(video_paths):
+                if self.is_cancelled():
+                    return False
+                if not video_path.exists():
+                    self.log(f"Attention: Video introuvable: {video_path}")
+                    continue
+                base_name = video_path.stem
+                self.log(f"Analyse du mouvement ({i+1}/{len(video_paths)}): {base_name}")
+
+                def _on_scan(index, name=base_name):
+                    if index % 50 == 0:
+                        self.status(f"Analyse {name} : image {index}")
+
+                scan = scan_motion(
+                    self.ffmpeg_bin, video_path, candidate_fps, hwaccel=hwaccel,
+                    is_cancelled=self.is_cancelled, on_frame=_on_scan, on_process=_on_process,
+                )
+                if self.is_cancelled() or scan["cancelled"]:
+                    return False
+                if scan["error"]:
+                    self.log(f"Echec analyse video {base_name}: {scan['error']}")
+                    return False
+                videos.append(video_path)
+                scans.append(scan)
+            self.log(f"Analyse du mouvement terminée en {time.perf_counter() - t0:.2f}s")
+
+            budgets = allocate_budget([s["motion"].sum() for s in scans], budget)
+            images_dir.mkdir(parents=True, exist_ok=True)
+            for video_path, scan, video_budget in zip(videos, scans, budgets, strict=True):
+                if self.is_cancelled():
+                    return False
+                base_name = video_path.stem
+                indices = select_keyframes(scan["motion"], video_budget, scan["sharpness"])
+                self.log(f"{base_name}: {len(indices)} keyframes sur {len(scan['motion'])} candidates")
+
+                def _on_write(index, kept, name=base_name):
+                    if kept:
+                        self.status(f"Extraction {name} : image {index}")
+
+                stats = extract_frame_indices(
+                    self.ffmpeg_bin, video_path, images_dir, candidate_fps, indices,
+                    prefix=_video_prefix(video_path), hwaccel=hwaccel,
+                    is_cancelled=self.is_cancelled, on_frame=_on_write, on_process=_on_process,
+                    writers=max(1, min(4, self.num_threads)),
+                )
+                if self.is_cancelled() or stats["cancelled"]:
+                    return False
+                if stats["error"]:
+                    self.log(f"Echec extraction video {base_name}: {stats['error']}")
+                    return False
+        except Exception as e:
+            self.log(f"Erreur: {str(e)}")
+            return False
+        finally:
+            self.process = None
+
+        if not videos:
+            return False
+        self.log(f"{sum(budgets)} keyframes visées, extraction terminée en {time.perf_counter() - t0:.2f}s")
+        return True
+
+    def _extract_sharp_frames(self, video_path: str, images_dir: Path, prefix: str | None) -> bool | None:
+        """Extraction FFmpeg → pipe avec rejet des frames floues avant écriture."""
+        base_name = Path(video_path).stem
+        window = self.params.blur_stream_window
+        self.log(f"Filtrage flou en flux (fenêtre glissante {window} frames, facteur {self.params.blur_factor})")
+
+        def _on_process(proc):
+            self.process = proc
+
+        def _on_frame(index, kept):
+            if index % 25 == 0:
+                self.status(f"Extraction {base_name} : image {index}")
+
+        t0 = time.perf_counter()
+        try:
+            stats = extract_sharp_frames(
+                self.ffmpeg_bin, video_path, images_dir, self.fps, prefix=prefix,
+                factor=self.params.blur_factor,
+                window=window,
+                downscale=getattr(self.params, 'blur_downscale', 1),
+                hwaccel='videotoolbox' if self.is_silicon else None,
+                is_cancelled=self.is_cancelled,
+                on_frame=_on_frame,
+                on_process=_on_process,
+                writers=max(1, min(4, self.num_threads)),
+            )
+        except Exception as e:
+            self.log(f"Erreur: {str(e)}")
+            return False
+        finally:
+            self.process = None
+
+        if self.is_cancelled() or stats["cancelled"]:
+            return None
+        if stats["error"]:
+            self.log(f"Erreur lors de l'extraction: {stats['error']}")
+            return None
+        self.log(
+            f"{stats['written']} frames extraites, {stats['rejected']} floues écartées "
+            f"sur {stats['frames']} en {time.perf_counter() - t0:.2f}s"
+        )
+        return True
+
+    def _command_env(self, threads: int) -> dict:
+        env = os.environ.copy()
+        if self.is_silicon:
+            env['OMP_NUM_THREADS'] = str(threads)
+            env['VECLIB_MAXIMUM_THREADS'] = str(threads)
+            env['OPENBLAS_NUM_THREADS'] = str(threads)
+        return env
+
     def run_command(self, cmd: list, description: str, status_prefix: str | None = None) -> bool:
         """Exécute une commande système avec logging et callback de statut."""
         self.log(f"\n{'='*60}\n{description}\n{'='*60}")
 
-        env = os.environ.copy()
-        if self.is_silicon:
-            env['OMP_NUM_THREADS'] = str(self.num_threads)
-            env['VECLIB_MAXIMUM_THREADS'] = str(self.num_threads)
-            env['OPENBLAS_NUM_THREADS'] = str(self.num_threads)
+        env = self._command_env(self.num_threads)
 
         def _colmap_parser(line_str: str):
             self.log(line_str)
@@ -719,98 +1113,179 @@ class ColmapEngine(BaseEngine):
         self.log(f"Liste d'images triee pour COLMAP: {len(files)} images")
         return image_list_path
 
-    def _sort_colmap_database_images(self, database_path: Path) -> None:
-        """Make image IDs follow filename order for COLMAP's sequential matcher."""
-        ALLOWED_COLUMNS = {
-            ("images", "image_id"),
-            ("keypoints", "image_id"),
-            ("descriptors", "image_id"),
-            ("frames", "frame_id"),
-            ("frame_data", "frame_id"),
-            ("frame_data", "data_id"),
-            ("pose_priors", "corr_data_id"),
-        }
+    # Colonnes portant un image_id (frame_id = image_id : une frame par image).
+    _IMAGE_ID_COLUMNS = {
+        "images": ("image_id",),
+        "keypoints": ("image_id",),
+        "descriptors": ("image_id",),
+        "frames": ("frame_id",),
+        "frame_data": ("frame_id", "data_id"),
+        "pose_priors": ("corr_data_id",),
+    }
 
+    def _sort_colmap_database_images(self, database_path: Path) -> None:
+        """Make image IDs follow filename order for COLMAP's sequential matcher.
+
+        La base est réécrite dans un fichier voisin — tables portant un
+        image_id recopiées dans l'ordre trié (``INSERT … SELECT … JOIN
+        image_id_map``) — puis substituée par ``os.replace``. Chaque blob de
+        keypoints/descriptors n'est écrit qu'une fois, le fichier temporaire
+        se passe de journal (un seul fsync final) et la base d'origine reste
+        intacte jusqu'au remplacement.
+        """
+        database_path = Path(database_path)
+        sorted_path = database_path.with_name(database_path.name + ".sorting")
         try:
-            with sqlite3.connect(str(database_path)) as con:
-                rows = con.execute(
-                    "SELECT image_id, name FROM images ORDER BY name"
-                ).fetchall()
-                id_map = {old_id: new_id for new_id, (old_id, _) in enumerate(rows, start=1)}
-                if all(old_id == new_id for old_id, new_id in id_map.items()):
-                    self.log("Ordre des images COLMAP deja trie.")
-                    return
-
-                con.execute("PRAGMA foreign_keys=OFF")
-                con.execute("DELETE FROM matches")
-                con.execute("DELETE FROM two_view_geometries")
-                con.execute("CREATE TEMP TABLE image_id_map(old_id INTEGER PRIMARY KEY, new_id INTEGER NOT NULL)")
-                con.executemany(
-                    "INSERT INTO image_id_map(old_id, new_id) VALUES (?, ?)",
-                    id_map.items(),
+            count = self._write_renumbered_database(database_path, sorted_path)
+            if count:
+                os.replace(sorted_path, database_path)
+        except Exception as e:
+            self.log(f"Avertissement: tri de la base COLMAP echoue: {e}")
+            return
+        finally:
+            sorted_path.unlink(missing_ok=True)
+        if count:
+            self.log(f"Base COLMAP retriee pour matching sequentiel: {count} images")
+        else:
+            self.log("Ordre des images COLMAP deja trie.")
+
+    @classmethod
+    def _write_renumbered_database(cls, source: Path, target: Path) -> int:
+        """Écrit dans ``target`` la base ``source`` avec les images numérotées
+        par ordre de nom (appariements vidés) ; 0, sans rien écrire, si
+        l'ordre est déjà le bon."""
+        with closing(sqlite3.connect(str(source))) as con:
+            rows = con.execute("SELECT image_id FROM images ORDER BY name").fetchall()
+            schema = con.execute(
+                "SELECT type, name, sql FROM sqlite_master WHERE sql IS NOT NULL ORDER BY rowid"
+            ).fetchall()
+            user_version = con.execute("PRAGMA user_version").fetchone()[0]
+        if all(old_id == new_id for new_id, (old_id,) in enumerate(rows, start=1)):
+            return 0
+        if Path(f"{source}-wal").exists():
+            # Des pages encore dans le WAL ne suivraient pas le remplacement.
+            raise RuntimeError("base COLMAP ouverte en mode WAL")
+
+        tables = [name for kind, name, _ in schema if kind == "table" and not name.startswith("sqlite_")]
+        target.unlink(missing_ok=True)
+        with closing(sqlite3.connect(str(target), isolation_level=None)) as dst:
+            # Fichier temporaire : une écriture interrompue est simplement jetée.
+            dst.execute("PRAGMA journal_mode=OFF")
+            dst.execute("PRAGMA synchronous=OFF")
+            dst.execute("PRAGMA cache_size=-131072")  # 128 Mo
+            dst.execute("PRAGMA temp_store=MEMORY")
+            dst.execute(f"PRAGMA user_version={int(user_version)}")
+            dst.execute("ATTACH DATABASE ? AS src", (str(source),))
+            dst.execute("BEGIN")
+            for kind, name, sql in schema:
+                if kind == "table" and not name.startswith("sqlite_"):
+                    dst.execute(sql)
+            dst.execute("CREATE TEMP TABLE image_id_map(old_id INTEGER PRIMARY KEY, new_id INTEGER NOT NULL)")
+            dst.executemany(
+                "INSERT INTO image_id_map(old_id, new_id) VALUES (?, ?)",
+                ((old_id, new_id) for new_id, (old_id,) in enumerate(rows, start=1)),
+            )
+            for table in tables:
+                if table in ("matches", "two_view_geometries"):
+                    continue  # appariements invalidés par la renumérotation
+                columns = [column[1] for column in dst.execute(f'PRAGMA main.table_info("{table}")').fetchall()]
+                mapped = [column for column in cls._IMAGE_ID_COLUMNS.get(table, ()) if column in columns]
+                dst.execute(cls._renumbered_copy_sql(table, columns, mapped))
+            if any(name == "sqlite_sequence" for _, name, _ in schema):
+                dst.execute("DELETE FROM main.sqlite_sequence")
+                dst.execute("INSERT INTO main.sqlite_sequence SELECT name, seq FROM src.sqlite_sequence")
+                dst.execute(
+                    "UPDATE main.sqlite_sequence SET seq = (SELECT MAX(image_id) FROM main.images) WHERE name = 'images'"
                 )
-                table_columns = {
-                    table_name: {
-                        column[1]
-                        for column in con.execute(f"PRAGMA table_info({table_name})").fetchall()
-                    }
-                    for table_name, in con.execute(
-                        "SELECT name FROM sqlite_master WHERE type='table'"
-                    ).fetchall()
-                }
-
-                offset = 1000000000
-                for table, column in [
-                    ("images", "image_id"),
-                    ("keypoints", "image_id"),
-                    ("descriptors", "image_id"),
-                    ("frames", "frame_id"),
-                    ("frame_data", "frame_id"),
-                    ("frame_data", "data_id"),
-                    ("pose_priors", "corr_data_id"),
-                ]:
-                    if (table, column) not in ALLOWED_COLUMNS:
-                        continue
-                    if column not in table_columns.get(table, set()):
-                        continue
-                    con.execute(
-                        f"""
-                        UPDATE {table}
-                        SET {column} = (
-                            SELECT new_id + ?
-                            FROM image_id_map
-                            WHERE old_id = {table}.{column}
-                        )
-                        WHERE {column} IN (SELECT old_id FROM image_id_map)
-                        """,
-                        (offset,),
-                    )
-                    con.execute(
-                        f"""
-                        UPDATE {table}
-                        SET {column} = {column} - ?
-                        WHERE {column} > ?
-                        """,
-                        (offset, offset),
+                if "frames" in tables:
+                    dst.execute(
+                        "UPDATE main.sqlite_sequence SET seq = COALESCE((SELECT MAX(frame_id) FROM main.frames), 0) "
+                        "WHERE name = 'frames'"
                     )
+            # Index (et éventuels vues/triggers) après le remplissage : une seule passe de tri.
+            for kind, _, sql in schema:
+                if kind != "table":
+                    dst.execute(sql)
+            dst.execute("COMMIT")
+            dst.execute("DETACH DATABASE src")
+
+        with open(target, "rb+") as f:
+            os.fsync(f.fileno())
+        shutil.copymode(source, target)
+        return len(rows)
 
-                con.execute("DROP TABLE image_id_map")
-                con.execute(
-                    "UPDATE sqlite_sequence SET seq = (SELECT MAX(image_id) FROM images) WHERE name = 'images'"
-                )
-                con.execute(
-                    "UPDATE sqlite_sequence SET seq = COALESCE((SELECT MAX(frame_id) FROM frames), 0) WHERE name = 'frames'"
-                )
-                con.commit()
-                self.log(f"Base COLMAP retriee pour matching sequentiel: {len(rows)} images")
-        except Exception as e:
-            self.log(f"Avertissement: tri de la base COLMAP echoue: {e}")
+    @staticmethod
+    def _renumbered_copy_sql(table: str, columns: list[str], mapped: list[str]) -> str:
+        """``INSERT … SELECT`` de ``src.table`` vers ``main.table``, colonnes
+        ``mapped`` passées par ``image_id_map`` et lignes triées sur la
+        première colonne (la clé dans le schéma COLMAP) pour des insertions
+        en fin d'arbre."""
+        select, joins = [], []
+        for column in columns:
+            if column in mapped:
+                alias = f"map_{column}"
+                joins.append(f'LEFT JOIN image_id_map {alias} ON {alias}.old_id = old."{column}"')
+                select.append(f'COALESCE({alias}.new_id, old."{column}")')
+            else:
+                select.append(f'old."{column}"')
+        column_list = ", ".join(f'"{column}"' for column in columns)
+        order = " ORDER BY 1" if mapped else ""
+        return (
+            f'INSERT INTO main."{table}" ({column_list}) SELECT {", ".join(select)} '
+            f'FROM src."{table}" old {" ".join(joins)}{order}'
+        )
+
+    def feature_matching(self, database_path: str, images_dir: Path | None = None) -> bool:
+        """Exécute le matching des features (bruteforce ou LightGlue).
 
-    def feature_matching(self, database_path: str) -> bool:
-        """Exécute le matching des features (bruteforce ou LightGlue)."""
-        cmd, description = build_feature_matching_command(self.colmap_bin, database_path, self.params, self.num_threads)
+        En mode ``auto``, la stratégie vient de ``_resolve_match_plan``.
+        """
+        plan = self._resolve_match_plan(database_path, images_dir) if images_dir else None
+        if plan is None:
+            cmd, description = build_feature_matching_command(
+                self.colmap_bin, database_path, self.params, self.num_threads,
+                matcher_type='exhaustive' if self.params.matcher_type == 'auto' else None,
+            )
+        else:
+            pairs_path = None
+            if plan.matcher == 'pairs':
+                pairs_path = write_pairs(plan.pairs, Path(database_path).parent / "match_pairs.txt")
+            cmd, description = build_feature_matching_command(
+                self.colmap_bin, database_path, self.params, self.num_threads,
+                matcher_type=plan.matcher, sequential_overlap=plan.overlap, match_list_path=pairs_path,
+            )
         return self.run_command(cmd, description, status_prefix="Comparaison")
 
+    def _resolve_match_plan(self, database_path, images_dir) -> MatchPlan | None:
+        """Plan de matching du mode ``auto`` (calculé une fois par exécution) ;
+        None pour un matcher choisi explicitement."""
+        if self.params.matcher_type != 'auto':
+            return None
+        if self._matching_plan is None:
+            try:
+                with ColmapDatabase(database_path) as db:
+                    names = list(db.images().values())
+            except (OSError, sqlite3.Error):
+                names = []
+            if not names:
+                root = Path(images_dir)
+                names = [p.relative_to(root).as_posix() for p, _ in scan_image_files(root)]
+            self.status("Choix de la stratégie de matching...")
+            self._matching_plan = plan_matching(
+                names, images_dir, feature_type=getattr(self.params, 'feature_type', 'SIFT'),
+                workers=self.num_threads, is_cancelled=self.is_cancelled,
+            )
+            self.log(f"Matcher auto → {self._matching_plan.matcher} ({self._matching_plan.reason})")
+        return self._matching_plan
+
+    def _effective_matcher_type(self, database_path=None, images_dir=None) -> str:
+        """Matcher réellement utilisé : celui des paramètres, ou celui du plan auto."""
+        if self.params.matcher_type != 'auto':
+            return self.params.matcher_type
+        if self._matching_plan is None and database_path is not None and images_dir is not None:
+            self._resolve_match_plan(database_path, images_dir)
+        return self._matching_plan.matcher if self._matching_plan else 'exhaustive'
+
     def mapper(self, database_path: str, images_dir: str, sparse_dir: Path) -> bool:
         """Reconstruction 3D : global_mapper (GLOMAP, COLMAP 4.0+) avec repli automatique
         sur le mapper incrémental si le mapper global ne produit rien d'exploitable.
@@ -820,6 +1295,17 @@ class ColmapEngine(BaseEngine):
         reste plus fiable. Le repli garantit qu'on ne rend jamais une reconstruction vide.
         """
         sparse_dir = Path(sparse_dir)
+        clusters = self._plan_partition(database_path)
+        if clusters:
+            if self._partitioned_mapper(clusters, database_path, images_dir, sparse_dir):
+                return True
+            if self.is_cancelled():
+                return False
+            self.log("Reconstruction partitionnée sans résultat — repli sur le mapper complet.")
+            if sparse_dir.exists():
+                shutil.rmtree(sparse_dir)
+            sparse_dir.mkdir(parents=True, exist_ok=True)
+
         global_cmd = build_global_mapper_command(self.colmap_bin, database_path, images_dir, sparse_dir, self.params, self.num_threads)
         ok = self.run_command(global_cmd, "Reconstruction 3D (global_mapper)", status_prefix="Reconstruction 3D")
         if ok and self._has_valid_sparse_model(sparse_dir):
@@ -841,16 +1327,252 @@ class ColmapEngine(BaseEngine):
         ok = self.run_command(incremental_cmd, "Reconstruction 3D (mapper incrémental)", status_prefix="Reconstruction 3D")
         return ok and self._has_valid_sparse_model(sparse_dir)
 
+    def _plan_partition(self, database_path) -> list[list[str]] | None:
+        """Clusters d'images (noms relatifs de database.db) du mode partitionné ;
+        None si le mode est désactivé ou si un seul cluster suffit."""
+        mode = getattr(self.params, 'partition_mode', 'off')
+        if mode not in PARTITION_MODES or mode == 'off':
+            return None
+        size = max(1, getattr(self.params, 'partition_size', 500))
+        # model_merger aligne deux clusters sur au moins 3 images communes.
+        overlap = max(MIN_MERGE_SHARED_IMAGES, getattr(self.params, 'partition_overlap', 50))
+        try:
+            with ColmapDatabase(database_path) as db:
+                images = db.images()
+                if len(images) <= size:
+                    return None
+                if mode == 'auto':
+                    mode = 'sequential' if self._effective_matcher_type() == 'sequential' else 'graph'
+                if mode == 'graph':
+                    id1, id2, counts = db.match_counts(verified=True)
+                    if not len(counts):
+                        id1, id2, counts = db.match_counts()
+        except (OSError, sqlite3.Error) as e:
+            self.log(f"⚠️ Partition impossible (lecture de database.db: {e}) — mapper complet.")
+            return None
+
+        if mode == 'graph':
+            groups = partition_match_graph(list(images), id1, id2, counts, size, overlap)
+            clusters = [[images[i] for i in group] for group in groups]
+        else:
+            clusters = partition_sequential(list(images.values()), size, overlap)
+        self.log(f"Reconstruction partitionnée ({mode}) : {len(images)} images → "
+                 f"{len(clusters)} clusters de ≤ {size} images (+{overlap} communes)")
+        return clusters if len(clusters) > 1 else None
+
+    def _partitioned_mapper(self, clusters: list[list[str]], database_path, images_dir, sparse_dir: Path) -> bool:
+        """Reconstruit chaque cluster (mapper incrémental sur sa liste d'images),
+        en parallèle dans le budget de threads, puis fusionne les modèles
+        obtenus sur leurs images communes (model_merger + bundle_adjuster).
+
+        Les modèles finaux sont écrits dans sparse/0, sparse/1… du plus grand
+        au plus petit.
+        """
+        work_dir = sparse_dir.parent / "partition"
+        if work_dir.exists():
+            shutil.rmtree(work_dir)
+        work_dir.mkdir()
+        workers, threads = plan_workers(
+            len(clusters), self.num_threads, getattr(self.params, 'partition_workers', 0))
+        self.log(f"{workers} mappers simultanés × {threads} threads")
+
+        jobs = []
+        outputs = []
+        for k, names in enumerate(clusters):
+            list_path = work_dir / f"cluster_{k}.txt"
+            list_path.write_text("".join(f"{name}\n" for name in names), encoding="utf-8")
+            output = work_dir / f"cluster_{k}"
+            output.mkdir()
+            outputs.append(output)
+            cmd = build_incremental_mapper_command(
+                self.colmap_bin, str(database_path), str(images_dir), output,
+                self.params, threads, image_list_path=list_path,
+            )
+            jobs.append((cmd, f"cluster {k + 1}/{len(clusters)}", threads))
+
+        self.status(tr("status_reconstruction", "Création de la scène 3D..."))
+        results = self._run_concurrent(jobs, workers)
+        if self.is_cancelled():
+            return False
+        if not any(results):
+            self.log("❌ Échec du mapper sur tous les clusters")
+            return False
+
+        models: dict[str, tuple[Path, SubmodelReport]] = {}
+        for k, output in enumerate(outputs):
+            if not results[k]:
+                self.log(f"  cluster {k + 1} : échec du mapper, ignoré")
+                continue
+            reports = analyze_submodels(output)
+            if not reports:
+                self.log(f"  cluster {k + 1} : aucune reconstruction")
+                continue
+            best = reports[0]
+            models[f"cluster_{k}"] = (output / best.name, best)
+            self.log(f"  cluster {k + 1} : {best.summary['registered_images']}/{len(clusters[k])} images")
+        if not models:
+            return False
+
+        step = 0
+        tried: set[frozenset] = set()
+        while len(models) > 1 and not self.is_cancelled():
+            pair = merge_plan({n: r.image_names for n, (_, r) in models.items()},
+                              MIN_MERGE_SHARED_IMAGES, exclude=tried)
+            if pair is None:
+                break
+            a, b, shared = pair
+            (dir_a, rep_a), (dir_b, rep_b) = models[a], models[b]
+            step += 1
+            output = work_dir / f"merge_{step}"
+            output.mkdir()
+            ok = self.run_command(build_model_merger_command(self.colmap_bin, dir_a, dir_b, output),
+                                  f"Fusion {a} + {b} ({shared} images communes)", status_prefix="Fusion")
+            merged = read_submodel_report(output) if ok else None
+            registered = max(rep_a.summary["registered_images"], rep_b.summary["registered_images"])
+            if merged is None or merged.summary["registered_images"] <= registered:
+                self.log(f"Fusion {a} + {b} non retenue")
+                tried.add(frozenset((a, b)))
+                continue
+            del models[a], models[b]
+            models[f"merge_{step}"] = (output, merged)
+        if self.is_cancelled():
+            return False
+
+        ranked = sorted(models.values(), key=lambda m: m[1].rank_key, reverse=True)
+        if step and ranked[0][0].name.startswith("merge_"):
+            refined = work_dir / "bundle_adjusted"
+            refined.mkdir()
+            ok = self.run_command(
+                build_bundle_adjuster_command(self.colmap_bin, ranked[0][0], refined, self.params),
+                "Bundle adjustment global", status_prefix="Optimisation")
+            report = read_submodel_report(refined) if ok else None
+            if report is not None:
+                ranked[0] = (refined, report)
+
+        if sparse_dir.exists():
+            shutil.rmtree(sparse_dir)
+        sparse_dir.mkdir(parents=True)
+        for index, (model_dir, _) in enumerate(ranked):
+            shutil.move(str(model_dir), str(sparse_dir / str(index)))
+        shutil.rmtree(work_dir, ignore_errors=True)
+        return self._has_valid_sparse_model(sparse_dir)
+
+    def _run_concurrent(self, jobs: list[tuple[list, str, int]], workers: int) -> list[bool]:
+        """Exécute ``jobs`` [(commande, description, threads)] à ``workers``
+        processus simultanés ; chacun a son propre runner, arrêté par ``stop()``."""
+        results = [False] * len(jobs)
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            futures = {pool.submit(self._run_job, *job): i for i, job in enumerate(jobs)}
+            pending = set(futures)
+            while pending:
+                done, pending = wait(pending, timeout=1.0)
+                for future in done:
+                    results[futures[future]] = future.result()
+                if pending and self.is_cancelled():
+                    self._stop_jobs()
+        return results
+
+    def _run_job(self, cmd: list, description: str, threads: int) -> bool:
+        if self.is_cancelled() or self.stop_requested:
+            return False
+        job = BaseEngine(f"{self.name}.{description}")
+        job.telemetry_dir, job.telemetry_backend = self.telemetry_dir, self.telemetry_backend
+        with self._jobs_lock:
+            self._jobs.append(job)
+        try:
+            self.log(f"{description} : {' '.join(map(str, cmd))}")
+            returncode = job._execute_command(
+                cmd, env=self._command_env(threads),
+                line_callback=lambda line: self.log(f"[{description}] {line}"), timeout=14400,
+            )
+        finally:
+            with self._jobs_lock:
+                self._jobs.remove(job)
+        self.log(f"{description} {'terminé' if returncode == 0 else 'échoué'}")
+        return returncode == 0
+
+    def _stop_jobs(self) -> None:
+        with self._jobs_lock:
+            jobs = list(self._jobs)
+        for job in jobs:
+            job.stop()
+
     def _has_valid_sparse_model(self, sparse_dir: Path) -> bool:
-        """Vérifie qu'au moins un sous-modèle sparse (dossier 0/) contient une
+        """Vérifie qu'au moins un sous-modèle sparse (dossier 0/, 1/…) contient une
         reconstruction complète (cameras + images + points3D, format .bin ou .txt)."""
-        model_dir = Path(sparse_dir) / "0"
-        if not model_dir.is_dir():
-            return False
-        return all(
-            (model_dir / f"{stem}.bin").exists() or (model_dir / f"{stem}.txt").exists()
-            for stem in ("cameras", "images", "points3D")
-        )
+        return bool(list_submodels(sparse_dir))
+
+    def _select_best_submodel(self, database_path: Path, images_dir: Path, sparse_dir: Path) -> None:
+        """Classe les sous-modèles (images enregistrées, puis longueur moyenne des
+        tracks), fusionne éventuellement ceux qui partagent des images et place
+        le meilleur dans sparse/0. Le classement est écrit dans sparse_report.json.
+        """
+        reports = analyze_submodels(sparse_dir)
+        if not reports:
+            return
+        for r in reports:
+            s = r.summary
+            self.log(f"  sparse/{r.name} : {s['registered_images']} images, {s['points3D']} points, "
+                     f"track moyen {s['mean_track_length']:.2f}")
+
+        best = reports[0]
+        merged = []
+        if getattr(self.params, 'merge_submodels', False) and len(reports) > 1:
+            best, merged = self._merge_submodels(sparse_dir, best, reports[1:])
+
+        if best.name != "0":
+            self.log(f"Sous-modèle sparse/{best.name} retenu "
+                     f"({best.summary['registered_images']} images) → sparse/0")
+            promote_submodel(sparse_dir, best.name)
+
+        report_path = sparse_dir.parent / "sparse_report.json"
+        try:
+            report_path.write_text(json.dumps({
+                "selected": best.name,
+                "merged": merged,
+                "submodels": [r.to_dict() for r in reports],
+            }, indent=2, ensure_ascii=False), encoding="utf-8")
+        except OSError as e:
+            self.log(f"⚠️ Rapport sparse non écrit: {e}")
+
+    def _merge_submodels(self, sparse_dir: Path, best: SubmodelReport,
+                         others: list[SubmodelReport]) -> tuple[SubmodelReport, list[str]]:
+        """Fusionne dans ``best`` les sous-modèles partageant au moins
+        MIN_MERGE_SHARED_IMAGES images, tant que la fusion enregistre plus d'images.
+
+        Les sous-modèles absorbés sont déplacés dans ``sparse/_merged/`` : ils
+        ne restent pas parmi les modèles candidats (``list_submodels``).
+        """
+        merged = []
+        for other in others:
+            if self.is_cancelled():
+                break
+            shared = len(best.image_names & other.image_names)
+            if shared < MIN_MERGE_SHARED_IMAGES:
+                continue
+            output = sparse_dir / f".merge-{best.name}-{other.name}"
+            if output.exists():
+                shutil.rmtree(output)
+            output.mkdir()
+            cmd = build_model_merger_command(self.colmap_bin, sparse_dir / best.name, sparse_dir / other.name, output)
+            ok = self.run_command(cmd, f"Fusion sparse/{best.name} + sparse/{other.name}", status_prefix="Fusion")
+            result = read_submodel_report(output) if ok else None
+            if result is None or result.summary["registered_images"] <= best.summary["registered_images"]:
+                self.log(f"Fusion sparse/{best.name} + sparse/{other.name} ({shared} images communes) non retenue")
+                shutil.rmtree(output, ignore_errors=True)
+                continue
+            target = sparse_dir / best.name
+            shutil.rmtree(target)
+            output.rename(target)
+            best = SubmodelReport(best.name, result.summary, result.image_names)
+            merged.append(other.name)
+            archive = sparse_dir / "_merged"
+            archive.mkdir(exist_ok=True)
+            shutil.rmtree(archive / other.name, ignore_errors=True)
+            (sparse_dir / other.name).rename(archive / other.name)
+            self.log(f"✅ sparse/{other.name} fusionné dans sparse/{best.name} "
+                     f"({best.summary['registered_images']} images)")
+        return best, merged
 
     def image_undistorter(self, images_dir: str, sparse_dir: str, output_dir: str) -> bool:
         """Exécute l'undistortion des images."""
@@ -882,8 +1604,9 @@ class ColmapEngine(BaseEngine):
         self.log(f"Configuration Brush créée: {config_path}")
 
     def stop(self):
-        """Arrête le processus en cours."""
+        """Arrête le processus en cours (et les mappers de clusters)."""
         super().stop()
+        self._stop_jobs()
 
     @staticmethod
     def delete_project_content(target_path: Path) -> tuple[bool, str]:
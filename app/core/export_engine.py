@@ -3,7 +3,15 @@ import subprocess
 from collections.abc import Callable
 from pathlib import Path
 
+import numpy as np
+
 from .base_engine import BaseEngine
+from .glb_writer import has_gaussian_fields, write_glb
+from .ply_utils import parse_ply_header, read_ply_vertices
+from .text_columns import fixed_point_chars, join_char_columns, table_chars, text_table, write_rows
+
+# "%.3f" of every uchar colour channel divided by 255 (OBJ vertex colours).
+_UNIT_COLOR_TABLE = text_table(["%.3f" % (i / 255) for i in range(256)])
 
 
 class ExportEngine(BaseEngine):
@@ -96,8 +104,10 @@ class ExportEngine(BaseEngine):
         try:
             try:
                 from plyfile import PlyData
-                ply = PlyData.read(str(input_file))
-                ply.write(str(output_file), text=True)
+                if not self._write_ply_ascii_fast(input_file, output_file):
+                    ply = PlyData.read(str(input_file))
+                    ply.text = True
+                    ply.write(str(output_file))
                 self.log(f"Exporté PLY ASCII: {output_file}")
                 return True
             except ImportError:
@@ -107,6 +117,39 @@ class ExportEngine(BaseEngine):
             self.log(f"Erreur conversion PLY ASCII: {e}")
             return False
 
+    def _write_ply_ascii_fast(self, input_file: Path, output_file: Path) -> bool:
+        """Vectorised ASCII PLY writer for single-element vertex files.
+
+        Produces the same bytes as ``PlyData.write(text=True)`` (header built
+        by plyfile, values formatted ``%.18g`` like its ``np.savetxt`` rows).
+        Returns False when the layout needs plyfile's generic path (several
+        elements, list properties).
+        """
+        from plyfile import PlyData, PlyElement
+
+        header = parse_ply_header(input_file)
+        if [name for name, _, _ in header["elements"]] != ["vertex"]:
+            return False
+        vertex = read_ply_vertices(input_file)
+        if any(vertex.dtype.fields[k][0].kind not in "iuf" for k in vertex.dtype.names):
+            return False
+        if output_file.resolve() == input_file.resolve():
+            # Réécriture en place : ne pas tronquer le fichier encore mappé.
+            vertex = np.array(vertex)
+
+        el = PlyElement.describe(vertex, "vertex", comments=header["element_comments"].get("vertex", []))
+        ply = PlyData([el], text=True, comments=header["comments"], obj_info=header["obj_info"])
+        names = vertex.dtype.names
+        row_fmt = " ".join(["%.18g"] * len(names)) + "\n"
+
+        def columns(start, stop):
+            return [vertex[k][start:stop].astype(np.float64).tolist() for k in names]
+
+        with open(output_file, 'w') as fout:
+            fout.write(ply.header + "\n")
+            write_rows(fout, row_fmt, len(vertex), columns)
+        return True
+
     def _export_xyz(self, input_file: Path, output_dir: Path, opts: dict) -> bool:
         """Export PLY to XYZ text format with optional colors."""
         output_file = output_dir / f"{input_file.stem}.xyz"
@@ -115,21 +158,21 @@ class ExportEngine(BaseEngine):
 
         try:
             try:
-                from plyfile import PlyData
-                ply = PlyData.read(str(input_file))
-                vertex = ply['vertex']
-                has_colors = 'red' in vertex.data.dtype.names
+                vertex = read_ply_vertices(input_file)
+                has_colors = 'red' in vertex.dtype.names
+                with_colors = include_colors and has_colors
+
+                d = delimiter.replace('%', '%%')
+                row_fmt = d.join(["%r"] * 3 + (["%d"] * 3 if with_colors else [])) + "\n"
+
+                def columns(start, stop):
+                    cols = [vertex[k][start:stop].astype(np.float64).tolist() for k in ('x', 'y', 'z')]
+                    if with_colors:
+                        cols += [vertex[k][start:stop].astype(np.int64).tolist() for k in ('red', 'green', 'blue')]
+                    return cols
 
                 with open(output_file, 'w') as fout:
-                    for i in range(len(vertex)):
-                        data = vertex[i]
-                        x, y, z = float(data['x']), float(data['y']), float(data['z'])
-
-                        if include_colors and has_colors:
-                            r, g, b = int(data['red']), int(data['green']), int(data['blue'])
-                            fout.write(f"{x}{delimiter}{y}{delimiter}{z}{delimiter}{r}{delimiter}{g}{delimiter}{b}\n")
-                        else:
-                            fout.write(f"{x}{delimiter}{y}{delimiter}{z}\n")
+                    write_rows(fout, row_fmt, len(vertex), columns)
             except ImportError:
                 # Fallback: parse manually
                 with open(input_file) as fin:
@@ -167,10 +210,8 @@ class ExportEngine(BaseEngine):
 
         try:
             try:
-                from plyfile import PlyData
-                ply = PlyData.read(str(input_file))
-                vertex = ply['vertex']
-                has_colors = 'red' in vertex.data.dtype.names
+                vertex = read_ply_vertices(input_file)
+                has_colors = 'red' in vertex.dtype.names
 
                 if include_mtl:
                     mtl_file = output_dir / f"{input_file.stem}.mtl"
@@ -190,19 +231,34 @@ class ExportEngine(BaseEngine):
                         fout.write(f"mtllib {input_file.stem}.mtl\n\n")
                     fout.write("o PointCloud\n\n")
 
-                    vertex_count = 0
-                    for i in range(len(vertex)):
-                        data = vertex[i]
-                        x = float(data['x']) * scale
-                        y = float(data['y']) * scale
-                        z = float(data['z']) * scale
-
-                        vertex_count += 1
-                        if include_colors and has_colors:
-                            r, g, b = int(data['red'])/255, int(data['green'])/255, int(data['blue'])/255
-                            fout.write(f"v {x:.6f} {y:.6f} {z:.6f} {r:.3f} {g:.3f} {b:.3f}\n")
-                        else:
-                            fout.write(f"v {x:.6f} {y:.6f} {z:.6f}\n")
+                    with_colors = include_colors and has_colors
+                    row_fmt = "v %.6f %.6f %.6f %.3f %.3f %.3f\n" if with_colors else "v %.6f %.6f %.6f\n"
+
+                    def columns(start, stop):
+                        cols = [vertex[k][start:stop].astype(np.float64) * scale for k in ('x', 'y', 'z')]
+                        if with_colors:
+                            cols += [vertex[k][start:stop].astype(np.int64) / 255 for k in ('red', 'green', 'blue')]
+                        return cols
+
+                    def render(start, stop):
+                        # Byte-level rendering of the same "%.6f"/"%.3f" text.
+                        pieces = [b"v "]
+                        for i, k in enumerate(('x', 'y', 'z')):
+                            src = vertex[k][start:stop]
+                            exact = src.dtype == np.float32 and scale == 1
+                            pieces += [fixed_point_chars(src.astype(np.float64) * scale, 6, exact), b" " if i < 2 else b""]
+                        if with_colors:
+                            for k in ('red', 'green', 'blue'):
+                                col = vertex[k][start:stop]
+                                if col.dtype == np.uint8:
+                                    pieces += [b" ", table_chars(col, _UNIT_COLOR_TABLE)]
+                                else:
+                                    pieces += [b" ", fixed_point_chars(col.astype(np.int64) / 255, 3)]
+                        pieces.append(b"\n")
+                        return join_char_columns(pieces, stop - start)
+
+                    vertex_count = len(vertex)
+                    write_rows(fout, row_fmt, vertex_count, columns, render=render)
 
                     fout.write(f"\n# {vertex_count} vertices\n")
 
@@ -260,47 +316,67 @@ class ExportEngine(BaseEngine):
             return False
 
     def _export_glb(self, input_file: Path, output_dir: Path, opts: dict) -> bool:
-        """Export PLY to GLB using available tools."""
+        """Export PLY to GLB.
+
+        ``method`` : 'auto'/'native' (défaut) utilise le writer glTF intégré ;
+        'legacy' enchaîne trimesh → open3d → assimp comme auparavant, et
+        'trimesh' / 'open3d' / 'assimp' forcent un outil externe précis.
+        """
         output_file = output_dir / f"{input_file.stem}.glb"
-        method = opts.get('method', 'auto')  # auto, trimesh, open3d, assimp
-        opts.get('point_size', 0.01)
+        method = opts.get('method', 'auto')  # auto, native, legacy, trimesh, open3d, assimp
 
-        if method == 'auto':
+        if method in ('auto', 'native'):
+            if self._try_export_glb_native(input_file, output_file, opts):
+                return True
+        elif method == 'legacy':
             if self._try_export_glb_trimesh(input_file, output_file, opts):
                 return True
             if self._try_export_glb_open3d(input_file, output_file, opts):
                 return True
             if self._try_export_glb_assimp(input_file, output_file, opts):
                 return True
+            self.log("GLB export failed. Install: pip install trimesh open3d")
+            return False
         elif method == 'trimesh':
             if self._try_export_glb_trimesh(input_file, output_file, opts):
                 return True
         elif method == 'open3d':
             if self._try_export_glb_open3d(input_file, output_file, opts):
                 return True
-        elif method == 'assimp':
-            if self._try_export_glb_assimp(input_file, output_file, opts):
-                return True
+        elif method == 'assimp' and self._try_export_glb_assimp(input_file, output_file, opts):
+            return True
 
-        self.log("GLB export failed. Install: pip install trimesh open3d")
+        self.log(f"GLB export failed (méthode: {method})")
         return False
 
+    def _try_export_glb_native(self, input_file: Path, output_file: Path, opts: dict) -> bool:
+        """Export with the built-in glTF 2.0 writer (no external tool, no temp file)."""
+        try:
+            vertex = read_ply_vertices(input_file)
+            gaussian = opts.get('gaussian_attributes')
+            if gaussian is None:
+                gaussian = has_gaussian_fields(vertex)
+            written = write_glb(output_file, vertex, gaussian=bool(gaussian))
+            suffix = " (KHR_gaussian_splatting)" if gaussian else ""
+            self.log(f"Exporté GLB{suffix}: {output_file} ({len(vertex)} points, {written / 1e6:.1f} Mo)")
+            return True
+        except Exception as e:
+            self.log(f"Erreur GLB: {e}")
+            return False
+
     def _try_export_glb_trimesh(self, input_file: Path, output_file: Path, opts: dict) -> bool:
         """Export using trimesh library."""
         try:
-            import numpy as np
             import trimesh
-            from plyfile import PlyData
 
-            ply = PlyData.read(str(input_file))
-            vertex = ply['vertex']
+            vertex = read_ply_vertices(input_file)
 
             points = np.column_stack([
                 vertex['x'], vertex['y'], vertex['z']
             ])
 
             colors = None
-            if 'red' in vertex.data.dtype.names:
+            if 'red' in vertex.dtype.names:
                 colors = np.column_stack([
                     vertex['red'], vertex['green'], vertex['blue']
                 ])
@@ -351,10 +427,7 @@ class ExportEngine(BaseEngine):
     def _try_export_glb_assimp(self, input_file: Path, output_file: Path, opts: dict) -> bool:
         """Export using assimp command-line tool via intermediate OBJ."""
         try:
-            from plyfile import PlyData
-
-            ply = PlyData.read(str(input_file))
-            vertex = ply['vertex']
+            vertex = read_ply_vertices(input_file)
 
             temp_obj = input_file.parent / f"{input_file.stem}_temp.obj"
             temp_mtl = input_file.parent / f"{input_file.stem}_temp.mtl"
@@ -364,14 +437,18 @@ class ExportEngine(BaseEngine):
                 f.write(f"mtllib {temp_mtl.name}\n")
                 f.write("o PointCloud\n\n")
 
-                for i in range(len(vertex)):
-                    data = vertex[i]
-                    x, y, z = data['x'], data['y'], data['z']
-                    if 'red' in data.dtype.names:
-                        r, g, b = data['red']/255, data['green']/255, data['blue']/255
-                        f.write(f"v {x} {y} {z} {r:.3f} {g:.3f} {b:.3f}\n")
-                    else:
-                        f.write(f"v {x} {y} {z}\n")
+                has_colors = 'red' in vertex.dtype.names
+                # f"{np.float32}" formate via float (repr float64, pas le
+                # str float32 de NumPy) : "%r" sur float64 donne le même texte.
+                row_fmt = "v %r %r %r %.3f %.3f %.3f\n" if has_colors else "v %r %r %r\n"
+
+                def columns(start, stop):
+                    cols = [vertex[k][start:stop].astype(np.float64).tolist() for k in ('x', 'y', 'z')]
+                    if has_colors:
+                        cols += [(vertex[k][start:stop] / 255).tolist() for k in ('red', 'green', 'blue')]
+                    return cols
+
+                write_rows(f, row_fmt, len(vertex), columns)
 
                 f.write(f"\n# {len(vertex)} vertices\n")
 
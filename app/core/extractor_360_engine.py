@@ -55,6 +55,7 @@ class Extractor360Engine(BaseEngine):
             if log_callback:
                 log_callback(f"SECURITY: Invalid output directory: {output_dir}")
             return False
+        self.telemetry_dir = Path(output_dir) / "telemetry"
 
         cmd = [
             self.venv_python,
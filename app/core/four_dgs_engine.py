@@ -125,6 +125,7 @@ class FourDGSEngine(BaseEngine):
         if safe_out is None:
             self.log(f"SECURITY: Invalid output directory: {output_dir}")
             return False
+        self.telemetry_dir = Path(output_dir) / "telemetry"
         self.log(f"Scan du dossier : {videos_dir}")
         supported_ext = (".mp4", ".mov", ".avi", ".mkv")
         videos_path = Path(videos_dir)
@@ -0,0 +1,214 @@
+"""
+glb_writer.py — Built-in glTF 2.0 binary (.glb) writer for splat point clouds.
+
+Packs the vertex array straight into one interleaved buffer view of a single
+POINTS primitive — no trimesh/open3d/assimp, no intermediate OBJ/PLY:
+
+  - POSITION  float32 VEC3 (with the min/max bounds glTF requires)
+  - COLOR_0   uint8 VEC4 normalized — from red/green/blue when present,
+              otherwise from the SH DC term (0.5 + C0·f_dc) with the
+              activated opacity as alpha
+
+For Gaussian Splat PLYs the splat parameters are added as attributes of the
+``KHR_gaussian_splatting`` extension (declared in ``extensionsUsed`` only, so
+plain glTF viewers still show the coloured point cloud):
+
+  - SCALE     float32 VEC3   exp(scale_i)
+  - ROTATION  float32 VEC4   normalised quaternion, glTF (x, y, z, w) order
+  - OPACITY   float32 SCALAR sigmoid(opacity)
+  - SH_DEGREE_0_COEF_0 float32 VEC3  raw f_dc_0..2
+
+The BIN chunk is written in chunks from the (possibly memory-mapped) source,
+so peak memory stays bounded regardless of the splat count.
+"""
+import json
+import struct
+
+import numpy as np
+
+_GLB_MAGIC = 0x46546C67  # b"glTF"
+_CHUNK_JSON = 0x4E4F534A
+_CHUNK_BIN = 0x004E4942
+
+# glTF componentType / mode codes.
+_UNSIGNED_BYTE = 5121
+_FLOAT = 5126
+_ARRAY_BUFFER = 34962
+_MODE_POINTS = 0
+
+KHR_GAUSSIAN_SPLATTING = "KHR_gaussian_splatting"
+
+# Zeroth-order spherical-harmonic constant (DC term → linear colour).
+SH_C0 = 0.28209479177387814
+
+_GAUSSIAN_FIELDS = (
+    "scale_0", "scale_1", "scale_2",
+    "rot_0", "rot_1", "rot_2", "rot_3",
+    "opacity",
+    "f_dc_0", "f_dc_1", "f_dc_2",
+)
+
+# Vertices packed per write.
+_WRITE_CHUNK = 1 << 16
+
+
+def has_gaussian_fields(vertex):
+    """True if the vertex array carries the full set of 3DGS parameters."""
+    names = set(vertex.dtype.names or ())
+    return all(f in names for f in _GAUSSIAN_FIELDS)
+
+
+def _record_dtype(gaussian):
+    fields = [("position", "<f4", (3,)), ("color", "u1", (4,))]
+    if gaussian:
+        fields += [
+            ("scale", "<f4", (3,)),
+            ("rotation", "<f4", (4,)),
+            ("opacity", "<f4"),
+            ("sh_dc", "<f4", (3,)),
+        ]
+    return np.dtype(fields)
+
+
+def _sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+def _fill_records(rec, vertex, gaussian):
+    """Pack one slice of the source vertex array into interleaved records."""
+    names = vertex.dtype.names
+    for i, k in enumerate(("x", "y", "z")):
+        rec["position"][:, i] = vertex[k]
+
+    if "red" in names:
+        for i, k in enumerate(("red", "green", "blue")):
+            rec["color"][:, i] = np.clip(vertex[k], 0, 255)
+    elif "f_dc_0" in names:
+        for i in range(3):
+            linear = 0.5 + SH_C0 * vertex[f"f_dc_{i}"].astype(np.float32)
+            rec["color"][:, i] = np.clip(np.rint(linear * 255.0), 0, 255)
+    else:
+        rec["color"][:, :3] = 255
+
+    if "opacity" in names:
+        alpha = _sigmoid(vertex["opacity"].astype(np.float32))
+        rec["color"][:, 3] = np.clip(np.rint(alpha * 255.0), 0, 255)
+    else:
+        rec["color"][:, 3] = 255
+
+    if gaussian:
+        for i in range(3):
+            rec["scale"][:, i] = np.exp(vertex[f"scale_{i}"].astype(np.float32))
+        # PLY stores (w, x, y, z); glTF quaternions are (x, y, z, w).
+        q = np.stack([vertex[f"rot_{i}"].astype(np.float32) for i in (1, 2, 3, 0)], axis=1)
+        norm = np.linalg.norm(q, axis=1, keepdims=True)
+        q = np.divide(q, norm, out=np.tile(np.float32([0, 0, 0, 1]), (len(q), 1)), where=norm > 0)
+        rec["rotation"] = q
+        rec["opacity"] = alpha
+        for i in range(3):
+            rec["sh_dc"][:, i] = vertex[f"f_dc_{i}"]
+
+
+def _position_bounds(vertex, n):
+    lo = np.full(3, np.inf)
+    hi = np.full(3, -np.inf)
+    for start in range(0, n, _WRITE_CHUNK * 16):
+        for i, k in enumerate(("x", "y", "z")):
+            col = vertex[k][start:start + _WRITE_CHUNK * 16]
+            lo[i] = min(lo[i], float(np.nanmin(col)))
+            hi[i] = max(hi[i], float(np.nanmax(col)))
+    # Positions are stored as float32: express the bounds in that precision.
+    return np.float32(lo).tolist(), np.float32(hi).tolist()
+
+
+def _build_gltf(n, dtype, gaussian, pos_min, pos_max):
+    stride = dtype.itemsize
+    accessors = []
+    attributes = {}
+
+    def add(name, field, component_type, type_, normalized=False, **extra):
+        acc = {
+            "bufferView": 0,
+            "byteOffset": dtype.fields[field][1],
+            "componentType": component_type,
+            "count": n,
+            "type": type_,
+        }
+        if normalized:
+            acc["normalized"] = True
+        acc.update(extra)
+        attributes[name] = len(accessors)
+        accessors.append(acc)
+
+    add("POSITION", "position", _FLOAT, "VEC3", min=pos_min, max=pos_max)
+    add("COLOR_0", "color", _UNSIGNED_BYTE, "VEC4", normalized=True)
+    primitive = {"attributes": attributes, "mode": _MODE_POINTS}
+    gltf = {
+        "asset": {"version": "2.0", "generator": "CorbeauSplat"},
+        "scene": 0,
+        "scenes": [{"nodes": [0]}],
+        "nodes": [{"mesh": 0, "name": "PointCloud"}],
+        "meshes": [{"primitives": [primitive]}],
+        "buffers": [{"byteLength": n * stride}],
+        "bufferViews": [{
+            "buffer": 0,
+            "byteOffset": 0,
+            "byteLength": n * stride,
+            "byteStride": stride,
+            "target": _ARRAY_BUFFER,
+        }],
+        "accessors": accessors,
+    }
+    if gaussian:
+        prefix = KHR_GAUSSIAN_SPLATTING + ":"
+        add(prefix + "SCALE", "scale", _FLOAT, "VEC3")
+        add(prefix + "ROTATION", "rotation", _FLOAT, "VEC4")
+        add(prefix + "OPACITY", "opacity", _FLOAT, "SCALAR")
+        add(prefix + "SH_DEGREE_0_COEF_0", "sh_dc", _FLOAT, "VEC3")
+        primitive["extensions"] = {KHR_GAUSSIAN_SPLATTING: {"kernel": "ellipse"}}
+        gltf["extensionsUsed"] = [KHR_GAUSSIAN_SPLATTING]
+    return gltf
+
+
+def write_glb(path, vertex, gaussian=None, chunk_size=_WRITE_CHUNK):
+    """Write ``vertex`` (structured array with x/y/z) as a .glb point cloud.
+
+    ``gaussian`` forces the KHR_gaussian_splatting attributes on/off; by
+    default they are written when the 3DGS fields are present.
+    Returns the number of bytes written. Raises ValueError when the array has
+    no x/y/z or the cloud is empty (glTF accessors need count >= 1).
+    """
+    names = set(vertex.dtype.names or ())
+    if not {"x", "y", "z"} <= names:
+        raise ValueError("Le PLY doit contenir les propriétés x, y, z.")
+    n = len(vertex)
+    if n == 0:
+        raise ValueError("Nuage de points vide : rien à exporter en GLB.")
+    if gaussian is None:
+        gaussian = has_gaussian_fields(vertex)
+    elif gaussian and not has_gaussian_fields(vertex):
+        raise ValueError("Attributs Gaussian Splat absents du PLY.")
+
+    dtype = _record_dtype(gaussian)
+    pos_min, pos_max = _position_bounds(vertex, n)
+    gltf = _build_gltf(n, dtype, gaussian, pos_min, pos_max)
+
+    json_bytes = json.dumps(gltf, separators=(",", ":")).encode("utf-8")
+    json_bytes += b" " * (-len(json_bytes) % 4)
+    bin_length = n * dtype.itemsize
+    bin_padding = -bin_length % 4
+    total = 12 + 8 + len(json_bytes) + 8 + bin_length + bin_padding
+
+    with open(path, "wb") as f:
+        f.write(struct.pack("<III", _GLB_MAGIC, 2, total))
+        f.write(struct.pack("<II", len(json_bytes), _CHUNK_JSON))
+        f.write(json_bytes)
+        f.write(struct.pack("<II", bin_length + bin_padding, _CHUNK_BIN))
+        rec = np.zeros(min(chunk_size, n), dtype=dtype)
+        for start in range(0, n, chunk_size):
+            part = vertex[start:start + chunk_size]
+            out = rec[:len(part)]
+            _fill_records(out, part, gaussian)
+            f.write(out.view(np.uint8))
+        f.write(b"\0" * bin_padding)
+    return total
@@ -0,0 +1,164 @@
+"""
+image_dedupe.py — Détection des quasi-doublons (rafales, frames identiques).
+
+Chaque image reçoit un hash perceptuel de 64 bits (dHash : signe du gradient
+horizontal sur une vignette 9×8) calculé sur un décodage réduit, ainsi qu'un
+score de netteté (variance du Laplacien) sur ce même décodage. Les hashes
+sont indexés dans un BK-tree (distance de Hamming) ; un groupe réunit une
+image « pivot » et toutes les images non encore groupées à au plus
+``max_distance`` bits d'elle. Le pivot n'étant comparé qu'à ses voisins
+directs, un lent panoramique ne s'effondre pas en un seul groupe (diamètre
+d'un groupe ≤ 2 × ``max_distance``). Dans chaque groupe, l'image la plus
+nette est conservée.
+"""
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+# Distance de Hamming par défaut (sur 64 bits) sous laquelle deux images sont
+# des quasi-doublons : rafales et frames figées, pas deux vues voisines.
+DEFAULT_MAX_DISTANCE = 6
+
+_REDUCED_GRAYSCALE_FLAGS = {
+    2: "IMREAD_REDUCED_GRAYSCALE_2",
+    4: "IMREAD_REDUCED_GRAYSCALE_4",
+    8: "IMREAD_REDUCED_GRAYSCALE_8",
+}
+
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+def dhash_array(gray) -> int:
+    """dHash 64 bits d'une image en niveaux de gris (tableau 2D)."""
+    import cv2
+    import numpy as np
+    thumb = cv2.resize(gray, (9, 8), interpolation=cv2.INTER_AREA)
+    bits = thumb[:, 1:] > thumb[:, :-1]
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def image_signature(path, downscale: int = 4) -> tuple[int, float] | None:
+    """(dHash, netteté) d'une image décodée à 1/``downscale`` ; None si illisible."""
+    import cv2
+    flag = getattr(cv2, _REDUCED_GRAYSCALE_FLAGS.get(downscale, "IMREAD_GRAYSCALE"))
+    gray = cv2.imread(str(path), flag)
+    if gray is None:
+        return None
+    _, std = cv2.meanStdDev(cv2.Laplacian(gray, cv2.CV_32F))
+    return dhash_array(gray), float(std[0, 0]) ** 2
+
+
+class BKTree:
+    """BK-tree sur la distance de Hamming entre hashes entiers.
+
+    ``search(h, r)`` ne visite que les sous-arbres dont l'arête ``d`` vérifie
+    ``|d - dist(h, nœud)| <= r`` (inégalité triangulaire).
+    """
+
+    def __init__(self):
+        self._root = None  # [hash, items, {distance: enfant}]
+        self.size = 0
+
+    def add(self, value: int, item) -> None:
+        self.size += 1
+        if self._root is None:
+            self._root = [value, [item], {}]
+            return
+        node = self._root
+        while True:
+            d = hamming(value, node[0])
+            if d == 0:
+                node[1].append(item)
+                return
+            child = node[2].get(d)
+            if child is None:
+                node[2][d] = [value, [item], {}]
+                return
+            node = child
+
+    def search(self, value: int, radius: int) -> list[tuple[int, object]]:
+        """Éléments à distance <= ``radius`` de ``value`` : [(distance, item)]."""
+        found = []
+        stack = [self._root] if self._root is not None else []
+        while stack:
+            node = stack.pop()
+            d = hamming(value, node[0])
+            if d <= radius:
+                found.extend((d, item) for item in node[1])
+            for edge, child in node[2].items():
+                if d - radius <= edge <= d + radius:
+                    stack.append(child)
+        return found
+
+
+@dataclass
+class DuplicateGroup:
+    kept: str
+    removed: list[str] = field(default_factory=list)
+    distances: list[int] = field(default_factory=list)
+
+    def to_dict(self):
+        return {
+            "kept": self.kept,
+            "removed": [{"path": p, "distance": d} for p, d in zip(self.removed, self.distances, strict=True)],
+        }
+
+
+def compute_signatures(files, downscale: int = 4, workers: int | None = None,
+                       is_cancelled: Callable | None = None) -> dict:
+    """Signatures ``{str(path): (hash, netteté)}`` calculées dans un pool de threads.
+
+    Les images illisibles sont omises ; le résultat est partiel en cas
+    d'annulation.
+    """
+    def signature(f):
+        if is_cancelled and is_cancelled():
+            return f, None
+        return f, image_signature(f, downscale)
+
+    signatures = {}
+    with ThreadPoolExecutor(max_workers=max(1, workers or 1)) as pool:
+        for f, sig in pool.map(signature, files):
+            if sig is not None:
+                signatures[str(f)] = sig
+    return signatures
+
+
+def group_near_duplicates(signatures: dict, max_distance: int = DEFAULT_MAX_DISTANCE) -> list[DuplicateGroup]:
+    """Groupes de quasi-doublons (au moins deux images) dans ``signatures``.
+
+    Les pivots sont pris dans l'ordre des chemins ; chaque groupe conserve
+    l'image la plus nette (à égalité, le premier chemin).
+    """
+    tree = BKTree()
+    for path, (value, _) in signatures.items():
+        tree.add(value, path)
+
+    assigned = set()
+    groups = []
+    for path in sorted(signatures):
+        if path in assigned:
+            continue
+        value = signatures[path][0]
+        members = {p: d for d, p in tree.search(value, max_distance) if p not in assigned}
+        assigned.update(members)
+        if len(members) < 2:
+            continue
+        kept = max(sorted(members), key=lambda p: signatures[p][1])
+        removed = sorted(p for p in members if p != kept)
+        groups.append(DuplicateGroup(
+            kept, removed, [hamming(signatures[p][0], signatures[kept][0]) for p in removed],
+        ))
+    return groups
+
+
+def find_near_duplicates(files, max_distance: int = DEFAULT_MAX_DISTANCE, downscale: int = 4,
+                         workers: int | None = None, is_cancelled: Callable | None = None) -> list[DuplicateGroup]:
+    """Hash + regroupement de ``files`` ; voir ``group_near_duplicates``."""
+    signatures = compute_signatures([Path(f) for f in files], downscale, workers, is_cancelled)
+    if is_cancelled and is_cancelled():
+        return []
+    return group_near_duplicates(signatures, max_distance)
@@ -0,0 +1,244 @@
+"""
+ingest.py — Import des images sources dans le dossier de travail.
+
+Trois étapes, toutes sans appel ``stat`` superflu :
+
+  1. ``scan_image_files`` parcourt les dossiers avec ``os.scandir`` (type et
+     taille viennent de l'entrée de répertoire) ;
+  2. ``plan_ingest`` écarte les fichiers identiques octet pour octet (hash
+     BLAKE2 calculé seulement pour les tailles en collision) et calcule en
+     une passe le nom cible de chaque fichier (même règle de collision que
+     l'import historique : ``<dossier parent>_<n>_<nom>``) ;
+  3. ``ingest_files`` matérialise le plan dans un pool de threads, par
+     reflink (APFS ``clonefile`` / Linux ``FICLONE``), lien physique si
+     demandé, sinon copie.
+
+Les liens physiques partagent l'inode avec la source : le moteur ne réécrit
+jamais une image sur place (écriture dans un fichier temporaire puis
+``os.replace``), mais ils restent opt-in (``mode="link"``).
+"""
+import hashlib
+import os
+import shutil
+import sys
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+IMAGE_EXTS = {'.jpg', '.jpeg', '.png'}
+INGEST_MODES = ("auto", "link", "copy")
+
+_HASH_CHUNK = 1 << 20
+
+# macOS 10.13+ APFS supports instant file clones via clonefile(2).
+# On APFS volumes, clonefile creates a copy-on-write reflink — near-instant
+# regardless of file size, with no additional disk space until the copy is
+# modified.  Fall back to shutil.copy2 on non-APFS or non-macOS systems.
+_CLONEFILE_FUNC = None
+
+if sys.platform == "darwin":
+    try:
+        import ctypes
+        _libc = ctypes.CDLL("libSystem.B.dylib", use_errno=True)
+        _clonefile: Any = _libc.clonefile
+        _clonefile.argtypes = [ctypes.c_char_p, ctypes.c_char_p, ctypes.c_int]
+        _clonefile.restype = ctypes.c_int
+    except (AttributeError, OSError):
+        pass
+    else:
+        _CLONEFILE_FUNC = _clonefile
+
+# Linux : ioctl FICLONE (Btrfs, XFS reflink=1, bcachefs…), _IOW(0x94, 9, int).
+_FICLONE = 0x40049409 if sys.platform.startswith("linux") else None
+
+
+def is_image_name(name: str) -> bool:
+    """Nom d'image importable (ni fichier caché / AppleDouble, ni masque)."""
+    return (
+        not name.startswith(".")
+        and os.path.splitext(name)[1].lower() in IMAGE_EXTS
+        and not name.lower().endswith('.mask.png')
+    )
+
+
+def scan_image_files(root) -> list[tuple[Path, int]]:
+    """Images sous ``root`` (récursif) : [(chemin, taille)], par nom à chaque niveau.
+
+    Les liens symboliques vers des fichiers sont suivis, pas ceux vers des
+    dossiers (pas de cycle possible).
+    """
+    found = []
+    stack = [os.fspath(root)]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError:
+            continue
+        subdirs = []
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+                elif is_image_name(entry.name) and entry.is_file():
+                    found.append((Path(entry.path), entry.stat().st_size))
+            except OSError:
+                continue
+        stack.extend(reversed(subdirs))
+    return found
+
+
+def file_digest(path) -> str:
+    """Empreinte BLAKE2b (128 bits) du contenu de ``path``."""
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        while chunk := f.read(_HASH_CHUNK):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+@dataclass
+class IngestPlan:
+    """Fichiers à importer (source → cible) et doublons exacts écartés."""
+    targets: list[tuple[Path, Path]] = field(default_factory=list)
+    duplicates: list[tuple[Path, Path]] = field(default_factory=list)  # (doublon, original gardé)
+
+
+def find_identical(files: list[tuple[Path, int]], workers: int = 1,
+                   is_cancelled: Callable | None = None) -> dict[Path, Path]:
+    """Doublons exacts ``{doublon: premier fichier identique}``.
+
+    Seuls les fichiers partageant une taille avec un autre sont hashés.
+    """
+    by_size: dict[int, list[Path]] = {}
+    for path, size in files:
+        by_size.setdefault(size, []).append(path)
+    candidates = [p for group in by_size.values() if len(group) > 1 for p in group]
+    if not candidates:
+        return {}
+
+    def digest(path):
+        if is_cancelled and is_cancelled():
+            return path, None
+        try:
+            return path, file_digest(path)
+        except OSError:
+            return path, None
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        digests = dict(pool.map(digest, candidates))
+
+    first: dict[tuple[int, str], Path] = {}
+    duplicates = {}
+    for path, size in files:
+        d = digests.get(path)
+        if d is None:
+            continue
+        original = first.setdefault((size, d), path)
+        if original is not path:
+            duplicates[path] = original
+    return duplicates
+
+
+def plan_ingest(files: list[tuple[Path, int]], images_dir: Path, skip_identical: bool = True,
+                workers: int = 1, is_cancelled: Callable | None = None) -> IngestPlan:
+    """Calcule en une passe la cible de chaque fichier dans ``images_dir``.
+
+    Un nom déjà pris (présent dans ``images_dir`` ou attribué plus tôt) devient
+    ``<dossier parent>_<n>_<nom>`` avec le plus petit ``n`` libre.
+    """
+    plan = IngestPlan()
+    duplicates = find_identical(files, workers, is_cancelled) if skip_identical else {}
+    try:
+        with os.scandir(images_dir) as it:
+            taken = {entry.name for entry in it}
+    except FileNotFoundError:
+        taken = set()
+    for path, _ in files:
+        if path in duplicates:
+            plan.duplicates.append((path, duplicates[path]))
+            continue
+        name = path.name
+        if name in taken:
+            counter = 1
+            while f"{path.parent.name}_{counter}_{path.name}" in taken:
+                counter += 1
+            name = f"{path.parent.name}_{counter}_{path.name}"
+        taken.add(name)
+        plan.targets.append((path, images_dir / name))
+    return plan
+
+
+def reflink(src, dst) -> None:
+    """Clone copy-on-write de ``src`` vers ``dst`` ; OSError si non supporté."""
+    if _CLONEFILE_FUNC is not None:
+        if _CLONEFILE_FUNC(os.fsencode(src), os.fsencode(dst), 0) != 0:
+            import ctypes
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err), str(src))
+        return
+    if _FICLONE is None:
+        raise OSError(f"reflink non supporté sur {sys.platform}")
+    import fcntl
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        try:
+            fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+        except OSError:
+            fdst.close()
+            os.unlink(dst)
+            raise
+
+
+def clone_or_copy(src, dst, mode: str = "auto") -> str:
+    """Matérialise ``dst`` depuis ``src`` ; retourne la méthode utilisée.
+
+    ``auto`` : reflink puis copie ; ``link`` : lien physique, puis reflink,
+    puis copie ; ``copy`` : copie (``shutil.copy2``). Les métadonnées
+    (dates, permissions) sont préservées.
+    """
+    if mode == "link":
+        try:
+            os.link(src, dst)
+            return "link"
+        except OSError:
+            pass
+    if mode in ("auto", "link"):
+        try:
+            reflink(src, dst)
+            shutil.copystat(src, dst)
+            return "reflink"
+        except OSError:
+            # Autre volume, système de fichiers sans reflink… → copie.
+            pass
+    shutil.copy2(src, dst)
+    return "copy"
+
+
+def ingest_files(targets: list[tuple[Path, Path]], mode: str = "auto", workers: int = 4,
+                 is_cancelled: Callable | None = None,
+                 on_progress: Callable[[int, int], None] | None = None) -> dict[str, int]:
+    """Exécute le plan dans un pool de threads ; retourne le compte par méthode.
+
+    ``on_progress(done, total)`` est appelé depuis le thread appelant. En cas
+    d'annulation, les fichiers non encore commencés sont ignorés.
+    """
+    if mode not in INGEST_MODES:
+        raise ValueError(f"Mode d'import inconnu: {mode!r} (attendu: {', '.join(INGEST_MODES)})")
+    counts = {"link": 0, "reflink": 0, "copy": 0}
+    total = len(targets)
+
+    def run(pair):
+        if is_cancelled and is_cancelled():
+            return None
+        return clone_or_copy(pair[0], pair[1], mode)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        for done, method in enumerate(pool.map(run, targets), start=1):
+            if method is not None:
+                counts[method] += 1
+            if on_progress:
+                on_progress(done, total)
+    return counts
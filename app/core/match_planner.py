@@ -0,0 +1,220 @@
+"""
+match_planner.py — Choix automatique de la stratégie de matching COLMAP.
+
+``matcher_type="auto"`` remplace le choix manuel (exhaustif / séquentiel /
+vocab tree) par un plan calculé après l'extraction des features :
+
+  1. peu d'images (≤ ``EXHAUSTIVE_MAX_IMAGES``) → matching exhaustif ;
+  2. noms formant une séquence (``frame_0001``, ``IMG_1234``…, voir
+     ``sequence_score``) → matcher séquentiel, avec un ``overlap`` estimé
+     sur la distance (en frames) à laquelle deux vues se ressemblent encore ;
+  3. sinon → liste de paires (``matches_importer``) : chaque image est
+     appariée à ses ``PAIRS_PER_IMAGE`` plus proches voisines selon un
+     descripteur global calculé sur une vignette (décodage réduit) ;
+  4. sans OpenCV pour les vignettes → vocab tree (SIFT) ou exhaustif.
+
+Le descripteur global concatène une mini-image 8×8 centrée-normée et un
+histogramme d'orientations de gradient sur une grille 4×4 (façon GIST) :
+grossier, mais suffisant pour écarter les paires sans recouvrement.
+"""
+import os
+import re
+from collections.abc import Callable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+
+# En dessous, l'exhaustif reste rapide (≤ ~31k paires) et le plus sûr.
+EXHAUSTIVE_MAX_IMAGES = 250
+# Part minimale de voisins consécutifs (même préfixe, pas constant) pour
+# considérer le jeu comme une séquence.
+SEQUENCE_MIN_SCORE = 0.9
+# Voisins retenus par image pour la liste de paires.
+PAIRS_PER_IMAGE = 25
+# Bornes de l'overlap séquentiel estimé.
+MIN_SEQUENTIAL_OVERLAP = 5
+MAX_SEQUENTIAL_OVERLAP = 60
+
+_THUMB_SIZE = 32
+_GRID = 4
+_ORIENTATION_BINS = 8
+_NUMBERED_NAME = re.compile(r"^(.*?)(\d+)\D*$")
+
+
+@dataclass
+class MatchPlan:
+    """Stratégie retenue : ``matcher`` parmi exhaustive, sequential,
+    vocab_tree ou pairs (liste ``pairs`` de noms d'images)."""
+    matcher: str
+    reason: str
+    overlap: int | None = None
+    pairs: list[tuple[str, str]] = field(default_factory=list)
+
+
+def sequence_score(names: Sequence[str]) -> float:
+    """Part des images suivies (dans l'ordre des noms) de leur successeur
+    numérique : même dossier et préfixe, index augmenté du pas dominant."""
+    keyed = []
+    for name in names:
+        directory, base = os.path.split(name)
+        match = _NUMBERED_NAME.match(os.path.splitext(base)[0])
+        if match:
+            keyed.append(((directory, match.group(1)), int(match.group(2))))
+    if len(keyed) < 2:
+        return 0.0
+    keyed.sort()
+    steps = [b[1] - a[1] for a, b in zip(keyed, keyed[1:], strict=False) if a[0] == b[0]]
+    if not steps:
+        return 0.0
+    values, counts = np.unique(steps, return_counts=True)
+    step = values[np.argmax(counts)]
+    if step <= 0:
+        return 0.0
+    return float(np.count_nonzero(np.asarray(steps) == step)) / (len(names) - 1)
+
+
+def global_descriptor(gray) -> np.ndarray:
+    """Descripteur global L2-normé d'une image en niveaux de gris."""
+    import cv2
+    thumb = cv2.resize(gray, (_THUMB_SIZE, _THUMB_SIZE), interpolation=cv2.INTER_AREA).astype(np.float32)
+
+    tiny = cv2.resize(thumb, (8, 8), interpolation=cv2.INTER_AREA).ravel()
+    tiny -= tiny.mean()
+    tiny /= np.linalg.norm(tiny) or 1.0
+
+    gx = cv2.Sobel(thumb, cv2.CV_32F, 1, 0)
+    gy = cv2.Sobel(thumb, cv2.CV_32F, 0, 1)
+    magnitude, angle = cv2.cartToPolar(gx, gy)
+    # Orientations non signées (mod π) : robustes aux inversions de contraste.
+    bins = (angle * (_ORIENTATION_BINS / np.pi)).astype(np.int64) % _ORIENTATION_BINS
+    cells = np.arange(_THUMB_SIZE) * _GRID // _THUMB_SIZE
+    hist = np.zeros((_GRID, _GRID, _ORIENTATION_BINS), dtype=np.float32)
+    np.add.at(hist, (cells[:, None], cells[None, :], bins), magnitude)
+    hist = np.sqrt(hist.ravel())
+    hist /= np.linalg.norm(hist) or 1.0
+
+    descriptor = np.concatenate([tiny, hist])
+    return descriptor / np.sqrt(2.0)
+
+
+def compute_descriptors(paths: Sequence[Path], workers: int = 1,
+                        is_cancelled: Callable | None = None) -> np.ndarray | None:
+    """Descripteurs globaux (N, D) ; une ligne nulle par image illisible.
+
+    None si OpenCV est absent ou en cas d'annulation.
+    """
+    try:
+        import cv2
+    except ImportError:
+        return None
+
+    def describe(path):
+        if is_cancelled and is_cancelled():
+            return None
+        gray = cv2.imread(str(path), cv2.IMREAD_REDUCED_GRAYSCALE_8)
+        return global_descriptor(gray) if gray is not None else None
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        rows = list(pool.map(describe, paths))
+    if is_cancelled and is_cancelled():
+        return None
+    dim = next((len(r) for r in rows if r is not None), 0)
+    out = np.zeros((len(rows), dim), dtype=np.float32)
+    for i, row in enumerate(rows):
+        if row is not None:
+            out[i] = row
+    return out
+
+
+def nearest_pairs(descriptors: np.ndarray, k: int, chunk: int = 1024) -> set[tuple[int, int]]:
+    """Paires (i < j) où j est parmi les ``k`` plus proches voisins de i (ou
+    l'inverse), par similarité cosinus, calculée par blocs de lignes."""
+    n = len(descriptors)
+    k = min(k, n - 1)
+    pairs: set[tuple[int, int]] = set()
+    if k <= 0:
+        return pairs
+    for start in range(0, n, chunk):
+        sims = descriptors[start:start + chunk] @ descriptors.T
+        rows = np.arange(sims.shape[0])
+        sims[rows, start + rows] = -np.inf
+        neighbours = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+        for i, row in zip(range(start, start + sims.shape[0]), neighbours.tolist(), strict=True):
+            pairs.update((min(i, j), max(i, j)) for j in row)
+    return pairs
+
+
+def estimate_overlap(descriptors: np.ndarray, max_lag: int = MAX_SEQUENTIAL_OVERLAP) -> int:
+    """Overlap séquentiel : distance (en frames) au-delà de laquelle deux
+    vues ne se ressemblent pas plus que deux vues quelconques.
+
+    Le seuil est à mi-chemin entre la similarité des voisines immédiates et
+    celle de paires tirées au hasard ; pour chaque frame, on compte les
+    décalages consécutifs (1, 2, …) restant au-dessus du seuil, et l'overlap
+    est le 75e centile de ce compte sur la séquence.
+    """
+    n = len(descriptors)
+    if n < 3:
+        return MIN_SEQUENTIAL_OVERLAP
+    max_lag = min(max_lag, n - 1)
+    lags = np.stack([
+        np.pad(np.einsum("ij,ij->i", descriptors[:n - lag], descriptors[lag:]), (0, lag),
+               constant_values=-np.inf)
+        for lag in range(1, max_lag + 1)
+    ], axis=1)  # (n, max_lag) : similarité de i avec i + lag
+    rng = np.random.default_rng(0)
+    a, b = rng.integers(0, n, size=(2, min(4096, n * 4)))
+    baseline = float(np.median(np.einsum("ij,ij->i", descriptors[a], descriptors[b])))
+    adjacent = float(np.median(lags[:n - 1, 0]))
+    threshold = (baseline + adjacent) / 2
+    above = lags >= threshold
+    # Premier décalage sous le seuil, moins un (max_lag si aucun) : une
+    # ressemblance isolée à grande distance ne rallonge pas l'overlap.
+    span = np.where(above.all(axis=1), max_lag, np.argmin(above, axis=1))
+    overlap = int(np.ceil(np.percentile(span[:n - 1], 75)))
+    return int(np.clip(overlap, MIN_SEQUENTIAL_OVERLAP, MAX_SEQUENTIAL_OVERLAP))
+
+
+def plan_matching(names: Sequence[str], images_dir, feature_type: str = "SIFT",
+                  workers: int = 1, is_cancelled: Callable | None = None) -> MatchPlan:
+    """Choisit la stratégie de matching pour les images ``names`` (chemins
+    relatifs à ``images_dir``, ordre quelconque)."""
+    names = sorted(names)
+    n = len(names)
+    if n <= EXHAUSTIVE_MAX_IMAGES:
+        return MatchPlan("exhaustive", f"{n} images ≤ {EXHAUSTIVE_MAX_IMAGES}")
+
+    sequential = sequence_score(names) >= SEQUENCE_MIN_SCORE
+    descriptors = compute_descriptors([Path(images_dir) / name for name in names], workers, is_cancelled)
+    if descriptors is None:
+        if sequential:
+            return MatchPlan("sequential", "noms en séquence (overlap par défaut)")
+        if feature_type == "SIFT":
+            return MatchPlan("vocab_tree", f"{n} images non ordonnées, vignettes indisponibles")
+        return MatchPlan("exhaustive", f"{n} images non ordonnées, vignettes indisponibles")
+
+    if sequential:
+        overlap = estimate_overlap(descriptors)
+        return MatchPlan("sequential", f"noms en séquence, overlap estimé {overlap}", overlap=overlap)
+
+    if any(" " in name for name in names):
+        # Le format de paires de COLMAP sépare les noms par une espace.
+        matcher = "vocab_tree" if feature_type == "SIFT" else "exhaustive"
+        return MatchPlan(matcher, f"{n} images non ordonnées, noms avec espaces")
+
+    index_pairs = nearest_pairs(descriptors, PAIRS_PER_IMAGE)
+    pairs = [(names[i], names[j]) for i, j in sorted(index_pairs)]
+    return MatchPlan(
+        "pairs",
+        f"{n} images non ordonnées : {len(pairs)} paires ({PAIRS_PER_IMAGE} voisines par image)",
+        pairs=pairs,
+    )
+
+
+def write_pairs(pairs: Sequence[tuple[str, str]], path) -> Path:
+    """Écrit la liste de paires au format ``matches_importer`` (``--match_type pairs``)."""
+    path = Path(path)
+    path.write_text("".join(f"{a} {b}\n" for a, b in pairs), encoding="utf-8")
+    return path
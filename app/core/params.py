@@ -36,13 +36,54 @@ class ColmapParams:
     ba_refine_principal_point: bool = False
     ba_refine_extra_params: bool = True
     min_num_matches: int = 15
-    matcher_type: str = 'exhaustive' # exhaustive, sequential, vocab_tree
+    matcher_type: str = 'exhaustive' # exhaustive, sequential, vocab_tree, auto (voir match_planner)
     sequential_overlap: int = 30
     undistort_images: bool = False
     # Blur filtering: discard frames whose sharpness (variance of Laplacian) falls
     # below blur_factor x the median sharpness. 0 (or filter_blurry=False) disables.
     filter_blurry: bool = False
     blur_factor: float = 0.7
+    # Décodage réduit pour le score de netteté (1 = pleine résolution, 2/4/8 =
+    # IMREAD_REDUCED_GRAYSCALE_N). Opt-in : le seuil étant relatif à la
+    # médiane, les images rejetées ne restent les mêmes que si le flou
+    # dépasse ~N pixels.
+    blur_downscale: int = 1
+    # Vidéo : score de netteté calculé en flux pendant l'extraction FFmpeg,
+    # contre la médiane glissante des N dernières frames (seules les frames
+    # nettes sont écrites, encodées par OpenCV et non par FFmpeg). Opt-in :
+    # 0 = extraction complète puis filtrage global.
+    blur_stream_window: int = 0
+    # Vidéo : sélection de keyframes par mouvement de caméra (flux optique).
+    # keyframe_budget = nombre total de frames visé (0 = échantillonnage fixe
+    # à fps) ; les candidates sont échantillonnées à keyframe_fps.
+    keyframe_budget: int = 0
+    keyframe_fps: float = 10.0
+    # Dossiers d'images : écarte les quasi-doublons (rafales) avant la copie,
+    # par dHash à dedupe_distance bits près ; la plus nette de chaque groupe reste.
+    dedupe_images: bool = False
+    dedupe_distance: int = 6
+    # Import des images : "auto" (reflink sinon copie), "link" (liens physiques
+    # d'abord — même volume, sources partagées) ou "copy".
+    ingest_mode: str = 'auto'
+    # Conserve les bases COLMAP après extraction et matching (colmap_cache/) :
+    # changer seulement le matcher ou le mapper ne refait pas l'extraction.
+    # Opt-in : sans reflink, chaque entrée est une copie complète de
+    # database.db (jusqu'à 4 copies, plusieurs Go sur les grands jeux).
+    stage_cache: bool = False
+    # Après le mapper : le sous-modèle le plus complet devient sparse/0. Avec
+    # merge_submodels, les sous-modèles partageant des images sont d'abord
+    # fusionnés (colmap model_merger) quand la fusion enregistre plus d'images.
+    merge_submodels: bool = False
+    # Reconstruction partitionnée des grands jeux : "off", "auto" (au-delà de
+    # partition_size images), "sequential" (tranches dans l'ordre des noms) ou
+    # "graph" (clusters du graphe des correspondances). Les clusters, étendus
+    # de partition_overlap images communes (au moins 3, minimum requis par
+    # model_merger), sont reconstruits en parallèle
+    # (partition_workers mappers, 0 = selon le nombre de threads) puis fusionnés.
+    partition_mode: str = 'off'
+    partition_size: int = 500
+    partition_overlap: int = 50
+    partition_workers: int = 0
     thermal_throttling: bool = False
     # View graph calibration estimates focal lengths from two-view geometries.
     # Recommended before global_mapper, especially for AI-generated content.
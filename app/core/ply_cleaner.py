@@ -4,80 +4,399 @@ ply_cleaner.py — Nettoyage automatique de fichiers .ply Gaussian Splat.
 Retire les artefacts courants produits par la photogrammétrie splatting :
   - Splats quasi-transparents (faible opacité → bruit),
   - Splats surdimensionnés (gaussiennes géantes, ex. "coquilles" de ciel),
-  - Outliers spatiaux / floaters loin du nuage principal.
+  - Outliers spatiaux / floaters loin du nuage principal, ou isolés (densité
+    k plus proches voisins, mode "knn").
 
 La géométrie et la couleur des splats conservés sont préservées exactement —
 nous supprimons uniquement des splats entiers, sans jamais altérer les survivants.
 Le fichier original n'est jamais modifié sur place.
 """
+import math
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
 from pathlib import Path
 
 import numpy as np
 
 from .base_engine import validate_path_standalone as _validate_path
+from .ply_utils import DEFAULT_WRITE_CHUNK, parse_ply_header, read_ply_vertices, write_ply_vertices
+from .quantiles import DEFAULT_RELATIVE_ACCURACY, QuantileSketch
+from .system import get_memory_info, get_optimal_threads
 
 # Presets de sévérité → (opacity_min sur l'alpha activé, percentile d'échelle, percentile d'outlier)
 # Percentile plus élevé = garde plus (plus doux) ; plus bas = supprime plus (plus fort).
+# outlier_mode : "median" (distance au centre robuste, filtré par outlier_pct) ou
+# "knn" (densité locale : distance moyenne aux knn_k plus proches voisins,
+# rejetée au-delà de knn_sigma écarts robustes).
 PRESETS = {
-    "light":  {"opacity_min": 0.05, "scale_pct": 99.9, "outlier_pct": 99.9},
-    "medium": {"opacity_min": 0.10, "scale_pct": 99.5, "outlier_pct": 99.5},
-    "strong": {"opacity_min": 0.20, "scale_pct": 99.0, "outlier_pct": 99.0},
+    "light":  {"opacity_min": 0.05, "scale_pct": 99.9, "outlier_pct": 99.9,
+               "outlier_mode": "median", "knn_k": 8, "knn_sigma": 4.0},
+    "medium": {"opacity_min": 0.10, "scale_pct": 99.5, "outlier_pct": 99.5,
+               "outlier_mode": "median", "knn_k": 8, "knn_sigma": 3.0},
+    "strong": {"opacity_min": 0.20, "scale_pct": 99.0, "outlier_pct": 99.0,
+               "outlier_mode": "median", "knn_k": 8, "knn_sigma": 2.5},
 }
 
+OUTLIER_MODES = ("median", "knn")
+
+# Points par bloc pour les requêtes k-NN (threads).
+_KNN_CHUNK = 1 << 16
+# Bits par axe de la clé de voxel (3 × 21 = 63 bits).
+_VOXEL_BITS = 21
+# Splats par bloc du mode basse mémoire (tampons float32 réutilisés).
+_MASK_CHUNK = 1 << 20
+# Splats par bloc du mode en flux (temporaires float64 ~15 Mo par bloc).
+_STREAM_CHUNK = 1 << 18
+
 
 def _sigmoid(x):
     return 1.0 / (1.0 + np.exp(-x))
 
 
+def _kdtree_knn_distance(points, k, workers):
+    """Distance moyenne aux k plus proches voisins (hors soi-même), exacte via
+    scipy.spatial.cKDTree, requêtes réparties par blocs sur un pool de threads."""
+    from scipy.spatial import cKDTree
+
+    tree = cKDTree(points)
+    n = len(points)
+
+    def query(start):
+        d, _ = tree.query(points[start:start + _KNN_CHUNK], k=k + 1, workers=1)
+        return d[:, 1:].mean(axis=1)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        parts = list(pool.map(query, range(0, n, _KNN_CHUNK)))
+    return np.concatenate(parts)
+
+
+def _voxel_knn_distance(points, k, workers):
+    """Estimation de la distance k-NN moyenne par hachage voxel (sans scipy).
+
+    La taille de voxel est choisie pour ~k points par cellule sur la boîte
+    robuste (1er–99e percentile). Le nombre de points dans les 27 cellules
+    voisines donne une densité locale ρ, et la distance retournée est le rayon
+    de la boule contenant k points à cette densité.
+    """
+    n = len(points)
+    q_lo, q_hi = np.percentile(points, [1.0, 99.0], axis=0)
+    extent = np.maximum(q_hi - q_lo, 1e-9)
+    h = float(np.cbrt(np.prod(extent) * k / n))
+    if not np.isfinite(h) or h <= 0:
+        h = 1.0
+
+    max_cell = (1 << _VOXEL_BITS) - 2
+    center = np.floor(np.median(points, axis=0) / h)
+    cells = np.floor(points / h) - center + (1 << (_VOXEL_BITS - 1))
+    cells = np.clip(cells, 1, max_cell - 1).astype(np.int64)
+    keys = (cells[:, 0] << (2 * _VOXEL_BITS)) | (cells[:, 1] << _VOXEL_BITS) | cells[:, 2]
+    uniq, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+
+    offsets = [
+        (dx << (2 * _VOXEL_BITS)) + (dy << _VOXEL_BITS) + dz
+        for dx in (-1, 0, 1) for dy in (-1, 0, 1) for dz in (-1, 0, 1)
+    ]
+    m = len(uniq)
+    neighbours = np.zeros(m, dtype=np.int64)
+
+    def count_block(start):
+        block = uniq[start:start + _KNN_CHUNK]
+        total = np.zeros(len(block), dtype=np.int64)
+        for off in offsets:
+            target = block + off
+            idx = np.searchsorted(uniq, target)
+            idx_c = np.minimum(idx, m - 1)
+            total += np.where(uniq[idx_c] == target, counts[idx_c], 0)
+        neighbours[start:start + len(block)] = total
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(count_block, range(0, m, _KNN_CHUNK)))
+
+    others = np.maximum(neighbours[inverse] - 1, 0.5)  # sans le point lui-même
+    density = others / (27.0 * h ** 3)
+    return np.cbrt(3.0 * k / (4.0 * np.pi * density))
+
+
+def knn_distance(x, y, z, k=8, workers=None):
+    """Distance moyenne de chaque splat à ses k plus proches voisins.
+
+    Utilise scipy.spatial.cKDTree si disponible, sinon une estimation par
+    voxels. Retourne des zéros si le nuage compte k points ou moins.
+    """
+    points = np.column_stack([
+        np.asarray(x, dtype=np.float64),
+        np.asarray(y, dtype=np.float64),
+        np.asarray(z, dtype=np.float64),
+    ])
+    n = len(points)
+    k = max(1, int(k))
+    if n <= k:
+        return np.zeros(n)
+    workers = workers or get_optimal_threads()
+    try:
+        return _kdtree_knn_distance(points, k, workers)
+    except ImportError:
+        return _voxel_knn_distance(points, k, workers)
+
+
+def knn_keep_mask(dist, sigma=3.0):
+    """Garde les splats dont log(distance k-NN) reste sous médiane + ``sigma``
+    × MAD (×1.4826). Tout est gardé si la dispersion est nulle."""
+    score = np.log(np.maximum(dist, 1e-12))
+    if len(score) == 0:
+        return np.ones(0, dtype=bool)
+    med = np.median(score)
+    mad = 1.4826 * np.median(np.abs(score - med))
+    if mad <= 0:
+        return np.ones(len(score), dtype=bool)
+    return (score - med) <= sigma * mad
+
+
+def knn_outlier_mask(x, y, z, k=8, sigma=3.0, workers=None):
+    """Masque des splats dont la densité locale n'est pas anormalement faible
+    (voir ``knn_distance`` et ``knn_keep_mask``). Retourne (keep_mask, knn_distance)."""
+    dist = knn_distance(x, y, z, k=k, workers=workers)
+    return knn_keep_mask(dist, sigma), dist
+
+
+def splat_alpha(opacity):
+    """Opacité activée (sigmoïde du logit PLY), en float64."""
+    return _sigmoid(np.asarray(opacity, dtype=np.float64))
+
+
+def splat_sizes(s0, s1, s2):
+    """Plus grand des trois axes (exp de l'échelle logarithmique), en float64."""
+    return np.maximum.reduce([
+        np.exp(np.asarray(s0, dtype=np.float64)),
+        np.exp(np.asarray(s1, dtype=np.float64)),
+        np.exp(np.asarray(s2, dtype=np.float64)),
+    ])
+
+
+def centre_distance_from(x, y, z, centre):
+    """Distance de chaque splat au point ``centre`` (cx, cy, cz), en float64."""
+    cx, cy, cz = centre
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    z = np.asarray(z, dtype=np.float64)
+    return np.sqrt((x - cx) ** 2 + (y - cy) ** 2 + (z - cz) ** 2)
+
+
+def centre_distance(x, y, z):
+    """Distance de chaque splat au centre robuste (médiane par axe) du nuage."""
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    z = np.asarray(z, dtype=np.float64)
+    return centre_distance_from(x, y, z, (np.median(x), np.median(y), np.median(z)))
+
+
+def _check_outlier_mode(outlier_mode):
+    if outlier_mode not in OUTLIER_MODES:
+        raise ValueError(f"outlier_mode inconnu : {outlier_mode} (attendu : {', '.join(OUTLIER_MODES)})")
+
+
+def _mask_stats(m_op, m_sc, m_out):
+    keep = m_op & m_sc & m_out
+    n = len(keep)
+    kept = int(keep.sum())
+    stats = {
+        "total": int(n),
+        "kept": kept,
+        "removed": int(n - kept),
+        "removed_opacity": int(n - m_op.sum()),
+        "removed_scale": int(n - m_sc.sum()),
+        "removed_outlier": int(n - m_out.sum()),
+    }
+    return keep, stats
+
+
+def _chunked_max(cols, start, stop, out):
+    """Maximum élément par élément des colonnes ``cols[start:stop]`` dans ``out`` (float32)."""
+    np.maximum(cols[0][start:stop], cols[1][start:stop], out=out)
+    for col in cols[2:]:
+        np.maximum(out, col[start:stop], out=out)
+    return out
+
+
+def _chunked_sq_dist(x, y, z, centre, start, stop, out, tmp):
+    """Carré de la distance à ``centre`` des splats ``start:stop`` dans ``out`` (float32)."""
+    out.fill(0)
+    for col, c in zip((x, y, z), centre, strict=True):
+        np.subtract(col[start:stop], c, out=tmp)
+        np.multiply(tmp, tmp, out=tmp)
+        np.add(out, tmp, out=out)
+    return out
+
+
+def _low_memory_clean_mask(x, y, z, opacity, s0, s1, s2, opacity_min, scale_pct, outlier_pct):
+    """Variante float32 de ``compute_clean_mask`` à mémoire bornée.
+
+    Les colonnes (souvent un memmap) sont lues par blocs de ``_MASK_CHUNK`` ;
+    un seul tampon float32 de la taille du nuage sert aux sélections de
+    percentile (``overwrite_input``), puis les masques sont recalculés par bloc.
+    Sigmoïde et exponentielle sont évitées : l'opacité est comparée au logit
+    du seuil, l'échelle reste en log et la distance au carré (transformations
+    monotones). Seule l'interpolation entre deux valeurs voisines du
+    percentile peut différer du mode float64 (un splat au plus par filtre).
+    """
+    n = len(x)
+    chunk = min(_MASK_CHUNK, max(n, 1))
+    buf = np.empty(chunk, dtype=np.float32)
+    tmp = np.empty(chunk, dtype=np.float32)
+    keep_all = np.ones(n, dtype=bool)
+
+    # 1. Opacité : sigmoid(o) >= a  ⇔  o >= logit(a).
+    if opacity_min <= 0.0:
+        m_op = keep_all.copy()
+    else:
+        thr = math.inf if opacity_min >= 1.0 else math.log(opacity_min) - math.log1p(-opacity_min)
+        thr = np.float64(thr)  # comparaison exacte, bloc par bloc
+        m_op = np.empty(n, dtype=bool)
+        for start in range(0, n, chunk):
+            stop = min(start + chunk, n)
+            np.greater_equal(opacity[start:stop], thr, out=m_op[start:stop])
+
+    scratch = np.empty(n, dtype=np.float32) if n else None
+
+    # 2. Échelle : percentile du max des log-échelles (exp est monotone).
+    if scale_pct >= 100.0 or n == 0:
+        m_sc = keep_all.copy()
+    else:
+        for start in range(0, n, chunk):
+            stop = min(start + chunk, n)
+            _chunked_max((s0, s1, s2), start, stop, scratch[start:stop])
+        thr = np.percentile(scratch, scale_pct, overwrite_input=True)
+        m_sc = np.empty(n, dtype=bool)
+        for start in range(0, n, chunk):
+            stop = min(start + chunk, n)
+            np.less_equal(_chunked_max((s0, s1, s2), start, stop, buf[:stop - start]), thr, out=m_sc[start:stop])
+
+    # 3. Distance au centre robuste, comparée au carré.
+    if outlier_pct >= 100.0 or n == 0:
+        m_out = keep_all
+    else:
+        centre = []
+        for col in (x, y, z):
+            scratch[:] = col
+            centre.append(np.float32(np.median(scratch, overwrite_input=True)))
+        for start in range(0, n, chunk):
+            stop = min(start + chunk, n)
+            _chunked_sq_dist(x, y, z, centre, start, stop, scratch[start:stop], tmp[:stop - start])
+        thr = np.percentile(scratch, outlier_pct, overwrite_input=True)
+        m_out = np.empty(n, dtype=bool)
+        for start in range(0, n, chunk):
+            stop = min(start + chunk, n)
+            m = stop - start
+            np.less_equal(_chunked_sq_dist(x, y, z, centre, start, stop, buf[:m], tmp[:m]), thr,
+                          out=m_out[start:stop])
+    return m_op, m_sc, m_out
+
+
+def _streaming_clean_mask(x, y, z, opacity, s0, s1, s2, opacity_min, scale_pct, outlier_pct,
+                          relative_accuracy=DEFAULT_RELATIVE_ACCURACY):
+    """Variante en flux de ``compute_clean_mask`` : seuils estimés par sketch.
+
+    Passe 1 (lecture par blocs de ``_STREAM_CHUNK``) : médianes x/y/z et
+    percentile d'échelle, puis percentile de distance au centre estimé. Aucun
+    tableau float pleine longueur n'est alloué ; les seuils sont à ±α relatif
+    des valeurs exactes (voir ``quantiles``), donc seuls les splats à moins de
+    α du seuil peuvent être classés différemment. Passe 2 : masques par bloc.
+    Retourne (m_op, m_sc, m_out).
+    """
+    n = len(x)
+    chunk = _STREAM_CHUNK
+    blocks = [(start, min(start + chunk, n)) for start in range(0, n, chunk)]
+    use_scale = scale_pct < 100.0 and n > 0
+    use_dist = outlier_pct < 100.0 and n > 0
+
+    def block_sizes(start, stop):
+        return splat_sizes(s0[start:stop], s1[start:stop], s2[start:stop])
+
+    def block_dist(start, stop):
+        return centre_distance_from(x[start:stop], y[start:stop], z[start:stop], centre)
+
+    sketches = [QuantileSketch(relative_accuracy) for _ in range(4)]
+    if use_scale or use_dist:
+        for start, stop in blocks:
+            if use_dist:
+                for sk, col in zip(sketches[:3], (x, y, z), strict=True):
+                    sk.update(col[start:stop])
+            if use_scale:
+                sketches[3].update(block_sizes(start, stop))
+    scale_thr = sketches[3].percentile(scale_pct) if use_scale else None
+
+    dist_thr = None
+    if use_dist:
+        centre = tuple(sk.quantile(0.5) for sk in sketches[:3])
+        dist_sketch = QuantileSketch(relative_accuracy)
+        for start, stop in blocks:
+            dist_sketch.update(block_dist(start, stop))
+        dist_thr = dist_sketch.percentile(outlier_pct)
+
+    m_op = np.empty(n, dtype=bool)
+    m_sc = np.ones(n, dtype=bool)
+    m_out = np.ones(n, dtype=bool)
+    for start, stop in blocks:
+        m_op[start:stop] = splat_alpha(opacity[start:stop]) >= opacity_min
+        if use_scale:
+            m_sc[start:stop] = block_sizes(start, stop) <= scale_thr
+        if use_dist:
+            m_out[start:stop] = block_dist(start, stop) <= dist_thr
+    return m_op, m_sc, m_out
+
+
 def compute_clean_mask(x, y, z, opacity, s0, s1, s2,
-                       opacity_min=0.10, scale_pct=99.5, outlier_pct=99.5):
+                       opacity_min=0.10, scale_pct=99.5, outlier_pct=99.5,
+                       outlier_mode="median", knn_k=8, knn_sigma=3.0, low_memory=False,
+                       streaming=False):
     """Calcule un masque booléen de filtrage pour un ensemble de splats Gaussian.
 
     Les paramètres sont des tableaux numpy 1-D (une entrée par splat). `opacity` est le
     logit brut (pré-sigmoïde) et `s0..s2` sont les échelles logarithmiques, suivant la
-    convention PLY 3DGS/Brush. Retourne (keep_mask, stats_dict).
+    convention PLY 3DGS/Brush. `outlier_mode` choisit le filtre spatial ("median" ou
+    "knn", voir PRESETS) ; outlier_pct >= 100 le désactive dans les deux cas.
+    `low_memory` calcule en float32 par blocs (~10 octets par splat au lieu de
+    ~60, voir ``_low_memory_clean_mask``) ; le mode knn reste en float64.
+    `streaming` estime les percentiles en flux (``_streaming_clean_mask``,
+    erreur relative ``DEFAULT_RELATIVE_ACCURACY``) sans tableau pleine
+    longueur autre que les masques ; il a priorité sur `low_memory`.
+    Retourne (keep_mask, stats_dict).
     """
-    x = np.asarray(x, dtype=np.float64)
-    y = np.asarray(y, dtype=np.float64)
-    z = np.asarray(z, dtype=np.float64)
-    opacity = np.asarray(opacity, dtype=np.float64)
+    _check_outlier_mode(outlier_mode)
     n = len(x)
 
+    if low_memory or streaming:
+        knn = outlier_mode == "knn" and outlier_pct < 100.0 and n > 0
+        partial = _streaming_clean_mask if streaming else _low_memory_clean_mask
+        m_op, m_sc, m_out = partial(
+            x, y, z, opacity, s0, s1, s2, opacity_min, scale_pct, 100.0 if knn else outlier_pct,
+        )
+        if knn:
+            m_out, _ = knn_outlier_mask(x, y, z, k=knn_k, sigma=knn_sigma)
+        return _mask_stats(m_op, m_sc, m_out)
+
     # 1. Opacité — supprime les splats quasi-invisibles (bruit).
-    alpha = _sigmoid(opacity)
-    m_op = alpha >= opacity_min
+    m_op = splat_alpha(opacity) >= opacity_min
 
     # 2. Échelle — supprime les gaussiennes surdimensionnées (coquilles ciel / gros floaters).
-    sizes = np.maximum.reduce([
-        np.exp(np.asarray(s0, dtype=np.float64)),
-        np.exp(np.asarray(s1, dtype=np.float64)),
-        np.exp(np.asarray(s2, dtype=np.float64)),
-    ])
     if scale_pct >= 100.0 or n == 0:
         m_sc = np.ones(n, dtype=bool)
     else:
-        scale_thr = np.percentile(sizes, scale_pct)
-        m_sc = sizes <= scale_thr
+        sizes = splat_sizes(s0, s1, s2)
+        m_sc = sizes <= np.percentile(sizes, scale_pct)
 
-    # 3. Outliers spatiaux — supprime les splats loin du centre robuste du nuage.
+    # 3. Outliers spatiaux — supprime les splats loin du centre robuste du nuage,
+    #    ou (mode knn) les splats isolés dont la densité locale est anormale.
     if outlier_pct >= 100.0 or n == 0:
         m_out = np.ones(n, dtype=bool)
+    elif outlier_mode == "knn":
+        m_out, _ = knn_outlier_mask(x, y, z, k=knn_k, sigma=knn_sigma)
     else:
-        cx, cy, cz = np.median(x), np.median(y), np.median(z)
-        dist = np.sqrt((x - cx) ** 2 + (y - cy) ** 2 + (z - cz) ** 2)
-        dist_thr = np.percentile(dist, outlier_pct)
-        m_out = dist <= dist_thr
+        dist = centre_distance(x, y, z)
+        m_out = dist <= np.percentile(dist, outlier_pct)
 
-    keep = m_op & m_sc & m_out
-    stats = {
-        "total": int(n),
-        "kept": int(keep.sum()),
-        "removed": int(n - keep.sum()),
-        "removed_opacity": int((~m_op).sum()),
-        "removed_scale": int((~m_sc).sum()),
-        "removed_outlier": int((~m_out).sum()),
-    }
-    return keep, stats
+    return _mask_stats(m_op, m_sc, m_out)
 
 
 def resolve_params(strength="medium", overrides=None):
@@ -89,14 +408,25 @@ def resolve_params(strength="medium", overrides=None):
     return params
 
 
-def clean_ply(input_path, output_path, strength="medium", overrides=None, log=None):
+def clean_ply(input_path, output_path, strength="medium", overrides=None, log=None,
+              chunk_size=DEFAULT_WRITE_CHUNK, use_cache=True, available_memory=None):
     """Nettoie un PLY Gaussian Splat et écrit le résultat dans output_path.
 
-    Retourne un dictionnaire de statistiques. Lève ValueError si le fichier
-    n'est pas un Gaussian Splat.
+    Le bloc vertex est mappé en mémoire (voir ``ply_utils.read_ply_vertices``) :
+    seules les colonnes utiles au masque sont effectivement lues, le reste du
+    fichier n'est parcouru qu'à l'écriture. Les splats conservés sont écrits
+    par blocs de ``chunk_size`` lignes, sans copie intégrale des survivants.
+    Si une analyse exacte à jour est en mémoire (``clean_analysis``, ex. après
+    un aperçu) et ``use_cache`` est vrai, le masque en est dérivé sans recalcul
+    (sauf en mode ``low_memory`` ou ``streaming``).
+    Le paramètre ``low_memory`` (surcharge) est activé automatiquement quand
+    le calcul float64 ne tiendrait pas dans la RAM disponible
+    (``available_memory`` en octets, interrogée si None).
+
+    Retourne un dictionnaire de statistiques (dont ``bytes_written``,
+    ``write_seconds`` et ``write_throughput`` en octets/s). Lève ValueError si
+    le fichier n'est pas un Gaussian Splat.
     """
-    from plyfile import PlyData, PlyElement
-
     def _log(msg):
         if log:
             log(msg)
@@ -113,11 +443,7 @@ def clean_ply(input_path, output_path, strength="medium", overrides=None, log=No
 
     params = resolve_params(strength, overrides)
     _log(f"Lecture de {input_path} ...")
-    ply = PlyData.read(str(input_path))
-
-    if "vertex" not in ply:
-        raise ValueError("PLY invalide : élément 'vertex' absent.")
-    data = ply["vertex"].data
+    data = read_ply_vertices(input_path)
     names = set(data.dtype.names or ())
     required = {"x", "y", "z", "opacity", "scale_0", "scale_1", "scale_2"}
     missing = required - names
@@ -127,32 +453,143 @@ def clean_ply(input_path, output_path, strength="medium", overrides=None, log=No
             + ", ".join(sorted(missing)) + ")."
         )
 
-    _log(f"{len(data)} splats chargés. Analyse...")
-    keep, stats = compute_clean_mask(
-        data["x"], data["y"], data["z"], data["opacity"],
-        data["scale_0"], data["scale_1"], data["scale_2"],
-        **params,
-    )
+    if params.get("low_memory") is None:
+        params["low_memory"] = _needs_low_memory(len(data), available_memory)
+        if params["low_memory"]:
+            _log("Mémoire limitée : calcul du masque en float32 par blocs.")
+
+    analysis = None
+    # low_memory / streaming bornent la mémoire : pas de tables d'analyse.
+    if use_cache and not (params["low_memory"] or params.get("streaming")):
+        from .clean_analysis import get_cached_analysis
+        analysis = get_cached_analysis(input_path, exact=True)
+    if analysis is not None and len(analysis) == len(data):
+        _log(f"{len(data)} splats chargés. Analyse en cache réutilisée.")
+        keep, stats = analysis.keep_mask(**params)
+    else:
+        _log(f"{len(data)} splats chargés. Analyse...")
+        keep, stats = compute_clean_mask(
+            data["x"], data["y"], data["z"], data["opacity"],
+            data["scale_0"], data["scale_1"], data["scale_2"],
+            **params,
+        )
 
-    cleaned = data[keep]
-    el = PlyElement.describe(cleaned, "vertex")
-    PlyData([el], text=False).write(str(output_path))
+    in_place = Path(output_path).resolve() == Path(input_path).resolve()
+    t0 = time.perf_counter()
+    if in_place:
+        # Nettoyage en place : le mapping reste la source pendant l'écriture
+        # d'un fichier voisin, qui remplace ensuite l'original (pas de copie
+        # du bloc vertex en RAM).
+        tmp_path = Path(output_path).with_name(f".{Path(output_path).name}.tmp")
+        try:
+            written = write_ply_vertices(tmp_path, data, keep, chunk_size=chunk_size)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        del data
+        os.replace(tmp_path, output_path)
+    else:
+        written = write_ply_vertices(output_path, data, keep, chunk_size=chunk_size)
+    elapsed = time.perf_counter() - t0
+    stats["bytes_written"] = written
+    stats["write_seconds"] = round(elapsed, 3)
+    stats["write_throughput"] = written / elapsed if elapsed > 0 else float(written)
     _log(
         f"Nettoyage terminé : {stats['kept']}/{stats['total']} splats conservés "
-        f"({stats['removed']} retirés). Écrit dans {output_path}"
+        f"({stats['removed']} retirés). Écrit dans {output_path} "
+        f"({written / 1e6:.1f} Mo, {stats['write_throughput'] / 1e6:.1f} Mo/s)"
     )
     return stats
 
 
-def clean_ply_batch(input_dir, output_dir, strength="medium", overrides=None, log=None, recursive=False):
+# Estimation grossière de l'empreinte mémoire d'un clean par splat : colonnes
+# lues + alpha / échelle max / distance / masques en float64 (le bloc vertex
+# lui-même est mappé, donc hors tas).
+_CLEAN_BYTES_PER_SPLAT = 96
+# Part de la mémoire disponible que les workers parallèles peuvent se partager.
+_BATCH_MEMORY_FRACTION = 0.6
+
+
+def _available_memory():
+    """RAM disponible en octets (0 si inconnue). ``get_memory_info`` lance des
+    sous-processus : les lots l'interrogent une seule fois."""
+    info = get_memory_info()
+    return info.get("available") or info.get("total") or 0
+
+
+def _needs_low_memory(count, available=None):
+    """Vrai si le masque float64 de ``count`` splats dépasserait la part de RAM
+    ``available`` (interrogée si None). Sans information mémoire (hors macOS),
+    le mode reste désactivé."""
+    if available is None:
+        available = _available_memory()
+    return available > 0 and count * _CLEAN_BYTES_PER_SPLAT > available * _BATCH_MEMORY_FRACTION
+
+
+def _estimate_clean_memory(ply_path):
+    """Octets de RAM estimés pour nettoyer un fichier (d'après l'en-tête)."""
+    try:
+        header = parse_ply_header(ply_path)
+        count = next(c for name, c, _ in header["elements"] if name == "vertex")
+        return count * _CLEAN_BYTES_PER_SPLAT
+    except (OSError, ValueError, StopIteration):
+        return Path(ply_path).stat().st_size
+
+
+def _batch_worker_cap(ply_files, workers, available):
+    """Borne le nombre de workers pour que les plus gros fichiers tiennent
+    simultanément en ``available`` octets. Sans information mémoire (total == 0
+    hors macOS), ``workers`` est retourné tel quel."""
+    if available <= 0:
+        return workers
+    largest = max(_estimate_clean_memory(f) for f in ply_files)
+    if largest <= 0:
+        return workers
+    return max(1, min(workers, int(available * _BATCH_MEMORY_FRACTION // largest)))
+
+
+def _clean_batch_item(ply_path, out_path, strength, overrides, available_memory):
+    """Nettoie un fichier dans un processus du pool (fonction picklable)."""
+    t0 = time.perf_counter()
+    try:
+        stats = clean_ply(ply_path, out_path, strength=strength, overrides=overrides,
+                          available_memory=available_memory)
+    except Exception as e:
+        stats = {"error": str(e), "error_type": type(e).__name__}
+    stats["file"] = str(Path(ply_path).name)
+    stats["seconds"] = round(time.perf_counter() - t0, 3)
+    return stats
+
+
+def _log_batch_item(log, stats, idx, total):
+    if not log:
+        return
+    name = stats["file"]
+    if "error" not in stats:
+        log(f"[{idx}/{total}] ✓ {name}: {stats['kept']}/{stats['total']} splats conservés ({stats['seconds']:.2f}s)")
+    elif stats.get("error_type") == "ValueError":
+        log(f"⚠️  {name}: ignoré ({stats['error']})")
+    else:
+        log(f"❌  {name}: erreur ({stats['error']})")
+
+
+def clean_ply_batch(input_dir, output_dir, strength="medium", overrides=None, log=None, recursive=False,
+                    workers=1, cancel_check=None):
     """Nettoie tous les fichiers .ply d'un dossier.
 
-    Retourne une liste de dictionnaires de statistiques, un par fichier traité.
+    Retourne une liste de dictionnaires de statistiques, un par fichier traité,
+    dans l'ordre trié des fichiers d'entrée quel que soit l'ordre de fin.
+    Chaque entrée contient ``file`` et ``seconds`` (durée du fichier). Le
+    bilan du lot est laissé à l'appelant (CLI, ``CleanerWorker``).
 
     Paramètres :
     - input_dir : Path ou str — dossier contenant les .ply
     - output_dir : Path ou str — dossier où écrire les fichiers nettoyés
     - recursive : bool — si True, parcourt récursivement les sous-dossiers
+    - workers : int — nombre de processus parallèles (1 = séquentiel, 0 = auto).
+      Le nombre effectif est plafonné selon la mémoire disponible.
+    - cancel_check : callable sans argument — si elle retourne True, les
+      fichiers encore en attente sont annulés (entrée ``cancelled``).
     """
     safe_in = _validate_path(input_dir)
     safe_out = _validate_path(output_dir) or _validate_path(str(Path(output_dir).parent))
@@ -173,31 +610,80 @@ def clean_ply_batch(input_dir, output_dir, strength="medium", overrides=None, lo
             log(msg)
         raise ValueError(msg)
 
+    total = len(ply_files)
+    if not workers or workers < 1:
+        workers = get_optimal_threads()
+    workers = min(workers, total)
+    available = _available_memory()
+    if workers > 1:
+        workers = _batch_worker_cap(ply_files, workers, available)
+    # Part de RAM de chaque fichier en cours (décision low_memory).
+    share = available // workers
+
     if log:
-        log(f"{len(ply_files)} fichier(s) .ply trouvé(s) dans {input_dir}. Début du nettoyage...")
+        log(f"{total} fichier(s) .ply trouvé(s) dans {input_dir}. Début du nettoyage"
+            + (f" ({workers} processus)..." if workers > 1 else "..."))
 
-    all_stats = []
+    jobs = []
     for ply_path in ply_files:
-        rel = ply_path.relative_to(input_dir)
-        out_path = output_dir / rel
+        out_path = output_dir / ply_path.relative_to(input_dir)
         out_path.parent.mkdir(parents=True, exist_ok=True)
+        jobs.append((ply_path, out_path))
 
-        try:
-            stats = clean_ply(ply_path, out_path, strength=strength, overrides=overrides, log=log)
-            stats["file"] = str(ply_path.name)
-            all_stats.append(stats)
-        except ValueError as e:
-            if log:
-                log(f"⚠️  {ply_path.name}: ignoré ({e})")
-            all_stats.append({"file": str(ply_path.name), "error": str(e)})
-        except Exception as e:
-            if log:
-                log(f"❌  {ply_path.name}: erreur ({e})")
-            all_stats.append({"file": str(ply_path.name), "error": str(e)})
+    def _cancelled_entry(ply_path):
+        return {"file": str(ply_path.name), "error": "annulé", "cancelled": True}
 
-    if log:
-        success = sum(1 for s in all_stats if "error" not in s)
-        failed = len(all_stats) - success
-        log(f"Nettoyage par lots terminé : {success} réussis, {failed} échoués.")
+    all_stats = [None] * total
+    if workers <= 1:
+        for idx, (ply_path, out_path) in enumerate(jobs):
+            if cancel_check and cancel_check():
+                all_stats[idx:] = [_cancelled_entry(p) for p, _ in jobs[idx:]]
+                break
+            if log:
+                log(f"[{idx + 1}/{total}] Nettoyage de {ply_path.name}...")
+            t0 = time.perf_counter()
+            try:
+                stats = clean_ply(ply_path, out_path, strength=strength, overrides=overrides, log=log,
+                                  available_memory=share)
+            except Exception as e:
+                stats = {"error": str(e), "error_type": type(e).__name__}
+            stats["file"] = str(ply_path.name)
+            stats["seconds"] = round(time.perf_counter() - t0, 3)
+            all_stats[idx] = stats
+            if "error" in stats:
+                _log_batch_item(log, stats, idx + 1, total)
+    else:
+        done_count = 0
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(_clean_batch_item, ply_path, out_path, strength, overrides, share): idx
+                for idx, (ply_path, out_path) in enumerate(jobs)
+            }
+            pending = set(futures)
+            while pending:
+                done, pending = wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    idx = futures[fut]
+                    if fut.cancelled():
+                        continue
+                    try:
+                        stats = fut.result()
+                    except Exception as e:  # crash du processus worker
+                        stats = {"file": str(jobs[idx][0].name), "error": str(e), "seconds": 0.0}
+                    all_stats[idx] = stats
+                    done_count += 1
+                    _log_batch_item(log, stats, done_count, total)
+                if pending and cancel_check and cancel_check():
+                    if log:
+                        log("Annulation : les fichiers en attente ne seront pas traités.")
+                    pool.shutdown(wait=True, cancel_futures=True)
+                    for fut in pending:
+                        idx = futures[fut]
+                        if not fut.cancelled() and fut.done() and fut.exception() is None:
+                            all_stats[idx] = fut.result()
+                    break
+        for idx, stats in enumerate(all_stats):
+            if stats is None:
+                all_stats[idx] = _cancelled_entry(jobs[idx][0])
 
     return all_stats
@@ -1,9 +1,216 @@
 """
-ply_utils.py — formerly contained helpers for the homemade SPZ encoder.
+ply_utils.py — Shared, zero-copy access to the vertex block of .ply files.
 
-All functions (compress_scale, compress_rotation, compress_alpha,
-write_spz_header, write_spz_data, parse_ply_manual) have been removed as part
-of the migration to the official nianticlabs/spz library (v1.0.7).
+Brush/Sharp outputs are ``binary_little_endian`` PLYs whose vertex element is a
+fixed-size record per splat. For those files the header is parsed once and the
+vertex block is exposed as an ``np.memmap`` structured array: nothing is read
+until a column is touched, and the OS page cache (not the Python heap) holds
+the bytes. ASCII, big-endian, list-property or otherwise unusual files fall
+back to :mod:`plyfile`, which loads the element into RAM as before.
 
-This file is now empty and can be deleted if no other module imports from it.
+The writer side streams a filtered vertex array back to disk chunk by chunk,
+so cleaning never materialises the survivors as a second full array.
+
+(This module formerly held the homemade SPZ encoder helpers, removed when SPZ
+export migrated to the official nianticlabs/spz library.)
 """
+from pathlib import Path
+
+import numpy as np
+
+# PLY scalar type names (both spellings allowed by the spec) → NumPy codes.
+_PLY_SCALAR_TYPES = {
+    "char": "i1", "int8": "i1",
+    "uchar": "u1", "uint8": "u1",
+    "short": "i2", "int16": "i2",
+    "ushort": "u2", "uint16": "u2",
+    "int": "i4", "int32": "i4",
+    "uint": "u4", "uint32": "u4",
+    "float": "f4", "float32": "f4",
+    "double": "f8", "float64": "f8",
+}
+
+# Maximum header size we are willing to scan before giving up (Brush headers
+# with SH degree 3 are ~2 KB).
+_MAX_HEADER_BYTES = 1 << 20
+
+
+def parse_ply_header(path):
+    """Parse the header of a .ply file.
+
+    Returns a dict ``{"format", "elements", "comments", "obj_info",
+    "element_comments", "header_size"}`` where ``elements`` is a list of
+    ``(name, count, properties)`` tuples and each property is ``(name, type)``
+    or ``(name, ("list", count_type, item_type))``. Comments appearing after an
+    ``element`` line are attached to it in ``element_comments`` (as plyfile
+    does). Raises ValueError if the file is not a PLY.
+    """
+    with open(path, "rb") as f:
+        if f.readline().strip() != b"ply":
+            raise ValueError(f"Fichier PLY invalide (signature absente) : {path}")
+        fmt = None
+        elements = []
+        comments = []
+        obj_info = []
+        element_comments = {}
+        while True:
+            raw = f.readline()
+            if not raw:
+                raise ValueError(f"En-tête PLY tronqué : {path}")
+            if f.tell() > _MAX_HEADER_BYTES:
+                raise ValueError(f"En-tête PLY trop long : {path}")
+            line = raw.decode("ascii", errors="replace").strip()
+            if not line:
+                continue
+            tokens = line.split()
+            keyword = tokens[0]
+            if keyword == "end_header":
+                break
+            if keyword == "format" and len(tokens) >= 2:
+                fmt = tokens[1]
+            elif keyword in ("comment", "obj_info"):
+                text = line.split(None, 1)[1] if len(tokens) > 1 else ""
+                if keyword == "obj_info":
+                    obj_info.append(text)
+                elif elements:
+                    element_comments.setdefault(elements[-1][0], []).append(text)
+                else:
+                    comments.append(text)
+            elif keyword == "element" and len(tokens) >= 3:
+                elements.append((tokens[1], int(tokens[2]), []))
+            elif keyword == "property" and elements:
+                if tokens[1] == "list" and len(tokens) >= 5:
+                    elements[-1][2].append((tokens[4], ("list", tokens[2], tokens[3])))
+                elif len(tokens) >= 3:
+                    elements[-1][2].append((tokens[2], tokens[1]))
+        header_size = f.tell()
+    if fmt is None:
+        raise ValueError(f"En-tête PLY sans ligne 'format' : {path}")
+    return {
+        "format": fmt,
+        "elements": elements,
+        "comments": comments,
+        "obj_info": obj_info,
+        "element_comments": element_comments,
+        "header_size": header_size,
+    }
+
+
+def _fixed_record_dtype(properties):
+    """Little-endian structured dtype for an element, or None if it has list
+    properties or unknown scalar types (variable-size records)."""
+    fields = []
+    for name, ptype in properties:
+        if not isinstance(ptype, str) or ptype not in _PLY_SCALAR_TYPES:
+            return None
+        fields.append((name, "<" + _PLY_SCALAR_TYPES[ptype]))
+    return np.dtype(fields)
+
+
+def _memmap_vertices(path, header):
+    """Return the vertex element as an ``np.memmap``, or None when the file
+    layout does not allow a direct mapping."""
+    if header["format"] != "binary_little_endian":
+        return None
+    offset = header["header_size"]
+    for name, count, properties in header["elements"]:
+        dtype = _fixed_record_dtype(properties)
+        if dtype is None:
+            return None
+        if name == "vertex":
+            if count == 0:
+                return np.empty(0, dtype=dtype)
+            if Path(path).stat().st_size < offset + count * dtype.itemsize:
+                return None
+            return np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=(count,))
+        # Fixed-size element stored before the vertices: skip over it.
+        offset += count * dtype.itemsize
+    return None
+
+
+def read_ply_vertices(path):
+    """Return the ``vertex`` element of a PLY as a NumPy structured array.
+
+    Binary little-endian files are memory-mapped without copying; everything
+    else is read through plyfile (ImportError is propagated when plyfile is
+    not installed so callers can keep their manual-parsing fallbacks).
+    Raises ValueError if the file has no vertex element.
+    """
+    path = str(path)
+    header = parse_ply_header(path)
+    if not any(name == "vertex" for name, _, _ in header["elements"]):
+        raise ValueError("PLY invalide : élément 'vertex' absent.")
+
+    data = _memmap_vertices(path, header)
+    if data is not None:
+        return data
+
+    from plyfile import PlyData
+    ply = PlyData.read(path)
+    return ply["vertex"].data
+
+
+# NumPy kind+size → PLY scalar type name, as written by plyfile.
+_NUMPY_TO_PLY = {
+    "i1": "char", "u1": "uchar",
+    "i2": "short", "u2": "ushort",
+    "i4": "int", "u4": "uint",
+    "f4": "float", "f8": "double",
+}
+
+# Rows per write chunk: ~4 MB per chunk for a 62-float SH3 splat record.
+DEFAULT_WRITE_CHUNK = 1 << 14
+
+
+def _ply_property_type(dtype):
+    """PLY scalar type name for a NumPy field dtype, or None if unsupported."""
+    return _NUMPY_TO_PLY.get(f"{dtype.kind}{dtype.itemsize}")
+
+
+def write_ply_vertices(path, data, keep=None, chunk_size=DEFAULT_WRITE_CHUNK):
+    """Write ``data[keep]`` as a binary_little_endian PLY without building the
+    filtered copy.
+
+    The header is emitted with the final vertex count, then kept rows are
+    written in chunks of ``chunk_size`` source rows, so peak memory is
+    bounded by the chunk rather than by the number of survivors.
+    Returns the number of bytes written.
+    """
+    names = data.dtype.names or ()
+    props = []
+    for name in names:
+        ptype = _ply_property_type(data.dtype.fields[name][0])
+        if ptype is None:
+            raise ValueError(f"Type de propriété PLY non supporté : {name} ({data.dtype.fields[name][0]})")
+        props.append((name, ptype))
+    out_dtype = np.dtype([(name, "<" + _PLY_SCALAR_TYPES[ptype]) for name, ptype in props])
+
+    n = len(data)
+    if keep is None:
+        count = n
+    else:
+        keep = np.asarray(keep, dtype=bool)
+        if keep.shape != (n,):
+            raise ValueError("Le masque doit avoir une entrée par vertex.")
+        count = int(np.count_nonzero(keep))
+
+    header = ["ply", "format binary_little_endian 1.0", f"element vertex {count}"]
+    header += [f"property {ptype} {name}" for name, ptype in props]
+    header.append("end_header")
+    header_bytes = ("\n".join(header) + "\n").encode("ascii")
+
+    chunk_size = max(1, int(chunk_size))
+    written = 0
+    with open(path, "wb") as f:
+        f.write(header_bytes)
+        written += len(header_bytes)
+        for start in range(0, n, chunk_size):
+            chunk = data[start:start + chunk_size]
+            if keep is not None:
+                chunk = chunk[keep[start:start + chunk_size]]
+            if not len(chunk):
+                continue
+            buf = np.ascontiguousarray(chunk.astype(out_dtype, copy=False))
+            f.write(buf.view(np.uint8))
+            written += buf.nbytes
+    return written
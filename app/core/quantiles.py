@@ -0,0 +1,165 @@
+"""
+quantiles.py — Quantiles approchés en flux (sketch à seaux logarithmiques).
+
+``QuantileSketch`` suit l'algorithme DDSketch : chaque valeur non nulle est
+comptée dans le seau ``ceil(log_γ |v|)`` avec ``γ = (1 + α) / (1 - α)``, et
+un seau restitue ``±2γ^k / (γ + 1)``. Les mises à jour sont vectorisées
+(``np.bincount`` par bloc) et deux sketches se fusionnent par addition.
+
+Borne d'erreur (``α = relative_accuracy``) :
+
+  - la valeur estimée au rang r est à ±α·|x_(r)| de la valeur exacte x_(r)
+    (statistique d'ordre), pour |x_(r)| >= ``MIN_INDEXABLE`` — plus petites,
+    elles sont comptées comme zéro (erreur absolue < ``MIN_INDEXABLE``) ;
+  - ``percentile(p)`` interpole linéairement entre les rangs entourant
+    ``p/100·(n-1)``, comme ``np.percentile`` : l'écart est au plus
+    α·max(|x_(⌊r⌋)|, |x_(⌈r⌉)|).
+
+Un seuil ainsi estimé ne change donc la décision que pour les valeurs à
+moins de α (relatif) du seuil exact. La mémoire dépend de l'étendue des
+valeurs, pas de leur nombre : ~ln(max/min)/(2α) seaux (≈ 28 000 seaux
+pour 24 décades à α = 0.1 %).
+"""
+import math
+
+import numpy as np
+
+DEFAULT_RELATIVE_ACCURACY = 1e-3
+# |v| en dessous de ce seuil → seau zéro.
+MIN_INDEXABLE = 1e-12
+
+
+class _BucketStore:
+    """Compteurs denses pour une plage contiguë de clés entières."""
+
+    def __init__(self):
+        self.offset = 0
+        self.counts = np.zeros(0, dtype=np.int64)
+
+    @property
+    def total(self):
+        return int(self.counts.sum())
+
+    def add_keys(self, keys):
+        if len(keys) == 0:
+            return
+        self.add_counts(int(keys.min()), np.bincount(keys - keys.min()))
+
+    def add_counts(self, offset, counts):
+        if len(counts) == 0:
+            return
+        if len(self.counts) == 0:
+            self.offset, self.counts = offset, counts.astype(np.int64)
+            return
+        lo = min(self.offset, offset)
+        hi = max(self.offset + len(self.counts), offset + len(counts))
+        if lo != self.offset or hi != self.offset + len(self.counts):
+            grown = np.zeros(hi - lo, dtype=np.int64)
+            grown[self.offset - lo:self.offset - lo + len(self.counts)] = self.counts
+            self.offset, self.counts = lo, grown
+        self.counts[offset - self.offset:offset - self.offset + len(counts)] += counts
+
+
+class QuantileSketch:
+    """Estimateur de quantiles en flux à erreur relative bornée (DDSketch).
+
+    >>> sk = QuantileSketch()
+    >>> for block in blocks:
+    ...     sk.update(block)
+    >>> sk.percentile(99.5)
+
+    Les NaN sont ignorés ; ±inf sont comptés dans les seaux extrêmes. Le
+    minimum et le maximum sont restitués exactement.
+    """
+
+    def __init__(self, relative_accuracy=DEFAULT_RELATIVE_ACCURACY):
+        if not 0.0 < relative_accuracy < 1.0:
+            raise ValueError("relative_accuracy doit être dans ]0, 1[.")
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1.0 + relative_accuracy) / (1.0 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self._max_key = math.ceil(math.log(np.finfo(np.float64).max) / self._log_gamma)
+        self._pos = _BucketStore()
+        self._neg = _BucketStore()
+        self.zero_count = 0
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def _keys(self, magnitudes):
+        with np.errstate(over="ignore"):
+            keys = np.ceil(np.log(magnitudes) / self._log_gamma)
+        # ±inf → seau du plus grand float fini (borne la taille des compteurs).
+        return np.minimum(keys, self._max_key).astype(np.int64)
+
+    def update(self, values):
+        """Ajoute un bloc de valeurs (tableau de n'importe quelle forme)."""
+        v = np.asarray(values, dtype=np.float64).ravel()
+        v = v[~np.isnan(v)]
+        if len(v) == 0:
+            return
+        self.count += len(v)
+        self.min = min(self.min, float(v.min()))
+        self.max = max(self.max, float(v.max()))
+        pos = v[v >= MIN_INDEXABLE]
+        neg = -v[v <= -MIN_INDEXABLE]
+        self.zero_count += len(v) - len(pos) - len(neg)
+        self._pos.add_keys(self._keys(pos))
+        self._neg.add_keys(self._keys(neg))
+
+    def merge(self, other):
+        """Ajoute les comptes d'un autre sketch de même précision."""
+        if other.gamma != self.gamma:
+            raise ValueError("Sketches de précisions différentes.")
+        self._pos.add_counts(other._pos.offset, other._pos.counts)
+        self._neg.add_counts(other._neg.offset, other._neg.counts)
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def _bucket_value(self, key):
+        return 2.0 * math.exp(key * self._log_gamma) / (self.gamma + 1.0)
+
+    def value_at_rank(self, rank):
+        """Valeur approchée de la statistique d'ordre ``rank`` (0-indexée)."""
+        if self.count == 0:
+            raise ValueError("Sketch vide : aucun quantile.")
+        rank = min(max(int(rank), 0), self.count - 1)
+        # Les extrêmes sont connus exactement.
+        if rank == 0:
+            return self.min
+        if rank == self.count - 1:
+            return self.max
+        neg_total = self._neg.total
+        if rank < neg_total:
+            # Négatifs : du plus grand module au plus petit.
+            cum = np.cumsum(self._neg.counts[::-1])
+            idx = int(np.searchsorted(cum, rank, side="right"))
+            key = self._neg.offset + len(self._neg.counts) - 1 - idx
+            value = -self._bucket_value(key)
+        elif rank < neg_total + self.zero_count:
+            value = 0.0
+        else:
+            cum = np.cumsum(self._pos.counts)
+            idx = int(np.searchsorted(cum, rank - neg_total - self.zero_count, side="right"))
+            value = self._bucket_value(self._pos.offset + idx)
+        return min(max(value, self.min), self.max)
+
+    def quantile(self, q):
+        """Quantile ``q`` ∈ [0, 1] avec interpolation linéaire (comme numpy)."""
+        if not 0.0 <= q <= 1.0:
+            raise ValueError("q doit être dans [0, 1].")
+        if self.count == 0:
+            raise ValueError("Sketch vide : aucun quantile.")
+        pos = q * (self.count - 1)
+        lo = math.floor(pos)
+        lo_value = self.value_at_rank(lo)
+        if pos == lo:
+            return lo_value
+        hi_value = self.value_at_rank(lo + 1)
+        return lo_value + (hi_value - lo_value) * (pos - lo)
+
+    def percentile(self, p):
+        """Percentile ``p`` ∈ [0, 100] (voir ``quantile``)."""
+        return self.quantile(p / 100.0)
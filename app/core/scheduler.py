@@ -0,0 +1,336 @@
+"""
+scheduler.py — Planificateur des exécutions de moteurs selon les ressources.
+
+Chaque onglet de la GUI lance son worker et son moteur indépendamment :
+un upscale pendant l'extraction COLMAP sature le CPU, deux Brush épuisent la
+mémoire unifiée. ``JobScheduler`` fait passer ces exécutions par une file
+commune :
+
+  - chaque job déclare ses besoins (``ResourceRequest``) : threads CPU, accès
+    exclusif au GPU, estimation de RAM ;
+  - le budget (``ResourceBudget``) vient de ``get_optimal_threads()`` et de
+    ``get_memory_info()`` (RAM non contrainte si elle est inconnue) ;
+  - l'admission suit l'ordre d'arrivée : le premier job en attente passe dès
+    que ses besoins tiennent dans ce qui reste, les suivants attendent leur
+    tour (pas de famine d'un gros job). Seule exception : un job en tête
+    bloqué uniquement par le GPU occupé laisse passer les jobs suivants qui
+    tiennent dans le budget en lui réservant ses threads et sa RAM (travail
+    CPU à côté d'un entraînement GPU). Un job plus gros que le budget entier
+    passe seul.
+
+L'état de la file (``snapshot()``) est publié, si ``publish_state()`` a été
+appelé, dans ``STATE_DIR/<pid>.json`` : ``main.py jobs`` lit ces fichiers
+pour afficher les files des processus CorbeauSplat en cours.
+"""
+import contextlib
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Iterator
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+from .system import get_memory_info, get_optimal_threads
+
+GIB = 1 << 30
+
+# Part de la RAM physique allouable aux jobs (le reste : système, GUI, cache).
+MEMORY_FRACTION = 0.8
+
+STATE_DIR = Path(tempfile.gettempdir()) / "corbeausplat-jobs"
+
+JOB_STATES = ("queued", "running", "done", "failed", "cancelled")
+
+# Jobs terminés conservés dans ``snapshot()``.
+HISTORY_SIZE = 20
+
+
+@dataclass(frozen=True)
+class ResourceRequest:
+    """Besoins déclarés d'un job. ``threads`` = 0 : tout le budget CPU."""
+    threads: int = 1
+    gpu: bool = False
+    memory: int = 0  # octets
+
+
+# Mémoire d'entraînement Brush par splat (paramètres, gradients, états Adam).
+BRUSH_BYTES_PER_SPLAT = 1024
+
+# Besoins par défaut des moteurs lancés depuis la GUI.
+ENGINE_REQUESTS = {
+    "colmap": ResourceRequest(threads=0, memory=4 * GIB),
+    "4dgs": ResourceRequest(threads=0, memory=4 * GIB),
+    "extract360": ResourceRequest(threads=0, memory=2 * GIB),
+    "brush": ResourceRequest(threads=2, gpu=True, memory=2 * GIB),
+    "sharp": ResourceRequest(threads=2, gpu=True, memory=4 * GIB),
+    "upscale": ResourceRequest(threads=2, gpu=True, memory=2 * GIB),
+}
+
+
+def brush_request(max_splats: int | None) -> ResourceRequest:
+    """Besoins d'un entraînement Brush, la RAM croissant avec ``max_splats``."""
+    base = ENGINE_REQUESTS["brush"]
+    return ResourceRequest(base.threads, base.gpu, base.memory + int(max_splats or 0) * BRUSH_BYTES_PER_SPLAT)
+
+
+@dataclass(frozen=True)
+class ResourceBudget:
+    threads: int
+    memory: int = 0  # octets ; 0 = inconnue, non contrainte
+
+    @classmethod
+    def detect(cls, memory_fraction: float = MEMORY_FRACTION) -> "ResourceBudget":
+        total = get_memory_info().get("total", 0)
+        return cls(threads=max(1, get_optimal_threads()), memory=int(total * memory_fraction))
+
+
+@dataclass
+class Job:
+    id: int
+    name: str
+    request: ResourceRequest
+    threads: int  # threads effectivement réservés (``request.threads`` résolu)
+    state: str = "queued"
+    submitted: float = field(default_factory=time.time)
+    started: float | None = None
+    finished: float | None = None
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        data["request"] = asdict(self.request)
+        return data
+
+
+class JobScheduler:
+    """File d'admission des jobs sous un budget de ressources (thread-safe)."""
+
+    def __init__(self, budget: ResourceBudget | None = None):
+        self._budget = budget
+        self._cond = threading.Condition()
+        self._queue: deque[Job] = deque()
+        self._running: list[Job] = []
+        self._history: deque[Job] = deque(maxlen=HISTORY_SIZE)
+        self._next_id = 1
+        self._listeners: list[Callable[[dict], None]] = []
+        self._state_path: Path | None = None
+
+    @property
+    def budget(self) -> ResourceBudget:
+        if self._budget is None:
+            self._budget = ResourceBudget.detect()
+        return self._budget
+
+    # ── Admission ─────────────────────────────────────────────────────────
+    def _gpu_busy(self) -> bool:
+        return any(j.request.gpu for j in self._running)
+
+    def _fits(self, job: Job, threads: int = 0, memory: int = 0) -> bool:
+        """``job`` tient-il à côté des jobs en cours (plus ``threads`` et
+        ``memory`` réservés pour des jobs en attente devant lui) ?"""
+        if not self._running:
+            return True  # seul, un job passe même s'il dépasse le budget
+        if job.request.gpu and self._gpu_busy():
+            return False
+        budget = self.budget
+        if sum(j.threads for j in self._running) + threads + job.threads > budget.threads:
+            return False
+        return not (budget.memory and job.request.memory
+                    and sum(j.request.memory for j in self._running) + memory + job.request.memory
+                    > budget.memory)
+
+    def _admissible(self, job: Job) -> bool:
+        """Ordre d'arrivée, sauf devant des jobs bloqués par le GPU seul :
+        ``job`` peut les doubler s'il tient en leur laissant leur part."""
+        threads = memory = 0
+        for ahead in self._queue:
+            if ahead is job:
+                return self._fits(job, threads, memory)
+            if not (ahead.request.gpu and self._gpu_busy()):
+                return False
+            threads += ahead.threads
+            memory += ahead.request.memory
+        return False
+
+    def acquire(self, name: str, request: ResourceRequest | None = None,
+                is_cancelled: Callable[[], bool] | None = None, poll_interval: float = 0.5) -> Job | None:
+        """Met le job en file et bloque jusqu'à son admission ; None si
+        ``is_cancelled()`` devient vrai avant. Le job admis doit être rendu
+        par ``release``."""
+        request = request or ResourceRequest()
+        with self._cond:
+            threads = min(request.threads, self.budget.threads) if request.threads > 0 else self.budget.threads
+            job = Job(self._next_id, name, request, threads)
+            self._next_id += 1
+            self._queue.append(job)
+            self._changed()
+            while not self._admissible(job):
+                if is_cancelled and is_cancelled():
+                    self._queue.remove(job)
+                    self._finish(job, "cancelled")
+                    return None
+                self._cond.wait(poll_interval)
+            self._queue.remove(job)
+            job.state = "running"
+            job.started = time.time()
+            self._running.append(job)
+            self._changed()
+            return job
+
+    def release(self, job: Job, state: str = "done") -> None:
+        """Rend les ressources de ``job`` (état final ``done``, ``failed``…)."""
+        with self._cond:
+            if job in self._running:
+                self._running.remove(job)
+                self._finish(job, state)
+
+    @contextlib.contextmanager
+    def reserve(self, name: str, request: ResourceRequest | None = None,
+                is_cancelled: Callable[[], bool] | None = None) -> Iterator[Job | None]:
+        """``acquire`` / ``release`` autour d'un bloc ; ``None`` si annulé en
+        attente. Une exception dans le bloc termine le job en ``failed``."""
+        job = self.acquire(name, request, is_cancelled)
+        if job is None:
+            yield None
+            return
+        state = "done"
+        try:
+            yield job
+        except BaseException:
+            state = "failed"
+            raise
+        finally:
+            self.release(job, state)
+
+    def _finish(self, job: Job, state: str) -> None:
+        job.state = state
+        job.finished = time.time()
+        self._history.append(job)
+        self._changed()
+
+    # ── État ──────────────────────────────────────────────────────────────
+    def snapshot(self) -> dict:
+        with self._cond:
+            budget = self.budget
+            return {
+                "pid": os.getpid(),
+                "updated": time.time(),
+                "budget": asdict(budget),
+                "used": {
+                    "threads": sum(j.threads for j in self._running),
+                    "memory": sum(j.request.memory for j in self._running),
+                    "gpu": any(j.request.gpu for j in self._running),
+                },
+                "running": [j.to_dict() for j in self._running],
+                "queued": [j.to_dict() for j in self._queue],
+                "history": [j.to_dict() for j in self._history],
+            }
+
+    def add_listener(self, callback: Callable[[dict], None]) -> None:
+        """``callback(snapshot)`` à chaque changement, depuis le thread qui
+        l'a provoqué (la GUI doit repasser par un signal Qt)."""
+        with self._cond:
+            self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[[dict], None]) -> None:
+        with self._cond:
+            with contextlib.suppress(ValueError):
+                self._listeners.remove(callback)
+
+    def publish_state(self, state_dir: Path = STATE_DIR) -> Path:
+        """Écrit désormais l'état de la file dans ``state_dir/<pid>.json``."""
+        state_dir = Path(state_dir)
+        state_dir.mkdir(parents=True, exist_ok=True)
+        with self._cond:
+            self._state_path = state_dir / f"{os.getpid()}.json"
+            self._changed(notify=False)
+        return self._state_path
+
+    def unpublish_state(self) -> None:
+        with self._cond:
+            path, self._state_path = self._state_path, None
+        if path:
+            path.unlink(missing_ok=True)
+
+    def _changed(self, notify: bool = True) -> None:
+        """Appelé sous le verrou : réveille les attentes, publie l'état."""
+        if notify:
+            self._cond.notify_all()
+        if not (self._listeners or self._state_path):
+            return
+        snapshot = self.snapshot()
+        if self._state_path:
+            tmp = self._state_path.with_suffix(".tmp")
+            try:
+                tmp.write_text(json.dumps(snapshot), encoding="utf-8")
+                os.replace(tmp, self._state_path)
+            except OSError:
+                pass  # publication best-effort
+        for callback in list(self._listeners):
+            with contextlib.suppress(Exception):
+                callback(snapshot)
+
+
+_scheduler: JobScheduler | None = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> JobScheduler:
+    """Planificateur partagé du processus."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = JobScheduler()
+        return _scheduler
+
+
+def _pid_alive(pid: int) -> bool:
+    if sys.platform == "win32":
+        return True  # os.kill(pid, 0) terminerait le processus ; fichiers retirés à la fermeture
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def read_published_states(state_dir: Path = STATE_DIR) -> list[dict]:
+    """États publiés par les processus encore vivants (fichiers orphelins supprimés)."""
+    states = []
+    for path in sorted(Path(state_dir).glob("*.json")):
+        try:
+            pid = int(path.stem)
+        except ValueError:
+            continue
+        if not _pid_alive(pid):
+            path.unlink(missing_ok=True)
+            continue
+        try:
+            states.append(json.loads(path.read_text(encoding="utf-8")))
+        except (OSError, json.JSONDecodeError):
+            continue
+    return states
+
+
+def format_state(state: dict) -> str:
+    """Résumé texte d'un ``snapshot()`` (commande ``jobs``)."""
+    budget, used = state["budget"], state["used"]
+    memory = f", RAM {used['memory'] / GIB:.1f}/{budget['memory'] / GIB:.1f} Go" if budget["memory"] else ""
+    lines = [
+        f"Processus {state['pid']} : threads {used['threads']}/{budget['threads']}{memory}, "
+        f"GPU {'occupé' if used['gpu'] else 'libre'}"
+    ]
+    now = time.time()
+    for job in state["running"]:
+        lines.append(f"  ▶ #{job['id']} {job['name']} ({job['threads']} threads, "
+                     f"{now - job['started']:.0f} s)")
+    for position, job in enumerate(state["queued"], start=1):
+        lines.append(f"  … #{job['id']} {job['name']} (en attente, position {position})")
+    if not state["running"] and not state["queued"]:
+        lines.append("  aucun job")
+    return "\n".join(lines)
@@ -0,0 +1,344 @@
+"""
+telemetry.py — Mesure des ressources consommées par les sous-processus.
+
+Pendant qu'un moteur exécute une commande (``BaseEngine._execute_command``),
+un ``TelemetrySampler`` relève à intervalle fixe l'usage cumulé de tout le
+groupe de processus de l'enfant (``setsid`` : COLMAP et ses workers, ffmpeg,
+Brush…) : temps CPU, RSS, octets lus / écrits sur disque, threads.
+
+La lecture passe par un ``TelemetryBackend`` interchangeable :
+
+  - ``ProcBackend`` (Linux) : ``/proc/<pid>/stat`` (groupe, temps CPU),
+    ``status`` (VmRSS, Threads) et ``io`` (read_bytes, write_bytes) ;
+  - ``DarwinBackend`` (macOS) : ``libproc`` via ctypes (``proc_listpids``,
+    ``proc_pidinfo``, ``proc_pid_rusage``).
+
+Les échantillons sont écrits en JSONL (une ligne d'en-tête, un échantillon
+par ligne, une ligne de résumé) ; ``format_summary`` donne les pics et
+moyennes pour le log du moteur.
+"""
+import contextlib
+import ctypes
+import ctypes.util
+import json
+import os
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+DEFAULT_INTERVAL = 1.0
+
+
+@dataclass
+class GroupUsage:
+    """Usage d'un groupe de processus à un instant (compteurs cumulés)."""
+    cpu_time: float  # secondes CPU (utilisateur + système, enfants récoltés inclus)
+    rss: int  # octets
+    read_bytes: int
+    write_bytes: int
+    threads: int
+    processes: int
+
+
+@dataclass
+class Sample:
+    t: float  # secondes depuis le début de l'exécution
+    cpu_percent: float  # 100 = un cœur
+    rss: int
+    read_bytes: int  # cumulés depuis le début
+    write_bytes: int
+    threads: int
+    processes: int
+
+
+class TelemetryBackend:
+    """Lecture de l'usage cumulé d'un groupe de processus."""
+
+    def group_usage(self, pgid: int) -> GroupUsage | None:
+        """None si le groupe n'a plus aucun membre lisible."""
+        raise NotImplementedError()
+
+
+class ProcBackend(TelemetryBackend):
+    """Backend Linux : parcours de ``/proc`` (``root`` remplaçable pour les tests)."""
+
+    def __init__(self, root: str | Path = "/proc"):
+        self.root = Path(root)
+        self.clock_ticks = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+    @staticmethod
+    def _read(path: Path) -> str | None:
+        try:
+            return path.read_text()
+        except OSError:  # processus terminé entre-temps, ou io illisible
+            return None
+
+    @staticmethod
+    def _fields(text: str | None, keys: tuple[str, ...]) -> dict[str, int]:
+        """Valeurs entières ``clé: valeur [unité]`` de status / io."""
+        values = {}
+        for line in (text or "").splitlines():
+            key, _, rest = line.partition(":")
+            if key in keys and rest.split():
+                values[key] = int(rest.split()[0])
+        return values
+
+    def group_usage(self, pgid: int) -> GroupUsage | None:
+        usage = GroupUsage(0.0, 0, 0, 0, 0, 0)
+        ticks = 0
+        try:
+            entries = list(os.scandir(self.root))
+        except OSError:
+            return None
+        for entry in entries:
+            if not entry.name.isdigit():
+                continue
+            stat = self._read(Path(entry.path) / "stat")
+            if not stat:
+                continue
+            # Le nom (champ 2) peut contenir des espaces et des parenthèses.
+            fields = stat.rsplit(")", 1)[-1].split()
+            if len(fields) < 15 or fields[2] != str(pgid):
+                continue
+            if fields[0] == "Z":  # terminé, pas encore récolté : plus de VmRSS
+                continue
+            # utime, stime, cutime, cstime : champs 14 à 17 de stat(5).
+            ticks += sum(int(v) for v in fields[11:15])
+            status = self._fields(self._read(Path(entry.path) / "status"), ("VmRSS", "Threads"))
+            io = self._fields(self._read(Path(entry.path) / "io"), ("read_bytes", "write_bytes"))
+            usage.rss += status.get("VmRSS", 0) * 1024
+            usage.threads += status.get("Threads", 1)
+            usage.read_bytes += io.get("read_bytes", 0)
+            usage.write_bytes += io.get("write_bytes", 0)
+            usage.processes += 1
+        if not usage.processes:
+            return None
+        usage.cpu_time = ticks / self.clock_ticks
+        return usage
+
+
+class _TaskInfo(ctypes.Structure):
+    _fields_ = [
+        ("pti_virtual_size", ctypes.c_uint64),
+        ("pti_resident_size", ctypes.c_uint64),
+        ("pti_total_user", ctypes.c_uint64),
+        ("pti_total_system", ctypes.c_uint64),
+        ("pti_threads_user", ctypes.c_uint64),
+        ("pti_threads_system", ctypes.c_uint64),
+        ("pti_policy", ctypes.c_int32),
+        ("pti_faults", ctypes.c_int32),
+        ("pti_pageins", ctypes.c_int32),
+        ("pti_cow_faults", ctypes.c_int32),
+        ("pti_messages_sent", ctypes.c_int32),
+        ("pti_messages_received", ctypes.c_int32),
+        ("pti_syscalls_mach", ctypes.c_int32),
+        ("pti_syscalls_unix", ctypes.c_int32),
+        ("pti_csw", ctypes.c_int32),
+        ("pti_threadnum", ctypes.c_int32),
+        ("pti_numrunning", ctypes.c_int32),
+        ("pti_priority", ctypes.c_int32),
+    ]
+
+
+class _RusageInfoV2(ctypes.Structure):
+    _fields_ = [("ri_uuid", ctypes.c_uint8 * 16)] + [
+        (name, ctypes.c_uint64) for name in (
+            "ri_user_time", "ri_system_time", "ri_pkg_idle_wkups", "ri_interrupt_wkups",
+            "ri_pageins", "ri_wired_size", "ri_resident_size", "ri_phys_footprint",
+            "ri_proc_start_abstime", "ri_proc_exit_abstime", "ri_child_user_time",
+            "ri_child_system_time", "ri_child_pkg_idle_wkups", "ri_child_interrupt_wkups",
+            "ri_child_pageins", "ri_child_elapsed_abstime", "ri_diskio_bytesread",
+            "ri_diskio_byteswritten",
+        )
+    ]
+
+
+class _TimebaseInfo(ctypes.Structure):
+    _fields_ = [("numer", ctypes.c_uint32), ("denom", ctypes.c_uint32)]
+
+
+class DarwinBackend(TelemetryBackend):
+    """Backend macOS : ``libproc`` (pas de ``/proc``, ``ps`` trop coûteux)."""
+    _PROC_PGRP_ONLY = 2
+    _PROC_PIDTASKINFO = 4
+    _RUSAGE_INFO_V2 = 2
+
+    def __init__(self):
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.dylib", use_errno=True)
+        self._libproc = ctypes.CDLL(ctypes.util.find_library("proc") or "libproc.dylib", use_errno=True)
+        timebase = _TimebaseInfo()
+        self._libc.mach_timebase_info(ctypes.byref(timebase))
+        # Temps en unités mach (ns sur Intel, ticks de 41,67 ns sur Apple Silicon).
+        self._seconds_per_tick = timebase.numer / timebase.denom / 1e9 if timebase.denom else 1e-9
+
+    def _pids(self, pgid: int) -> list[int]:
+        size = self._libproc.proc_listpids(self._PROC_PGRP_ONLY, pgid, None, 0)
+        if size <= 0:
+            return []
+        buffer = (ctypes.c_int * (size // ctypes.sizeof(ctypes.c_int) + 16))()
+        size = self._libproc.proc_listpids(self._PROC_PGRP_ONLY, pgid, buffer, ctypes.sizeof(buffer))
+        return [pid for pid in buffer[:max(0, size) // ctypes.sizeof(ctypes.c_int)] if pid > 0]
+
+    def group_usage(self, pgid: int) -> GroupUsage | None:
+        usage = GroupUsage(0.0, 0, 0, 0, 0, 0)
+        ticks = 0
+        for pid in self._pids(pgid):
+            info = _TaskInfo()
+            if self._libproc.proc_pidinfo(pid, self._PROC_PIDTASKINFO, 0,
+                                          ctypes.byref(info), ctypes.sizeof(info)) != ctypes.sizeof(info):
+                continue  # terminé entre-temps
+            rusage = _RusageInfoV2()
+            if self._libproc.proc_pid_rusage(pid, self._RUSAGE_INFO_V2, ctypes.byref(rusage)) == 0:
+                ticks += rusage.ri_child_user_time + rusage.ri_child_system_time
+                usage.read_bytes += rusage.ri_diskio_bytesread
+                usage.write_bytes += rusage.ri_diskio_byteswritten
+            ticks += info.pti_total_user + info.pti_total_system
+            usage.rss += info.pti_resident_size
+            usage.threads += info.pti_threadnum
+            usage.processes += 1
+        if not usage.processes:
+            return None
+        usage.cpu_time = ticks * self._seconds_per_tick
+        return usage
+
+
+def default_backend() -> TelemetryBackend | None:
+    """Backend de la plateforme courante ; None si aucun n'est disponible."""
+    if sys.platform.startswith("linux") and Path("/proc/self/stat").exists():
+        return ProcBackend()
+    if sys.platform == "darwin":
+        with contextlib.suppress(OSError, AttributeError):
+            return DarwinBackend()
+    return None
+
+
+def summarize(samples: list[Sample]) -> dict | None:
+    """Pics et moyennes d'une série d'échantillons (None si vide)."""
+    if not samples:
+        return None
+    n = len(samples)
+    return {
+        "samples": n,
+        "duration": samples[-1].t,
+        "cpu_percent_mean": sum(s.cpu_percent for s in samples) / n,
+        "cpu_percent_peak": max(s.cpu_percent for s in samples),
+        "rss_mean": sum(s.rss for s in samples) // n,
+        "rss_peak": max(s.rss for s in samples),
+        "threads_mean": sum(s.threads for s in samples) / n,
+        "threads_peak": max(s.threads for s in samples),
+        "processes_peak": max(s.processes for s in samples),
+        "read_bytes": samples[-1].read_bytes,
+        "write_bytes": samples[-1].write_bytes,
+    }
+
+
+def _size(value: float) -> str:
+    for unit in ("o", "Ko", "Mo", "Go"):
+        if abs(value) < 1024 or unit == "Go":
+            return f"{value:.0f} {unit}" if unit == "o" else f"{value:.1f} {unit}"
+        value /= 1024
+    return f"{value:.1f} Go"
+
+
+def format_summary(summary: dict) -> str:
+    return (
+        f"CPU moy {summary['cpu_percent_mean']:.0f} % / pic {summary['cpu_percent_peak']:.0f} %, "
+        f"RSS moy {_size(summary['rss_mean'])} / pic {_size(summary['rss_peak'])}, "
+        f"threads moy {summary['threads_mean']:.0f} / pic {summary['threads_peak']}, "
+        f"lu {_size(summary['read_bytes'])}, écrit {_size(summary['write_bytes'])} "
+        f"({summary['samples']} échantillons sur {summary['duration']:.0f} s)"
+    )
+
+
+def run_path(directory: str | Path, label: str) -> Path:
+    """Chemin libre ``directory/<horodatage>-<label>.jsonl``."""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    stem = f"{time.strftime('%Y%m%d-%H%M%S')}-{''.join(c if c.isalnum() or c in '-_.' else '_' for c in label)}"
+    path, n = directory / f"{stem}.jsonl", 1
+    while path.exists():
+        n += 1
+        path = directory / f"{stem}-{n}.jsonl"
+    return path
+
+
+class TelemetrySampler:
+    """Échantillonne le groupe ``pgid`` dans un thread démon jusqu'à ``stop()``.
+
+    Les compteurs cumulés (CPU, I/O) ne reculent pas quand un membre du
+    groupe se termine : chaque échantillon garde le maximum déjà vu.
+    """
+
+    def __init__(self, pgid: int, path: str | Path, backend: TelemetryBackend,
+                 interval: float = DEFAULT_INTERVAL, header: dict | None = None):
+        self.pgid = pgid
+        self.path = Path(path)
+        self.backend = backend
+        self.interval = interval
+        self.header = header or {}
+        self.samples: list[Sample] = []
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._file = None
+        self._start = 0.0
+        self._base: GroupUsage | None = None
+        self._last_t = 0.0
+        self._last_cpu = 0.0
+        self._read = self._written = 0
+
+    def start(self) -> "TelemetrySampler":
+        self._start = time.monotonic()
+        self._base = self.backend.group_usage(self.pgid)
+        self._file = open(self.path, "w", encoding="utf-8")  # noqa: SIM115 — fermé par stop()
+        self._write({"pgid": self.pgid, "interval": self.interval, "started": time.time(), **self.header})
+        self._thread = threading.Thread(target=self._loop, name=f"telemetry-{self.pgid}", daemon=True)
+        self._thread.start()
+        return self
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            if self.sample() is None and self._base is not None:
+                break  # groupe terminé
+
+    def sample(self) -> Sample | None:
+        """Relève et enregistre un échantillon (None si le groupe a disparu)."""
+        usage = self.backend.group_usage(self.pgid)
+        if usage is None:
+            return None
+        if self._base is None:
+            self._base = GroupUsage(0.0, 0, 0, 0, 0, 0)
+        t = time.monotonic() - self._start
+        cpu = max(self._last_cpu, usage.cpu_time - self._base.cpu_time)
+        elapsed = t - self._last_t
+        self._read = max(self._read, usage.read_bytes - self._base.read_bytes)
+        self._written = max(self._written, usage.write_bytes - self._base.write_bytes)
+        sample = Sample(
+            t=round(t, 3),
+            cpu_percent=round(100.0 * (cpu - self._last_cpu) / elapsed, 1) if elapsed > 0 else 0.0,
+            rss=usage.rss, read_bytes=self._read, write_bytes=self._written,
+            threads=usage.threads, processes=usage.processes,
+        )
+        self._last_t, self._last_cpu = t, cpu
+        self.samples.append(sample)
+        self._write(asdict(sample))
+        return sample
+
+    def stop(self) -> dict | None:
+        """Arrête l'échantillonnage, ferme le JSONL ; renvoie ``summarize``."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        summary = summarize(self.samples)
+        if self._file is not None:
+            if summary:
+                self._write({"summary": summary})
+            self._file.close()
+            self._file = None
+        return summary
+
+    def _write(self, record: dict) -> None:
+        with contextlib.suppress(OSError, ValueError):
+            self._file.write(json.dumps(record) + "\n")
+            self._file.flush()
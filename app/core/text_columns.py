@@ -0,0 +1,168 @@
+"""
+text_columns.py — Vectorised, byte-exact text formatting of numeric columns.
+
+The point-cloud text exporters (XYZ/OBJ/ASCII PLY) write millions of rows.
+Formatting them one ``f"..."`` at a time is interpreter-bound, so rows are
+instead produced a chunk at a time:
+
+  - ``write_rows`` formats a chunk with a single ``%`` call on the repeated
+    row format (any format, e.g. ``%r`` shortest float repr);
+  - ``fixed_point_chars`` / ``table_chars`` render ``%.Nf`` fields and small
+    lookup tables directly as NumPy byte matrices, which ``join_char_columns``
+    concatenates and compacts into the final text.
+
+Both paths produce exactly the bytes Python's ``"%.Nf" % value`` would:
+rounding is done half-to-even on the *exact* binary value (Dekker
+two-product), as CPython's correctly-rounded dtoa does.
+"""
+from itertools import chain
+
+import numpy as np
+
+# Rows formatted per write by the text exporters.
+TEXT_CHUNK = 1 << 16
+
+# Veltkamp splitter (2**27 + 1) for the error-free two-product.
+_SPLITTER = 134217729.0
+# Largest |value * 10**decimals| handled by the byte renderer: keeps the
+# scaled value an exact integer in float64 and int64.
+_FIXED_MAX_SCALED = float(2 ** 52)
+# "00".."99" as uint16, so two digits are emitted per lookup.
+_DIGIT_PAIRS = np.frombuffer("".join(f"{i:02d}" for i in range(100)).encode("ascii"), dtype=np.uint16)
+
+
+def write_rows(fout, row_fmt, n, columns, render=None, chunk_size=None):
+    """Write ``n`` rows of ``row_fmt % row`` to ``fout`` in chunks.
+
+    ``columns(start, stop)`` returns one sequence per format field for that
+    slice (NumPy arrays are converted with ``tolist``). ``render(start,
+    stop)``, when given, may return the chunk text directly (fast byte
+    renderer) or None to use the ``%`` path for that chunk.
+    """
+    chunk_size = chunk_size or TEXT_CHUNK
+    for start in range(0, n, chunk_size):
+        stop = min(start + chunk_size, n)
+        text = render(start, stop) if render else None
+        if text is None:
+            cols = [c.tolist() if isinstance(c, np.ndarray) else c for c in columns(start, stop)]
+            text = (row_fmt * (stop - start)) % tuple(chain.from_iterable(zip(*cols, strict=True)))
+        fout.write(text)
+
+
+def _round_scaled(values, decimals, exact=False):
+    """``values * 10**decimals`` rounded half-to-even on the exact product, as
+    int64, or None if a value is non-finite or too large."""
+    scale = float(10 ** decimals)
+    p = values * scale
+    if not np.all(np.abs(p) < _FIXED_MAX_SCALED):
+        return None
+    if exact:
+        return np.rint(p).astype(np.int64)
+    # err = values*scale - p exactly (Dekker, no FMA needed).
+    c = _SPLITTER * values
+    vh = c - (c - values)
+    vl = values - vh
+    c = _SPLITTER * scale
+    sh = c - (c - scale)
+    sl = scale - sh
+    err = ((vh * sh - p) + vh * sl + vl * sh) + vl * sl
+    # Nearest integer to p, then correct by ±1 using the exact remainder
+    # (t ± 0.5 is exact, so the sign tests below are exact too).
+    r = np.rint(p)
+    t = p - r
+    hi = (t - 0.5) + err
+    lo = (t + 0.5) + err
+    ri = r.astype(np.int64)
+    odd = (ri & 1).astype(bool)
+    ri += (hi > 0) | ((hi == 0) & odd)
+    ri -= (lo < 0) | ((lo == 0) & odd)
+    return ri
+
+
+def _put_digits(chars, end, values, count):
+    """Write the ``count`` low decimal digits of ``values`` right-aligned so
+    the last one lands in column ``end - 1``."""
+    n = len(values)
+    while count >= 2:
+        q = values // 100
+        chars[:, end - 2:end] = np.take(_DIGIT_PAIRS, values - q * 100).view(np.uint8).reshape(n, 2)
+        values = q
+        end -= 2
+        count -= 2
+    if count:
+        chars[:, end - 1] = values % 10 + 48
+
+
+def fixed_point_chars(values, decimals, exact=False):
+    """Render float64 ``values`` as ``"%.{decimals}f"`` text.
+
+    Returns ``(chars, mask)``: a uint8 matrix with one row per value and the
+    boolean mask of the bytes that belong to the text (leading sign/zeros are
+    masked out). Returns None when a value is out of the renderer's range.
+    ``exact=True`` skips the two-product when the caller knows
+    ``values * 10**decimals`` is exact in float64 (float32 inputs with
+    ``decimals <= 6``: 24 + 20 bits of mantissa).
+    """
+    r = _round_scaled(values, decimals, exact)
+    if r is None:
+        return None
+    n = len(values)
+    a = np.abs(r)
+    p10 = 10 ** decimals
+    ip = a // p10
+    top = int(ip.max()) if n else 0
+    k = len(str(top))
+    width = 1 + k + (1 + decimals if decimals else 0)
+    chars = np.empty((n, width), dtype=np.uint8)
+    mask = np.ones((n, width), dtype=bool)
+    chars[:, 0] = ord("-")
+    mask[:, 0] = np.signbit(values)  # "%.6f" % -1e-9 == "-0.000000"
+    _put_digits(chars, 1 + k, ip.astype(np.uint32 if top < 2 ** 32 else np.uint64), k)
+    for c in range(k - 1):
+        mask[:, 1 + c] = ip >= 10 ** (k - 1 - c)
+    if decimals:
+        chars[:, 1 + k] = ord(".")
+        _put_digits(chars, width, (a - ip * p10).astype(np.uint32 if decimals <= 9 else np.uint64), decimals)
+    return chars, mask
+
+
+def text_table(strings):
+    """Pre-render a lookup table of ASCII strings for ``table_chars``."""
+    width = max((len(s) for s in strings), default=0)
+    chars = np.zeros((len(strings), width), dtype=np.uint8)
+    mask = np.zeros((len(strings), width), dtype=bool)
+    for i, s in enumerate(strings):
+        raw = s.encode("ascii")
+        chars[i, :len(raw)] = np.frombuffer(raw, dtype=np.uint8)
+        mask[i, :len(raw)] = True
+    return chars, mask
+
+
+def table_chars(index, table):
+    """Rows of a ``text_table`` selected by integer ``index``."""
+    chars, mask = table
+    width = chars.shape[1]
+    # Gather whole rows at once through a fixed-size void view.
+    rows = np.take(chars.view(f"V{width}").ravel(), index).view(np.uint8).reshape(len(index), width)
+    if mask.all():
+        return rows, np.ones(rows.shape, dtype=bool)
+    return rows, mask[index]
+
+
+def join_char_columns(pieces, n):
+    """Concatenate literal ``bytes`` and ``(chars, mask)`` pieces row-wise and
+    return the compacted text, or None if any piece is None."""
+    if any(piece is None for piece in pieces):
+        return None
+    widths = [len(p) if isinstance(p, bytes) else p[0].shape[1] for p in pieces]
+    chars = np.empty((n, sum(widths)), dtype=np.uint8)
+    mask = np.ones((n, sum(widths)), dtype=bool)
+    col = 0
+    for piece, width in zip(pieces, widths, strict=True):
+        if isinstance(piece, bytes):
+            chars[:, col:col + width] = np.frombuffer(piece, dtype=np.uint8)
+        else:
+            chars[:, col:col + width] = piece[0]
+            mask[:, col:col + width] = piece[1]
+        col += width
+    return np.compress(mask.ravel(), chars.ravel()).tobytes().decode("ascii")
@@ -0,0 +1,509 @@
+"""
+video_frames.py — Extraction de frames FFmpeg avec filtrage du flou en flux.
+
+Le mode classique écrit toutes les frames en JPEG puis les relit pour
+mesurer leur netteté et déplacer les floues. Ici FFmpeg décode vers un pipe
+(flux ``image2pipe`` de PPM : un en-tête texte minimal par frame, pixels
+RGB bruts), chaque frame est notée en mémoire (variance du Laplacien) et
+seules les frames retenues sont encodées et écrites. Les frames rejetées ne
+touchent jamais le disque.
+
+La sélection de keyframes (``scan_motion`` → ``select_keyframes`` →
+``extract_frame_indices``) remplace l'échantillonnage fixe : une passe
+d'analyse à basse résolution mesure le mouvement de la caméra (flux optique)
+entre candidates, puis un budget de frames est réparti sur le mouvement
+cumulé et seules ces frames sont décodées en pleine résolution et écrites.
+
+La médiane globale de ``select_blurry_files`` n'est pas connue en flux : un
+``RollingBlurFilter`` compare chaque frame à la médiane des ``window``
+dernières (elle incluse), ce qui suit aussi les changements d'éclairage ou
+de texture au fil d'un long vol.
+"""
+import bisect
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+# Fenêtre glissante par défaut (frames) pour la médiane de netteté.
+DEFAULT_BLUR_WINDOW = 31
+# Qualité JPEG des frames écrites (≈ -qscale:v 2 de FFmpeg).
+JPEG_QUALITY = 95
+# Délai (s) sans nouvelle frame au-delà duquel FFmpeg est considéré bloqué.
+READ_TIMEOUT = 120.0
+
+
+def laplacian_variance(gray) -> float:
+    """Variance du Laplacien (float32, accumulée en double) d'une image 8 bits."""
+    import cv2
+    _, std = cv2.meanStdDev(cv2.Laplacian(gray, cv2.CV_32F))
+    return float(std[0, 0]) ** 2
+
+
+class RollingBlurFilter:
+    """Décision flou/net en flux contre une médiane glissante.
+
+    Une frame est rejetée si son score est inférieur à ``factor`` × la médiane
+    des ``window`` derniers scores (elle comprise). Comme dans
+    ``select_blurry_files``, au plus ``max_remove_frac`` des frames vues
+    jusque-là peuvent être rejetées ; ``factor <= 0`` désactive le filtre.
+    """
+
+    def __init__(self, factor: float, window: int = DEFAULT_BLUR_WINDOW, max_remove_frac: float = 0.5):
+        self.factor = factor
+        self.window = max(1, int(window))
+        self.max_remove_frac = max_remove_frac
+        self._recent = deque()
+        self._sorted = []
+        self.seen = 0
+        self.rejected = 0
+
+    def median(self) -> float:
+        s = self._sorted
+        mid = len(s) // 2
+        return s[mid] if len(s) % 2 else (s[mid - 1] + s[mid]) / 2.0
+
+    def accept(self, score: float) -> bool:
+        """Enregistre ``score`` et retourne True si la frame doit être gardée."""
+        self._recent.append(score)
+        bisect.insort(self._sorted, score)
+        if len(self._recent) > self.window:
+            old = self._recent.popleft()
+            del self._sorted[bisect.bisect_left(self._sorted, old)]
+        self.seen += 1
+        if self.factor <= 0 or score >= self.median() * self.factor:
+            return True
+        if self.rejected + 1 > self.max_remove_frac * self.seen:
+            return True
+        self.rejected += 1
+        return False
+
+
+def select_blurry_rolling(scores, factor: float, window: int = DEFAULT_BLUR_WINDOW,
+                          max_remove_frac: float = 0.5) -> list[int]:
+    """Indices des scores (dans l'ordre des frames) rejetés par ``RollingBlurFilter``."""
+    rolling = RollingBlurFilter(factor, window, max_remove_frac)
+    return [i for i, s in enumerate(scores) if not rolling.accept(s)]
+
+
+def _read_exact(stream, size: int) -> bytes | None:
+    buf = bytearray(size)
+    view = memoryview(buf)
+    got = 0
+    while got < size:
+        n = stream.readinto(view[got:])
+        if not n:
+            return None if got == 0 else bytes(buf[:got])
+        got += n
+    return bytes(buf)
+
+
+def _read_ppm_header(stream) -> tuple[int, int, int] | None:
+    """Lit ``P6 <w> <h> <maxval>`` suivi d'un blanc ; None en fin de flux."""
+    tokens = []
+    token = b""
+    while len(tokens) < 4:
+        c = stream.read(1)
+        if not c:
+            if tokens or token:
+                raise ValueError("Flux PPM tronqué (en-tête incomplet).")
+            return None
+        if c.isspace():
+            if token:
+                tokens.append(token)
+                token = b""
+        elif c == b"#" and not token:
+            stream.readline()  # commentaire
+        else:
+            token += c
+    if tokens[0] != b"P6":
+        raise ValueError(f"Flux PPM invalide (signature {tokens[0]!r}).")
+    width, height, maxval = (int(t) for t in tokens[1:])
+    if maxval > 255:
+        raise ValueError("PPM 16 bits non supporté.")
+    return width, height, maxval
+
+
+def read_ppm_frames(stream):
+    """Itère les frames RGB (tableaux h×w×3 uint8) d'un flux PPM concaténé."""
+    while True:
+        header = _read_ppm_header(stream)
+        if header is None:
+            return
+        width, height, _ = header
+        data = _read_exact(stream, width * height * 3)
+        if data is None or len(data) != width * height * 3:
+            raise ValueError("Flux PPM tronqué (frame incomplète).")
+        yield np.frombuffer(data, dtype=np.uint8).reshape(height, width, 3)
+
+
+def build_pipe_command(ffmpeg_bin: str, video_path, fps, hwaccel: str | None = None,
+                       width: int | None = None) -> list:
+    """Commande FFmpeg décodant ``video_path`` à ``fps`` vers stdout (PPM).
+
+    ``width`` réduit les frames (hauteur proportionnelle) après l'échantillonnage
+    ``fps`` : la numérotation des frames est la même qu'en pleine résolution.
+    """
+    cmd = [ffmpeg_bin, "-hide_banner", "-loglevel", "error", "-nostdin"]
+    if hwaccel:
+        cmd.extend(["-hwaccel", hwaccel])
+    vf = f"fps={fps}" + (f",scale={int(width)}:-2" if width else "")
+    cmd.extend([
+        "-i", str(video_path),
+        "-vf", vf,
+        "-f", "image2pipe", "-c:v", "ppm", "-pix_fmt", "rgb24",
+        "-",
+    ])
+    return cmd
+
+
+class FramePipe:
+    """Processus FFmpeg dont on itère les frames RGB décodées.
+
+    ``close()`` attend la fin du processus et retourne son code ; ``error``
+    résume alors stderr en cas d'échec. Le processus est lancé dans son
+    propre groupe (``BaseEngine.stop`` tue le groupe de ``self.process``) ;
+    stderr est drainé dans un thread.
+
+    Un chien de garde tue FFmpeg si aucune frame n'arrive pendant
+    ``read_timeout`` secondes (entrée réseau ou décodeur matériel bloqués) :
+    l'itération lève alors ``ValueError``. Seule l'attente d'une frame est
+    chronométrée, pas le traitement fait par l'appelant entre deux frames.
+    ``read_timeout=None`` désactive le délai.
+    """
+
+    def __init__(self, ffmpeg_bin: str, video_path, fps, hwaccel: str | None = None,
+                 width: int | None = None, read_timeout: float | None = READ_TIMEOUT):
+        self.proc = subprocess.Popen(
+            build_pipe_command(ffmpeg_bin, video_path, fps, hwaccel, width),
+            stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            start_new_session=sys.platform != "win32",
+        )
+        self.returncode = None
+        self.read_timeout = read_timeout
+        self.timed_out = False
+        self._waiting_since = None
+        self._closed = threading.Event()
+        self._stderr = deque(maxlen=20)
+        self._drain = threading.Thread(target=self._drain_stderr, daemon=True)
+        self._drain.start()
+        if read_timeout:
+            threading.Thread(target=self._watchdog, daemon=True).start()
+
+    def _drain_stderr(self):
+        for line in self.proc.stderr:
+            self._stderr.append(line.decode(errors="replace").strip())
+
+    def _watchdog(self):
+        poll = min(1.0, self.read_timeout / 4)
+        while not self._closed.wait(poll):
+            since = self._waiting_since
+            if since is not None and time.monotonic() - since > self.read_timeout:
+                self.timed_out = True
+                if self.proc.poll() is None:
+                    self.proc.kill()
+                return
+
+    def __iter__(self):
+        frames = read_ppm_frames(self.proc.stdout)
+        while True:
+            self._waiting_since = time.monotonic()
+            try:
+                frame = next(frames)
+            except StopIteration:
+                frame = None
+            except ValueError:
+                if not self.timed_out:
+                    raise
+                frame = None
+            finally:
+                self._waiting_since = None
+            if self.timed_out:
+                raise ValueError(self._timeout_message())
+            if frame is None:
+                return
+            yield frame
+
+    def _timeout_message(self) -> str:
+        return f"ffmpeg n'a produit aucune frame pendant {self.read_timeout:g} s (processus arrêté)."
+
+    def terminate(self):
+        if self.proc.poll() is None:
+            self.proc.terminate()
+
+    def close(self) -> int:
+        if self.returncode is None:
+            self._closed.set()
+            self.proc.stdout.close()
+            self.returncode = self.proc.wait()
+            self._drain.join(timeout=5)
+        return self.returncode
+
+    @property
+    def error(self) -> str:
+        if self.timed_out:
+            return self._timeout_message()
+        if self.returncode in (None, 0):
+            return ""
+        return "\n".join(self._stderr) or f"ffmpeg a échoué (code {self.returncode})"
+
+
+def _score_frame(rgb, downscale: int) -> float:
+    import cv2
+    gray = cv2.cvtColor(rgb, cv2.COLOR_RGB2GRAY)
+    if downscale > 1:
+        h, w = gray.shape
+        gray = cv2.resize(gray, (max(1, w // downscale), max(1, h // downscale)),
+                          interpolation=cv2.INTER_AREA)
+    return laplacian_variance(gray)
+
+
+def _write_jpeg(path: Path, rgb) -> None:
+    import cv2
+    cv2.imwrite(str(path), cv2.cvtColor(rgb, cv2.COLOR_RGB2BGR), [cv2.IMWRITE_JPEG_QUALITY, JPEG_QUALITY])
+
+
+def _write_selected(pipe: FramePipe, images_dir: Path, pattern: str, keep, stats: dict,
+                    is_cancelled=None, on_frame=None, writers: int = 2,
+                    last_index: int | None = None) -> None:
+    """Écrit en JPEG les frames de ``pipe`` pour lesquelles ``keep(index, rgb)``.
+
+    L'encodage se fait dans ``writers`` threads, au plus ``2 × writers``
+    frames en attente (mémoire bornée). Après la frame ``last_index``, FFmpeg
+    est arrêté : la suite de la vidéo n'est pas décodée.
+    """
+    writers = max(1, writers)
+    pending = deque()
+    stopped = False
+    try:
+        with ThreadPoolExecutor(max_workers=writers) as pool:
+            for index, rgb in enumerate(pipe, start=1):
+                if is_cancelled and is_cancelled():
+                    stats["cancelled"] = True
+                    pipe.terminate()
+                    break
+                stats["frames"] += 1
+                kept = keep(index, rgb)
+                if kept:
+                    while len(pending) >= 2 * writers:
+                        pending.popleft().result()
+                    pending.append(pool.submit(_write_jpeg, images_dir / (pattern % index), rgb))
+                    stats["written"] += 1
+                else:
+                    stats["rejected"] += 1
+                if on_frame:
+                    on_frame(index, kept)
+                if last_index is not None and index >= last_index:
+                    stopped = True
+                    pipe.terminate()
+                    break
+            for future in pending:
+                future.result()
+    except ValueError as e:
+        stats["error"] = str(e)
+        pipe.terminate()
+    stats["returncode"] = pipe.close()
+    if not stats["error"] and not stats["cancelled"] and not stopped:
+        stats["error"] = pipe.error
+
+
+def _new_stats() -> dict:
+    return {"frames": 0, "written": 0, "rejected": 0, "returncode": None, "cancelled": False, "error": ""}
+
+
+def extract_sharp_frames(
+    ffmpeg_bin: str, video_path, images_dir, fps, prefix: str | None = None,
+    factor: float = 0.7, window: int = DEFAULT_BLUR_WINDOW, downscale: int = 1,
+    max_remove_frac: float = 0.5, hwaccel: str | None = None,
+    is_cancelled=None, on_frame=None, on_process=None, writers: int = 2,
+) -> dict:
+    """Extrait les frames nettes de ``video_path`` dans ``images_dir``.
+
+    Les frames gardent la numérotation d'FFmpeg (``<prefix>_%04d.jpg``, à
+    partir de 1) : les trous correspondent aux frames floues écartées.
+
+    ``on_frame(index, kept)`` est appelé pour chaque frame, ``on_process(proc)``
+    reçoit le processus FFmpeg (pour l'interrompre). Retourne
+    ``{"frames", "written", "rejected", "returncode", "cancelled", "error"}``.
+    """
+    images_dir = Path(images_dir)
+    images_dir.mkdir(parents=True, exist_ok=True)
+    rolling = RollingBlurFilter(factor, window, max_remove_frac)
+    stats = _new_stats()
+    pipe = FramePipe(ffmpeg_bin, video_path, fps, hwaccel)
+    if on_process:
+        on_process(pipe.proc)
+    _write_selected(
+        pipe, images_dir, _frame_pattern(prefix),
+        lambda index, rgb: rolling.accept(_score_frame(rgb, downscale)),
+        stats, is_cancelled, on_frame, writers,
+    )
+    return stats
+
+
+def _frame_pattern(prefix: str | None) -> str:
+    return f"{prefix}_%04d.jpg" if prefix else "frame_%04d.jpg"
+
+
+# ── Sélection de keyframes par mouvement ────────────────────────────────────
+
+# Largeur des frames d'analyse (flux optique) — la passe 1 décode à cette taille.
+ANALYSIS_WIDTH = 320
+# Mouvement résiduel (fraction de largeur / frame) assimilé au bruit du flux.
+MOTION_NOISE = 0.002
+
+
+def frame_motion(prev_gray, gray) -> float:
+    """Mouvement apparent entre deux frames (fraction de la largeur).
+
+    Médiane de la norme du flux optique de Farneback : robuste aux objets
+    mobiles, elle suit le déplacement dominant (translation ou rotation de
+    la caméra).
+    """
+    import cv2
+    flow = cv2.calcOpticalFlowFarneback(prev_gray, gray, None, 0.5, 3, 15, 3, 5, 1.2, 0)
+    magnitude = np.sqrt(flow[..., 0] ** 2 + flow[..., 1] ** 2)
+    return float(np.median(magnitude)) / gray.shape[1]
+
+
+def scan_motion(
+    ffmpeg_bin: str, video_path, fps, width: int = ANALYSIS_WIDTH,
+    hwaccel: str | None = None, is_cancelled=None, on_frame=None, on_process=None,
+) -> dict:
+    """Passe d'analyse : mouvement et netteté de chaque frame candidate.
+
+    Décode la vidéo réduite à ``width`` pixels ; ne garde que la frame
+    précédente en mémoire. Retourne ``{"motion", "sharpness", "cancelled",
+    "error"}`` où ``motion[i]`` est le mouvement entre les candidates i-1 et
+    i (``motion[0] = 0``).
+    """
+    import cv2
+    motion, sharpness = [], []
+    result = {"motion": None, "sharpness": None, "cancelled": False, "error": ""}
+    pipe = FramePipe(ffmpeg_bin, video_path, fps, hwaccel, width)
+    if on_process:
+        on_process(pipe.proc)
+    prev = None
+    try:
+        for index, rgb in enumerate(pipe, start=1):
+            if is_cancelled and is_cancelled():
+                result["cancelled"] = True
+                pipe.terminate()
+                break
+            gray = cv2.cvtColor(rgb, cv2.COLOR_RGB2GRAY)
+            motion.append(0.0 if prev is None else frame_motion(prev, gray))
+            sharpness.append(laplacian_variance(gray))
+            prev = gray
+            if on_frame:
+                on_frame(index)
+    except ValueError as e:
+        result["error"] = str(e)
+        pipe.terminate()
+    pipe.close()
+    if not result["error"] and not result["cancelled"]:
+        result["error"] = pipe.error
+    result["motion"] = np.asarray(motion, dtype=np.float64)
+    result["sharpness"] = np.asarray(sharpness, dtype=np.float64)
+    return result
+
+
+def allocate_budget(weights, budget: int, minimum: int = 2) -> list[int]:
+    """Répartit ``budget`` frames entre vidéos au prorata de ``weights``.
+
+    Chaque vidéo reçoit au moins ``minimum`` frames (si le budget le permet) ;
+    le reste est distribué par plus forts restes.
+    """
+    weights = np.asarray(weights, dtype=np.float64)
+    n = len(weights)
+    if n == 0:
+        return []
+    base = np.full(n, min(minimum, budget // n), dtype=np.int64)
+    rest = budget - int(base.sum())
+    if rest <= 0:
+        return base.tolist()
+    total = weights.sum()
+    share = weights / total * rest if total > 0 else np.full(n, rest / n)
+    extra = np.floor(share).astype(np.int64)
+    order = np.argsort(-(share - extra), kind="stable")
+    extra[order[:rest - int(extra.sum())]] += 1
+    return (base + extra).tolist()
+
+
+def select_keyframes(motion, budget: int, sharpness=None, noise: float = MOTION_NOISE) -> np.ndarray:
+    """Indices (0-based, croissants) de ``budget`` frames réparties en mouvement.
+
+    Les cibles sont espacées régulièrement sur le mouvement cumulé (bruit
+    retranché) : les passages statiques ne reçoivent presque aucune frame,
+    les panoramiques rapides en reçoivent davantage. La première et la
+    dernière candidate sont toujours retenues. Avec ``sharpness``, chaque
+    cible prend la frame la plus nette à moins d'un quart d'intervalle.
+    """
+    motion = np.asarray(motion, dtype=np.float64)
+    n = len(motion)
+    if budget >= n:
+        return np.arange(n)
+    if budget <= 0:
+        return np.arange(0)
+    cum = np.cumsum(np.maximum(motion - noise, 0.0))
+    if budget == 1 or cum[-1] <= 0:
+        return np.unique(np.linspace(0, n - 1, budget).round().astype(np.int64))
+
+    targets = np.linspace(0.0, cum[-1], budget)
+    picks = np.unique(np.clip(np.searchsorted(cum, targets), 0, n - 1))
+    picks[0], picks[-1] = 0, n - 1
+
+    if sharpness is not None and len(picks) > 2:
+        sharpness = np.asarray(sharpness, dtype=np.float64)
+        refined = picks.copy()
+        for j in range(1, len(picks) - 1):
+            lo = picks[j] - (picks[j] - picks[j - 1]) // 4
+            hi = picks[j] + (picks[j + 1] - picks[j]) // 4
+            refined[j] = lo + int(np.argmax(sharpness[lo:hi + 1]))
+        picks = np.unique(refined)
+
+    # Les sauts de mouvement regroupent des cibles : on comble le budget en
+    # coupant les plus grands écarts de mouvement restants.
+    selected = set(picks.tolist())
+    while len(selected) < budget:
+        ordered = sorted(selected)
+        best, best_gap = None, 0.0
+        for a, b in zip(ordered[:-1], ordered[1:], strict=True):
+            if b - a > 1 and cum[b] - cum[a] >= best_gap:
+                best, best_gap = (a, b), cum[b] - cum[a]
+        if best is None:
+            break
+        a, b = best
+        mid = int(np.searchsorted(cum, (cum[a] + cum[b]) / 2.0))
+        selected.add(min(max(mid, a + 1), b - 1))
+    return np.asarray(sorted(selected), dtype=np.int64)
+
+
+def extract_frame_indices(
+    ffmpeg_bin: str, video_path, images_dir, fps, indices, prefix: str | None = None,
+    hwaccel: str | None = None, is_cancelled=None, on_frame=None, on_process=None,
+    writers: int = 2,
+) -> dict:
+    """Passe d'écriture : n'encode que les candidates d'``indices`` (0-based).
+
+    Même échantillonnage ``fps`` que ``scan_motion`` ; les fichiers gardent la
+    numérotation FFmpeg (index + 1). Retourne les mêmes stats que
+    ``extract_sharp_frames``.
+    """
+    images_dir = Path(images_dir)
+    images_dir.mkdir(parents=True, exist_ok=True)
+    wanted = {int(i) + 1 for i in indices}
+    stats = _new_stats()
+    if not wanted:
+        return stats
+    pipe = FramePipe(ffmpeg_bin, video_path, fps, hwaccel)
+    if on_process:
+        on_process(pipe.proc)
+    _write_selected(pipe, images_dir, _frame_pattern(prefix),
+                    lambda index, rgb: index in wanted, stats,
+                    is_cancelled, on_frame, writers, last_index=max(wanted))
+    return stats
@@ -1,7 +1,11 @@
 import contextlib
+from collections.abc import Callable
 
 from PySide6.QtCore import QThread, Signal
 
+from app.core.i18n import tr
+from app.core.scheduler import ResourceRequest, get_scheduler
+
 
 class BaseWorker(QThread):
     """Classe de base pour les workers avec signaux standardisés"""
@@ -25,5 +29,20 @@ class BaseWorker(QThread):
                 self.process.terminate()
         self.requestInterruption()
 
+    def run_scheduled(self, name: str, request: ResourceRequest, target: Callable[[], None]) -> None:
+        """Exécute ``target`` une fois le job admis par le planificateur commun
+        (``app.core.scheduler``) ; un arrêt pendant l'attente annule le job."""
+        scheduler = get_scheduler()
+        state = scheduler.snapshot()
+        if state["running"] or state["queued"]:
+            self.log_signal.emit(tr("msg_job_waiting", "En attente de ressources ({} job(s) en cours)…",
+                                    len(state["running"])))
+        with scheduler.reserve(name, request,
+                               is_cancelled=lambda: self.isInterruptionRequested() or not self.is_running) as job:
+            if job is None:
+                self.finished_signal.emit(False, tr("USER_CANCELLED"))
+                return
+            target()
+
     def parse_line(self, line):
         """A surcharger pour extraire la progression ou des infos spécifiques"""
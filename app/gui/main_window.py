@@ -1,12 +1,13 @@
 from pathlib import Path
 
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QTimer
 from PySide6.QtGui import QColor
 from PySide6.QtWidgets import QApplication, QLabel, QMainWindow, QMessageBox, QTabWidget, QVBoxLayout, QWidget
 
 from app import VERSION
 from app.core.engine import ColmapEngine
 from app.core.i18n import add_language_observer, tr
+from app.core.scheduler import get_scheduler
 from app.gui.managers import AppLifecycle, SessionManager
 from app.gui.styles import set_dark_theme
 from app.gui.tabs.brush_tab import BrushTab
@@ -104,6 +105,15 @@ class ColmapGUI(QMainWindow):
         self.logs_tab = LogsTab()
         self.tabs.addTab(self.logs_tab, tr("tab_logs"))
 
+        # File des jobs (planificateur partagé par les workers)
+        self.jobs_label = QLabel()
+        self.jobs_label.setStyleSheet("color: #888888; font-size: 10px; padding: 2px;")
+        self.statusBar().addPermanentWidget(self.jobs_label)
+        get_scheduler().publish_state()
+        self._jobs_timer = QTimer(self)
+        self._jobs_timer.timeout.connect(self.update_jobs_status)
+        self._jobs_timer.start(1000)
+
         # Discreet Version Label (Status Bar)
         version_label = QLabel(f"v{VERSION}")
         version_label.setStyleSheet("color: #666666; font-size: 10px; padding: 2px;")
@@ -136,6 +146,17 @@ class ColmapGUI(QMainWindow):
         # Apply visual hierarchy to utility tabs
         self.apply_tab_styling()
 
+    def update_jobs_status(self):
+        """Résumé de la file du planificateur dans la barre d'état"""
+        state = get_scheduler().snapshot()
+        running, queued = state["running"], state["queued"]
+        if not running and not queued:
+            self.jobs_label.setText("")
+            return
+        names = ", ".join(job["name"] for job in running)
+        self.jobs_label.setText(tr("jobs_status", "Jobs : {} en cours ({}), {} en attente",
+                                   len(running), names, len(queued)))
+
     def retranslate_ui(self):
         """Update window title and tab names when language changes"""
         self.setWindowTitle(tr("app_title"))
@@ -743,5 +764,6 @@ class ColmapGUI(QMainWindow):
     def closeEvent(self, event):
         """Appelé à la fermeture de la fenêtre"""
         self.session_manager.save(immediate=True)
+        get_scheduler().unpublish_state()
         event.accept()
 
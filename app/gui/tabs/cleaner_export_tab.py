@@ -10,7 +10,7 @@ from PySide6.QtWidgets import (
 
 from app.core.i18n import tr
 from app.gui.tabs.cleaner_tab import CleanerTab
-from app.gui.workers import CleanerWorker
+from app.gui.workers import CleanerWorker, CleanPreviewWorker
 
 
 class CleanerExportTab(QWidget):
@@ -25,6 +25,8 @@ class CleanerExportTab(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         self._cleaner_worker = None
+        self._preview_worker = None
+        self._pending_preview = None
         self._init_ui()
         self._connect_signals()
 
@@ -45,6 +47,7 @@ class CleanerExportTab(QWidget):
     def _connect_signals(self):
         self.cleaner_tab.cleanRequested.connect(self._on_clean_requested)
         self.cleaner_tab.stopRequested.connect(self._stop_cleaner)
+        self.cleaner_tab.previewRequested.connect(self._on_preview_requested)
 
     # ── Slots ────────────────────────────────────────────────────────────────
 
@@ -57,12 +60,30 @@ class CleanerExportTab(QWidget):
         self.log_signal.emit(f"Nettoyage PLY : {input_path} → {output_path}")
 
         self._cleaner_worker = CleanerWorker(
-            input_path, output_path, params, recursive=recursive
+            input_path, output_path, params, recursive=recursive, jobs=0
         )
         self._cleaner_worker.log_signal.connect(self.log_signal.emit)
         self._cleaner_worker.finished_signal.connect(self._on_clean_finished)
         self._cleaner_worker.start()
 
+    def _on_preview_requested(self, input_path, params):
+        # Un seul aperçu à la fois : la dernière demande attend la fin du précédent.
+        if self._preview_worker and self._preview_worker.isRunning():
+            self._pending_preview = (input_path, params)
+            return
+        self._pending_preview = None
+        self._preview_worker = CleanPreviewWorker(input_path, params)
+        self._preview_worker.finished_signal.connect(self._on_preview_finished)
+        self._preview_worker.finished.connect(self._on_preview_thread_done)
+        self._preview_worker.start()
+
+    def _on_preview_finished(self, success, message):
+        self.cleaner_tab.set_preview(message if success else "")
+
+    def _on_preview_thread_done(self):
+        if self._pending_preview:
+            self._on_preview_requested(*self._pending_preview)
+
     def _stop_cleaner(self):
         if self._cleaner_worker and self._cleaner_worker.isRunning():
             self._cleaner_worker.stop()
@@ -1,7 +1,7 @@
 """Onglet de nettoyage des splats (PLY Cleaner)."""
 import os
 
-from PySide6.QtCore import Signal
+from PySide6.QtCore import QTimer, Signal
 from PySide6.QtWidgets import (
     QCheckBox,
     QComboBox,
@@ -24,17 +24,25 @@ from app.gui.widgets.dialog_utils import (
     get_save_file_name,
 )
 
+# Délai d'inactivité avant l'aperçu : glisser un spin box n'en lance qu'un.
+PREVIEW_DELAY_MS = 400
+
 
 class CleanerTab(QWidget):
     """Onglet : Charger un .ply / dossier → ajuster les seuils → nettoyer."""
 
     cleanRequested = Signal(str, str, dict, bool)   # input_path, output_path, params, recursive
+    previewRequested = Signal(str, dict)            # input_path, params
     stopRequested = Signal()
 
     def __init__(self, parent=None):
         super().__init__(parent)
         self._current_input = ""
         self._current_output = ""
+        self._preview_timer = QTimer(self)
+        self._preview_timer.setSingleShot(True)
+        self._preview_timer.setInterval(PREVIEW_DELAY_MS)
+        self._preview_timer.timeout.connect(self._emit_preview)
         self.init_ui()
 
     def init_ui(self):
@@ -125,6 +133,15 @@ class CleanerTab(QWidget):
         self.spin_outlier.setDecimals(1)
         form.addRow(tr("cleaner_outlier_pct", "Distance max (%) :"), self.spin_outlier)
 
+        # Aperçu du nombre de splats conservés (fichier unique)
+        self.lbl_preview = QLabel("")
+        self.lbl_preview.setStyleSheet("color: #888;")
+        form.addRow(self.lbl_preview)
+        for widget in (self.spin_opacity, self.spin_scale, self.spin_outlier):
+            widget.valueChanged.connect(self._request_preview)
+        self.chk_custom.toggled.connect(self._request_preview)
+        self.combo_strength.currentIndexChanged.connect(self._request_preview)
+
         self._toggle_custom(False)
         params_group.setLayout(form)
         layout.addWidget(params_group)
@@ -202,6 +219,7 @@ class CleanerTab(QWidget):
             self.output_group.setTitle(tr("cleaner_output_group", "Destination"))
 
         self._update_btn_state()
+        self._request_preview()
 
     def _browse_input(self):
         path, _ = get_open_file_name(
@@ -212,6 +230,7 @@ class CleanerTab(QWidget):
             self._current_input = path
             self.lbl_input.setText(os.path.basename(path))
             self._update_btn_state()
+            self._request_preview()
 
     def _browse_input_dir(self):
         path = get_existing_directory(
@@ -261,19 +280,36 @@ class CleanerTab(QWidget):
         self.spin_scale.setValue(p["scale_pct"])
         self.spin_outlier.setValue(p["outlier_pct"])
 
-    def _request_clean(self):
-        """Prépare les paramètres et émet le signal."""
+    def _current_params(self):
         if self.chk_custom.isChecked():
             overrides = {
                 "opacity_min": self.spin_opacity.value(),
                 "scale_pct": self.spin_scale.value(),
                 "outlier_pct": self.spin_outlier.value(),
             }
-            params = resolve_params("medium", overrides)
-        else:
-            strength = self.combo_strength.currentData()
-            params = resolve_params(strength)
+            return resolve_params("medium", overrides)
+        return resolve_params(self.combo_strength.currentData())
+
+    def _request_preview(self, *_):
+        """Programme un aperçu des splats conservés (fichier unique seulement),
+        émis après ``PREVIEW_DELAY_MS`` sans nouveau changement."""
+        if self.combo_mode.currentData() == "batch" or not self._current_input:
+            self._preview_timer.stop()
+            self.lbl_preview.setText("")
+            return
+        self._preview_timer.start()
 
+    def _emit_preview(self):
+        if self.combo_mode.currentData() == "batch" or not self._current_input:
+            return
+        self.previewRequested.emit(self._current_input, self._current_params())
+
+    def set_preview(self, text):
+        self.lbl_preview.setText(text)
+
+    def _request_clean(self):
+        """Prépare les paramètres et émet le signal."""
+        params = self._current_params()
         recursive = self.chk_recursive.isChecked() if self.combo_mode.currentData() == "batch" else False
         self.cleanRequested.emit(self._current_input, self._current_output, params, recursive)
 
@@ -144,6 +144,7 @@ class ExportTab(QWidget):
         glb_layout = QFormLayout(self.glb_widget)
         self.glb_method = QComboBox()
         self.glb_method.addItem("Auto (recommandé)", "auto")
+        self.glb_method.addItem("Externe (trimesh → open3d → assimp)", "legacy")
         self.glb_method.addItem("Trimesh", "trimesh")
         self.glb_method.addItem("Open3D", "open3d")
         self.glb_method.addItem("Assimp", "assimp")
@@ -101,7 +101,7 @@ class ParamsTab(QWidget):
         match_layout = QFormLayout()
 
         self.matcher_type_combo = QComboBox()
-        self.matcher_type_combo.addItems(['exhaustive', 'sequential', 'vocab_tree'])
+        self.matcher_type_combo.addItems(['exhaustive', 'sequential', 'vocab_tree', 'auto'])
         self.matcher_type_combo.setCurrentText('exhaustive')
         self.matcher_type_combo.setMinimumWidth(150)
         self.lbl_match_type = QLabel(tr("lbl_match_type"))
@@ -10,6 +10,7 @@ from PySide6.QtWidgets import (
 )
 
 from app.core.i18n import add_language_observer, tr
+from app.core.scheduler import ENGINE_REQUESTS, get_scheduler
 
 
 class BinaryInstallWorker(QThread):
@@ -59,6 +60,14 @@ class TestWorker(QThread):
         self.params     = params
 
     def run(self):
+        with get_scheduler().reserve("Upscale", ENGINE_REQUESTS["upscale"],
+                                     is_cancelled=self.isInterruptionRequested) as job:
+            if job is None:
+                self.finished.emit(False, tr("USER_CANCELLED"))
+                return
+            self._run_upscale()
+
+    def _run_upscale(self):
         try:
             import shutil as _shutil
             import tempfile as _tempfile
@@ -7,11 +7,13 @@ import traceback
 from pathlib import Path
 
 from app.core.brush_engine import BrushEngine
+from app.core.clean_analysis import preview_clean
 from app.core.engine import ColmapEngine
 from app.core.extractor_360_engine import Extractor360Engine
 from app.core.four_dgs_engine import FourDGSEngine
 from app.core.i18n import tr
-from app.core.ply_cleaner import clean_ply
+from app.core.ply_cleaner import clean_ply, clean_ply_batch
+from app.core.scheduler import ENGINE_REQUESTS, brush_request
 from app.gui.base_worker import BaseWorker
 
 
@@ -32,6 +34,9 @@ class Extractor360Worker(BaseWorker):
         super().stop()
 
     def run(self):
+        self.run_scheduled("360Extractor", ENGINE_REQUESTS["extract360"], self._run_extraction)
+
+    def _run_extraction(self):
         self.log_signal.emit(tr("status_360_start", "--- Démarrage 360Extractor ---"))
         if not self.engine.is_installed():
             self.finished_signal.emit(False, tr("err_360_not_installed", "360Extractor non installé."))
@@ -86,6 +91,9 @@ class ColmapWorker(BaseWorker):
         super().stop()
 
     def run(self):
+        self.run_scheduled("COLMAP", ENGINE_REQUESTS["colmap"], self._run_pipeline)
+
+    def _run_pipeline(self):
         # 1. Check 360 Extractor
         if self.extractor_360_params and self.extractor_360_params.get("enabled", False):
             from app.core.extractor_360_engine import Extractor360Engine
@@ -170,6 +178,9 @@ class BrushWorker(BaseWorker):
         super().stop()
 
     def run(self):
+        self.run_scheduled("Brush", brush_request(self.params.get("max_splats")), self._run_training)
+
+    def _run_training(self):
         try:
             self.log_signal.emit("Initialisation BrushWorker...")
             self.log_signal.emit(f"Input: {self.input_path}")
@@ -433,6 +444,9 @@ class SharpWorker(BaseWorker):
         super().stop()
 
     def run(self):
+        self.run_scheduled("Sharp", ENGINE_REQUESTS["sharp"], self._run_prediction)
+
+    def _run_prediction(self):
         try:
             # Handle Upscale
             if self.params.get("upscale", False):
@@ -510,6 +524,9 @@ class SharpVideoWorker(BaseWorker):
         super().stop()
 
     def run(self):
+        self.run_scheduled("Sharp vidéo", ENGINE_REQUESTS["sharp"], self._run_frames)
+
+    def _run_frames(self):
         """Process video frames using the shared SharpEngine.process_video_frames pipeline."""
         try:
             self.status_signal.emit(tr("sharp_msg_extract_frames"))
@@ -538,12 +555,13 @@ class SharpVideoWorker(BaseWorker):
 class CleanerWorker(BaseWorker):
     """Thread worker pour nettoyer un ou plusieurs fichiers .ply (Gaussian Splat)."""
 
-    def __init__(self, input_path, output_path, params, recursive=False):
+    def __init__(self, input_path, output_path, params, recursive=False, jobs=1):
         super().__init__()
         self.input_path = Path(input_path)
         self.output_path = Path(output_path)
         self.params = params
         self.recursive = recursive
+        self.jobs = jobs
 
     def run(self):
         try:
@@ -552,47 +570,24 @@ class CleanerWorker(BaseWorker):
             if self.input_path.is_dir():
                 # Mode dossier
                 self.log_signal.emit(f"Nettoyage par lots : {self.input_path} → {self.output_path}")
-                self.output_path.mkdir(parents=True, exist_ok=True)
-
-                pattern = "**/*.ply" if self.recursive else "*.ply"
-                ply_files = sorted(f for f in self.input_path.glob(pattern) if not f.name.startswith('.'))
-
-                if not ply_files:
-                    self.log_signal.emit(f"Aucun fichier .ply trouvé dans {self.input_path}")
-                    self.finished_signal.emit(False, "Aucun fichier .ply trouvé.")
+                try:
+                    all_stats = clean_ply_batch(
+                        self.input_path, self.output_path,
+                        overrides=self.params,
+                        log=self.log_signal.emit,
+                        recursive=self.recursive,
+                        workers=self.jobs,
+                        cancel_check=self.isInterruptionRequested,
+                    )
+                except ValueError as e:
+                    self.finished_signal.emit(False, str(e))
                     return
 
-                total = len(ply_files)
-                success_count = 0
-                fail_count = 0
-
-                for idx, ply_path in enumerate(ply_files, 1):
-                    if self.isInterruptionRequested():
-                        self.log_signal.emit("Nettoyage annulé par l'utilisateur.")
-                        break
-
-                    rel = ply_path.relative_to(self.input_path)
-                    out_path = self.output_path / rel
-                    out_path.parent.mkdir(parents=True, exist_ok=True)
-
-                    self.log_signal.emit(f"[{idx}/{total}] Nettoyage de {ply_path.name}...")
-                    try:
-                        stats = clean_ply(
-                            ply_path, out_path,
-                            log=self.log_signal.emit,
-                            overrides=self.params,
-                        )
-                        self.log_signal.emit(
-                            f"  ✓ {stats['kept']}/{stats['total']} splats conservés "
-                            f"({stats['removed']} retirés)"
-                        )
-                        success_count += 1
-                    except ValueError as e:
-                        self.log_signal.emit(f"  ⚠️  {ply_path.name}: ignoré ({e})")
-                        fail_count += 1
-                    except Exception as e:
-                        self.log_signal.emit(f"  ❌  {ply_path.name}: {e}")
-                        fail_count += 1
+                total = len(all_stats)
+                if any(s.get("cancelled") for s in all_stats):
+                    self.log_signal.emit("Nettoyage annulé par l'utilisateur.")
+                success_count = sum(1 for s in all_stats if "error" not in s)
+                fail_count = sum(1 for s in all_stats if "error" in s and not s.get("cancelled"))
 
                 msg = (
                     f"Nettoyage par lots terminé : {success_count} réussis, "
@@ -619,6 +614,26 @@ class CleanerWorker(BaseWorker):
             self.finished_signal.emit(False, str(e))
 
 
+class CleanPreviewWorker(BaseWorker):
+    """Thread worker : nombre de splats conservés pour des paramètres donnés,
+    sans écrire de PLY (analyse mise en cache après le premier appel)."""
+
+    def __init__(self, input_path, params):
+        super().__init__()
+        self.input_path = input_path
+        self.params = params
+
+    def run(self):
+        try:
+            stats = preview_clean(self.input_path, overrides=self.params)
+            msg = tr("cleaner_preview", "Aperçu : {kept}/{total} splats conservés").format(
+                kept=stats["kept"], total=stats["total"]
+            )
+            self.finished_signal.emit(True, msg)
+        except Exception as e:
+            self.finished_signal.emit(False, str(e))
+
+
 # ---------------------------------------------------------------------
 # SPLAT TRANSFORM WORKER
 # ---------------------------------------------------------------------
@@ -675,6 +690,9 @@ class FourDGSWorker(BaseWorker):
 
 
     def run(self):
+        self.run_scheduled("4DGS", ENGINE_REQUESTS["4dgs"], self._run_dataset)
+
+    def _run_dataset(self):
         self.log_signal.emit("--- Démarrage 4DGS ---")
 
 
@@ -0,0 +1,167 @@
+"""Bases ``database.db`` COLMAP synthétiques et tri de référence pour les tests.
+
+``legacy_sort_database_images`` reprend tel quel l'ancien
+``ColmapEngine._sort_colmap_database_images`` (UPDATE corrélés avec décalage
+en deux passes) : les tests vérifient que la reconstruction ensembliste donne
+la même base, et le benchmark s'y compare.
+"""
+from __future__ import annotations
+
+import sqlite3
+
+import numpy as np
+
+# Schéma COLMAP 3.12 (rigs / frames), tables utiles au tri.
+SCHEMA = """
+CREATE TABLE cameras (camera_id INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL, model INTEGER NOT NULL,
+    width INTEGER NOT NULL, height INTEGER NOT NULL, params BLOB, prior_focal_length INTEGER NOT NULL);
+CREATE TABLE rigs (rig_id INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL, ref_sensor_id INTEGER NOT NULL,
+    ref_sensor_type INTEGER NOT NULL);
+CREATE TABLE frames (frame_id INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL, rig_id INTEGER NOT NULL,
+    FOREIGN KEY(rig_id) REFERENCES rigs(rig_id) ON DELETE CASCADE);
+CREATE TABLE frame_data (frame_id INTEGER NOT NULL, data_id INTEGER NOT NULL, sensor_id INTEGER NOT NULL,
+    sensor_type INTEGER NOT NULL, FOREIGN KEY(frame_id) REFERENCES frames(frame_id) ON DELETE CASCADE);
+CREATE TABLE images (image_id INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL, name TEXT NOT NULL UNIQUE,
+    camera_id INTEGER NOT NULL, CONSTRAINT image_id_check CHECK(image_id >= 0 and image_id < 2147483647),
+    FOREIGN KEY(camera_id) REFERENCES cameras(camera_id));
+CREATE TABLE pose_priors (corr_data_id INTEGER PRIMARY KEY NOT NULL, corr_sensor_id INTEGER NOT NULL,
+    corr_sensor_type INTEGER NOT NULL, position BLOB, coordinate_system INTEGER NOT NULL);
+CREATE TABLE keypoints (image_id INTEGER PRIMARY KEY NOT NULL, rows INTEGER NOT NULL, cols INTEGER NOT NULL,
+    data BLOB, FOREIGN KEY(image_id) REFERENCES images(image_id) ON DELETE CASCADE);
+CREATE TABLE descriptors (image_id INTEGER PRIMARY KEY NOT NULL, rows INTEGER NOT NULL, cols INTEGER NOT NULL,
+    data BLOB, FOREIGN KEY(image_id) REFERENCES images(image_id) ON DELETE CASCADE);
+CREATE TABLE matches (pair_id INTEGER PRIMARY KEY NOT NULL, rows INTEGER NOT NULL, cols INTEGER NOT NULL,
+    data BLOB);
+CREATE TABLE two_view_geometries (pair_id INTEGER PRIMARY KEY NOT NULL, rows INTEGER NOT NULL,
+    cols INTEGER NOT NULL, data BLOB, config INTEGER NOT NULL);
+CREATE UNIQUE INDEX index_name ON images(name);
+CREATE INDEX index_frame_data ON frame_data(data_id);
+"""
+
+
+def make_database(path, n_images: int, n_keypoints: int = 16, seed: int = 0) -> list[str]:
+    """Base à ``n_images`` images insérées dans un ordre aléatoire (comme un
+    ``feature_extractor`` multi-thread). Retourne les noms dans l'ordre des ids."""
+    rng = np.random.default_rng(seed)
+    names = [f"frame_{i:06d}.jpg" for i in rng.permutation(n_images)]
+    con = sqlite3.connect(str(path))
+    con.executescript(SCHEMA)
+    con.execute("INSERT INTO cameras VALUES (1, 1, 640, 480, ?, 0)", (np.zeros(4).tobytes(),))
+    con.execute("INSERT INTO rigs VALUES (1, 1, 0)")
+    kp = rng.random((n_keypoints, 6), dtype=np.float32)
+    desc = rng.integers(0, 256, (n_keypoints, 128), dtype=np.uint8)
+    for image_id, name in enumerate(names, start=1):
+        con.execute("INSERT INTO images VALUES (?, ?, 1)", (image_id, name))
+        con.execute("INSERT INTO frames VALUES (?, 1)", (image_id,))
+        con.execute("INSERT INTO frame_data VALUES (?, ?, 1, 0)", (image_id, image_id))
+        con.execute("INSERT INTO keypoints VALUES (?, ?, 6, ?)", (image_id, n_keypoints, kp.tobytes()))
+        con.execute("INSERT INTO descriptors VALUES (?, ?, 128, ?)",
+                    (image_id, n_keypoints, desc[:, image_id % 128:].tobytes()))
+        if image_id % 3 == 0:
+            con.execute("INSERT INTO pose_priors VALUES (?, 1, 0, ?, 0)",
+                        (image_id, np.full(3, image_id, dtype=np.float64).tobytes()))
+    con.execute("INSERT INTO matches VALUES (2147483649, 1, 2, ?)", (np.zeros(2, np.uint32).tobytes(),))
+    con.execute("INSERT INTO two_view_geometries VALUES (2147483649, 0, 2, NULL, 2)")
+    con.commit()
+    con.close()
+    return names
+
+
+def dump_database(path) -> dict[str, object]:
+    """Contenu comparable d'une base : schéma, lignes triées de chaque table."""
+    con = sqlite3.connect(str(path))
+    try:
+        schema = sorted(con.execute("SELECT type, name, tbl_name, sql FROM sqlite_master").fetchall(),
+                        key=repr)
+        tables = [name for kind, name, _, _ in schema if kind == "table"]
+        dump = {"schema": schema}
+        for table in tables:
+            dump[table] = sorted(con.execute(f'SELECT * FROM "{table}"').fetchall(), key=repr)
+        dump["integrity"] = con.execute("PRAGMA integrity_check").fetchall()
+        dump["foreign_keys"] = con.execute("PRAGMA foreign_key_check").fetchall()
+        return dump
+    finally:
+        con.close()
+
+
+def legacy_sort_database_images(database_path) -> None:
+    """Ancien tri (UPDATE corrélés, deux passes par table)."""
+    ALLOWED_COLUMNS = {
+        ("images", "image_id"),
+        ("keypoints", "image_id"),
+        ("descriptors", "image_id"),
+        ("frames", "frame_id"),
+        ("frame_data", "frame_id"),
+        ("frame_data", "data_id"),
+        ("pose_priors", "corr_data_id"),
+    }
+
+    with sqlite3.connect(str(database_path)) as con:
+        rows = con.execute(
+            "SELECT image_id, name FROM images ORDER BY name"
+        ).fetchall()
+        id_map = {old_id: new_id for new_id, (old_id, _) in enumerate(rows, start=1)}
+        if all(old_id == new_id for old_id, new_id in id_map.items()):
+            return
+
+        con.execute("PRAGMA foreign_keys=OFF")
+        con.execute("DELETE FROM matches")
+        con.execute("DELETE FROM two_view_geometries")
+        con.execute("CREATE TEMP TABLE image_id_map(old_id INTEGER PRIMARY KEY, new_id INTEGER NOT NULL)")
+        con.executemany(
+            "INSERT INTO image_id_map(old_id, new_id) VALUES (?, ?)",
+            id_map.items(),
+        )
+        table_columns = {
+            table_name: {
+                column[1]
+                for column in con.execute(f"PRAGMA table_info({table_name})").fetchall()
+            }
+            for table_name, in con.execute(
+                "SELECT name FROM sqlite_master WHERE type='table'"
+            ).fetchall()
+        }
+
+        offset = 1000000000
+        for table, column in [
+            ("images", "image_id"),
+            ("keypoints", "image_id"),
+            ("descriptors", "image_id"),
+            ("frames", "frame_id"),
+            ("frame_data", "frame_id"),
+            ("frame_data", "data_id"),
+            ("pose_priors", "corr_data_id"),
+        ]:
+            if (table, column) not in ALLOWED_COLUMNS:
+                continue
+            if column not in table_columns.get(table, set()):
+                continue
+            con.execute(
+                f"""
+                UPDATE {table}
+                SET {column} = (
+                    SELECT new_id + ?
+                    FROM image_id_map
+                    WHERE old_id = {table}.{column}
+                )
+                WHERE {column} IN (SELECT old_id FROM image_id_map)
+                """,
+                (offset,),
+            )
+            con.execute(
+                f"""
+                UPDATE {table}
+                SET {column} = {column} - ?
+                WHERE {column} > ?
+                """,
+                (offset, offset),
+            )
+
+        con.execute("DROP TABLE image_id_map")
+        con.execute(
+            "UPDATE sqlite_sequence SET seq = (SELECT MAX(image_id) FROM images) WHERE name = 'images'"
+        )
+        con.execute(
+            "UPDATE sqlite_sequence SET seq = COALESCE((SELECT MAX(frame_id) FROM frames), 0) WHERE name = 'frames'"
+        )
+        con.commit()
@@ -0,0 +1,49 @@
+"""Écriture de modèles sparse COLMAP binaires pour les tests.
+
+Tuples au format des fichiers :
+  caméras : (camera_id, model_id, width, height, [params])
+  images  : (image_id, qvec, tvec, camera_id, name, [(x, y, point3D_id)])
+  points  : (point3D_id, xyz, rgb, error, [(image_id, point2D_idx)])
+"""
+from __future__ import annotations
+
+import struct
+
+PINHOLE_CAMERA = (1, 1, 640, 480, [500.0, 510.0, 320.0, 240.0])
+
+
+def write_binary_model(model_dir, cameras, images, points) -> None:
+    model_dir.mkdir(parents=True, exist_ok=True)
+    data = struct.pack("<Q", len(cameras))
+    for cam_id, model_id, w, h, params in cameras:
+        data += struct.pack("<iiQQ", cam_id, model_id, w, h) + struct.pack(f"<{len(params)}d", *params)
+    (model_dir / "cameras.bin").write_bytes(data)
+
+    data = struct.pack("<Q", len(images))
+    for image_id, q, t, cam_id, name, pts in images:
+        data += struct.pack("<i7di", image_id, *q, *t, cam_id) + name.encode() + b"\0"
+        data += struct.pack("<Q", len(pts))
+        for x, y, pid in pts:
+            data += struct.pack("<ddq", x, y, pid)
+    (model_dir / "images.bin").write_bytes(data)
+
+    data = struct.pack("<Q", len(points))
+    for pid, xyz, rgb, err, track in points:
+        data += struct.pack("<Q3d3BdQ", pid, *xyz, *rgb, err, len(track))
+        for image_id, idx in track:
+            data += struct.pack("<ii", image_id, idx)
+    (model_dir / "points3D.bin").write_bytes(data)
+
+
+def write_simple_model(model_dir, names, n_points: int = 4) -> None:
+    """Modèle où chacune des ``names`` observe chacun des ``n_points`` points."""
+    images = [
+        (i + 1, [1, 0, 0, 0], [float(i), 0, 0], 1, name,
+         [(float(k), float(k), k + 1) for k in range(n_points)])
+        for i, name in enumerate(names)
+    ]
+    points = [
+        (k + 1, [float(k), 0.0, 1.0], [128, 128, 128], 0.5, [(i + 1, k) for i in range(len(names))])
+        for k in range(n_points)
+    ]
+    write_binary_model(model_dir, [PINHOLE_CAMERA], images, points)
@@ -0,0 +1,73 @@
+"""Reference (pre-vectorisation) per-vertex text writers.
+
+Kept verbatim from the former ExportEngine loops so tests can check that the
+chunked NumPy formatting produces byte-identical output, and so the
+benchmark has a baseline to compare against.
+"""
+from __future__ import annotations
+
+import numpy as np
+
+
+def make_splat_cloud(n: int, seed: int = 0, colors: bool = True) -> np.ndarray:
+    """Random float32 xyz (+ uchar rgb) structured array, spanning a few decades."""
+    rng = np.random.default_rng(seed)
+    fields = [("x", "<f4"), ("y", "<f4"), ("z", "<f4")]
+    if colors:
+        fields += [("red", "u1"), ("green", "u1"), ("blue", "u1")]
+    data = np.empty(n, dtype=fields)
+    for k in ("x", "y", "z"):
+        data[k] = rng.normal(size=n) * 10.0 ** rng.integers(-3, 4, n)
+    if colors:
+        for k in ("red", "green", "blue"):
+            data[k] = rng.integers(0, 256, n)
+    return data
+
+
+def write_binary_ply(path, data: np.ndarray) -> None:
+    types = {"f4": "float", "u1": "uchar"}
+    with open(path, "wb") as f:
+        header = ["ply", "format binary_little_endian 1.0", f"element vertex {len(data)}"]
+        header += [f"property {types[data.dtype[k].str[1:]]} {k}" for k in data.dtype.names]
+        header.append("end_header")
+        f.write(("\n".join(header) + "\n").encode("ascii"))
+        f.write(data.tobytes())
+
+
+def legacy_xyz(fout, vertex, include_colors=False, delimiter=" "):
+    has_colors = "red" in vertex.dtype.names
+    for i in range(len(vertex)):
+        data = vertex[i]
+        x, y, z = float(data["x"]), float(data["y"]), float(data["z"])
+
+        if include_colors and has_colors:
+            r, g, b = int(data["red"]), int(data["green"]), int(data["blue"])
+            fout.write(f"{x}{delimiter}{y}{delimiter}{z}{delimiter}{r}{delimiter}{g}{delimiter}{b}\n")
+        else:
+            fout.write(f"{x}{delimiter}{y}{delimiter}{z}\n")
+
+
+def legacy_obj_vertices(fout, vertex, include_colors=True, scale=1.0):
+    has_colors = "red" in vertex.dtype.names
+    for i in range(len(vertex)):
+        data = vertex[i]
+        x = float(data["x"]) * scale
+        y = float(data["y"]) * scale
+        z = float(data["z"]) * scale
+
+        if include_colors and has_colors:
+            r, g, b = int(data["red"]) / 255, int(data["green"]) / 255, int(data["blue"]) / 255
+            fout.write(f"v {x:.6f} {y:.6f} {z:.6f} {r:.3f} {g:.3f} {b:.3f}\n")
+        else:
+            fout.write(f"v {x:.6f} {y:.6f} {z:.6f}\n")
+
+
+def legacy_assimp_vertices(fout, vertex):
+    for i in range(len(vertex)):
+        data = vertex[i]
+        x, y, z = data["x"], data["y"], data["z"]
+        if "red" in data.dtype.names:
+            r, g, b = data["red"] / 255, data["green"] / 255, data["blue"] / 255
+            fout.write(f"v {x} {y} {z} {r:.3f} {g:.3f} {b:.3f}\n")
+        else:
+            fout.write(f"v {x} {y} {z}\n")
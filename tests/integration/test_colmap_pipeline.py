@@ -3,6 +3,7 @@
 Tous les binaires externes (colmap, ffmpeg) sont mockés ;
 seule la logique d'orchestration du pipeline est testée.
 """
+import pytest
 
 
 class TestColmapPipeline:
@@ -93,3 +94,369 @@ class TestColmapPipelineConfig:
         assert not any("exhaustive_matcher" in s for s in cmd_strings), (
             "exhaustive_matcher ne devrait PAS être appelé en mode sequential"
         )
+
+    def test_auto_matcher_small_project_is_exhaustive(self, colmap_engine, colmap_params,
+                                                      mock_subprocess_run):
+        """Avec matcher_type='auto', un petit jeu d'images reste en exhaustif."""
+        colmap_params.matcher_type = 'auto'
+        success, _ = colmap_engine.run()
+        cmd_strings = [" ".join(call[0][0]) for call in mock_subprocess_run.call_args_list]
+        assert success is True
+        assert any("exhaustive_matcher" in s for s in cmd_strings)
+
+    def test_auto_matcher_numbered_frames(self, colmap_engine, colmap_params, mock_subprocess_run,
+                                          monkeypatch):
+        """Au-delà du seuil, des noms frame_0000… donnent un matching séquentiel."""
+        from app.core import match_planner
+        monkeypatch.setattr(match_planner, "EXHAUSTIVE_MAX_IMAGES", 1)
+        colmap_params.matcher_type = 'auto'
+        success, _ = colmap_engine.run()
+        cmds = [call[0][0] for call in mock_subprocess_run.call_args_list]
+        matcher = next(c for c in cmds if "sequential_matcher" in c)
+        overlap = int(matcher[matcher.index("--SequentialMatching.overlap") + 1])
+        assert success is True
+        assert overlap == match_planner.MIN_SEQUENTIAL_OVERLAP
+        assert not any("exhaustive_matcher" in c for c in cmds)
+
+
+class TestColmapStageCache:
+    """Réutilisation des bases COLMAP en cache entre deux exécutions."""
+
+    @pytest.fixture(autouse=True)
+    def _enable_cache(self, colmap_params):
+        colmap_params.stage_cache = True
+
+    @staticmethod
+    def _rerun_steps(engine, mock_subprocess_run):
+        mock_subprocess_run.reset_mock()
+        success, _ = engine.run()
+        assert success is True
+        steps = []
+        for call in mock_subprocess_run.call_args_list:
+            cmd = call[0][0]
+            steps.append(cmd[1] if len(cmd) > 1 else cmd[0])
+        return steps
+
+    def test_unchanged_params_skip_extraction_and_matching(self, colmap_engine, mock_subprocess_run):
+        colmap_engine.run()
+        steps = self._rerun_steps(colmap_engine, mock_subprocess_run)
+        assert "feature_extractor" not in steps
+        assert not any(s.endswith("_matcher") for s in steps)
+        assert "global_mapper" in steps
+
+    def test_mapper_change_reuses_matches(self, colmap_engine, colmap_params, mock_subprocess_run):
+        colmap_engine.run()
+        colmap_params.ba_refine_focal_length = not colmap_params.ba_refine_focal_length
+        steps = self._rerun_steps(colmap_engine, mock_subprocess_run)
+        assert "feature_extractor" not in steps
+        assert not any(s.endswith("_matcher") for s in steps)
+
+    def test_matching_change_reuses_features(self, colmap_engine, colmap_params, mock_subprocess_run):
+        colmap_engine.run()
+        colmap_params.max_ratio = 0.7
+        steps = self._rerun_steps(colmap_engine, mock_subprocess_run)
+        assert "feature_extractor" not in steps
+        assert "exhaustive_matcher" in steps
+
+    def test_extraction_change_recomputes(self, colmap_engine, colmap_params, mock_subprocess_run):
+        colmap_engine.run()
+        colmap_params.max_num_features = 4096
+        steps = self._rerun_steps(colmap_engine, mock_subprocess_run)
+        assert "feature_extractor" in steps and "exhaustive_matcher" in steps
+
+    def test_auto_plan_restored_with_matches(self, colmap_engine, colmap_params, mock_subprocess_run):
+        colmap_params.matcher_type = 'auto'
+        colmap_engine.run()
+        plan = colmap_engine._matching_plan
+        assert plan is not None
+        logs = []
+        colmap_engine.logger_callback = logs.append
+        self._rerun_steps(colmap_engine, mock_subprocess_run)
+        assert colmap_engine._matching_plan == plan
+        assert not any(line.startswith("Matcher auto") for line in logs)
+
+    def test_cache_disabled(self, colmap_engine, colmap_params, mock_subprocess_run, fake_project_dir):
+        colmap_params.stage_cache = False
+        colmap_engine.run()
+        steps = self._rerun_steps(colmap_engine, mock_subprocess_run)
+        assert "feature_extractor" in steps
+        assert not (fake_project_dir / "colmap_cache").exists()
+
+
+class TestColmapStageResume:
+    """Reprise par étape à partir du manifeste colmap_stages.json."""
+
+    @staticmethod
+    def _failing(mock_subprocess_run, *keywords):
+        original = mock_subprocess_run.side_effect
+
+        def _side_effect(cmd, *args, **kwargs):
+            if any(k in cmd for k in keywords):
+                return 1
+            return original(cmd, *args, **kwargs)
+        mock_subprocess_run.side_effect = _side_effect
+        return original
+
+    @staticmethod
+    def _steps(mock_subprocess_run):
+        return [call[0][0][1] for call in mock_subprocess_run.call_args_list]
+
+    def test_resume_after_mapper_failure(self, colmap_engine, colmap_params, mock_subprocess_run):
+        colmap_params.stage_cache = False  # seul le manifeste permet la reprise
+        original = self._failing(mock_subprocess_run, "global_mapper", "mapper")
+        success, _ = colmap_engine.run()
+        assert success is False
+
+        mock_subprocess_run.side_effect = original
+        mock_subprocess_run.reset_mock()
+        colmap_engine.resume_from = "auto"
+        success, _ = colmap_engine.run()
+        assert success is True
+        steps = self._steps(mock_subprocess_run)
+        assert steps == ["global_mapper"]
+
+    def test_resume_after_matching_failure(self, colmap_engine, colmap_params, mock_subprocess_run):
+        colmap_params.stage_cache = False
+        original = self._failing(mock_subprocess_run, "exhaustive_matcher")
+        assert colmap_engine.run()[0] is False
+
+        mock_subprocess_run.side_effect = original
+        mock_subprocess_run.reset_mock()
+        colmap_engine.resume_from = "auto"
+        assert colmap_engine.run()[0] is True
+        steps = self._steps(mock_subprocess_run)
+        assert "feature_extractor" not in steps
+        assert steps[:2] == ["exhaustive_matcher", "view_graph_calibrator"]
+
+    def test_completed_project_runs_nothing(self, colmap_engine, mock_subprocess_run):
+        assert colmap_engine.run()[0] is True
+        mock_subprocess_run.reset_mock()
+        colmap_engine.resume_from = "auto"
+        assert colmap_engine.run()[0] is True
+        assert self._steps(mock_subprocess_run) == []
+
+    def test_modified_artifact_is_rerun(self, colmap_engine, mock_subprocess_run, fake_project_dir):
+        assert colmap_engine.run()[0] is True
+        (fake_project_dir / "sparse" / "0" / "points3D.bin").write_bytes(b"corrupt")
+        mock_subprocess_run.reset_mock()
+        colmap_engine.resume_from = "auto"
+        assert colmap_engine.run()[0] is True
+        assert self._steps(mock_subprocess_run) == ["global_mapper"]
+
+    def test_explicit_stage_requires_previous_stages(self, colmap_engine):
+        colmap_engine.resume_from = "mapper"
+        success, message = colmap_engine.run()
+        assert success is False
+        assert "mapper" in message
+
+
+class TestSubmodelSelection:
+    """Après le mapper : le meilleur sous-modèle devient sparse/0."""
+
+    @staticmethod
+    def _mapper_writes(mock_subprocess_run, models, merged=None):
+        from pathlib import Path
+
+        from tests._colmap_models import write_simple_model
+        original = mock_subprocess_run.side_effect
+
+        def _side_effect(cmd, *args, **kwargs):
+            if "global_mapper" in cmd:
+                out = Path(cmd[cmd.index("--output_path") + 1])
+                for name, images in models.items():
+                    write_simple_model(out / name, images)
+                return 0
+            if "model_merger" in cmd:
+                if merged is None:
+                    return 1
+                write_simple_model(Path(cmd[cmd.index("--output_path") + 1]), merged)
+                return 0
+            return original(cmd, *args, **kwargs)
+        mock_subprocess_run.side_effect = _side_effect
+
+    def test_largest_submodel_promoted(self, colmap_engine, mock_subprocess_run, fake_project_dir):
+        import json
+
+        from app.core.colmap_io import read_sparse_model
+        self._mapper_writes(mock_subprocess_run, {
+            "0": ["a.jpg", "b.jpg"],
+            "1": ["c.jpg", "d.jpg", "e.jpg"],
+        })
+        assert colmap_engine.run()[0] is True
+        sparse = fake_project_dir / "sparse"
+        assert read_sparse_model(sparse / "0").images.names == ["c.jpg", "d.jpg", "e.jpg"]
+        assert read_sparse_model(sparse / "1").images.names == ["a.jpg", "b.jpg"]
+        report = json.loads((fake_project_dir / "sparse_report.json").read_text())
+        assert report["selected"] == "1"
+        assert report["merged"] == []
+        assert not any("model_merger" in c[0][0] for c in mock_subprocess_run.call_args_list)
+
+    def test_overlapping_submodels_merged(self, colmap_engine, colmap_params, mock_subprocess_run,
+                                          fake_project_dir):
+        from app.core.colmap_io import read_sparse_model
+        colmap_params.merge_submodels = True
+        self._mapper_writes(mock_subprocess_run, {
+            "0": ["a.jpg", "b.jpg", "c.jpg", "d.jpg"],
+            "1": ["b.jpg", "c.jpg", "d.jpg", "e.jpg", "f.jpg"],
+            "2": ["x.jpg", "y.jpg"],
+        }, merged=["a.jpg", "b.jpg", "c.jpg", "d.jpg", "e.jpg", "f.jpg"])
+        assert colmap_engine.run()[0] is True
+        merges = [c[0][0] for c in mock_subprocess_run.call_args_list if "model_merger" in c[0][0]]
+        assert len(merges) == 1  # sparse/2 ne partage aucune image
+        sparse = fake_project_dir / "sparse"
+        assert len(read_sparse_model(sparse / "0").images.names) == 6
+        # sparse/0, absorbé par le meilleur (sparse/1), quitte les candidats.
+        assert sorted(p.name for p in sparse.iterdir()) == ["0", "2", "_merged"]
+        assert [p.name for p in (sparse / "_merged").iterdir()] == ["0"]
+
+    def test_failed_merge_keeps_best(self, colmap_engine, colmap_params, mock_subprocess_run,
+                                     fake_project_dir):
+        from app.core.colmap_io import read_sparse_model
+        colmap_params.merge_submodels = True
+        self._mapper_writes(mock_subprocess_run, {
+            "0": ["a.jpg", "b.jpg", "c.jpg"],
+            "1": ["a.jpg", "b.jpg", "c.jpg", "d.jpg"],
+        })
+        assert colmap_engine.run()[0] is True
+        sparse = fake_project_dir / "sparse"
+        assert read_sparse_model(sparse / "0").images.names == ["a.jpg", "b.jpg", "c.jpg", "d.jpg"]
+        assert sorted(p.name for p in sparse.iterdir()) == ["0", "1"]
+
+
+class TestPartitionedReconstruction:
+    """Mode partitionné sur une scène synthétique : clusters reconstruits
+    séparément (mapper sur liste d'images) puis fusionnés."""
+
+    @staticmethod
+    def _fake_colmap(mock_subprocess_run):
+        import shutil
+        import sqlite3
+        from pathlib import Path
+
+        from app.core.colmap_io import MAX_IMAGE_ID, read_sparse_model
+        from tests._colmap_models import write_simple_model
+        original = mock_subprocess_run.side_effect
+
+        def _arg(cmd, flag):
+            return Path(cmd[cmd.index(flag) + 1])
+
+        def _side_effect(cmd, *args, **kwargs):
+            if "feature_extractor" in cmd:
+                # Base minimale : images + paires vérifiées entre voisines de la séquence.
+                names = sorted(p.name for p in _arg(cmd, "--image_path").iterdir())
+                con = sqlite3.connect(_arg(cmd, "--database_path"))
+                con.executescript(
+                    "CREATE TABLE images (image_id INTEGER PRIMARY KEY, name TEXT);"
+                    "CREATE TABLE matches (pair_id INTEGER PRIMARY KEY, rows INTEGER, cols INTEGER, data BLOB);"
+                    "CREATE TABLE two_view_geometries (pair_id INTEGER PRIMARY KEY, rows INTEGER,"
+                    " cols INTEGER, data BLOB);"
+                )
+                con.executemany("INSERT INTO images VALUES (?, ?)", enumerate(names, start=1))
+                con.executemany("INSERT INTO two_view_geometries VALUES (?, ?, 2, NULL)", [
+                    (a * MAX_IMAGE_ID + b, 200 // (b - a))
+                    for a in range(1, len(names) + 1) for b in range(a + 1, min(a + 4, len(names) + 1))
+                ])
+                con.commit()
+                con.close()
+                return 0
+            if "mapper" in cmd and "--image_list_path" in cmd:
+                names = _arg(cmd, "--image_list_path").read_text().split()
+                write_simple_model(_arg(cmd, "--output_path") / "0", names)
+                return 0
+            if "model_merger" in cmd:
+                union = set()
+                for flag in ("--input_path1", "--input_path2"):
+                    union.update(read_sparse_model(_arg(cmd, flag)).images.names)
+                write_simple_model(_arg(cmd, "--output_path"), sorted(union))
+                return 0
+            if "bundle_adjuster" in cmd:
+                shutil.copytree(_arg(cmd, "--input_path"), _arg(cmd, "--output_path"), dirs_exist_ok=True)
+                return 0
+            return original(cmd, *args, **kwargs)
+        mock_subprocess_run.side_effect = _side_effect
+
+    @staticmethod
+    def _programs(mock_subprocess_run):
+        return [call[0][0][1] for call in mock_subprocess_run.call_args_list]
+
+    def _run(self, mode, colmap_engine, colmap_params, mock_subprocess_run, fake_project_dir):
+        from tests.integration._synthetic_scene import generate_scene
+        n_views = generate_scene(fake_project_dir / "images", n_views=12, w=160, h=120)
+        colmap_params.partition_mode = mode
+        colmap_params.partition_size = 5
+        colmap_params.partition_overlap = 2
+        self._fake_colmap(mock_subprocess_run)
+        assert colmap_engine.run()[0] is True
+        return n_views + 3  # + les 3 JPEG du projet factice
+
+    def test_sequential_partition_merges_all_clusters(self, colmap_engine, colmap_params,
+                                                       mock_subprocess_run, fake_project_dir):
+        from app.core.colmap_io import list_submodels, read_sparse_model
+        total = self._run("sequential", colmap_engine, colmap_params, mock_subprocess_run, fake_project_dir)
+        programs = self._programs(mock_subprocess_run)
+        assert programs.count("mapper") == 3
+        assert "global_mapper" not in programs
+        assert programs.count("model_merger") == 2
+        assert programs.count("bundle_adjuster") == 1
+        sparse = fake_project_dir / "sparse"
+        assert len(read_sparse_model(sparse / "0").images.names) == total
+        assert [d.name for d in list_submodels(sparse)] == ["0"]
+        assert not (fake_project_dir / "partition").exists()
+
+    def test_graph_partition_from_database(self, colmap_engine, colmap_params,
+                                           mock_subprocess_run, fake_project_dir):
+        from app.core.colmap_io import read_sparse_model
+        colmap_engine.num_threads = 8  # 2 mappers simultanés × 4 threads
+        total = self._run("graph", colmap_engine, colmap_params, mock_subprocess_run, fake_project_dir)
+        programs = self._programs(mock_subprocess_run)
+        assert programs.count("mapper") == 3
+        mapper_threads = {
+            call[0][0][call[0][0].index("--Mapper.num_threads") + 1]
+            for call in mock_subprocess_run.call_args_list if call[0][0][1] == "mapper"
+        }
+        assert mapper_threads == {"4"}
+        assert len(read_sparse_model(fake_project_dir / "sparse" / "0").images.names) == total
+
+    def test_failed_cluster_is_skipped(self, colmap_engine, colmap_params, mock_subprocess_run,
+                                       fake_project_dir):
+        logs = []
+        colmap_engine.logger_callback = logs.append
+        self._fake_colmap(mock_subprocess_run)
+        fake = mock_subprocess_run.side_effect
+
+        def _side_effect(cmd, *args, **kwargs):
+            if "--image_list_path" in cmd and cmd[cmd.index("--image_list_path") + 1].endswith("cluster_2.txt"):
+                return 1
+            return fake(cmd, *args, **kwargs)
+        mock_subprocess_run.side_effect = _side_effect
+        from tests.integration._synthetic_scene import generate_scene
+        generate_scene(fake_project_dir / "images", n_views=12, w=160, h=120)
+        colmap_params.partition_mode = "sequential"
+        colmap_params.partition_size = 5
+        colmap_params.partition_overlap = 2
+        assert colmap_engine.run()[0] is True
+        assert "  cluster 3 : échec du mapper, ignoré" in logs
+        assert self._programs(mock_subprocess_run).count("model_merger") == 1
+
+    def test_all_clusters_failing_stops(self, colmap_engine, colmap_params, mock_subprocess_run,
+                                        fake_project_dir):
+        self._fake_colmap(mock_subprocess_run)
+        fake = mock_subprocess_run.side_effect
+        mock_subprocess_run.side_effect = (
+            lambda cmd, *a, **kw: 1 if "--image_list_path" in cmd else fake(cmd, *a, **kw))
+        from tests.integration._synthetic_scene import generate_scene
+        generate_scene(fake_project_dir / "images", n_views=12, w=160, h=120)
+        colmap_params.partition_mode = "sequential"
+        colmap_params.partition_size = 5
+        colmap_params.partition_overlap = 2
+        assert colmap_engine.run()[0] is False
+        assert "model_merger" not in self._programs(mock_subprocess_run)
+
+    def test_small_set_uses_single_mapper(self, colmap_engine, colmap_params, mock_subprocess_run,
+                                          fake_project_dir):
+        colmap_params.partition_mode = "auto"
+        self._fake_colmap(mock_subprocess_run)
+        assert colmap_engine.run()[0] is True
+        programs = self._programs(mock_subprocess_run)
+        assert "global_mapper" in programs
+        assert "model_merger" not in programs
@@ -0,0 +1,50 @@
+"""Test end-to-end RÉEL de la reconstruction partitionnée (COLMAP réel).
+
+La scène synthétique est découpée en clusters reconstruits séparément
+(``colmap mapper --image_list_path``), puis fusionnés par ``model_merger``
+et affinés par ``bundle_adjuster``. Le modèle final doit couvrir la quasi-
+totalité des vues, comme une reconstruction d'un seul bloc.
+
+Opt-in (marqueur ``e2e``) : ``pytest -m e2e``. Ignoré si ``colmap`` est introuvable.
+"""
+from __future__ import annotations
+
+import pytest
+
+from app.core.system import resolve_binary
+from tests.integration._synthetic_scene import generate_scene
+
+pytestmark = pytest.mark.e2e
+
+requires_colmap = pytest.mark.skipif(
+    not resolve_binary("colmap"),
+    reason="e2e réel : nécessite le binaire colmap installé",
+)
+
+N_VIEWS = 24
+
+
+@requires_colmap
+@pytest.mark.parametrize("mode", ["sequential", "graph"])
+def test_partitioned_reconstruction_registers_most_views(tmp_path, mode):
+    from app.core.colmap_io import read_sparse_model
+    from app.core.engine import ColmapEngine
+    from app.core.params import ColmapParams
+
+    src_images = tmp_path / "src_images"
+    generate_scene(src_images, n_views=N_VIEWS)
+    params = ColmapParams(partition_mode=mode, partition_size=12, partition_overlap=6)
+    engine = ColmapEngine(
+        params, str(src_images), str(tmp_path / "out"), "images", 1,
+        project_name="synth",
+        logger_callback=lambda _m: None,
+        progress_callback=lambda _x: None,
+    )
+    ok, message = engine.run()
+    assert ok, message
+
+    project = tmp_path / "out" / "synth"
+    model = read_sparse_model(project / "sparse" / "0")
+    assert len(model.images) >= N_VIEWS * 0.8
+    assert model.summary()["mean_reprojection_error"] < 2.0
+    assert not (project / "partition").exists()
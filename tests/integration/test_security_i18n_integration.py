@@ -59,6 +59,19 @@ class TestPathValidation:
 class TestI18n:
     """LanguageManager and translation tests."""
 
+    @pytest.fixture(autouse=True)
+    def _isolated_config(self, tmp_path, monkeypatch):
+        """set_language() persists to config.json: keep it out of the repo root."""
+        from app.core import i18n
+
+        manager = i18n.LanguageManager()
+        previous = manager.current_lang
+        monkeypatch.setattr(i18n, "resolve_project_root", lambda: tmp_path)
+        (tmp_path / "assets").symlink_to(Path(__file__).resolve().parents[2] / "assets")
+        yield
+        manager.current_lang = previous
+        manager._load_translations()
+
     def test_tr_returns_french(self):
         """After set_language('fr'), tr returns expected French."""
         from app.core.i18n import set_language, tr
@@ -1,8 +1,12 @@
+import asyncio
+import sys
+import threading
+import time
 from pathlib import Path
 
 import pytest
 
-from app.core.base_engine import BaseEngine
+from app.core.base_engine import AsyncProcessRunner, BaseEngine, supervisor_loop
 
 
 @pytest.fixture
@@ -92,3 +96,107 @@ class TestIsSafePath:
 
     def test_empty_string(self, engine):
         assert engine.is_safe_path("") is False
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# AsyncProcessRunner / _execute_command_async
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _python(code):
+    return [sys.executable, "-c", code]
+
+
+_PRINT_THEN_EXIT = "import sys\nfor i in range(3): print(f'line {i}', flush=True)\nsys.exit(3)"
+_SILENT_SLEEP = "import time; time.sleep(30)"
+
+
+class TestAsyncExecuteCommand:
+    def test_lines_and_returncode(self, engine):
+        lines = []
+
+        async def on_line(line):
+            lines.append(line)
+
+        original = engine.runner
+        returncode = asyncio.run(engine._execute_command_async(_python(_PRINT_THEN_EXIT), line_callback=on_line))
+        assert returncode == 3
+        assert lines == ["line 0", "line 1", "line 2"]
+        # Le runner temporaire, lié à la boucle d'asyncio.run, ne survit pas à l'appel.
+        assert engine.runner is original
+
+    @staticmethod
+    def _run_capturing_runner(engine, delay, **kwargs):
+        """Exécute ``_SILENT_SLEEP`` ; renvoie (returncode, durée, runner en cours d'exécution)."""
+        seen = []
+
+        async def main():
+            asyncio.get_running_loop().call_later(delay, lambda: seen.append(engine.runner))
+            t0 = time.monotonic()
+            returncode = await engine._execute_command_async(_python(_SILENT_SLEEP), **kwargs)
+            return returncode, time.monotonic() - t0
+
+        return (*asyncio.run(main()), seen[0])
+
+    def test_stop_wakes_pending_read(self, engine):
+        stop = threading.Timer(0.3, engine.stop)
+        stop.start()
+        returncode, elapsed, runner = self._run_capturing_runner(engine, 0.1)
+        stop.join()
+        assert returncode == -1
+        assert elapsed < 5
+        assert isinstance(runner, AsyncProcessRunner) and runner.poll() is not None
+
+    def test_inactivity_timeout(self, engine):
+        returncode, _, runner = self._run_capturing_runner(engine, 0.1, inactivity_timeout=0.3)
+        assert returncode == -1
+        assert runner.poll() is not None
+
+    def test_one_loop_supervises_concurrent_runs(self, tmp_path):
+        engines = [BaseEngine(f"job{i}", process_runner=AsyncProcessRunner()) for i in range(4)]
+        code = "import time; print('start', flush=True); time.sleep(1); print('done', flush=True)"
+
+        async def main():
+            t0 = time.monotonic()
+            codes = await asyncio.gather(*(e._execute_command_async(_python(code), line_callback=lambda _: None)
+                                           for e in engines))
+            return codes, time.monotonic() - t0
+
+        codes, elapsed = asyncio.run(main())
+        assert codes == [0, 0, 0, 0]
+        assert elapsed < 3  # exécutions simultanées, pas en série
+
+
+class TestAsyncRunnerFromThreads:
+    def test_sync_execute_command_uses_supervisor_loop(self):
+        engine = BaseEngine("sync", process_runner=AsyncProcessRunner())
+        lines = []
+        assert engine._execute_command(_python(_PRINT_THEN_EXIT), line_callback=lines.append) == 3
+        assert lines == ["line 0", "line 1", "line 2"]
+        assert engine.runner.loop is supervisor_loop()
+
+    def test_stop_from_other_thread(self):
+        engine = BaseEngine("sync", process_runner=AsyncProcessRunner())
+        threading.Timer(0.3, engine.stop).start()
+        t0 = time.monotonic()
+        assert engine._execute_command(_python(_SILENT_SLEEP)) == -1
+        assert time.monotonic() - t0 < 5
+
+    @pytest.mark.skipif(sys.platform == "win32", reason="SIGTERM ignoré : POSIX")
+    def test_terminate_does_not_block_the_caller(self):
+        runner = AsyncProcessRunner()
+        runner.start(_python("import signal, time\n"
+                             "signal.signal(signal.SIGTERM, signal.SIG_IGN)\n"
+                             "print('ready', flush=True)\n"
+                             "time.sleep(30)"))
+        assert runner.readline(timeout=10) == "ready\n"
+        t0 = time.monotonic()
+        runner.terminate()  # SIGTERM ignoré : SIGKILL seulement 5 s plus tard
+        assert time.monotonic() - t0 < 1
+        assert runner.wait(timeout=15) is not None
+
+    def test_sync_runner_interface(self):
+        runner = AsyncProcessRunner()
+        runner.start(_python("print('a'); print('b')"))
+        assert list(runner.stdout_iter()) == ["a\n", "b\n"]
+        assert runner.wait(timeout=5) == 0
+        assert runner.get_returncode() == 0
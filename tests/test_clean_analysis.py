@@ -0,0 +1,153 @@
+"""Tests pour app/core/clean_analysis.py — cache d'analyse des aperçus de nettoyage."""
+import os
+
+import numpy as np
+import pytest
+
+from app.core import clean_analysis
+from app.core.clean_analysis import (
+    CleanAnalysis,
+    analyze_ply,
+    cache_path,
+    get_cached_analysis,
+    preview_clean,
+)
+from app.core.ply_cleaner import clean_ply, compute_clean_mask
+from app.core.ply_utils import write_ply_vertices
+
+_FIELDS = ("x", "y", "z", "opacity", "scale_0", "scale_1", "scale_2")
+
+
+def _splats(n=5000, seed=0):
+    rng = np.random.default_rng(seed)
+    data = np.empty(n, dtype=[(f, "<f4") for f in _FIELDS])
+    for k in ("x", "y", "z"):
+        data[k] = rng.normal(size=n) * 3.0
+    data["opacity"] = rng.normal(size=n) * 3.0
+    for k in ("scale_0", "scale_1", "scale_2"):
+        data[k] = rng.normal(-4.0, 1.0, size=n)
+    # Quelques valeurs dupliquées pour exercer les égalités aux seuils.
+    data["opacity"][:50] = data["opacity"][50]
+    data["scale_0"][:50] = 0.0
+    return data
+
+
+@pytest.fixture(autouse=True)
+def _empty_caches(tmp_path, monkeypatch):
+    monkeypatch.setattr(clean_analysis, "CACHE_DIR", tmp_path / "cache")
+    clean_analysis._memory_cache.clear()
+    yield
+    clean_analysis._memory_cache.clear()
+
+
+@pytest.fixture
+def ply(tmp_path):
+    path = tmp_path / "scene.ply"
+    write_ply_vertices(path, _splats())
+    return path
+
+
+class TestCleanAnalysis:
+    @pytest.mark.parametrize("params", [
+        dict(opacity_min=0.1, scale_pct=99.5, outlier_pct=99.5),
+        dict(opacity_min=0.5, scale_pct=90.0, outlier_pct=95.3),
+        dict(opacity_min=0.0, scale_pct=100.0, outlier_pct=100.0),
+        dict(opacity_min=0.2, scale_pct=97.0, outlier_pct=99.0, outlier_mode="knn", knn_k=6, knn_sigma=2.0),
+    ])
+    def test_matches_compute_clean_mask(self, params):
+        data = _splats()
+        analysis = CleanAnalysis.from_vertices(data)
+        analysis.source = None
+        expected_keep, expected_stats = compute_clean_mask(*(data[f] for f in _FIELDS), **params)
+        if params.get("outlier_mode") == "knn":
+            from app.core.ply_cleaner import knn_distance
+            analysis.knn[6] = knn_distance(data["x"], data["y"], data["z"], k=6)
+        keep, stats = analysis.keep_mask(**params)
+        np.testing.assert_array_equal(keep, expected_keep)
+        assert stats == expected_stats
+
+    def test_rejects_non_splat(self):
+        data = np.zeros(3, dtype=[("x", "<f4"), ("y", "<f4"), ("z", "<f4")])
+        with pytest.raises(ValueError, match="Gaussian Splat"):
+            CleanAnalysis.from_vertices(data)
+
+
+class TestDiskCache:
+    def test_preview_writes_cache_and_reuses_it(self, ply):
+        stats = preview_clean(ply, "strong")
+        assert cache_path(ply).parent == clean_analysis.CACHE_DIR
+        assert cache_path(ply).stat().st_size < 14 * len(_splats())  # float32, sans rangs
+        assert sorted(p.name for p in ply.parent.iterdir()) == ["cache", "scene.ply"]
+        clean_analysis._memory_cache.clear()
+        cached = get_cached_analysis(ply)
+        assert cached is not None and not cached.exact
+        assert preview_clean(ply, "strong") == stats
+
+    def test_modified_file_invalidates_cache(self, ply):
+        analyze_ply(ply)
+        clean_analysis._memory_cache.clear()
+        write_ply_vertices(ply, _splats(seed=1))
+        st = os.stat(ply)
+        os.utime(ply, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+        assert get_cached_analysis(ply) is None
+
+    def test_without_disk_cache(self, ply):
+        preview_clean(ply, use_disk_cache=False)
+        assert not clean_analysis.CACHE_DIR.exists()
+
+    def test_knn_distances_are_persisted(self, ply):
+        preview_clean(ply, overrides={"outlier_mode": "knn", "knn_k": 5})
+        clean_analysis._memory_cache.clear()
+        assert 5 in get_cached_analysis(ply).knn
+
+    def test_size_cap_evicts_least_recently_used(self, ply, monkeypatch):
+        other = ply.with_name("other.ply")
+        write_ply_vertices(other, _splats(seed=2))
+        preview_clean(ply)
+        monkeypatch.setattr(clean_analysis, "CACHE_MAX_BYTES", cache_path(ply).stat().st_size)
+        st = os.stat(cache_path(ply))
+        os.utime(cache_path(ply), ns=(st.st_atime_ns, st.st_mtime_ns - 10 ** 9))
+        preview_clean(other)
+        assert cache_path(other).exists() and not cache_path(ply).exists()
+
+
+class TestCleanPlyUsesCache:
+    def test_cached_and_fresh_outputs_identical(self, ply, tmp_path):
+        fresh = clean_ply(ply, tmp_path / "fresh.ply", "strong", use_cache=False)
+        preview = preview_clean(ply, "strong")
+        logs = []
+        cached = clean_ply(ply, tmp_path / "cached.ply", "strong", log=logs.append)
+        assert any("cache" in line for line in logs)
+        assert preview["kept"] == cached["kept"] == fresh["kept"]
+        assert (tmp_path / "cached.ply").read_bytes() == (tmp_path / "fresh.ply").read_bytes()
+
+    @pytest.mark.parametrize("mode", ["low_memory", "streaming"])
+    def test_bounded_memory_modes_skip_the_cache(self, ply, tmp_path, mode):
+        overrides = {mode: True}
+        preview_clean(ply, "strong")
+        logs = []
+        stats = clean_ply(ply, tmp_path / "out.ply", "strong", overrides=overrides, log=logs.append)
+        assert not any("Analyse en cache" in line for line in logs)
+        clean_analysis._memory_cache.clear()
+        preview = preview_clean(ply, "strong", overrides=overrides)
+        assert preview["kept"] == stats["kept"]
+        assert not clean_analysis._memory_cache
+
+    def test_disk_cache_never_drives_the_write(self, ply, tmp_path):
+        fresh = clean_ply(ply, tmp_path / "fresh.ply", "strong", use_cache=False)
+        preview_clean(ply, "strong")
+        clean_analysis._memory_cache.clear()
+        get_cached_analysis(ply)  # relue du disque (float32) : approchée
+        assert get_cached_analysis(ply, exact=True) is None
+        logs = []
+        stats = clean_ply(ply, tmp_path / "out.ply", "strong", log=logs.append)
+        assert not any("Analyse en cache" in line for line in logs)
+        assert stats["kept"] == fresh["kept"]
+
+    @pytest.mark.parametrize("low_memory", [True, False])
+    def test_in_place(self, ply, low_memory):
+        original = clean_ply(ply, ply.with_name("ref.ply"), "strong", use_cache=False)
+        stats = clean_ply(ply, ply, "strong", overrides={"low_memory": low_memory}, use_cache=False)
+        assert stats["kept"] == original["kept"]
+        assert ply.read_bytes() == ply.with_name("ref.ply").read_bytes()
+        assert not list(ply.parent.glob("*.tmp"))
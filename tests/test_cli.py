@@ -504,3 +504,46 @@ class TestRobustMode:
         args = get_parser().parse_args(["colmap", "-i", "x", "-o", "y", "--filter_blur", "--blur_strength", "strong"])
         assert args.filter_blur is True
         assert args.blur_strength == "strong"
+
+
+class TestCleanCommand:
+    """Tests pour la commande clean."""
+
+    def test_jobs_flag_parses(self):
+        from app.cli.parser import get_parser
+        args = get_parser().parse_args(["clean", "-i", "x", "-o", "y", "-j", "4"])
+        assert args.jobs == 4
+        assert get_parser().parse_args(["clean", "-i", "x", "-o", "y"]).jobs == 1
+
+    @patch("app.cli.commands.clean_ply_batch")
+    def test_run_clean_passes_jobs(self, mock_batch, tmp_path):
+        from app.cli.commands import run_clean
+        from app.cli.parser import get_parser
+        mock_batch.return_value = [{"file": "a.ply", "kept": 1, "total": 2, "seconds": 0.1}]
+        args = get_parser().parse_args(["clean", "-i", str(tmp_path), "-o", str(tmp_path / "out"), "--jobs", "3"])
+        run_clean(args)
+        assert mock_batch.call_args.kwargs["workers"] == 3
+
+    @patch("app.cli.commands.clean_ply_batch")
+    def test_run_clean_passes_outlier_mode(self, mock_batch, tmp_path):
+        from app.cli.commands import run_clean
+        from app.cli.parser import get_parser
+        mock_batch.return_value = []
+        args = get_parser().parse_args(["clean", "-i", str(tmp_path), "-o", str(tmp_path / "out"),
+                                        "--outlier_mode", "knn", "--knn_k", "12"])
+        run_clean(args)
+        assert mock_batch.call_args.kwargs["overrides"] == {"outlier_mode": "knn", "knn_k": 12}
+
+    @patch("app.cli.commands.clean_ply")
+    @patch("app.cli.commands.preview_clean")
+    def test_preview_does_not_write(self, mock_preview, mock_clean, tmp_path, capsys):
+        from app.cli.commands import run_clean
+        from app.cli.parser import get_parser
+        mock_preview.return_value = {"kept": 8, "total": 10, "removed_opacity": 1,
+                                     "removed_scale": 1, "removed_outlier": 0}
+        src = tmp_path / "a.ply"
+        src.write_bytes(b"")
+        args = get_parser().parse_args(["clean", "-i", str(src), "-o", str(tmp_path / "b.ply"), "--preview"])
+        run_clean(args)
+        mock_clean.assert_not_called()
+        assert "8/10" in capsys.readouterr().out
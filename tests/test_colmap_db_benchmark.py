@@ -0,0 +1,52 @@
+"""Benchmark du tri de database.db (matching séquentiel) sur une base synthétique de 20k images.
+
+Opt-in (marqueur ``benchmark``, désélectionné par défaut) :  ``pytest -m benchmark -s``
+
+Compare la reconstruction dans un fichier voisin à l'ancien tri par UPDATE
+corrélés (``tests/_colmap_database.py``), sur deux copies de la même base.
+"""
+import shutil
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.core.params import ColmapParams
+from tests._colmap_database import dump_database, legacy_sort_database_images, make_database
+
+pytestmark = pytest.mark.benchmark
+
+N_IMAGES = 20_000
+N_KEYPOINTS = 256  # ~6 Ko de keypoints + 32 Ko de descripteurs par image
+
+
+@pytest.fixture(scope="module")
+def database(tmp_path_factory):
+    path = tmp_path_factory.mktemp("bench") / "database.db"
+    make_database(path, N_IMAGES, n_keypoints=N_KEYPOINTS)
+    return path
+
+
+def test_sort_database_2x(database, tmp_path):
+    from app.core.engine import ColmapEngine
+    with patch("app.core.engine.resolve_binary", side_effect=lambda x: x), \
+            patch("app.core.engine.is_apple_silicon", return_value=False):
+        engine = ColmapEngine(ColmapParams(), str(tmp_path / "in"), str(tmp_path / "out"), "images", 5,
+                              logger_callback=MagicMock())
+    legacy_db, new_db = tmp_path / "legacy.db", tmp_path / "database.db"
+    shutil.copy(database, legacy_db)
+    shutil.copy(database, new_db)
+
+    t0 = time.perf_counter()
+    legacy_sort_database_images(legacy_db)
+    legacy = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    engine._sort_colmap_database_images(new_db)
+    new = time.perf_counter() - t0
+
+    size = new_db.stat().st_size / 1e6
+    print(f"\nTri database.db ({N_IMAGES} images, {size:.0f} Mo) : ancien {legacy:.2f} s, "
+          f"nouveau {new:.2f} s (x{legacy / new:.1f})")
+    assert dump_database(new_db) == dump_database(legacy_db)
+    assert new_db.stat().st_size <= legacy_db.stat().st_size
+    assert new * 2 <= legacy
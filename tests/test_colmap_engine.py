@@ -3,6 +3,8 @@ import sys
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
+import pytest
+
 # Provide send2trash / cv2 stubs ONLY when the real package is unavailable
 # (headless CI). Injecting a MagicMock unconditionally would clobber a real,
 # installed cv2 for the whole session and break other tests (e.g. the COLMAP
@@ -402,6 +404,72 @@ class TestCheckAndNormalizeResolution:
         assert result is True
 
 
+    @patch("app.core.engine.resolve_binary")
+    @patch("app.core.engine.is_apple_silicon")
+    def test_probes_headers_and_resizes_in_parallel(self, mock_silicon, mock_resolve_binary, tmp_path):
+        """Dimensions lues sans décodage ; seules les images hors taille sont décodées."""
+        mock_silicon.return_value = False
+        mock_resolve_binary.side_effect = lambda x: x
+        cv2 = pytest.importorskip("cv2")
+        if isinstance(cv2, MagicMock):
+            pytest.skip("OpenCV non installé")
+        import numpy as np
+
+        from app.core.engine import ColmapEngine, probe_image_size
+
+        engine = ColmapEngine(
+            MagicMock(), str(tmp_path / "input"), str(tmp_path / "output"),
+            "images", 5, logger_callback=lambda m: None
+        )
+        engine._cv2_loaded = True
+        engine.num_threads = 4
+
+        images_dir = tmp_path / "images"
+        images_dir.mkdir()
+        for i in range(4):
+            cv2.imwrite(str(images_dir / f"img_{i}.jpg"), np.zeros((60, 80, 3), np.uint8))
+        for i in range(3):
+            cv2.imwrite(str(images_dir / f"big_{i}.png"), np.zeros((120, 160, 3), np.uint8))
+        assert probe_image_size(images_dir / "big_0.png") == (160, 120)
+
+        real_imread = cv2.imread
+        with patch("cv2.imread", side_effect=real_imread) as spy:
+            assert engine._check_and_normalize_resolution(images_dir) is True
+        # Seules les 3 images à redimensionner ont été décodées.
+        assert sorted(Path(c.args[0]).name for c in spy.call_args_list) == [f"big_{i}.png" for i in range(3)]
+        for f in images_dir.iterdir():
+            assert probe_image_size(f) == (80, 60)
+
+    def test_resize_does_not_write_through_hardlinks(self, tmp_path):
+        """Une image importée par lien physique ne modifie pas la source."""
+        cv2 = pytest.importorskip("cv2")
+        if isinstance(cv2, MagicMock):
+            pytest.skip("OpenCV non installé")
+        import os
+
+        import numpy as np
+
+        from app.core.engine import _resize_image_file, probe_image_size
+        source = tmp_path / "source.png"
+        cv2.imwrite(str(source), np.zeros((120, 160, 3), np.uint8))
+        linked = tmp_path / "linked.png"
+        os.link(source, linked)
+        assert _resize_image_file(linked, (80, 60)) is True
+        assert probe_image_size(linked) == (80, 60)
+        assert probe_image_size(source) == (160, 120)
+        assert [p.name for p in tmp_path.iterdir() if p.name.startswith(".")] == []
+
+    def test_probe_falls_back_to_opencv(self, tmp_path):
+        from app.core.engine import probe_image_size
+        fake = tmp_path / "a.jpg"
+        fake.write_bytes(b"fake_jpg")
+        with patch("cv2.imread") as mock_imread:
+            mock_imread.return_value = MagicMock(shape=(480, 640, 3))
+            assert probe_image_size(fake) == (640, 480)
+            mock_imread.return_value = None
+            assert probe_image_size(fake) is None
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # ColmapEngine utility methods
 # ─────────────────────────────────────────────────────────────────────────────
@@ -600,6 +668,72 @@ class TestSelectBlurryFiles:
         assert rejected == ["a"]  # cap = int(10 * 0.1) = 1, blurriest kept
 
 
+def _write_blur_series(directory, n=14, seed=0):
+    """JPEG texturés : 4 nets pour 3 flous (sigma 1, 2, 4) en alternance."""
+    import cv2
+    import numpy as np
+    if isinstance(cv2, MagicMock):
+        pytest.skip("OpenCV non installé")
+    rng = np.random.default_rng(seed)
+    files = []
+    for i in range(n):
+        base = cv2.resize(rng.integers(0, 256, (120, 160), dtype=np.uint8), (1280, 960),
+                          interpolation=cv2.INTER_CUBIC)
+        base = cv2.add(base, rng.integers(0, 40, (960, 1280), dtype=np.uint8))
+        sigma = [0, 0, 0, 0, 1.0, 2.0, 4.0][i % 7]
+        img = cv2.GaussianBlur(base, (0, 0), sigma) if sigma else base
+        path = directory / f"{i:03d}.jpg"
+        cv2.imwrite(str(path), img, [cv2.IMWRITE_JPEG_QUALITY, 92])
+        files.append(path)
+    return files
+
+
+class TestBlurScores:
+    """Tests pour engine.blur_score() / compute_blur_scores()."""
+
+    def _reference_scores(self, files):
+        # Ancien calcul : pleine résolution, Laplacien float64, en série.
+        import cv2
+        return {str(f): cv2.Laplacian(cv2.imread(str(f), cv2.IMREAD_GRAYSCALE), cv2.CV_64F).var()
+                for f in files}
+
+    def test_full_resolution_float32_matches_reference(self, tmp_path):
+        from app.core.engine import compute_blur_scores
+        files = _write_blur_series(tmp_path)
+        ref = self._reference_scores(files)
+        scores = compute_blur_scores(files, downscale=1, workers=4)
+        assert scores.keys() == ref.keys()
+        for f, value in ref.items():
+            assert scores[f] == pytest.approx(value, rel=1e-4)
+
+    @pytest.mark.parametrize("downscale", [1, 2])
+    def test_reduced_decode_rejects_same_files(self, tmp_path, downscale):
+        from app.core.engine import compute_blur_scores, select_blurry_files
+        files = _write_blur_series(tmp_path)
+        expected, _ = select_blurry_files(self._reference_scores(files), 0.7)
+        rejected, _ = select_blurry_files(compute_blur_scores(files, downscale=downscale), 0.7)
+        assert sorted(rejected) == sorted(expected)
+        assert len(rejected) == 6
+
+    @pytest.mark.parametrize("downscale", [0, 3, 16])
+    def test_unsupported_downscale_rejected(self, tmp_path, downscale):
+        from app.core.engine import blur_score, compute_blur_scores
+        files = _write_blur_series(tmp_path, n=1)
+        with pytest.raises(ValueError, match="non supportée"):
+            blur_score(files[0], downscale)
+        with pytest.raises(ValueError, match="non supportée"):
+            compute_blur_scores(files, downscale=downscale)
+
+    def test_unreadable_and_cancelled(self, tmp_path):
+        from app.core.engine import compute_blur_scores
+        files = _write_blur_series(tmp_path, n=3)
+        bad = tmp_path / "bad.jpg"
+        bad.write_bytes(b"not an image")
+        scores = compute_blur_scores(files + [bad], workers=2)
+        assert str(bad) not in scores and len(scores) == 3
+        assert compute_blur_scores(files, is_cancelled=lambda: True) == {}
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # ALIKED / LightGlue integration tests
 # ─────────────────────────────────────────────────────────────────────────────
@@ -780,6 +914,58 @@ class TestAlikedLightGlue:
             assert "--SiftMatching.max_ratio" not in cmd
 
 
+class TestSortDatabaseImages:
+    """Tests pour ColmapEngine._sort_colmap_database_images()."""
+
+    @pytest.fixture
+    def engine(self, tmp_path):
+        from app.core.engine import ColmapEngine
+        from app.core.params import ColmapParams
+        with patch("app.core.engine.resolve_binary", side_effect=lambda x: x), \
+                patch("app.core.engine.is_apple_silicon", return_value=False):
+            engine = ColmapEngine(ColmapParams(), str(tmp_path / "input"), str(tmp_path / "output"),
+                                  "images", 5, logger_callback=MagicMock())
+        return engine
+
+    def test_matches_legacy_renumbering(self, engine, tmp_path):
+        import shutil
+
+        from tests._colmap_database import dump_database, legacy_sort_database_images, make_database
+        make_database(tmp_path / "legacy.db", 50)
+        shutil.copy(tmp_path / "legacy.db", tmp_path / "database.db")
+        legacy_sort_database_images(tmp_path / "legacy.db")
+        engine._sort_colmap_database_images(tmp_path / "database.db")
+
+        result = dump_database(tmp_path / "database.db")
+        assert result == dump_database(tmp_path / "legacy.db")
+        assert result["integrity"] == [("ok",)]
+        images = sorted(result["images"])
+        assert [name for _, name, _ in images] == [f"frame_{i:06d}.jpg" for i in range(50)]
+        assert result["matches"] == []
+        assert not (tmp_path / "database.db.sorting").exists()
+
+    def test_sorted_database_untouched(self, engine, tmp_path):
+        from tests._colmap_database import make_database
+        path = tmp_path / "database.db"
+        make_database(path, 5)
+        engine._sort_colmap_database_images(path)
+        before = path.read_bytes()
+        engine._sort_colmap_database_images(path)
+        assert path.read_bytes() == before
+        engine.logger_callback.assert_called_with("Ordre des images COLMAP deja trie.")
+
+    def test_failure_keeps_original(self, engine, tmp_path):
+        from tests._colmap_database import make_database
+        path = tmp_path / "database.db"
+        make_database(path, 5)
+        before = path.read_bytes()
+        with patch.object(type(engine), "_renumbered_copy_sql", side_effect=RuntimeError("boom")):
+            engine._sort_colmap_database_images(path)
+        assert path.read_bytes() == before
+        assert not (tmp_path / "database.db.sorting").exists()
+        assert "boom" in engine.logger_callback.call_args[0][0]
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # Tests pour app/cli/commands.py — _resolve_matching_type
 # ─────────────────────────────────────────────────────────────────────────────
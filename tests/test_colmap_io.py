@@ -0,0 +1,191 @@
+"""Tests pour app/core/colmap_io.py — lecture des modèles sparse et de database.db."""
+import sqlite3
+
+import numpy as np
+import pytest
+
+from app.core.colmap_io import (
+    MAX_IMAGE_ID,
+    ColmapDatabase,
+    analyze_submodels,
+    list_submodels,
+    model_files,
+    promote_submodel,
+    read_points3D,
+    read_sparse_model,
+)
+from tests._colmap_models import PINHOLE_CAMERA, write_binary_model, write_simple_model
+
+CAMERAS = [PINHOLE_CAMERA]
+IMAGES = [
+    # id, qvec, tvec, camera_id, name, [(x, y, point3D_id)]
+    (1, [1, 0, 0, 0], [0, 0, 0], 1, "a.jpg", [(1.0, 2.0, 20), (3.0, 4.0, -1), (5.0, 6.0, 10)]),
+    (2, [0, 0, 1, 0], [1, 2, 3], 1, "sub/b.jpg", [(7.0, 8.0, 10)]),
+]
+# Ordre volontairement non trié : COLMAP écrit dans l'ordre de sa table de hachage.
+POINTS = [
+    (20, [1.0, 2.0, 3.0], [255, 0, 0], 0.5, [(1, 0)]),
+    (10, [4.0, 5.0, 6.0], [0, 255, 0], 1.5, [(1, 2), (2, 0)]),
+]
+
+
+def _write_bin(model_dir):
+    write_binary_model(model_dir, CAMERAS, IMAGES, POINTS)
+
+
+def _write_txt(model_dir):
+    model_dir.mkdir(parents=True, exist_ok=True)
+    (model_dir / "cameras.txt").write_text("# Camera list\n" + "".join(
+        f"{c} PINHOLE {w} {h} {' '.join(map(str, p))}\n" for c, _, w, h, p in CAMERAS
+    ))
+    lines = ["# Image list"]
+    for image_id, q, t, cam_id, name, pts in IMAGES:
+        lines.append(f"{image_id} {' '.join(map(str, q))} {' '.join(map(str, t))} {cam_id} {name}")
+        lines.append(" ".join(f"{x} {y} {pid}" for x, y, pid in pts))
+    (model_dir / "images.txt").write_text("\n".join(lines) + "\n")
+    (model_dir / "points3D.txt").write_text("".join(
+        f"{pid} {' '.join(map(str, xyz))} {' '.join(map(str, rgb))} {err} "
+        + " ".join(f"{i} {k}" for i, k in track) + "\n"
+        for pid, xyz, rgb, err, track in POINTS
+    ))
+
+
+class TestSparseModel:
+    @pytest.mark.parametrize("writer", [_write_bin, _write_txt])
+    def test_reads_model(self, tmp_path, writer):
+        writer(tmp_path / "0")
+        model = read_sparse_model(tmp_path / "0", with_points2D=True, with_tracks=True)
+
+        cam = model.cameras[1]
+        assert (cam.model, cam.width, cam.height) == ("PINHOLE", 640, 480)
+        np.testing.assert_array_equal(cam.params, [500, 510, 320, 240])
+
+        assert model.images.names == ["a.jpg", "sub/b.jpg"]
+        np.testing.assert_array_equal(model.images.num_points2D, [3, 1])
+        np.testing.assert_array_equal(model.images.num_observations, [2, 1])
+        np.testing.assert_array_equal(model.images.points2D[0]["point3D_id"], [20, -1, 10])
+        # Rotation de 180° autour de y : centre = -Rᵀ t = (1, -2, 3).
+        np.testing.assert_allclose(model.images.centers(), [[0, 0, 0], [1, -2, 3]], atol=1e-12)
+
+        points = model.points
+        np.testing.assert_array_equal(points.ids, [10, 20])
+        np.testing.assert_array_equal(points.xyz, [[4, 5, 6], [1, 2, 3]])
+        np.testing.assert_array_equal(points.rgb, [[0, 255, 0], [255, 0, 0]])
+        np.testing.assert_array_equal(points.track_lengths, [2, 1])
+        np.testing.assert_array_equal(points.tracks["image_id"], [1, 2, 1])
+        np.testing.assert_array_equal(points.tracks["point2D_idx"], [2, 0, 0])
+        np.testing.assert_array_equal(points.track_offsets(), [0, 2, 3])
+
+        summary = model.summary()
+        assert summary["registered_images"] == 2
+        assert summary["points3D"] == 2
+        assert summary["observations"] == 3
+        assert summary["mean_track_length"] == pytest.approx(1.5)
+        assert summary["mean_reprojection_error"] == pytest.approx(1.0)
+
+    def test_tracks_not_loaded_by_default(self, tmp_path):
+        _write_bin(tmp_path / "0")
+        points = read_points3D(tmp_path / "0" / "points3D.bin")
+        assert points.tracks is None
+        np.testing.assert_array_equal(points.track_lengths, [2, 1])
+
+    def test_truncated_points_file(self, tmp_path):
+        _write_bin(tmp_path / "0")
+        path = tmp_path / "0" / "points3D.bin"
+        path.write_bytes(path.read_bytes()[:-4])
+        with pytest.raises(ValueError):
+            read_points3D(path)
+
+    def test_submodel_listing(self, tmp_path):
+        _write_bin(tmp_path / "0")
+        _write_txt(tmp_path / "10")
+        _write_bin(tmp_path / "2")
+        (tmp_path / "2" / "images.bin").unlink()
+        (tmp_path / "notes").mkdir()
+        assert [d.name for d in list_submodels(tmp_path)] == ["0", "10"]
+        assert model_files(tmp_path / "2") is None
+        with pytest.raises(ValueError):
+            read_sparse_model(tmp_path / "2")
+
+
+class TestSubmodelSelection:
+    def test_ranks_by_images_then_track_length(self, tmp_path):
+        write_simple_model(tmp_path / "0", ["a.jpg", "b.jpg"])
+        write_simple_model(tmp_path / "1", ["c.jpg", "d.jpg", "e.jpg"], n_points=2)
+        write_simple_model(tmp_path / "2", ["f.jpg", "g.jpg", "h.jpg"], n_points=6)
+        (tmp_path / "3").mkdir()
+        for stem in ("cameras", "images", "points3D"):
+            (tmp_path / "3" / f"{stem}.bin").touch()  # illisible : ignoré
+
+        reports = analyze_submodels(tmp_path)
+        assert [r.name for r in reports] == ["1", "2", "0"]
+        assert reports[0].image_names == {"c.jpg", "d.jpg", "e.jpg"}
+        assert reports[0].to_dict()["registered_images"] == 3
+
+    def test_tie_on_track_length_keeps_lowest_number(self, tmp_path):
+        write_simple_model(tmp_path / "0", ["a.jpg", "b.jpg"])
+        write_simple_model(tmp_path / "1", ["c.jpg", "d.jpg"])
+        assert [r.name for r in analyze_submodels(tmp_path)] == ["0", "1"]
+
+    def test_promote_swaps_with_zero(self, tmp_path):
+        write_simple_model(tmp_path / "0", ["a.jpg"])
+        write_simple_model(tmp_path / "1", ["b.jpg", "c.jpg"])
+        promote_submodel(tmp_path, "1")
+        assert read_sparse_model(tmp_path / "0").images.names == ["b.jpg", "c.jpg"]
+        assert read_sparse_model(tmp_path / "1").images.names == ["a.jpg"]
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["0", "1"]
+
+    def test_promote_without_zero(self, tmp_path):
+        write_simple_model(tmp_path / "1", ["b.jpg"])
+        promote_submodel(tmp_path, "1")
+        assert [p.name for p in tmp_path.iterdir()] == ["0"]
+
+
+class TestColmapDatabase:
+    def _database(self, path):
+        con = sqlite3.connect(path)
+        con.executescript("""
+            CREATE TABLE cameras (camera_id INTEGER PRIMARY KEY, model INTEGER, width INTEGER,
+                                  height INTEGER, params BLOB, prior_focal_length INTEGER);
+            CREATE TABLE images (image_id INTEGER PRIMARY KEY, name TEXT, camera_id INTEGER);
+            CREATE TABLE keypoints (image_id INTEGER PRIMARY KEY, rows INTEGER, cols INTEGER, data BLOB);
+            CREATE TABLE descriptors (image_id INTEGER PRIMARY KEY, rows INTEGER, cols INTEGER, data BLOB);
+            CREATE TABLE matches (pair_id INTEGER PRIMARY KEY, rows INTEGER, cols INTEGER, data BLOB);
+            CREATE TABLE two_view_geometries (pair_id INTEGER PRIMARY KEY, rows INTEGER, cols INTEGER,
+                                              data BLOB, config INTEGER);
+        """)
+        con.execute("INSERT INTO cameras VALUES (1, 0, 100, 80, ?, 0)",
+                    (np.array([90.0, 50.0, 40.0]).tobytes(),))
+        con.executemany("INSERT INTO images VALUES (?, ?, 1)", [(1, "a.jpg"), (2, "b.jpg")])
+        kp = np.arange(12, dtype=np.float32).reshape(3, 4)
+        con.execute("INSERT INTO keypoints VALUES (1, 3, 4, ?)", (kp.tobytes(),))
+        con.execute("INSERT INTO keypoints VALUES (2, 0, 4, NULL)")
+        desc = np.full((3, 128), 7, dtype=np.uint8)
+        con.execute("INSERT INTO descriptors VALUES (1, 3, 128, ?)", (desc.tobytes(),))
+        pairs = np.array([[0, 1], [2, 0]], dtype=np.uint32)
+        con.execute("INSERT INTO matches VALUES (?, 2, 2, ?)", (MAX_IMAGE_ID + 2, pairs.tobytes()))
+        con.execute("INSERT INTO two_view_geometries VALUES (?, 1, 2, ?, 2)",
+                    (MAX_IMAGE_ID + 2, pairs[:1].tobytes()))
+        con.commit()
+        con.close()
+
+    def test_reads_blobs(self, tmp_path):
+        path = tmp_path / "database.db"
+        self._database(path)
+        with ColmapDatabase(path) as db:
+            assert db.cameras()[1].model == "SIMPLE_PINHOLE"
+            assert db.images() == {1: "a.jpg", 2: "b.jpg"}
+            assert db.keypoint_counts() == {1: 3, 2: 0}
+            assert db.keypoints(1).shape == (3, 4)
+            assert db.keypoints(2).shape == (0, 4)
+            assert db.descriptors(1).dtype == np.uint8
+            np.testing.assert_array_equal(db.matches(1, 2), [[0, 1], [2, 0]])
+            np.testing.assert_array_equal(db.matches(2, 1), [[1, 0], [0, 2]])
+            assert db.matches(1, 2, verified=True).shape == (1, 2)
+            id1, id2, counts = db.match_counts()
+            assert (id1.tolist(), id2.tolist(), counts.tolist()) == ([1], [2], [2])
+            assert [(a, b, m.shape) for a, b, m in db.iter_matches(verified=True)] == [(1, 2, (1, 2))]
+
+    def test_missing_database(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            ColmapDatabase(tmp_path / "database.db")
@@ -0,0 +1,70 @@
+"""Tests pour app/core/colmap_partition.py — découpage des grands jeux d'images."""
+import numpy as np
+
+from app.core.colmap_partition import (
+    merge_plan,
+    partition_match_graph,
+    partition_sequential,
+    plan_workers,
+)
+
+
+def _edges(pairs):
+    arr = np.array(pairs, dtype=np.int64)
+    return arr[:, 0], arr[:, 1], arr[:, 2]
+
+
+class TestSequential:
+    def test_balanced_slices_with_forward_overlap(self):
+        names = [f"f{i:02d}.jpg" for i in range(10)]
+        clusters = partition_sequential(reversed(names), size=4, overlap=1)
+        # 10 images, ≤ 4 par cluster → 3 clusters équilibrés (4, 4, 2).
+        assert clusters == [names[0:5], names[4:9], names[8:10]]
+
+    def test_single_cluster_and_empty(self):
+        assert partition_sequential(["b", "a"], size=5) == [["a", "b"]]
+        assert partition_sequential([], size=5) == []
+
+
+class TestMatchGraph:
+    @staticmethod
+    def _two_cliques():
+        # Deux cliques {1..4} et {5..8} fortement liées, un pont faible 4–5.
+        pairs = [(a, b, 100) for a in range(1, 5) for b in range(a + 1, 5)]
+        pairs += [(a, b, 100) for a in range(5, 9) for b in range(a + 1, 9)]
+        pairs.append((4, 5, 10))
+        return _edges(pairs)
+
+    def test_clusters_follow_strong_edges(self):
+        id1, id2, w = self._two_cliques()
+        clusters = partition_match_graph(range(1, 9), id1, id2, w, size=4)
+        assert sorted(clusters) == [[1, 2, 3, 4], [5, 6, 7, 8]]
+
+    def test_overlap_adds_most_connected_neighbours(self):
+        id1, id2, w = self._two_cliques()
+        clusters = partition_match_graph(range(1, 9), id1, id2, w, size=4, overlap=1)
+        assert sorted(clusters) == [[1, 2, 3, 4, 5], [4, 5, 6, 7, 8]]
+
+    def test_isolated_images_are_assigned(self):
+        id1, id2, w = _edges([(1, 2, 50), (2, 3, 50)])
+        clusters = partition_match_graph([1, 2, 3, 4, 5], id1, id2, w, size=3)
+        assert sorted(i for c in clusters for i in c) == [1, 2, 3, 4, 5]
+        assert [1, 2, 3] in clusters
+
+
+class TestScheduling:
+    def test_plan_workers_within_thread_budget(self):
+        assert plan_workers(10, threads=16) == (4, 4)
+        assert plan_workers(2, threads=16) == (2, 8)
+        assert plan_workers(10, threads=2) == (1, 2)
+        assert plan_workers(10, threads=8, workers=3) == (3, 2)
+
+    def test_merge_plan_prefers_largest_overlap(self):
+        sets = {
+            "a": frozenset("abcde"),
+            "b": frozenset("cdefg"),
+            "c": frozenset("defghij"),
+        }
+        assert merge_plan(sets, 3) == ("b", "c", 4)
+        assert merge_plan(sets, 3, exclude={frozenset(("b", "c"))}) == ("a", "b", 3)
+        assert merge_plan(sets, 5) is None
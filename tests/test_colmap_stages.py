@@ -0,0 +1,96 @@
+"""Tests pour app/core/colmap_stages.py — empreintes d'étapes et cache des bases."""
+import os
+from dataclasses import replace
+
+from app.core.colmap_stages import STAGES, StageCache, StageManifest, image_set_fingerprint, stage_keys
+from app.core.params import ColmapParams
+
+
+def _images(tmp_path):
+    images = tmp_path / "images"
+    (images / "cam1").mkdir(parents=True)
+    (images / "a.jpg").write_bytes(b"a")
+    (images / "cam1" / "b.png").write_bytes(b"bb")
+    (images / "cam1" / "b.mask.png").write_bytes(b"mask")
+    (images / ".hidden.jpg").write_bytes(b"h")
+    return images
+
+
+class TestFingerprints:
+    def test_image_fingerprint_tracks_size_and_mtime(self, tmp_path):
+        images = _images(tmp_path)
+        base = image_set_fingerprint(images)
+        assert image_set_fingerprint(images) == base
+        (images / "cam1" / "b.mask.png").write_bytes(b"other mask")
+        assert image_set_fingerprint(images) == base
+        st = os.stat(images / "a.jpg")
+        os.utime(images / "a.jpg", ns=(st.st_atime_ns, st.st_mtime_ns + 1))
+        assert image_set_fingerprint(images) != base
+
+    def test_stage_keys_change_from_first_affected_stage(self):
+        params = ColmapParams()
+        keys = stage_keys("imgs", params)
+        mapper = stage_keys("imgs", replace(params, min_num_matches=30))
+        assert [mapper[s] == keys[s] for s in keys] == [True, True, True, False, False]
+        matching = stage_keys("imgs", replace(params, matcher_type="sequential"))
+        assert matching["extraction"] == keys["extraction"] and matching["matching"] != keys["matching"]
+        assert stage_keys("other", params)["extraction"] != keys["extraction"]
+
+
+class TestStageCache:
+    def test_store_restore_and_prune(self, tmp_path):
+        cache = StageCache(tmp_path / "cache", keep=2)
+        db = tmp_path / "database.db"
+        for i in range(3):
+            db.write_bytes(f"db{i}".encode())
+            cache.store("features", f"k{i}", db)
+            os.utime(cache.path("features", f"k{i}"), ns=(i, i))
+        cache._prune("features")
+        assert not cache.has("features", "k0")
+        assert cache.restore("features", "k1", db)
+        assert db.read_bytes() == b"db1"
+        assert not cache.restore("matches", "k1", db)
+
+    def test_meta_follows_its_database(self, tmp_path):
+        cache = StageCache(tmp_path / "cache", keep=1)
+        db = tmp_path / "database.db"
+        db.write_bytes(b"db")
+        cache.store("matches", "k0", db, meta={"matcher": "sequential", "overlap": 12})
+        assert cache.meta("matches", "k0") == {"matcher": "sequential", "overlap": 12}
+        assert cache.size() == 2
+        os.utime(cache.path("matches", "k0"), ns=(0, 0))
+        cache.store("matches", "k1", db)
+        assert cache.meta("matches", "k1") is None
+        assert not cache.meta_path("matches", "k0").exists()
+
+
+class TestStageManifest:
+    def test_roundtrip_and_artifact_check(self, tmp_path):
+        keys = stage_keys("imgs", ColmapParams())
+        manifest = StageManifest(tmp_path)
+        (tmp_path / "database.db").write_bytes(b"db")
+        (tmp_path / "sparse" / "0").mkdir(parents=True)
+        (tmp_path / "sparse" / "0" / "cameras.bin").write_bytes(b"cam")
+        manifest.mark_complete("extraction", keys["extraction"])
+        manifest.mark_complete("matching", keys["matching"], [tmp_path / "database.db"])
+        manifest.mark_complete("calibration", keys["calibration"])
+        manifest.mark_complete("mapper", keys["mapper"], [tmp_path / "sparse"])
+
+        reloaded = StageManifest(tmp_path)
+        assert reloaded.completed_count(keys) == 4
+        (tmp_path / "sparse" / "0" / "cameras.bin").write_bytes(b"changed")
+        assert reloaded.completed_count(keys) == 3
+        other = stage_keys("imgs", replace(ColmapParams(), max_ratio=0.6))
+        assert reloaded.completed_count(other) == 1
+
+    def test_invalidate_from_drops_later_stages(self, tmp_path):
+        keys = stage_keys("imgs", ColmapParams())
+        manifest = StageManifest(tmp_path)
+        for stage in STAGES:
+            manifest.mark_complete(stage, keys[stage])
+        manifest.invalidate_from("calibration")
+        assert set(StageManifest(tmp_path).stages) == {"extraction", "matching"}
+
+    def test_corrupt_manifest_is_ignored(self, tmp_path):
+        (tmp_path / "colmap_stages.json").write_text("{not json")
+        assert StageManifest(tmp_path).stages == {}
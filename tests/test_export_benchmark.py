@@ -0,0 +1,76 @@
+"""Benchmark des exports texte vectorisés (XYZ/OBJ) sur un nuage synthétique de 5M points.
+
+Opt-in (marqueur ``benchmark``, désélectionné par défaut) :  ``pytest -m benchmark -s``
+
+L'ancienne boucle par vertex est mesurée sur un sous-échantillon puis
+extrapolée (la faire tourner sur 5M points prendrait plusieurs minutes).
+
+Objectif x10 : OBJ (``%.6f`` rendu directement en octets). XYZ écrit
+``repr(float)`` — plus courte représentation exacte, calculée par CPython et
+qui coûte à elle seule plusieurs fois le budget d'un x10 — : son critère est
+d'approcher ce plafond, le coût des trois ``repr`` par ligne.
+"""
+import io
+import time
+
+import numpy as np
+import pytest
+
+from app.core.export_engine import ExportEngine
+from tests._ply_text_reference import legacy_obj_vertices, legacy_xyz, make_splat_cloud, write_binary_ply
+
+pytestmark = pytest.mark.benchmark
+
+N_POINTS = 5_000_000
+N_LEGACY_SAMPLE = 200_000
+
+
+@pytest.fixture(scope="module")
+def cloud(tmp_path_factory):
+    data = make_splat_cloud(N_POINTS, seed=42)
+    path = tmp_path_factory.mktemp("bench") / "cloud.ply"
+    write_binary_ply(path, data)
+    return path, data
+
+
+def _legacy_rate(writer, data):
+    sample = data[:N_LEGACY_SAMPLE]
+    t0 = time.perf_counter()
+    writer(io.StringIO(), sample)
+    return len(sample) / (time.perf_counter() - t0)
+
+
+def _export_rate(path, out_dir, fmt, options):
+    engine = ExportEngine(logger_callback=lambda _msg: None)
+    t0 = time.perf_counter()
+    assert engine.export(str(path), str(out_dir), fmt, options=options)
+    return N_POINTS / (time.perf_counter() - t0)
+
+
+def test_obj_export_10x(cloud, tmp_path):
+    path, data = cloud
+    legacy = _legacy_rate(lambda f, d: legacy_obj_vertices(f, d), data)
+    new = _export_rate(path, tmp_path, "obj", {"include_materials": False})
+    print(f"\nOBJ : ancien {legacy:,.0f} pts/s, nouveau {new:,.0f} pts/s (x{new / legacy:.1f})")
+    assert new >= 10 * legacy
+
+
+def _repr_ceiling(data):
+    """Débit si l'export ne faisait que les ``repr`` des coordonnées."""
+    sample = data[:N_LEGACY_SAMPLE]
+    cols = [sample[k].astype(np.float64).tolist() for k in ("x", "y", "z")]
+    t0 = time.perf_counter()
+    for col in cols:
+        list(map(repr, col))
+    return len(sample) / (time.perf_counter() - t0)
+
+
+def test_xyz_export_near_repr_ceiling(cloud, tmp_path):
+    path, data = cloud
+    legacy = _legacy_rate(lambda f, d: legacy_xyz(f, d, include_colors=True), data)
+    ceiling = _repr_ceiling(data)
+    new = _export_rate(path, tmp_path, "xyz", {"include_colors": True})
+    print(f"\nXYZ : ancien {legacy:,.0f} pts/s, nouveau {new:,.0f} pts/s (x{new / legacy:.1f}), "
+          f"plafond repr {ceiling:,.0f} pts/s ({new / ceiling:.0%})")
+    assert new >= 1.5 * legacy
+    assert new >= 0.6 * ceiling
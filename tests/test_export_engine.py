@@ -1,5 +1,8 @@
+import io
 import struct
+from unittest.mock import patch
 
+import numpy as np
 import pytest
 
 from app.core.export_engine import ExportEngine
@@ -168,3 +171,93 @@ class TestExportEdgeCases:
         assert result is True
         xyz_file = out_dir / "empty.xyz"
         assert xyz_file.read_text().strip() == ""
+
+
+class TestVectorisedTextExport:
+    """The chunked NumPy formatting must match the former per-vertex loops byte for byte."""
+
+    N = 3000
+
+    @pytest.fixture
+    def cloud(self, tmp_path):
+        from tests._ply_text_reference import make_splat_cloud, write_binary_ply
+        data = make_splat_cloud(self.N)
+        path = tmp_path / "cloud.ply"
+        write_binary_ply(path, data)
+        return path, data
+
+    @pytest.mark.parametrize("include_colors,delimiter", [(False, " "), (True, " "), (True, ","), (True, "%")])
+    def test_xyz_identical(self, engine, tmp_path, cloud, include_colors, delimiter):
+        from tests._ply_text_reference import legacy_xyz
+        path, data = cloud
+        with patch("app.core.text_columns.TEXT_CHUNK", 1000):
+            assert engine.export(str(path), str(tmp_path / "out"), "xyz",
+                                 options={"include_colors": include_colors, "delimiter": delimiter})
+        expected = io.StringIO()
+        legacy_xyz(expected, data, include_colors, delimiter)
+        assert (tmp_path / "out" / "cloud.xyz").read_text() == expected.getvalue()
+
+    @pytest.mark.parametrize("include_colors,scale", [(True, 1.0), (False, 2.5), (True, 0.1)])
+    def test_obj_identical(self, engine, tmp_path, cloud, include_colors, scale):
+        from tests._ply_text_reference import legacy_obj_vertices
+        path, data = cloud
+        assert engine.export(str(path), str(tmp_path / "out"), "obj",
+                             options={"include_vertex_colors": include_colors, "scale": scale, "include_materials": False})
+        expected = io.StringIO()
+        expected.write("# Exported from CorbeauSplat\no PointCloud\n\n")
+        legacy_obj_vertices(expected, data, include_colors, scale)
+        expected.write(f"\n# {self.N} vertices\n")
+        assert (tmp_path / "out" / "cloud.obj").read_text() == expected.getvalue()
+
+    def test_ascii_ply_identical_to_plyfile(self, engine, tmp_path, cloud):
+        plyfile = pytest.importorskip("plyfile")
+        path, _ = cloud
+        # Comments must survive the fast path exactly as plyfile writes them.
+        raw = path.read_bytes().replace(b"format binary_little_endian 1.0\n",
+                                        b"format binary_little_endian 1.0\ncomment made by test\nobj_info demo\n", 1)
+        path.write_bytes(raw)
+        out_dir = tmp_path / "out"
+        out_dir.mkdir()
+        assert engine.export(str(path), str(out_dir), "ply", options={"ascii_format": True})
+        reference = tmp_path / "reference.ply"
+        ply = plyfile.PlyData.read(str(path))
+        ply.text = True
+        ply.write(str(reference))
+        assert (out_dir / "cloud.ply").read_bytes() == reference.read_bytes()
+
+    def test_assimp_temp_obj_identical(self, engine, tmp_path, cloud):
+        from tests._ply_text_reference import legacy_assimp_vertices
+        path, data = cloud
+        captured = {}
+
+        def fake_convert(obj_path, _out):
+            captured["obj"] = obj_path.read_text()
+            return True
+
+        with patch.object(engine, "_convert_obj_to_glb", side_effect=fake_convert):
+            assert engine._try_export_glb_assimp(path, tmp_path / "cloud.glb", {})
+        expected = io.StringIO()
+        expected.write("# Temp OBJ from PLY\nmtllib cloud_temp.mtl\no PointCloud\n\n")
+        legacy_assimp_vertices(expected, data)
+        expected.write(f"\n# {self.N} vertices\n")
+        assert captured["obj"] == expected.getvalue()
+
+    def test_assimp_temp_obj_float32_text(self, engine, tmp_path):
+        from tests._ply_text_reference import legacy_assimp_vertices, write_binary_ply
+        data = np.zeros(1, dtype=[("x", "<f4"), ("y", "<f4"), ("z", "<f4")])
+        data["x"], data["y"], data["z"] = 0.1, 1.5, -2.0
+        path = tmp_path / "one.ply"
+        write_binary_ply(path, data)
+        captured = {}
+
+        def fake_convert(obj_path, _out):
+            captured["obj"] = obj_path.read_text()
+            return True
+
+        with patch.object(engine, "_convert_obj_to_glb", side_effect=fake_convert):
+            assert engine._try_export_glb_assimp(path, tmp_path / "one.glb", {})
+        # Texte de l'ancienne boucle f"{np.float32}", pas str(np.float32) ("0.1").
+        expected = io.StringIO()
+        legacy_assimp_vertices(expected, data)
+        assert expected.getvalue() == "v 0.10000000149011612 1.5 -2.0\n"
+        assert expected.getvalue() in captured["obj"]
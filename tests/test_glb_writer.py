@@ -0,0 +1,126 @@
+"""Tests pour app/core/glb_writer.py — writer glTF 2.0 binaire intégré."""
+import json
+import struct
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from app.core.export_engine import ExportEngine
+from app.core.glb_writer import KHR_GAUSSIAN_SPLATTING, SH_C0, write_glb
+
+
+def _read_glb(path):
+    raw = path.read_bytes()
+    magic, version, total = struct.unpack_from("<III", raw, 0)
+    assert (magic, version, total) == (0x46546C67, 2, len(raw))
+    json_len, json_type = struct.unpack_from("<II", raw, 12)
+    assert json_type == 0x4E4F534A and json_len % 4 == 0
+    gltf = json.loads(raw[20:20 + json_len])
+    bin_len, bin_type = struct.unpack_from("<II", raw, 20 + json_len)
+    assert bin_type == 0x004E4942 and bin_len % 4 == 0
+    binary = raw[28 + json_len:28 + json_len + bin_len]
+    return gltf, binary
+
+
+def _accessor(gltf, binary, name):
+    prim = gltf["meshes"][0]["primitives"][0]
+    acc = gltf["accessors"][prim["attributes"][name]]
+    view = gltf["bufferViews"][acc["bufferView"]]
+    comps = {"SCALAR": 1, "VEC3": 3, "VEC4": 4}[acc["type"]]
+    dtype = np.float32 if acc["componentType"] == 5126 else np.uint8
+    rows = np.frombuffer(binary, dtype=np.uint8)[:view["byteLength"]].reshape(acc["count"], view["byteStride"])
+    cols = rows[:, acc["byteOffset"]:acc["byteOffset"] + comps * np.dtype(dtype).itemsize]
+    return np.ascontiguousarray(cols).view(dtype).reshape(acc["count"], comps)
+
+
+def _splats(n=5):
+    fields = ["x", "y", "z", "opacity", "scale_0", "scale_1", "scale_2",
+              "rot_0", "rot_1", "rot_2", "rot_3", "f_dc_0", "f_dc_1", "f_dc_2"]
+    data = np.zeros(n, dtype=[(f, "<f4") for f in fields])
+    data["x"] = np.arange(n)
+    data["y"] = -np.arange(n)
+    data["z"] = 0.5
+    data["opacity"] = 0.0  # sigmoid -> 0.5
+    data["scale_0"] = np.log(2.0)
+    data["rot_0"] = 2.0  # w, unnormalised
+    data["f_dc_0"] = 1.0
+    return data
+
+
+class TestWriteGlb:
+    def test_colored_point_cloud(self, tmp_path):
+        data = np.zeros(3, dtype=[("x", "<f4"), ("y", "<f4"), ("z", "<f4"),
+                                  ("red", "u1"), ("green", "u1"), ("blue", "u1")])
+        data["x"] = [1, 2, 3]
+        data["red"] = [255, 10, 0]
+        path = tmp_path / "c.glb"
+        written = write_glb(path, data)
+        assert written == path.stat().st_size
+        gltf, binary = _read_glb(path)
+        prim = gltf["meshes"][0]["primitives"][0]
+        assert prim["mode"] == 0
+        assert set(prim["attributes"]) == {"POSITION", "COLOR_0"}
+        assert "extensionsUsed" not in gltf
+        pos_acc = gltf["accessors"][prim["attributes"]["POSITION"]]
+        assert pos_acc["min"] == [1.0, 0.0, 0.0] and pos_acc["max"] == [3.0, 0.0, 0.0]
+        np.testing.assert_array_equal(_accessor(gltf, binary, "POSITION")[:, 0], [1, 2, 3])
+        np.testing.assert_array_equal(_accessor(gltf, binary, "COLOR_0")[:, 0], [255, 10, 0])
+        assert (_accessor(gltf, binary, "COLOR_0")[:, 3] == 255).all()
+
+    def test_gaussian_attributes(self, tmp_path):
+        path = tmp_path / "s.glb"
+        write_glb(path, _splats(), chunk_size=2)
+        gltf, binary = _read_glb(path)
+        assert gltf["extensionsUsed"] == [KHR_GAUSSIAN_SPLATTING]
+        assert "extensionsRequired" not in gltf
+        prefix = KHR_GAUSSIAN_SPLATTING + ":"
+        np.testing.assert_allclose(_accessor(gltf, binary, prefix + "SCALE")[:, 0], 2.0, rtol=1e-6)
+        np.testing.assert_allclose(_accessor(gltf, binary, prefix + "ROTATION"), [[0, 0, 0, 1]] * 5)
+        np.testing.assert_allclose(_accessor(gltf, binary, prefix + "OPACITY")[:, 0], 0.5)
+        np.testing.assert_allclose(_accessor(gltf, binary, prefix + "SH_DEGREE_0_COEF_0")[:, 0], 1.0)
+        color = _accessor(gltf, binary, "COLOR_0")
+        assert color[0, 0] == round((0.5 + SH_C0) * 255)
+        assert color[0, 3] == 128  # sigmoid(0) = 0.5
+        np.testing.assert_array_equal(_accessor(gltf, binary, "POSITION")[:, 1], -np.arange(5))
+
+    def test_stride_and_offsets_aligned(self, tmp_path):
+        path = tmp_path / "s.glb"
+        write_glb(path, _splats())
+        gltf, _ = _read_glb(path)
+        assert gltf["bufferViews"][0]["byteStride"] % 4 == 0
+        assert all(a["byteOffset"] % 4 == 0 for a in gltf["accessors"])
+
+    def test_rejects_empty_and_missing_xyz(self, tmp_path):
+        with pytest.raises(ValueError):
+            write_glb(tmp_path / "e.glb", _splats(0))
+        with pytest.raises(ValueError):
+            write_glb(tmp_path / "e.glb", np.zeros(2, dtype=[("a", "<f4")]))
+
+
+class TestExportEngineGlb:
+    def test_auto_uses_native_writer(self, tmp_path):
+        from tests._ply_text_reference import make_splat_cloud, write_binary_ply
+        src = tmp_path / "cloud.ply"
+        write_binary_ply(src, make_splat_cloud(50))
+        engine = ExportEngine(logger_callback=lambda _m: None)
+        with patch.object(engine, "_try_export_glb_trimesh") as trimesh:
+            assert engine.export(str(src), str(tmp_path / "out"), "glb", options={})
+        trimesh.assert_not_called()
+        gltf, _ = _read_glb(tmp_path / "out" / "cloud.glb")
+        assert gltf["accessors"][0]["count"] == 50
+
+    def test_legacy_method_runs_external_chain(self, tmp_path):
+        from tests._ply_text_reference import make_splat_cloud, write_binary_ply
+        src = tmp_path / "cloud.ply"
+        write_binary_ply(src, make_splat_cloud(5))
+        engine = ExportEngine(logger_callback=lambda _m: None)
+        with patch.object(engine, "_try_export_glb_trimesh", return_value=False) as t, \
+             patch.object(engine, "_try_export_glb_open3d", return_value=False) as o, \
+             patch.object(engine, "_try_export_glb_assimp", return_value=True) as a, \
+             patch.object(engine, "_try_export_glb_native") as native:
+            assert engine.export(str(src), str(tmp_path / "out"), "glb", options={"method": "legacy"})
+        t.assert_called_once()
+        o.assert_called_once()
+        a.assert_called_once()
+        native.assert_not_called()
@@ -0,0 +1,79 @@
+"""Tests pour app/core/image_dedupe.py — hash perceptuel et quasi-doublons."""
+import random
+
+import numpy as np
+import pytest
+
+from app.core.image_dedupe import (
+    BKTree,
+    find_near_duplicates,
+    group_near_duplicates,
+    hamming,
+)
+
+cv2 = pytest.importorskip("cv2")
+
+
+class TestBKTree:
+    def test_search_matches_brute_force(self):
+        rng = random.Random(0)
+        values = [rng.getrandbits(64) for _ in range(300)]
+        # Quelques voisins proches pour peupler les petits rayons.
+        values += [v ^ (1 << rng.randrange(64)) for v in values[:50]]
+        tree = BKTree()
+        for i, v in enumerate(values):
+            tree.add(v, i)
+        assert tree.size == len(values)
+        for query in values[:20]:
+            for radius in (0, 3, 10):
+                got = sorted(i for _, i in tree.search(query, radius))
+                want = [i for i, v in enumerate(values) if hamming(query, v) <= radius]
+                assert got == want
+
+
+class TestGrouping:
+    def test_keeps_sharpest_of_each_group(self):
+        signatures = {
+            "a.jpg": (0b0000, 10.0),
+            "b.jpg": (0b0001, 50.0),
+            "c.jpg": (0b0011, 20.0),
+            "z.jpg": ((1 << 64) - 1, 5.0),
+        }
+        groups = group_near_duplicates(signatures, max_distance=2)
+        assert len(groups) == 1
+        assert groups[0].kept == "b.jpg"
+        assert groups[0].removed == ["a.jpg", "c.jpg"]
+        assert groups[0].distances == [1, 1]
+
+    def test_slow_drift_is_not_chained(self):
+        # Chaque image est à 2 bits de la suivante : un pivot ne capture que
+        # ses voisins directs, pas toute la série.
+        signatures = {f"{i:02d}.jpg": ((1 << (2 * i)) - 1, 1.0) for i in range(10)}
+        groups = group_near_duplicates(signatures, max_distance=2)
+        assert all(len(g.removed) + 1 <= 3 for g in groups)
+
+
+class TestFindNearDuplicates:
+    def test_burst_is_collapsed(self, tmp_path):
+        rng = np.random.default_rng(0)
+        scene = cv2.GaussianBlur(rng.integers(0, 256, (240, 320), dtype=np.uint8), (0, 0), 4)
+        other = cv2.GaussianBlur(rng.integers(0, 256, (240, 320), dtype=np.uint8), (0, 0), 4)
+        paths = []
+        for i, img in enumerate([
+            scene,
+            np.clip(scene.astype(np.int16) + 3, 0, 255).astype(np.uint8),  # exposition
+            cv2.GaussianBlur(scene, (0, 0), 2),  # bougé
+            other,
+        ]):
+            p = tmp_path / f"img_{i}.jpg"
+            cv2.imwrite(str(p), img)
+            paths.append(p)
+        groups = find_near_duplicates(paths, workers=2)
+        assert len(groups) == 1
+        assert groups[0].kept in (str(paths[0]), str(paths[1]))  # les deux nettes
+        assert str(paths[3]) not in groups[0].removed and str(paths[2]) in groups[0].removed
+
+    def test_unreadable_files_are_ignored(self, tmp_path):
+        bad = tmp_path / "bad.jpg"
+        bad.write_bytes(b"not an image")
+        assert find_near_duplicates([bad]) == []
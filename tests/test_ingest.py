@@ -0,0 +1,97 @@
+"""Tests pour app/core/ingest.py — import parallèle des images sources."""
+import os
+
+import pytest
+
+from app.core.ingest import (
+    clone_or_copy,
+    find_identical,
+    ingest_files,
+    plan_ingest,
+    scan_image_files,
+)
+
+
+def _write(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    return path
+
+
+@pytest.fixture
+def sources(tmp_path):
+    root = tmp_path / "src"
+    _write(root / "a.jpg", b"A" * 100)
+    _write(root / "b.png", b"B" * 100)  # même taille que a.jpg, contenu différent
+    _write(root / "day1" / "a.jpg", b"A2" * 60)  # même nom, autre contenu
+    _write(root / "day2" / "a.jpg", b"A" * 100)  # copie exacte de a.jpg
+    _write(root / "day2" / "notes.txt", b"x")
+    _write(root / "day2" / "._a.jpg", b"appledouble")
+    _write(root / "day2" / "a.mask.png", b"mask")
+    return root
+
+
+class TestScan:
+    def test_filters_like_image_import(self, sources):
+        found = {p.relative_to(sources).as_posix(): size for p, size in scan_image_files(sources)}
+        assert found == {"a.jpg": 100, "b.png": 100, "day1/a.jpg": 120, "day2/a.jpg": 100}
+
+    def test_does_not_follow_directory_symlinks(self, sources):
+        os.symlink(sources, sources / "loop")
+        assert len(scan_image_files(sources)) == 4
+
+
+class TestPlan:
+    def test_identical_files_by_content(self, sources):
+        files = scan_image_files(sources)
+        duplicates = find_identical(files, workers=2)
+        assert duplicates == {sources / "day2" / "a.jpg": sources / "a.jpg"}
+
+    def test_collision_names_match_legacy_rule(self, sources, tmp_path):
+        images = tmp_path / "images"
+        _write(images / "b.png", b"existing")
+        _write(images / "src_1_b.png", b"existing")
+        files = sorted(scan_image_files(sources))
+        plan = plan_ingest(files, images)
+        names = {src.relative_to(sources).as_posix(): dst.name for src, dst in plan.targets}
+        assert names == {"a.jpg": "a.jpg", "b.png": "src_2_b.png", "day1/a.jpg": "day1_1_a.jpg"}
+        assert [d.relative_to(sources).as_posix() for d, _ in plan.duplicates] == ["day2/a.jpg"]
+
+    def test_keep_identical_when_disabled(self, sources, tmp_path):
+        plan = plan_ingest(scan_image_files(sources), tmp_path / "images", skip_identical=False)
+        assert len(plan.targets) == 4 and not plan.duplicates
+
+
+class TestIngest:
+    def test_copies_plan_in_parallel(self, sources, tmp_path):
+        images = tmp_path / "images"
+        images.mkdir()
+        plan = plan_ingest(scan_image_files(sources), images)
+        progress = []
+        counts = ingest_files(plan.targets, workers=3, on_progress=lambda d, t: progress.append((d, t)))
+        assert sum(counts.values()) == 3
+        assert progress[-1] == (3, 3)
+        for src, dst in plan.targets:
+            assert dst.read_bytes() == src.read_bytes()
+
+    def test_link_mode_shares_inode(self, sources, tmp_path):
+        dst = tmp_path / "linked.jpg"
+        assert clone_or_copy(sources / "a.jpg", dst, mode="link") == "link"
+        assert os.path.samefile(sources / "a.jpg", dst)
+
+    def test_copy_mode_is_independent(self, sources, tmp_path):
+        dst = tmp_path / "copied.jpg"
+        assert clone_or_copy(sources / "a.jpg", dst, mode="copy") == "copy"
+        dst.write_bytes(b"changed")
+        assert (sources / "a.jpg").read_bytes() == b"A" * 100
+
+    def test_cancel_skips_remaining(self, sources, tmp_path):
+        images = tmp_path / "images"
+        images.mkdir()
+        plan = plan_ingest(scan_image_files(sources), images)
+        counts = ingest_files(plan.targets, is_cancelled=lambda: True)
+        assert sum(counts.values()) == 0 and not any(images.iterdir())
+
+    def test_rejects_unknown_mode(self):
+        with pytest.raises(ValueError, match="Mode d'import"):
+            ingest_files([], mode="symlink")
@@ -0,0 +1,103 @@
+"""Tests pour app/core/match_planner.py — choix automatique du matcher COLMAP."""
+import numpy as np
+import pytest
+
+from app.core import match_planner
+from app.core.colmap_commands import build_feature_matching_command
+from app.core.match_planner import (
+    estimate_overlap,
+    nearest_pairs,
+    plan_matching,
+    sequence_score,
+    write_pairs,
+)
+from app.core.params import ColmapParams
+
+cv2 = pytest.importorskip("cv2")
+
+
+def _texture(seed, size=256):
+    rng = np.random.default_rng(seed)
+    small = rng.integers(0, 256, (size // 16, size // 16), dtype=np.uint8)
+    return cv2.resize(small, (size, size), interpolation=cv2.INTER_CUBIC)
+
+
+def _pan(texture, n, step, width=128):
+    """Vues successives d'un travelling horizontal sur ``texture``."""
+    return [texture[:, i * step:i * step + width] for i in range(n)]
+
+
+class TestSequenceScore:
+    def test_numbered_frames(self):
+        assert sequence_score([f"frame_{i:04d}.jpg" for i in range(10)]) == 1.0
+        assert sequence_score([f"IMG_{i}.JPG" for i in range(100, 140, 2)]) == 1.0
+        assert sequence_score([f"cam1/{i:03d}.png" for i in range(5)]) == 1.0
+
+    def test_unordered_names(self):
+        assert sequence_score(["beach.jpg", "dog.jpg", "tree.jpg"]) == 0.0
+        assert sequence_score([f"IMG_{i}.jpg" for i in (3, 17, 18, 40, 95, 96)]) < 0.5
+
+
+class TestDescriptors:
+    def test_overlap_tracks_camera_speed(self):
+        tex = np.hstack([_texture(s) for s in range(4)])
+        slow = np.stack([match_planner.global_descriptor(v) for v in _pan(tex, 80, 1)])
+        fast = np.stack([match_planner.global_descriptor(v) for v in _pan(tex, 80, 8)])
+        assert estimate_overlap(slow) > estimate_overlap(fast) == match_planner.MIN_SEQUENTIAL_OVERLAP
+        assert estimate_overlap(slow[:2]) == match_planner.MIN_SEQUENTIAL_OVERLAP
+
+    def test_nearest_pairs_stay_within_scenes(self):
+        views = _pan(_texture(1), 6, 6) + _pan(_texture(2), 6, 6)
+        desc = np.stack([match_planner.global_descriptor(v) for v in views])
+        pairs = nearest_pairs(desc, k=2, chunk=5)
+        assert pairs
+        assert all((i < 6) == (j < 6) for i, j in pairs)
+        assert all(i < j for i, j in pairs)
+
+
+class TestPlanMatching:
+    def test_small_sets_stay_exhaustive(self, tmp_path):
+        plan = plan_matching(["b.jpg", "a.jpg"], tmp_path)
+        assert plan.matcher == "exhaustive"
+
+    def test_sequence_gets_sequential_with_overlap(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(match_planner, "EXHAUSTIVE_MAX_IMAGES", 5)
+        tex = np.hstack([_texture(s) for s in range(3)])
+        for i, view in enumerate(_pan(tex, 30, 8)):
+            cv2.imwrite(str(tmp_path / f"frame_{i:04d}.png"), cv2.resize(view, (512, 1024)))
+        plan = plan_matching([f"frame_{i:04d}.png" for i in range(30)], tmp_path)
+        assert plan.matcher == "sequential"
+        assert match_planner.MIN_SEQUENTIAL_OVERLAP <= plan.overlap <= match_planner.MAX_SEQUENTIAL_OVERLAP
+
+    def test_unordered_set_gets_pair_list(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(match_planner, "EXHAUSTIVE_MAX_IMAGES", 5)
+        monkeypatch.setattr(match_planner, "PAIRS_PER_IMAGE", 2)
+        names = []
+        for scene in (1, 2):
+            for i, view in enumerate(_pan(_texture(scene), 6, 6)):
+                name = f"{'xyz'[i % 3]}{scene}{i}_{'ab'[scene - 1]}.png"
+                cv2.imwrite(str(tmp_path / name), cv2.resize(view, (512, 1024)))
+                names.append(name)
+        plan = plan_matching(names, tmp_path)
+        assert plan.matcher == "pairs"
+        assert all(a[-5] == b[-5] for a, b in plan.pairs)  # même scène (suffixe _a / _b)
+
+        pairs_path = write_pairs(plan.pairs, tmp_path / "pairs.txt")
+        assert len(pairs_path.read_text().splitlines()) == len(plan.pairs)
+
+
+class TestMatchingCommand:
+    def test_pairs_use_matches_importer(self, tmp_path):
+        cmd, _ = build_feature_matching_command(
+            "colmap", "db", ColmapParams(), 4, matcher_type="pairs", match_list_path=tmp_path / "p.txt",
+        )
+        assert cmd[1] == "matches_importer"
+        assert cmd[cmd.index("--match_type") + 1] == "pairs"
+        assert cmd[cmd.index("--match_list_path") + 1] == str(tmp_path / "p.txt")
+
+    def test_overlap_override(self):
+        cmd, _ = build_feature_matching_command(
+            "colmap", "db", ColmapParams(), 4, matcher_type="sequential", sequential_overlap=12,
+        )
+        assert cmd[1] == "sequential_matcher"
+        assert cmd[cmd.index("--SequentialMatching.overlap") + 1] == "12"
@@ -2,8 +2,9 @@
 import math
 
 import numpy as np
+import pytest
 
-from app.core.ply_cleaner import PRESETS, compute_clean_mask, resolve_params
+from app.core.ply_cleaner import PRESETS, compute_clean_mask, knn_outlier_mask, resolve_params
 
 
 def _logit(alpha):
@@ -62,6 +63,124 @@ class TestComputeKeepMask:
         assert stats["removed"] == 0
 
 
+def _surface_with_floaters(n=20000, floaters=50, seed=0):
+    """Plan dense 20×20 + floaters isolés répartis dans le volume (y compris au centre)."""
+    rng = np.random.default_rng(seed)
+    surface = np.column_stack([rng.uniform(-10, 10, n), rng.uniform(-10, 10, n), rng.normal(0, 0.02, n)])
+    loose = np.column_stack([rng.uniform(-8, 8, floaters), rng.uniform(-8, 8, floaters), rng.uniform(2, 8, floaters)])
+    return np.vstack([surface, loose])
+
+
+class TestKnnOutliers:
+    def test_removes_isolated_floaters_inside_bounds(self):
+        pts = _surface_with_floaters()
+        keep, dist = knn_outlier_mask(pts[:, 0], pts[:, 1], pts[:, 2], k=8, sigma=3.0)
+        assert dist.shape == (len(pts),)
+        assert keep[:20000].mean() > 0.95
+        assert keep[20000:].mean() < 0.1
+
+    def test_voxel_fallback_matches_intent(self):
+        from app.core.ply_cleaner import _voxel_knn_distance
+        pts = _surface_with_floaters()
+        dist = _voxel_knn_distance(pts, 8, 2)
+        assert np.median(dist[20000:]) > 2 * np.median(dist[:20000])
+
+    def test_compute_clean_mask_knn_mode(self):
+        pts = _surface_with_floaters()
+        n = len(pts)
+        opacity = np.full(n, _logit(0.9))
+        zeros = np.zeros(n)
+        params = dict(opacity_min=0.0, scale_pct=100.0, outlier_pct=99.5)
+        _, median_stats = compute_clean_mask(pts[:, 0], pts[:, 1], pts[:, 2], opacity, zeros, zeros, zeros, **params)
+        keep, stats = compute_clean_mask(pts[:, 0], pts[:, 1], pts[:, 2], opacity, zeros, zeros, zeros,
+                                         outlier_mode="knn", knn_k=8, knn_sigma=3.0, **params)
+        # Les floaters proches du centre échappent au mode median, pas au mode knn.
+        assert keep[20000:].sum() < 5
+        assert stats["removed_outlier"] >= 45
+        assert median_stats["removed_outlier"] != stats["removed_outlier"]
+
+    def test_uniform_cloud_keeps_nearly_all(self):
+        rng = np.random.default_rng(1)
+        pts = rng.uniform(-1, 1, (5000, 3))
+        keep, _ = knn_outlier_mask(pts[:, 0], pts[:, 1], pts[:, 2])
+        assert keep.mean() > 0.97
+
+    def test_tiny_cloud_keeps_all(self):
+        keep, _ = knn_outlier_mask(np.zeros(3), np.zeros(3), np.zeros(3), k=8)
+        assert keep.all()
+
+    def test_unknown_mode_rejected(self):
+        zeros = np.zeros(2)
+        with pytest.raises(ValueError):
+            compute_clean_mask(zeros, zeros, zeros, zeros, zeros, zeros, zeros, outlier_mode="nope")
+
+
+class TestLowMemoryMask:
+    def _cloud(self, n=20000, seed=0):
+        rng = np.random.default_rng(seed)
+        cols = [rng.normal(size=n).astype(np.float32) * 3 for _ in range(4)]
+        cols += [rng.normal(-4.0, 1.0, size=n).astype(np.float32) for _ in range(3)]
+        return cols
+
+    def test_matches_float64_mask(self, monkeypatch):
+        import app.core.ply_cleaner as ply_cleaner
+        monkeypatch.setattr(ply_cleaner, "_MASK_CHUNK", 4096)  # plusieurs blocs
+        cols = self._cloud()
+        params = dict(opacity_min=0.2, scale_pct=98.0, outlier_pct=97.0)
+        ref_keep, ref = compute_clean_mask(*cols, **params)
+        keep, stats = compute_clean_mask(*cols, low_memory=True, **params)
+        assert stats["removed_opacity"] == ref["removed_opacity"]
+        assert abs(stats["kept"] - ref["kept"]) <= 2
+        assert (keep != ref_keep).sum() <= 2
+
+    def test_peak_memory_is_lower(self):
+        import tracemalloc
+        cols = self._cloud(200000)
+        peaks = []
+        for low_memory in (False, True):
+            tracemalloc.start()
+            compute_clean_mask(*cols, low_memory=low_memory)
+            peaks.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+        assert peaks[1] * 3 < peaks[0]
+
+    def test_edge_thresholds(self):
+        cols = self._cloud(100)
+        keep, stats = compute_clean_mask(*cols, opacity_min=0.0, scale_pct=100.0,
+                                         outlier_pct=100.0, low_memory=True)
+        assert keep.all()
+        _, stats = compute_clean_mask(*cols, opacity_min=1.0, low_memory=True)
+        assert stats["kept"] == 0
+
+
+class TestStreamingMask:
+    def test_kept_counts_close_to_exact(self, monkeypatch):
+        import app.core.ply_cleaner as ply_cleaner
+        from app.core.quantiles import DEFAULT_RELATIVE_ACCURACY
+        monkeypatch.setattr(ply_cleaner, "_STREAM_CHUNK", 8192)  # plusieurs blocs
+        rng = np.random.default_rng(5)
+        n = 100000
+        cols = [rng.normal(size=n) * 3 for _ in range(4)] + [rng.normal(-4.0, 1.0, n) for _ in range(3)]
+        params = dict(opacity_min=0.2, scale_pct=98.0, outlier_pct=97.0)
+        ref_keep, ref = compute_clean_mask(*cols, **params)
+        keep, stats = compute_clean_mask(*cols, streaming=True, **params)
+        assert stats["removed_opacity"] == ref["removed_opacity"]
+        # Seuls les splats à ±α (relatif) des seuils peuvent changer de camp.
+        sizes = np.exp(np.maximum.reduce(cols[4:]))
+        thr = np.percentile(sizes, 98.0)
+        band = np.abs(sizes - thr) <= 2 * DEFAULT_RELATIVE_ACCURACY * thr
+        assert abs(stats["removed_scale"] - ref["removed_scale"]) <= band.sum()
+        assert abs(stats["kept"] - ref["kept"]) <= 0.001 * n
+        assert (keep != ref_keep).mean() < 0.001
+
+    def test_disabled_thresholds(self):
+        zeros = np.zeros(10)
+        keep, stats = compute_clean_mask(zeros, zeros, zeros, zeros, zeros, zeros, zeros,
+                                         opacity_min=0.0, scale_pct=100.0, outlier_pct=100.0,
+                                         streaming=True)
+        assert keep.all()
+
+
 class TestPresets:
     def test_presets_exist(self):
         assert set(PRESETS) == {"light", "medium", "strong"}
@@ -73,3 +192,9 @@ class TestPresets:
 
     def test_resolve_params_unknown_falls_back_to_medium(self):
         assert resolve_params("nope") == PRESETS["medium"]
+
+    def test_presets_default_to_median_outliers(self):
+        assert all(p["outlier_mode"] == "median" for p in PRESETS.values())
+        p = resolve_params("strong", {"outlier_mode": "knn"})
+        assert p["outlier_mode"] == "knn"
+        assert p["knn_sigma"] == PRESETS["strong"]["knn_sigma"]
@@ -0,0 +1,135 @@
+"""Tests pour app/core/ply_utils.py — lecture mappée du bloc vertex."""
+import struct
+
+import numpy as np
+import pytest
+
+from app.core.ply_utils import parse_ply_header, read_ply_vertices, write_ply_vertices
+
+SAMPLE = [
+    (1.0, 2.0, 3.0, 255, 0, 0),
+    (4.0, 5.0, 6.0, 0, 255, 0),
+    (7.0, 8.0, 9.0, 0, 0, 255),
+]
+
+_PROPS = (
+    "property float x\n"
+    "property float y\n"
+    "property float z\n"
+    "property uchar red\n"
+    "property uchar green\n"
+    "property uchar blue\n"
+)
+
+
+def make_binary(path, vertices):
+    with open(path, "wb") as f:
+        f.write((f"ply\nformat binary_little_endian 1.0\nelement vertex {len(vertices)}\n"
+                 + _PROPS + "end_header\n").encode("ascii"))
+        for v in vertices:
+            f.write(struct.pack("<fffBBB", *v))
+
+
+def make_ascii(path, vertices):
+    with open(path, "w") as f:
+        f.write(f"ply\nformat ascii 1.0\nelement vertex {len(vertices)}\n" + _PROPS + "end_header\n")
+        for v in vertices:
+            f.write(" ".join(str(c) for c in v) + "\n")
+
+
+class TestParseHeader:
+    def test_parses_elements_and_size(self, tmp_path):
+        path = tmp_path / "a.ply"
+        make_binary(path, SAMPLE)
+        header = parse_ply_header(path)
+        assert header["format"] == "binary_little_endian"
+        name, count, props = header["elements"][0]
+        assert (name, count) == ("vertex", 3)
+        assert [p[0] for p in props] == ["x", "y", "z", "red", "green", "blue"]
+        assert path.stat().st_size == header["header_size"] + 3 * 15
+
+    def test_rejects_non_ply(self, tmp_path):
+        path = tmp_path / "bad.ply"
+        path.write_bytes(b"not a ply\n")
+        with pytest.raises(ValueError):
+            parse_ply_header(path)
+
+
+class TestReadPlyVertices:
+    def test_binary_is_memory_mapped(self, tmp_path):
+        path = tmp_path / "a.ply"
+        make_binary(path, SAMPLE)
+        data = read_ply_vertices(path)
+        assert isinstance(data, np.memmap)
+        assert len(data) == 3
+        assert data["y"].tolist() == [2.0, 5.0, 8.0]
+        assert data["blue"].tolist() == [0, 0, 255]
+
+    def test_ascii_falls_back_to_plyfile(self, tmp_path):
+        pytest.importorskip("plyfile")
+        path = tmp_path / "a.ply"
+        make_ascii(path, SAMPLE)
+        data = read_ply_vertices(path)
+        assert not isinstance(data, np.memmap)
+        assert data["x"].tolist() == [1.0, 4.0, 7.0]
+
+    def test_skips_preceding_fixed_element(self, tmp_path):
+        path = tmp_path / "a.ply"
+        with open(path, "wb") as f:
+            f.write((
+                "ply\nformat binary_little_endian 1.0\n"
+                "element meta 2\nproperty int id\n"
+                f"element vertex {len(SAMPLE)}\n" + _PROPS + "end_header\n"
+            ).encode("ascii"))
+            f.write(struct.pack("<ii", 7, 8))
+            for v in SAMPLE:
+                f.write(struct.pack("<fffBBB", *v))
+        data = read_ply_vertices(path)
+        assert isinstance(data, np.memmap)
+        assert data["z"].tolist() == [3.0, 6.0, 9.0]
+
+    def test_missing_vertex_element(self, tmp_path):
+        path = tmp_path / "a.ply"
+        path.write_bytes(b"ply\nformat binary_little_endian 1.0\nelement face 0\nend_header\n")
+        with pytest.raises(ValueError, match="vertex"):
+            read_ply_vertices(path)
+
+
+class TestWritePlyVertices:
+    def _vertices(self, n):
+        data = np.zeros(n, dtype=[("x", "<f4"), ("y", "<f4"), ("z", "<f4"), ("red", "u1")])
+        data["x"] = np.arange(n)
+        data["red"] = np.arange(n) % 256
+        return data
+
+    def test_roundtrip_with_mask_across_chunks(self, tmp_path):
+        data = self._vertices(1000)
+        keep = data["x"] % 3 == 0
+        path = tmp_path / "out.ply"
+        written = write_ply_vertices(path, data, keep, chunk_size=64)
+        assert written == path.stat().st_size
+        back = read_ply_vertices(path)
+        assert len(back) == int(keep.sum())
+        np.testing.assert_array_equal(back, data[keep])
+
+    def test_readable_by_plyfile(self, tmp_path):
+        plyfile = pytest.importorskip("plyfile")
+        data = self._vertices(10)
+        path = tmp_path / "out.ply"
+        write_ply_vertices(path, data)
+        ply = plyfile.PlyData.read(str(path))
+        assert ply["vertex"].count == 10
+        assert ply["vertex"]["red"].tolist() == list(range(10))
+
+    def test_big_endian_source_written_little_endian(self, tmp_path):
+        data = self._vertices(5).astype([("x", ">f4"), ("y", ">f4"), ("z", ">f4"), ("red", "u1")])
+        path = tmp_path / "out.ply"
+        write_ply_vertices(path, data)
+        assert read_ply_vertices(path)["x"].tolist() == [0.0, 1.0, 2.0, 3.0, 4.0]
+
+    def test_empty_mask_writes_header_only(self, tmp_path):
+        data = self._vertices(4)
+        path = tmp_path / "out.ply"
+        write_ply_vertices(path, data, np.zeros(4, dtype=bool))
+        assert parse_ply_header(path)["elements"][0][1] == 0
+        assert len(read_ply_vertices(path)) == 0
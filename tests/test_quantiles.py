@@ -0,0 +1,54 @@
+"""Tests pour app/core/quantiles.py — sketch de quantiles en flux."""
+import numpy as np
+import pytest
+
+from app.core.quantiles import DEFAULT_RELATIVE_ACCURACY, QuantileSketch
+
+
+def _sketch(values, blocks=7, **kwargs):
+    sk = QuantileSketch(**kwargs)
+    for block in np.array_split(values, blocks):
+        sk.update(block)
+    return sk
+
+
+class TestQuantileSketch:
+    @pytest.mark.parametrize("values", [
+        np.random.default_rng(0).lognormal(0.0, 3.0, 50000),
+        np.random.default_rng(1).normal(0.0, 5.0, 50000),
+        np.r_[np.zeros(500), np.random.default_rng(2).exponential(1.0, 5000)],
+    ])
+    def test_relative_error_bound(self, values):
+        sk = _sketch(values)
+        assert sk.count == len(values)
+        for p in (0, 0.5, 1, 10, 50, 90, 99, 99.5, 99.9, 100):
+            exact = np.percentile(values, p)
+            assert abs(sk.percentile(p) - exact) <= DEFAULT_RELATIVE_ACCURACY * abs(exact) + 1e-12
+
+    def test_merge_equals_single_pass(self):
+        values = np.random.default_rng(3).normal(size=10000)
+        left, right = _sketch(values[:4000]), _sketch(values[4000:])
+        left.merge(right)
+        whole = _sketch(values)
+        for q in (0.01, 0.5, 0.99):
+            assert left.quantile(q) == whole.quantile(q)
+
+    def test_ignores_nan_and_bounds_inf(self):
+        sk = _sketch(np.array([1.0, np.nan, 2.0, np.inf, 3.0]), blocks=1)
+        assert sk.count == 4
+        assert sk.quantile(1.0) == np.inf
+        assert sk.quantile(0.0) == 1.0
+
+    def test_coarser_accuracy_is_respected(self):
+        values = np.random.default_rng(4).lognormal(size=20000)
+        sk = _sketch(values, relative_accuracy=0.02)
+        exact = np.percentile(values, 95)
+        assert abs(sk.percentile(95) - exact) <= 0.02 * exact
+
+    def test_empty_and_invalid(self):
+        with pytest.raises(ValueError):
+            QuantileSketch().quantile(0.5)
+        with pytest.raises(ValueError):
+            QuantileSketch(relative_accuracy=0.0)
+        with pytest.raises(ValueError):
+            _sketch(np.ones(3), blocks=1).quantile(1.5)
@@ -0,0 +1,203 @@
+"""Tests pour app/core/scheduler.py — file d'admission des jobs."""
+import json
+import os
+import threading
+import time
+
+import pytest
+
+from app.core import scheduler as scheduler_mod
+from app.core.scheduler import (
+    GIB,
+    JobScheduler,
+    ResourceBudget,
+    ResourceRequest,
+    brush_request,
+    format_state,
+    read_published_states,
+)
+
+# Toute attente d'admission passe par un thread joint avec un délai : une
+# régression de l'ordonnancement fait échouer le test au lieu de le bloquer.
+TIMEOUT = 2.0
+
+
+def _acquire_in_thread(scheduler, name, request=None, **kwargs):
+    """Lance ``acquire`` dans un thread ; renvoie (thread, résultat)."""
+    result = {}
+
+    def target():
+        result["job"] = scheduler.acquire(name, request, poll_interval=0.01, **kwargs)
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    return thread, result
+
+
+def _joined(thread, result):
+    thread.join(TIMEOUT)
+    assert not thread.is_alive(), "acquire toujours bloqué"
+    return result["job"]
+
+
+def _acquire(scheduler, name, request=None):
+    """``acquire`` qui doit aboutir sans attendre (borné par ``TIMEOUT``)."""
+    return _joined(*_acquire_in_thread(scheduler, name, request))
+
+
+def _wait_queued(scheduler, count):
+    deadline = time.monotonic() + TIMEOUT
+    while len(scheduler.snapshot()["queued"]) < count:
+        assert time.monotonic() < deadline, "job jamais mis en file"
+        time.sleep(0.005)
+
+
+class TestAdmission:
+    def test_jobs_within_budget_run_together(self):
+        scheduler = JobScheduler(ResourceBudget(threads=8))
+        a = _acquire(scheduler, "a", ResourceRequest(threads=4))
+        b = _acquire(scheduler, "b", ResourceRequest(threads=4))
+        assert [j["name"] for j in scheduler.snapshot()["running"]] == ["a", "b"]
+        assert scheduler.snapshot()["used"]["threads"] == 8
+        scheduler.release(a)
+        scheduler.release(b)
+        assert scheduler.snapshot()["running"] == []
+
+    def test_gpu_is_exclusive(self):
+        scheduler = JobScheduler(ResourceBudget(threads=8))
+        first = _acquire(scheduler, "brush", ResourceRequest(gpu=True))
+        thread, result = _acquire_in_thread(scheduler, "sharp", ResourceRequest(gpu=True))
+        _wait_queued(scheduler, 1)
+        assert "job" not in result
+        # Un job CPU seul passe à côté du job GPU.
+        cpu = _acquire(scheduler, "colmap", ResourceRequest(threads=2))
+        scheduler.release(first)
+        assert _joined(thread, result).name == "sharp"
+        scheduler.release(cpu)
+        scheduler.release(result["job"])
+
+    def test_gpu_wait_keeps_its_threads_reserved(self):
+        scheduler = JobScheduler(ResourceBudget(threads=4))
+        first = _acquire(scheduler, "brush", ResourceRequest(threads=2, gpu=True))
+        gpu, gpu_result = _acquire_in_thread(scheduler, "sharp", ResourceRequest(threads=2, gpu=True))
+        _wait_queued(scheduler, 1)
+        # Doubler "sharp" lui prendrait ses threads : "colmap" attend son tour.
+        cpu, cpu_result = _acquire_in_thread(scheduler, "colmap", ResourceRequest(threads=1))
+        _wait_queued(scheduler, 2)
+        time.sleep(0.05)
+        assert "job" not in cpu_result
+        scheduler.release(first)
+        assert _joined(gpu, gpu_result).name == "sharp"
+        assert _joined(cpu, cpu_result).name == "colmap"
+        scheduler.release(gpu_result["job"])
+        scheduler.release(cpu_result["job"])
+
+    def test_fifo_blocks_later_small_jobs(self):
+        scheduler = JobScheduler(ResourceBudget(threads=4))
+        running = _acquire(scheduler, "a", ResourceRequest(threads=2))
+        big, big_result = _acquire_in_thread(scheduler, "big", ResourceRequest(threads=4))
+        _wait_queued(scheduler, 1)
+        small, small_result = _acquire_in_thread(scheduler, "small", ResourceRequest(threads=1))
+        _wait_queued(scheduler, 2)
+        # "small" tiendrait dans le budget restant, mais "big" est arrivé avant.
+        time.sleep(0.05)
+        assert "job" not in small_result
+        scheduler.release(running)
+        assert _joined(big, big_result).name == "big"
+        assert "job" not in small_result
+        scheduler.release(big_result["job"])
+        assert _joined(small, small_result).name == "small"
+        scheduler.release(small_result["job"])
+
+    def test_threads_zero_takes_whole_budget(self):
+        scheduler = JobScheduler(ResourceBudget(threads=6))
+        job = _acquire(scheduler, "colmap", ResourceRequest(threads=0))
+        assert job.threads == 6
+        scheduler.release(job)
+
+    def test_oversized_job_runs_alone(self):
+        scheduler = JobScheduler(ResourceBudget(threads=4, memory=8 * GIB))
+        job = _acquire(scheduler, "huge", ResourceRequest(threads=16, memory=32 * GIB))
+        assert job.threads == 4
+        scheduler.release(job)
+
+    def test_memory_budget(self):
+        scheduler = JobScheduler(ResourceBudget(threads=16, memory=8 * GIB))
+        first = _acquire(scheduler, "a", ResourceRequest(memory=6 * GIB))
+        thread, result = _acquire_in_thread(scheduler, "b", ResourceRequest(memory=4 * GIB))
+        _wait_queued(scheduler, 1)
+        assert "job" not in result
+        scheduler.release(first)
+        assert _joined(thread, result) is not None
+        scheduler.release(result["job"])
+
+    def test_unknown_memory_is_unconstrained(self):
+        scheduler = JobScheduler(ResourceBudget(threads=16))
+        jobs = [_acquire(scheduler, n, ResourceRequest(memory=64 * GIB)) for n in "ab"]
+        assert len(scheduler.snapshot()["running"]) == 2
+        for job in jobs:
+            scheduler.release(job)
+
+    def test_brush_request_scales_with_splats(self):
+        assert brush_request(None) == scheduler_mod.ENGINE_REQUESTS["brush"]
+        assert brush_request(1_000_000).memory > brush_request(None).memory
+
+
+class TestCancellationAndState:
+    def test_cancel_while_queued(self):
+        scheduler = JobScheduler(ResourceBudget(threads=2))
+        busy = _acquire(scheduler, "busy", ResourceRequest(threads=2))
+        cancel = threading.Event()
+        thread, result = _acquire_in_thread(scheduler, "waiting", ResourceRequest(),
+                                            is_cancelled=cancel.is_set)
+        _wait_queued(scheduler, 1)
+        cancel.set()
+        assert _joined(thread, result) is None
+        state = scheduler.snapshot()
+        assert state["queued"] == []
+        assert state["history"][-1]["state"] == "cancelled"
+        scheduler.release(busy)
+
+    def test_reserve_marks_failed_on_exception(self):
+        scheduler = JobScheduler(ResourceBudget(threads=2))
+        with pytest.raises(RuntimeError), scheduler.reserve("boom") as job:
+            assert job.state == "running"
+            raise RuntimeError
+        assert scheduler.snapshot()["history"][-1]["state"] == "failed"
+        with scheduler.reserve("ok"):
+            pass
+        assert scheduler.snapshot()["history"][-1]["state"] == "done"
+
+    def test_listener_receives_snapshots(self):
+        scheduler = JobScheduler(ResourceBudget(threads=2))
+        seen = []
+        scheduler.add_listener(lambda state: seen.append(len(state["running"])))
+        with scheduler.reserve("a"):
+            pass
+        assert 1 in seen and seen[-1] == 0
+
+    def test_publish_and_read_states(self, tmp_path):
+        scheduler = JobScheduler(ResourceBudget(threads=4))
+        path = scheduler.publish_state(tmp_path)
+        assert path == tmp_path / f"{os.getpid()}.json"
+        job = _acquire(scheduler, "Brush", ResourceRequest(threads=2, gpu=True))
+
+        # Fichier laissé par un processus disparu : supprimé à la lecture.
+        stale = tmp_path / "999999999.json"
+        stale.write_text(json.dumps(scheduler.snapshot()), encoding="utf-8")
+
+        states = read_published_states(tmp_path)
+        assert [s["pid"] for s in states] == [os.getpid()]
+        assert states[0]["running"][0]["name"] == "Brush"
+        assert not stale.exists()
+
+        text = format_state(states[0])
+        assert "Brush" in text and "GPU occupé" in text
+
+        scheduler.release(job)
+        scheduler.unpublish_state()
+        assert not path.exists()
+
+    def test_format_state_idle(self):
+        state = JobScheduler(ResourceBudget(threads=4)).snapshot()
+        assert "aucun job" in format_state(state)
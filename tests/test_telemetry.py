@@ -0,0 +1,167 @@
+"""Tests pour app/core/telemetry.py — échantillonnage des ressources des sous-processus."""
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+from app.core.base_engine import BaseEngine
+from app.core.telemetry import (
+    GroupUsage,
+    ProcBackend,
+    TelemetryBackend,
+    TelemetrySampler,
+    format_summary,
+    summarize,
+)
+
+
+def _fake_proc(root, pid, pgrp, ticks=(0, 0, 0, 0), rss_kb=0, threads=1, io=(0, 0), comm="colmap",
+               state="S"):
+    """Entrée ``root/<pid>`` au format de /proc (stat, status, io)."""
+    entry = root / str(pid)
+    entry.mkdir(parents=True)
+    utime, stime, cutime, cstime = ticks
+    # stat(5) : pid (comm) state ppid pgrp session tty tpgid flags minflt
+    # cminflt majflt cmajflt utime stime cutime cstime priority nice num_threads …
+    (entry / "stat").write_text(
+        f"{pid} ({comm}) {state} 1 {pgrp} {pgrp} 0 -1 0 0 0 0 0 {utime} {stime} {cutime} {cstime} "
+        f"20 0 {threads} 0 0 0 0\n"
+    )
+    (entry / "status").write_text(f"Name:\t{comm}\nThreads:\t{threads}\nVmRSS:\t{rss_kb} kB\n")
+    (entry / "io").write_text(f"rchar: 1\nwchar: 1\nread_bytes: {io[0]}\nwrite_bytes: {io[1]}\n")
+    return entry
+
+
+class TestProcBackend:
+    def test_sums_the_process_group(self, tmp_path):
+        _fake_proc(tmp_path, 100, 100, ticks=(50, 10, 30, 10), rss_kb=2048, threads=8, io=(4096, 1024))
+        _fake_proc(tmp_path, 101, 100, ticks=(100, 0, 0, 0), rss_kb=1024, threads=4, io=(0, 512),
+                   comm="colmap (worker) 2")
+        _fake_proc(tmp_path, 200, 200, ticks=(999, 0, 0, 0), rss_kb=99999, threads=50)
+        (tmp_path / "self").mkdir()
+
+        backend = ProcBackend(tmp_path)
+        backend.clock_ticks = 100
+        usage = backend.group_usage(100)
+
+        assert usage == GroupUsage(cpu_time=2.0, rss=3 * 1024 * 1024, read_bytes=4096,
+                                   write_bytes=1536, threads=12, processes=2)
+
+    def test_missing_io_and_empty_group(self, tmp_path):
+        entry = _fake_proc(tmp_path, 100, 100, rss_kb=10)
+        (entry / "io").unlink()  # /proc/<pid>/io illisible (autre utilisateur)
+        assert ProcBackend(tmp_path).group_usage(100).read_bytes == 0
+        assert ProcBackend(tmp_path).group_usage(300) is None
+        assert ProcBackend(tmp_path / "absent").group_usage(100) is None
+
+    def test_zombies_are_ignored(self, tmp_path):
+        _fake_proc(tmp_path, 100, 100, rss_kb=2048)
+        _fake_proc(tmp_path, 101, 100, state="Z")
+        _fake_proc(tmp_path, 200, 200, state="Z")
+        backend = ProcBackend(tmp_path)
+        assert backend.group_usage(100).processes == 1
+        # Groupe dont il ne reste que des zombies : terminé.
+        assert backend.group_usage(200) is None
+
+
+class _ScriptedBackend(TelemetryBackend):
+    """Renvoie successivement les usages donnés, puis None (groupe terminé)."""
+
+    def __init__(self, usages):
+        self.usages = list(usages)
+
+    def group_usage(self, pgid):
+        return self.usages.pop(0) if self.usages else None
+
+
+class TestSampler:
+    def test_samples_jsonl_and_summary(self, tmp_path, monkeypatch):
+        clock = iter([0.0, 1.0, 2.0])
+        monkeypatch.setattr("app.core.telemetry.time.monotonic", lambda: next(clock))
+        backend = _ScriptedBackend([
+            GroupUsage(10.0, 100, 1000, 0, 4, 1),   # base au démarrage
+            GroupUsage(12.0, 300, 3000, 50, 8, 2),  # +2 s CPU en 1 s → 200 %
+            GroupUsage(11.0, 200, 2000, 50, 6, 1),  # membre terminé : compteurs reculent
+        ])
+        path = tmp_path / "run.jsonl"
+        sampler = TelemetrySampler(100, path, backend, interval=3600, header={"cmd": ["colmap"]})
+        sampler.start()
+        first, second = sampler.sample(), sampler.sample()
+        summary = sampler.stop()
+
+        assert (first.cpu_percent, first.read_bytes, first.rss) == (200.0, 2000, 300)
+        assert (second.cpu_percent, second.read_bytes) == (0.0, 2000)
+        assert summary["cpu_percent_peak"] == 200.0
+        assert summary["rss_peak"] == 300 and summary["rss_mean"] == 250
+        assert summary["threads_peak"] == 8
+        records = [json.loads(line) for line in path.read_text().splitlines()]
+        assert records[0]["cmd"] == ["colmap"] and records[0]["pgid"] == 100
+        assert [r["t"] for r in records[1:3]] == [1.0, 2.0]
+        assert records[-1]["summary"] == summary
+
+    def test_summary_text(self):
+        summary = summarize([])
+        assert summary is None
+        text = format_summary({
+            "samples": 3, "duration": 3.0, "cpu_percent_mean": 150.0, "cpu_percent_peak": 400.0,
+            "rss_mean": 512 * 1024 ** 2, "rss_peak": 3 * 1024 ** 3, "threads_mean": 6.0,
+            "threads_peak": 12, "processes_peak": 2, "read_bytes": 2048, "write_bytes": 0,
+        })
+        assert "pic 400 %" in text and "pic 3.0 Go" in text and "lu 2.0 Ko" in text
+
+
+class _ConstantBackend(TelemetryBackend):
+    def __init__(self):
+        self.pgids = set()
+
+    def group_usage(self, pgid):
+        self.pgids.add(pgid)
+        return GroupUsage(1.0, 4096, 0, 0, 2, 1)
+
+
+_SLEEP = [sys.executable, "-c", "import time; print('ok'); time.sleep(0.3)"]
+
+
+@pytest.fixture
+def engine(tmp_path):
+    logs = []
+    eng = BaseEngine("test", logger_callback=logs.append)
+    eng.logs = logs
+    eng.telemetry_dir = tmp_path / "telemetry"
+    eng.telemetry_backend = _ConstantBackend()
+    eng._TELEMETRY_INTERVAL = 0.05
+    return eng
+
+
+class TestEngineTelemetry:
+    def _check_run(self, engine):
+        files = list(engine.telemetry_dir.glob("*.jsonl"))
+        assert len(files) == 1 and f"-test-{Path(sys.executable).name}" in files[0].name
+        records = [json.loads(line) for line in files[0].read_text().splitlines()]
+        assert records[0]["engine"] == "test"
+        assert len(records) >= 3 and "summary" in records[-1]
+        assert any(log.startswith("Télémétrie : CPU moy") for log in engine.logs)
+
+    def test_sync_execute_command(self, engine):
+        assert engine._execute_command(_SLEEP) == 0
+        self._check_run(engine)
+        assert len(engine.telemetry_backend.pgids) == 1
+
+    def test_async_execute_command(self, engine):
+        assert asyncio.run(engine._execute_command_async(_SLEEP)) == 0
+        self._check_run(engine)
+
+    def test_disabled_without_directory(self, engine, tmp_path):
+        engine.telemetry_dir = None
+        assert engine._execute_command(_SLEEP) == 0
+        assert not (tmp_path / "telemetry").exists()
+
+    @pytest.mark.skipif(not sys.platform.startswith("linux"), reason="/proc requis")
+    def test_real_proc_backend(self, engine):
+        engine.telemetry_backend = ProcBackend()
+        assert engine._execute_command(_SLEEP) == 0
+        records = [json.loads(line) for line in next(engine.telemetry_dir.glob("*.jsonl")).read_text().splitlines()]
+        samples = [r for r in records[1:] if "rss" in r]
+        assert samples and all(s["rss"] > 0 and s["threads"] >= 1 for s in samples)
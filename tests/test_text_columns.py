@@ -0,0 +1,55 @@
+"""Tests pour app/core/text_columns.py — formatage vectorisé byte-exact."""
+import io
+
+import numpy as np
+import pytest
+
+from app.core.text_columns import fixed_point_chars, join_char_columns, table_chars, text_table, write_rows
+
+
+def _render(values, decimals):
+    return join_char_columns([fixed_point_chars(values, decimals), b"\n"], len(values))
+
+
+class TestFixedPointChars:
+    @pytest.mark.parametrize("decimals", [0, 1, 3, 6, 9])
+    def test_matches_percent_format(self, decimals):
+        rng = np.random.default_rng(decimals)
+        values = np.concatenate([
+            rng.normal(size=5000) * 10.0 ** rng.integers(-8, 6, 5000),
+            rng.normal(size=5000).astype(np.float32).astype(np.float64),
+            rng.integers(-10 ** 6, 10 ** 6, 5000) / 2.0 ** rng.integers(0, 30, 5000),  # exact binary ties
+        ])
+        values = values[np.abs(values) * 10 ** decimals < 2 ** 52]
+        expected = "".join(f"{v:.{decimals}f}\n" for v in values.tolist())
+        assert _render(values, decimals) == expected
+
+    def test_signs_and_ties(self):
+        values = np.array([0.0, -0.0, -1e-9, 0.5, 1.5, 2.5, -2.5, 0.0078125, -0.0078125, 0.9999995])
+        for decimals in (0, 3, 6):
+            assert _render(values, decimals) == "".join(f"{v:.{decimals}f}\n" for v in values.tolist())
+
+    def test_out_of_range_returns_none(self):
+        assert fixed_point_chars(np.array([1.0, np.nan]), 6) is None
+        assert fixed_point_chars(np.array([1e12]), 6) is None
+        assert join_char_columns([b"v ", None], 2) is None
+
+    def test_exact_shortcut_for_float32(self):
+        rng = np.random.default_rng(7)
+        values = (rng.normal(size=20000) * 10.0 ** rng.integers(-4, 4, 20000)).astype(np.float32).astype(np.float64)
+        assert _render(values, 6) == join_char_columns([fixed_point_chars(values, 6, exact=True), b"\n"], len(values))
+
+
+class TestTableAndRows:
+    def test_table_chars_variable_width(self):
+        table = text_table([str(i) for i in range(256)])
+        idx = np.array([0, 7, 42, 255])
+        assert join_char_columns([table_chars(idx, table), b";"], 4) == "0;7;42;255;"
+
+    def test_write_rows_falls_back_per_chunk(self):
+        values = np.array([1.0, 2.0, np.inf, 4.0])
+        out = io.StringIO()
+        write_rows(out, "%.2f\n", 4, lambda s, e: [values[s:e]],
+                   render=lambda s, e: join_char_columns([fixed_point_chars(values[s:e], 2), b"\n"], e - s),
+                   chunk_size=2)
+        assert out.getvalue() == "1.00\n2.00\ninf\n4.00\n"
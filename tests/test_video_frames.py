@@ -0,0 +1,199 @@
+"""Tests pour app/core/video_frames.py — extraction vidéo avec filtrage flou en flux."""
+import io
+import os
+import stat
+import sys
+import time
+
+import numpy as np
+import pytest
+
+from app.core.video_frames import (
+    FramePipe,
+    RollingBlurFilter,
+    allocate_budget,
+    build_pipe_command,
+    extract_frame_indices,
+    extract_sharp_frames,
+    frame_motion,
+    read_ppm_frames,
+    scan_motion,
+    select_blurry_rolling,
+    select_keyframes,
+)
+
+cv2 = pytest.importorskip("cv2")
+
+
+def _ppm(frame):
+    h, w, _ = frame.shape
+    return f"P6\n{w} {h}\n255\n".encode() + frame.tobytes()
+
+
+class TestRollingBlurFilter:
+    def test_rejects_dip_below_local_median(self):
+        scores = [100.0] * 10 + [20.0] + [100.0] * 10
+        assert select_blurry_rolling(scores, 0.7, window=5) == [10]
+
+    def test_follows_gradual_drift(self):
+        # Une médiane globale (130) rejetterait le dernier quart, plus sombre.
+        scores = list(np.linspace(200.0, 60.0, 60))
+        assert select_blurry_rolling(scores, 0.7, window=9) == []
+
+    def test_caps_rejections(self):
+        rolling = RollingBlurFilter(0.7, window=3, max_remove_frac=0.5)
+        kept = [rolling.accept(s) for s in [100.0, 1.0, 1.0, 1.0, 100.0, 1.0]]
+        assert rolling.rejected <= 0.5 * rolling.seen
+        assert kept[0] and sum(not k for k in kept) == rolling.rejected
+
+    def test_zero_factor_keeps_everything(self):
+        assert select_blurry_rolling([5.0, 0.0, 1.0], 0.0) == []
+
+
+class TestPpmStream:
+    def test_parses_concatenated_frames(self):
+        rng = np.random.default_rng(0)
+        frames = [rng.integers(0, 256, (4, 6, 3), dtype=np.uint8) for _ in range(3)]
+        parsed = list(read_ppm_frames(io.BytesIO(b"".join(_ppm(f) for f in frames))))
+        assert len(parsed) == 3
+        for got, want in zip(parsed, frames, strict=True):
+            np.testing.assert_array_equal(got, want)
+
+    def test_truncated_stream_raises(self):
+        data = _ppm(np.zeros((4, 4, 3), dtype=np.uint8))[:-5]
+        with pytest.raises(ValueError, match="tronqué"):
+            list(read_ppm_frames(io.BytesIO(data)))
+
+    def test_pipe_command(self):
+        cmd = build_pipe_command("ffmpeg", "in.mp4", 5, hwaccel="videotoolbox")
+        assert cmd[-1] == "-"
+        assert cmd[cmd.index("-hwaccel") + 1] == "videotoolbox"
+        assert cmd[cmd.index("-vf") + 1] == "fps=5"
+        scaled = build_pipe_command("ffmpeg", "in.mp4", 5, width=320)
+        assert scaled[scaled.index("-vf") + 1] == "fps=5,scale=320:-2"
+
+
+def _fake_ffmpeg(tmp_path, frames, stall=0):
+    """Exécutable qui ignore ses arguments et émet ``frames`` en flux PPM.
+
+    ``stall`` > 0 : reste ensuite bloqué ``stall`` secondes sans rien émettre.
+    """
+    stream = tmp_path / "stream.ppm"
+    stream.write_bytes(b"".join(_ppm(np.repeat(f[:, :, None], 3, axis=2)) for f in frames))
+    script = tmp_path / "ffmpeg"
+    script.write_text(
+        f"#!{sys.executable}\n"
+        "import shutil, sys, time\n"
+        f"shutil.copyfileobj(open({str(stream)!r}, 'rb'), sys.stdout.buffer)\n"
+        "sys.stdout.flush()\n"
+        f"time.sleep({stall})\n"
+    )
+    script.chmod(script.stat().st_mode | stat.S_IXUSR)
+    return script
+
+
+def _texture(seed=1, shape=(48, 64)):
+    rng = np.random.default_rng(seed)
+    return cv2.GaussianBlur(rng.integers(0, 256, shape, dtype=np.uint8), (0, 0), 1.5)
+
+
+@pytest.fixture
+def fake_ffmpeg(tmp_path):
+    """Frames nettes décalées d'un pixel, la septième floue."""
+    sharp = _texture()
+    frames = [cv2.GaussianBlur(sharp, (0, 0), 6) if i == 6 else np.roll(sharp, i, axis=1) for i in range(12)]
+    return _fake_ffmpeg(tmp_path, frames)
+
+
+@pytest.mark.skipif(os.name == "nt", reason="script exécutable POSIX")
+class TestExtractSharpFrames:
+    def test_only_sharp_frames_are_written(self, fake_ffmpeg, tmp_path):
+        out = tmp_path / "images"
+        stats = extract_sharp_frames(str(fake_ffmpeg), "video.mp4", out, 2, prefix="clip", window=5)
+        assert stats["frames"] == 12 and stats["rejected"] == 1 and not stats["error"]
+        names = sorted(p.name for p in out.iterdir())
+        assert len(names) == 11
+        assert "clip_0007.jpg" not in names and "clip_0012.jpg" in names
+
+    def test_cancellation_stops_extraction(self, fake_ffmpeg, tmp_path):
+        stats = extract_sharp_frames(str(fake_ffmpeg), "video.mp4", tmp_path / "images", 2,
+                                     is_cancelled=lambda: True)
+        assert stats["cancelled"] and stats["written"] == 0
+
+
+@pytest.mark.skipif(os.name == "nt", reason="script exécutable POSIX")
+class TestFramePipeTimeout:
+    def test_stalled_ffmpeg_is_killed(self, tmp_path):
+        ffmpeg = _fake_ffmpeg(tmp_path, [_texture()] * 2, stall=60)
+        pipe = FramePipe(str(ffmpeg), "video.mp4", 2, read_timeout=0.5)
+        frames = []
+        with pytest.raises(ValueError, match="aucune frame pendant 0.5 s"):
+            for frame in pipe:
+                frames.append(frame)
+        assert len(frames) == 2
+        assert pipe.close() != 0 and pipe.timed_out
+        assert "aucune frame" in pipe.error
+
+    def test_slow_consumer_is_not_a_stall(self, tmp_path):
+        ffmpeg = _fake_ffmpeg(tmp_path, [_texture()] * 2)
+        pipe = FramePipe(str(ffmpeg), "video.mp4", 2, read_timeout=0.3)
+        count = 0
+        for _ in pipe:
+            time.sleep(0.8)  # traitement lent entre deux frames : pas de délai
+            count += 1
+        assert count == 2 and pipe.close() == 0 and not pipe.error
+
+
+class TestKeyframeSelection:
+    def test_frame_motion_tracks_shift(self):
+        a = _texture(shape=(96, 128))
+        assert frame_motion(a, a) < 1e-3
+        shifted = frame_motion(a, np.roll(a, 4, axis=1))
+        assert shifted == pytest.approx(4 / 128, rel=0.25)
+
+    def test_static_segment_gets_few_frames(self):
+        # 100 frames statiques puis 100 frames de panoramique rapide.
+        motion = np.r_[np.zeros(100), np.full(100, 0.05)]
+        picks = select_keyframes(motion, 20)
+        assert len(picks) == 20 and picks[0] == 0 and picks[-1] == 199
+        assert (picks < 100).sum() <= 2
+
+    def test_fills_budget_despite_motion_jumps(self):
+        motion = np.zeros(50)
+        motion[25] = 1.0
+        picks = select_keyframes(motion, 10)
+        assert len(picks) == 10 and len(set(picks.tolist())) == 10
+
+    def test_prefers_sharp_neighbour(self):
+        motion = np.full(40, 0.01)
+        sharpness = np.ones(40)
+        plain = select_keyframes(motion, 5)
+        sharpness[plain[2] + 1] = 10.0
+        assert plain[2] + 1 in select_keyframes(motion, 5, sharpness)
+
+    def test_budget_larger_than_candidates(self):
+        assert select_keyframes(np.ones(5), 10).tolist() == [0, 1, 2, 3, 4]
+
+    def test_allocate_budget(self):
+        assert allocate_budget([3.0, 1.0], 10) == [7, 3]
+        assert allocate_budget([0.0, 5.0], 10) == [2, 8]
+        assert sum(allocate_budget([1.0, 2.0, 4.0], 17)) == 17
+        assert allocate_budget([1.0, 1.0, 1.0], 2) == [1, 1, 0]
+
+
+@pytest.mark.skipif(os.name == "nt", reason="script exécutable POSIX")
+class TestKeyframeExtraction:
+    def test_scan_then_extract(self, tmp_path):
+        tex = _texture(shape=(96, 128))
+        # 10 frames immobiles puis 10 frames en mouvement (3 px / frame).
+        frames = [tex] * 10 + [np.roll(tex, 3 * i, axis=1) for i in range(1, 11)]
+        ffmpeg = _fake_ffmpeg(tmp_path, frames)
+        scan = scan_motion(str(ffmpeg), "video.mp4", 10)
+        assert not scan["error"] and len(scan["motion"]) == 20
+        assert scan["motion"][:10].max() < 0.005 < scan["motion"][11:].min()
+
+        indices = select_keyframes(scan["motion"], 6, scan["sharpness"])
+        stats = extract_frame_indices(str(ffmpeg), "video.mp4", tmp_path / "images", 10, indices, prefix="clip")
+        assert not stats["error"] and stats["written"] == 6
+        written = sorted(int(p.stem.split("_")[1]) - 1 for p in (tmp_path / "images").iterdir())
+        assert written == indices.tolist()
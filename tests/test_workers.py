@@ -60,6 +60,29 @@ class TestBaseWorker:
             assert worker.is_running is False
             assert worker.stopped_by_user is True
 
+    def test_run_scheduled_cancelled_while_queued(self):
+        """Un worker arrêté pendant l'attente du planificateur n'exécute rien."""
+        from app.core.scheduler import JobScheduler, ResourceBudget, ResourceRequest
+
+        scheduler = JobScheduler(ResourceBudget(threads=4))
+        busy = scheduler.acquire("busy", ResourceRequest(gpu=True))
+        with patch("app.gui.base_worker.QThread.__init__", return_value=None), \
+             patch("app.gui.base_worker.get_scheduler", return_value=scheduler):
+            worker = BaseWorker()
+            worker.is_running = False
+            worker.isInterruptionRequested = MagicMock(return_value=False)
+            worker.log_signal = MagicMock()
+            worker.finished_signal = MagicMock()
+            target = MagicMock()
+
+            worker.run_scheduled("Brush", ResourceRequest(gpu=True), target)
+
+        target.assert_not_called()
+        worker.finished_signal.emit.assert_called_once_with(False, ANY)
+        worker.log_signal.emit.assert_called_once()
+        assert scheduler.snapshot()["history"][-1]["state"] == "cancelled"
+        scheduler.release(busy)
+
 
 # ─────────────────────────────────────────────────────────────────────────────
 # ColmapWorker tests